@@ -0,0 +1,23 @@
+# finpick-back/app/api/admission.py
+from contextlib import asynccontextmanager
+from typing import Any
+
+from fastapi import HTTPException, status
+
+from ..services.admission import AdmissionRejected, LANE_INTERACTIVE, get_admission_controller
+
+
+@asynccontextmanager
+async def admit_or_429(current_user: Any, lane: str = LANE_INTERACTIVE):
+    """사용자별 수락 제어 - 토큰 부족/차선 포화 시 429 + Retry-After"""
+    uid = current_user.uid if hasattr(current_user, 'uid') else str(current_user)
+    try:
+        async with get_admission_controller().admit(uid, lane):
+            yield
+    except AdmissionRejected as e:
+        message = "요청이 너무 잦습니다." if e.reason == "rate_limited" else "요청이 많아 처리할 수 없습니다."
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"{message} {e.retry_after}초 후 다시 시도해주세요.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
@@ -0,0 +1,30 @@
+# finpick-back/app/api/profiles.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from ..services.request_profiler import get_profile_store, is_profiling_admin
+
+router = APIRouter()
+
+
+async def require_profiling_admin(x_profile_token: Optional[str] = Header(None)):
+    """관리자 토큰 확인 - 토큰이 설정되지 않았으면 조회 기능 자체를 숨김(404)"""
+    if not is_profiling_admin(x_profile_token):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@router.get("/profiles", dependencies=[Depends(require_profiling_admin)])
+async def list_profiles(limit: int = Query(50, ge=1, le=500)):
+    """저장된 요청 프로파일 목록 (최신순)"""
+    return {"profiles": get_profile_store().list(limit)}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profiling_admin)], response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """collapsed stack 텍스트 (flamegraph.pl, speedscope 등에 그대로 입력)"""
+    collapsed = get_profile_store().collapsed(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="프로파일을 찾을 수 없습니다.")
+    return PlainTextResponse(collapsed)
@@ -1,15 +1,34 @@
 # finpick-back/app/api/recommendations.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
 from typing import Any, Dict, List, Optional
-import json # json 모듈 추가
 from datetime import datetime
 import re
+import uuid
 
-from ..models.recommendation import RecommendationRequest, FeedbackData, ProductRecommendation
-from ..services.recommendation_service import RecommendationService
+from ..models.recommendation import RecommendationRequest, FeedbackData, ProductRecommendation, RecommendationResult
+from ..services.recommendation_service import RecommendationService, build_recommended_product
 from ..services.gemini_service import GeminiService
+from ..services.history_store import get_history_store
+from ..services.product_catalog import get_product_catalog
+from ..services.batch_recommender import current_views, recommend_records
+from ..services.allocation_engine import allocate_monthly_budget, monthly_budget_from_profile
+from ..services.loan_engine import REPAYMENT_METHODS, RATE_SCENARIOS
+from ..services.rate_index import RATE_METRICS, preferred_period_months
+from ..services.profile_analytics import (
+    assess_investment_readiness,
+    enhance_product_with_user_context,
+    enhance_user_profile_with_analytics,
+    standardize_user_profile
+)
+from ..services.segment_views import generic_query_domain, get_segment_view_store
+from ..services.admission import LANE_BATCH, LANE_INTERACTIVE
+from ..services.selection_engine import SelectionConstraints, select_diverse_top_k, product_quality_score, provider_name
+from ..services.token_usage import current_request_usage
 from ..auth.dependencies import get_current_user
+from .admission import admit_or_429
+from .responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -18,6 +37,12 @@ async def process_natural_language_query(
     request_data: Dict[str, Any],
     current_user: Any = Depends(get_current_user)
 ):
+    """자연어 쿼리 처리 - 사용자별 수락 제어(대화형 차선) 통과 후 실행"""
+    async with admit_or_429(current_user, LANE_INTERACTIVE):
+        return await _process_natural_language_query(request_data, current_user)
+
+
+async def _process_natural_language_query(request_data: Dict[str, Any], current_user: Any):
     """자연어 쿼리 처리 - Firestore 사용자 정보 연동 개선"""
     
     try:
@@ -38,12 +63,26 @@ async def process_natural_language_query(
         
         user_id_str = current_user.uid if hasattr(current_user, 'uid') else str(current_user)
         
-        standardized_profile = _standardize_user_profile(user_profile)
-        enhanced_profile = _enhance_user_profile_with_analytics(standardized_profile)
+        standardized_profile = standardize_user_profile(user_profile)
+        enhanced_profile = enhance_user_profile_with_analytics(standardized_profile)
         
         print(f"🔄 표준화된 프로필: {standardized_profile}")
         print(f"🚀 분석 강화된 프로필: {enhanced_profile}")
         
+        # 🧮 상품 유형만 말한 단순 요청은 사용자 유형별 사전 계산 뷰로 응답 (Gemini는 설명 문구만)
+        view_domain = generic_query_domain(natural_query)
+        segment_views = get_segment_view_store() if view_domain else None
+        if segment_views is not None:
+            catalog = get_product_catalog()
+            view_products = segment_views.lookup(catalog, view_domain, enhanced_profile, limit)
+            if view_products:
+                view_response = await _build_segment_view_response(
+                    natural_query, view_domain, view_products, enhanced_profile, len(catalog.products)
+                )
+                return FastJSONResponse(
+                    await _record_history_session(user_id_str, natural_query, view_response)
+                )
+        
         service = RecommendationService()
         gemini_service = GeminiService()
         
@@ -57,13 +96,11 @@ async def process_natural_language_query(
             limit=limit
         )
         
-        print(f"💡 DEBUG: Full AI Result from GeminiService: {json.dumps(ai_result, indent=2)}")
-        
         # 🔥 관련성 검사 실패한 경우 - 상품 데이터 없이 안내 메시지만 반환
         if not ai_result.get("is_financial_related", True):
             print(f"❌ 금융 관련 없는 요청 감지")
             
-            return {
+            return FastJSONResponse({
                 "success": False,
                 "is_financial_related": False,
                 "message": ai_result.get("suggested_response", 
@@ -72,52 +109,48 @@ async def process_natural_language_query(
                 "reason": ai_result.get("reason", ""),
                 "data": [],
                 "timestamp": datetime.now().isoformat()
-            }
+            })
 
         # 🔥 관련성 검사 통과한 경우 - 기존 로직 그대로
         if ai_result.get("success"):
             print("✅ 강화된 사용자 맞춤 금융모델 추천 성공")
             
-            # 기존 코드 그대로 유지하되 enhanced_profile 전달
+            # 🔥 enhanced_profile 전달 - RecommendationResult 스키마 그대로인 dict를 orjson으로 한 번 직렬화
             recommended_products = []
             
             for product_data in ai_result.get("recommended_products", []):
-                print(f"💡 DEBUG: Processing product_data in loop: {product_data}")
-                
                 if product_data and product_data.get("product_id"):
-                    print(f"💡 DEBUG: Found product ID: {product_data.get('product_id')}")
-                    # 🔥 enhanced_profile 전달
-                    enhanced_product = _enhance_product_with_user_context_v2(
-                        product_data,
-                        enhanced_profile  # 사용자 프로필 전달
-                    )
-                    recommended_products.append(enhanced_product)
+                    recommended_products.append(enhance_product_with_user_context(product_data, enhanced_profile))
                 else:
                     print(f"❌ DEBUG: Invalid product_data: {product_data}")
             
             print(f"💡 DEBUG: Final recommended_products list size: {len(recommended_products)}")
-            print(f"💡 DEBUG: Final recommended_products list: {json.dumps(recommended_products, indent=2)}")
-
-            response_data = {
-                "success": True,
-                "is_financial_related": True,
-                "data": recommended_products,
-                "personalization_level": _determine_personalization_level(enhanced_profile),
-                "user_insights": _generate_user_insights(enhanced_profile),
-                "recommendation_reasoning": _generate_recommendation_reasoning(enhanced_profile, recommended_products),
-                "ai_metadata": {
+
+            result = RecommendationResult.payload(
+                recommendation_type="financial_model_based",
+                data=recommended_products,
+                personalization_level=_determine_personalization_level(enhanced_profile),
+                user_insights=_generate_user_insights(enhanced_profile),
+                recommendation_reasoning=_generate_recommendation_reasoning(enhanced_profile, recommended_products),
+                ai_metadata={
                     "domain": ai_result.get("domain"),
                     "total_products_analyzed": len(available_products),
                     "user_profile_completeness": _calculate_profile_completeness(enhanced_profile),
-                    "processing_time": ai_result.get("processing_time", 0)
+                    "processing_time": ai_result.get("processing_time", 0),
+                    "token_usage": current_request_usage()
                 }
-            }
+            )
             
-            return response_data
+            return FastJSONResponse(
+                await _record_history_session(user_id_str, natural_query, result)
+            )
         else:
             print("❌ AI 추천 실패, 기본 추천으로 폴백")
             # 🔥 폴백에도 enhanced_profile 전달
-            return await _generate_fallback_recommendations(natural_query, available_products, limit, enhanced_profile)
+            fallback_response = await _generate_fallback_recommendations(natural_query, available_products, limit, enhanced_profile)
+            return FastJSONResponse(
+                await _record_history_session(user_id_str, natural_query, fallback_response)
+            )
             
     except Exception as e:
         print(f"❌ 자연어 추천 처리 실패: {e}")
@@ -126,6 +159,96 @@ async def process_natural_language_query(
             detail=f"추천 처리에 실패했습니다: {str(e)}"
         )
 
+async def _build_segment_view_response(
+    query: str,
+    domain: str,
+    view_products: List[Dict[str, Any]],
+    user_profile: Dict[str, Any],
+    total_products: int
+) -> Dict[str, Any]:
+    """사전 계산 뷰 상품에 사용자별 정보를 붙이고 Gemini로 추천 설명만 생성"""
+    recommended_products = [
+        enhance_product_with_user_context(product_data, user_profile)
+        for product_data in view_products
+    ]
+    
+    reasoning = None
+    try:
+        reasoning = await GeminiService().generate_recommendation_narrative(
+            query, domain, recommended_products, user_profile
+        )
+    except Exception as e:
+        print(f"⚠️ 추천 설명 생성 실패, 기본 설명 사용: {e}")
+    
+    return RecommendationResult.payload(
+        recommendation_type="segment_view",
+        data=recommended_products,
+        personalization_level=_determine_personalization_level(user_profile),
+        user_insights=_generate_user_insights(user_profile),
+        recommendation_reasoning=reasoning or _generate_recommendation_reasoning(user_profile, recommended_products),
+        ai_metadata={
+            "domain": domain,
+            "total_products_analyzed": total_products,
+            "user_profile_completeness": _calculate_profile_completeness(user_profile),
+            "processing_time": 0,
+            "source": "segment_view",
+            "token_usage": current_request_usage()
+        }
+    )
+
+async def _record_history_session(user_id: str, query: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """추천 응답을 이력 저장소에 기록하고 session_id를 붙여 반환 (기록 실패는 응답에 영향 없음)"""
+    session_id = str(uuid.uuid4())
+    response["session_id"] = session_id
+    try:
+        await get_history_store().record_session({
+            "session_id": session_id,
+            "user_id": user_id,
+            "query": query,
+            "created_at": datetime.now().isoformat(),
+            "response": response
+        })
+    except Exception as e:
+        print(f"⚠️ 추천 이력 기록 실패: {e}")
+    return response
+
+@router.get("/history", status_code=status.HTTP_200_OK)
+async def get_recommendation_history(
+    page: int = 1,
+    page_size: int = 10,
+    current_user: Any = Depends(get_current_user)
+):
+    """지난 추천 이력 조회 (최신순, Gemini 재호출 없이 저장된 응답 반환)"""
+    if page < 1 or not 1 <= page_size <= 50:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="page는 1 이상, page_size는 1~50 이어야 합니다."
+        )
+    
+    try:
+        user_id_str = current_user.uid if hasattr(current_user, 'uid') else str(current_user)
+        history = await get_history_store().get_history(user_id_str, page, page_size)
+        
+        return {
+            "success": True,
+            "data": history["items"],
+            "pagination": {
+                "page": history["page"],
+                "page_size": history["page_size"],
+                "total": history["total"],
+                "has_next": history["has_next"]
+            },
+            "source": history["source"],
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        print(f"❌ 추천 이력 조회 실패: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="추천 이력 조회에 실패했습니다."
+        )
+
 @router.post("/feedback", status_code=status.HTTP_200_OK)
 async def submit_recommendation_feedback(
     feedback_data: FeedbackData,
@@ -135,11 +258,24 @@ async def submit_recommendation_feedback(
     try:
         user_id_str = current_user.uid if hasattr(current_user, 'uid') else str(current_user)
         
-        print(f"📝 피드백 수신: {feedback_data.rating}/5 - {feedback_data.feedback}")
+        print(f"📝 피드백 수신: {feedback_data.rating}/5 - {feedback_data.feedback_text}")
         print(f"👤 사용자: {user_id_str}")
         
+        feedback_id = str(uuid.uuid4())
+        await get_history_store().record_feedback({
+            "feedback_id": feedback_id,
+            "user_id": user_id_str,
+            "recommendation_id": feedback_data.recommendation_id,
+            "rating": feedback_data.rating,
+            "feedback_text": feedback_data.feedback_text,
+            "interaction_type": feedback_data.interaction_type,
+            "product_ids": feedback_data.product_ids,
+            "created_at": feedback_data.timestamp.isoformat()
+        })
+        
         return {
             "success": True,
+            "feedback_id": feedback_id,
             "message": "피드백이 성공적으로 제출되었습니다.",
             "timestamp": datetime.now().isoformat()
         }
@@ -151,255 +287,363 @@ async def submit_recommendation_feedback(
             detail="피드백 처리에 실패했습니다."
         )
 
-# === 🔥 새로운 헬퍼 함수 - 사용자 프로필 기반 개선 ===
+@router.get("/search", status_code=status.HTTP_200_OK)
+async def search_products(
+    q: str,
+    limit: int = 10,
+    product_type: Optional[str] = None,
+    current_user: Any = Depends(get_current_user)
+):
+    """상품 키워드 검색 - 한국어 n-gram 역색인 + BM25"""
 
-def _enhance_product_with_user_context_v2(
-    product_data: Dict[str, Any], 
-    user_profile: Dict[str, Any]
-) -> Dict[str, Any]:
-    """새로운 AI 응답 구조를 위한 상품 컨텍스트 추가 함수 - 사용자 프로필 기반"""
-    
-    # 🔥 GeminiService에서 이미 사용자 프로필 기반으로 계산된 데이터를 사용
-    # user_specific 정보가 이미 계산되어 있으므로 그대로 사용
-    enhanced_product = {
-        "product_id": product_data.get('product_id'),
-        "name": product_data.get('name'),
-        "bank_name": product_data.get('bank_name'),
-        "type": product_data.get('type'),
-        "interest_rate": product_data.get('interest_rate'),
-        "conditions": product_data.get('conditions', {}),
-        "features": product_data.get('features', []),
-        
-        # AI 분석 결과 그대로 사용
-        "ai_analysis": product_data.get('ai_analysis', {
-            "suitability_score": 0.5,
-            "match_reasons": [],
-            "risk_assessment": "보통",
-            "expected_benefit": ""
-        }),
-        
-        # 🔥 사용자 특정 정보 - GeminiService에서 계산된 값 사용
-        "user_specific": product_data.get('user_specific', {
-            "recommended_monthly_amount": _estimate_monthly_amount_with_profile(product_data, user_profile),
-            "risk_compatibility": _assess_risk_compatibility_simple(product_data, user_profile),
-            "age_appropriateness": _assess_age_appropriateness_simple(product_data, user_profile)
+    query = q.strip()
+    if not query:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="검색어가 비어있습니다."
+        )
+
+    catalog = get_product_catalog()
+    hits = catalog.search_index.search(query, limit=max(1, min(limit, 50)), product_type=product_type)
+
+    results = []
+    for doc, score in hits:
+        product = catalog.products[doc]
+        results.append({
+            "product_id": product.get("id", ""),
+            "name": product.get("name", ""),
+            "bank_name": product.get("provider", {}).get("name", ""),
+            "type": product.get("type", ""),
+            "interest_rate": product.get("details", {}).get("interest_rate", 0),
+            "score": round(score, 4)
         })
+
+    return {
+        "success": True,
+        "query": query,
+        "data": results,
+        "total": len(results),
+        "catalog_version": catalog.version,
+        "timestamp": datetime.now().isoformat()
     }
-    
-    return enhanced_product
 
-# === 간단한 헬퍼 함수들 (GeminiService 함수들의 단순화 버전) ===
+@router.get("/best-rates", status_code=status.HTTP_200_OK)
+async def get_best_rate_products(
+    product_type: str = "적금",
+    period_months: int = 12,
+    metric: str = "max_rate",
+    max_min_amount: Optional[int] = None,
+    limit: int = 10,
+    current_user: Any = Depends(get_current_user)
+):
+    """기간별 금리 상위 상품 조회 (예: 12개월 적금 최고금리 순, 최소가입금액 ≤ X)"""
 
-def _estimate_monthly_amount_with_profile(product_data: Dict, user_profile: Optional[Dict]) -> int:
-    """사용자 프로필 기반 월 납입액 추정 - 단순화 버전"""
-    
-    if not user_profile:
-        return 300000  # 기본값
-    
-    basic_info = user_profile.get("basic_info", {})
-    min_amount = product_data.get('conditions', {}).get('minimum_amount', 100000)
-    if isinstance(min_amount, str):
-        try:
-            min_amount = int(min_amount)
-        except:
-            min_amount = 100000
-    
-    base_amount = max(100000, min_amount)
-    
-    # 직업 기반 조정
-    occupation = basic_info.get("occupation", "").lower()
-    if any(job in occupation for job in ["의사", "변호사", "회계사"]):
-        multiplier = 2.0
-    elif any(job in occupation for job in ["공무원", "교사"]):
-        multiplier = 1.5
-    elif any(job in occupation for job in ["학생"]):
-        multiplier = 0.5
-    else:
-        multiplier = 1.0
-    
-    # 연령 기반 조정
-    age = basic_info.get("age", "")
-    if "20" in age:
-        multiplier *= 0.8
-    elif "40" in age or "50" in age:
-        multiplier *= 1.3
-    
-    # 상품 타입별 조정
-    product_type = product_data.get('type', '').lower()
-    if "예금" in product_type:
-        multiplier *= 2.5  # 예금은 목돈
-    elif "대출" in product_type:
-        return 0  # 대출은 월 납입액 없음
-    
-    calculated = int(base_amount * multiplier)
-    return max(100000, min(1000000, calculated))
+    if metric not in RATE_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"지원하지 않는 금리 기준입니다: {metric} (가능: {', '.join(RATE_METRICS)})"
+        )
 
-def _assess_risk_compatibility_simple(product_data: Dict, user_profile: Optional[Dict]) -> str:
-    """간단한 위험도 적합성 평가"""
-    
-    if not user_profile:
-        return "적합"
-    
-    investment_profile = user_profile.get("investment_profile", {})
-    risk_score = investment_profile.get("total_score", 25)
-    
-    product_type = product_data.get('type', '').lower()
-    
-    if any(keyword in product_type for keyword in ["예금", "적금"]):
-        if risk_score <= 20:
-            return "매우 적합"
-        else:
-            return "적합"
-    elif "대출" in product_type:
-        if risk_score <= 20:
-            return "신중히 검토"
-        else:
-            return "적합"
-    
-    return "적합"
+    catalog = get_product_catalog()
+    resolved_period, entries = catalog.rate_index.top_products(
+        product_type,
+        period_months,
+        metric=metric,
+        limit=max(1, min(limit, 50)),
+        max_min_amount=max_min_amount
+    )
 
-def _assess_age_appropriateness_simple(product_data: Dict, user_profile: Optional[Dict]) -> str:
-    """간단한 연령 적합성 평가"""
-    
-    if not user_profile:
-        return "적합"
-    
-    basic_info = user_profile.get("basic_info", {})
-    age = basic_info.get("age", "")
-    product_type = product_data.get('type', '').lower()
-    
-    if "20" in age:
-        if "대출" in product_type:
-            return "신중한 계획 필요"
-        else:
-            return "목돈 마련에 적합"
-    elif "30" in age or "40" in age:
-        return "적합"
-    elif "50" in age or "60" in age:
-        if "대출" in product_type:
-            return "상환 계획 검토"
-        else:
-            return "안정 운용에 적합"
-    
-    return "적합"
+    if resolved_period is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"금리표가 있는 상품 타입이 아닙니다: {product_type}"
+        )
 
-# === 기존 헬퍼 함수들 ===
+    results = []
+    for entry in entries:
+        product = catalog.products[entry.doc]
+        results.append({
+            "product_id": product.get("id", ""),
+            "name": product.get("name", ""),
+            "bank_name": product.get("provider", {}).get("name", ""),
+            "type": product.get("type", ""),
+            "period_months": resolved_period,
+            "base_rate": entry.base_rate,
+            "max_rate": entry.max_rate,
+            "rate_type": entry.rate_type,
+            "minimum_amount": int(entry.minimum_amount)
+        })
 
-def _standardize_user_profile(raw_profile: Dict[str, Any]) -> Dict[str, Any]:
-    """원시 사용자 프로필을 표준화된 형식으로 변환"""
-    
-    if not raw_profile:
-        return {}
-    
-    standardized = {
-        "basic_info": {
-            "age": raw_profile.get("basicInfo", {}).get("age", ""),
-            "gender": raw_profile.get("basicInfo", {}).get("gender", ""),
-            "occupation": raw_profile.get("basicInfo", {}).get("occupation", ""),
-            "residence": raw_profile.get("basicInfo", {}).get("residence", ""),
-            "marital_status": raw_profile.get("basicInfo", {}).get("maritalStatus", ""),
-            "dependents": raw_profile.get("basicInfo", {}).get("dependents", "")
-        },
-        "investment_profile": {
-            "risk_tolerance": raw_profile.get("investmentProfile", {}).get("riskTolerance", {}),
-            "investment_period": raw_profile.get("investmentProfile", {}).get("investmentPeriod", {}),
-            "investment_knowledge": raw_profile.get("investmentProfile", {}).get("investmentKnowledge", {}),
-            "return_expectation": raw_profile.get("investmentProfile", {}).get("returnExpectation", {}),
-            "total_score": raw_profile.get("investmentProfile", {}).get("totalScore", 0)
-        },
-        "financial_status": raw_profile.get("financialStatus"),
-        "investment_goals": raw_profile.get("investmentGoals")
+    return {
+        "success": True,
+        "product_type": product_type,
+        "requested_period_months": period_months,
+        "period_months": resolved_period,
+        "metric": metric,
+        "data": results,
+        "total": len(results),
+        "catalog_version": catalog.version,
+        "timestamp": datetime.now().isoformat()
     }
-    
-    return standardized
 
-def _enhance_user_profile_with_analytics(profile: Dict[str, Any]) -> Dict[str, Any]:
-    """사용자 프로필에 분석 요소 추가"""
-    
-    enhanced = profile.copy()
-    
-    # 투자 성향 점수 기반 분석
-    investment_profile = profile.get("investment_profile", {})
-    risk_score = investment_profile.get("total_score", 0)
-    
-    # 위험 성향 분류
-    if risk_score <= 20:
-        risk_category = "conservative"
-    elif risk_score <= 40:
-        risk_category = "moderate"
-    else:
-        risk_category = "aggressive"
+@router.get("/maturity-comparison", status_code=status.HTTP_200_OK)
+async def compare_maturity_amounts(
+    amount: int,
+    product_type: str = "적금",
+    period_months: int = 12,
+    metric: str = "max_rate",
+    limit: int = 20,
+    current_user: Any = Depends(get_current_user)
+):
+    """세후 만기 수령액 비교 (예금: 예치금 / 적금: 월 납입액 기준, 이자소득세 15.4%)"""
+
+    if metric not in RATE_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"지원하지 않는 금리 기준입니다: {metric} (가능: {', '.join(RATE_METRICS)})"
+        )
+    if amount <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="금액은 0보다 커야 합니다."
+        )
+
+    catalog = get_product_catalog()
+    resolved_period = catalog.rate_index.resolve_period(product_type, period_months)
+    if resolved_period is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"금리표가 있는 상품 타입이 아닙니다: {product_type}"
+        )
+
+    comparisons = catalog.yield_engine.compare(
+        product_type, amount, resolved_period, metric=metric, limit=max(1, min(limit, 100))
+    )
+
+    results = []
+    for item in comparisons:
+        product = catalog.products[item.pop("doc")]
+        results.append({
+            "name": product.get("name", ""),
+            "bank_name": product.get("provider", {}).get("name", ""),
+            "type": product.get("type", ""),
+            **item
+        })
+
+    return {
+        "success": True,
+        "product_type": product_type,
+        "amount": amount,
+        "requested_period_months": period_months,
+        "period_months": resolved_period,
+        "metric": metric,
+        "data": results,
+        "total": len(results),
+        "catalog_version": catalog.version,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.post("/allocation", status_code=status.HTTP_200_OK)
+async def allocate_savings_budget(
+    request_data: Dict[str, Any],
+    current_user: Any = Depends(get_current_user)
+):
+    """월 저축 예산을 여러 적금에 나눠 담는 배분안 (상품별 한도/최소금액/은행 분산 반영)"""
+
+    user_profile = request_data.get("user_profile", {}) or {}
+    monthly_budget = request_data.get("monthly_budget") or monthly_budget_from_profile(user_profile)
+    period_months = request_data.get("period_months") or preferred_period_months(user_profile) or 12
+    max_products = request_data.get("max_products", 3)
+    max_per_provider = request_data.get("max_per_provider", 1)
+
+    try:
+        monthly_budget = int(monthly_budget or 0)
+        period_months, max_products, max_per_provider = int(period_months), int(max_products), int(max_per_provider)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="월 예산/기간/상품 수는 숫자여야 합니다."
+        )
+    if monthly_budget <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="월 예산(monthly_budget)이 필요합니다."
+        )
+    if not 1 <= max_products <= 10 or max_per_provider < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="상품 수는 1~10개, 은행별 상품 수는 1개 이상이어야 합니다."
+        )
+
+    catalog = get_product_catalog()
+    resolved_period = catalog.rate_index.resolve_period("적금", period_months) or period_months
+    allocation = allocate_monthly_budget(
+        catalog.yield_engine,
+        catalog.products,
+        monthly_budget,
+        period_months=resolved_period,
+        max_products=max_products,
+        max_per_provider=max_per_provider
+    )
+
+    return {
+        "success": True,
+        "requested_period_months": period_months,
+        "data": allocation,
+        "catalog_version": catalog.version,
+        "timestamp": datetime.now().isoformat()
+    }
+
+# 동기 배치 API 최대 건수 (그 이상은 CLI: python -m app.services.batch_recommender)
+BATCH_API_MAX_PROFILES = 1000
+
+@router.post("/batch", status_code=status.HTTP_200_OK)
+async def recommend_profiles_batch(
+    request_data: Dict[str, Any],
+    current_user: Any = Depends(get_current_user)
+):
+    """여러 고객 프로필 일괄 추천 (로컬 사용자 유형 뷰 기반, Gemini 호출 없음)
     
-    # 연령대 기반 분석
-    basic_info = profile.get("basic_info", {})
-    age = basic_info.get("age", "")
+    request_data: {"profiles": [{"user_id", "profile", "domain"?}], "limit": 5}
+    """
+    profiles = request_data.get("profiles") or []
+    limit = request_data.get("limit", 5)
     
-    if "20" in age:
-        age_group = "young"
-    elif "30" in age or "40" in age:
-        age_group = "middle"
-    else:
-        age_group = "senior"
+    if not isinstance(profiles, list) or not profiles:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="profiles 목록이 비어있습니다."
+        )
+    if len(profiles) > BATCH_API_MAX_PROFILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"한 번에 최대 {BATCH_API_MAX_PROFILES}건까지 처리할 수 있습니다. 대량 처리는 배치 CLI를 사용하세요."
+        )
     
-    enhanced["personalization_factors"] = {
-        "life_stage": _determine_life_stage(profile),
-        "financial_stability": _assess_financial_stability(profile),
-        "investment_readiness": _assess_investment_readiness(profile),
-        "goal_urgency": _assess_goal_urgency(profile)
+    try:
+        async with admit_or_429(current_user, LANE_BATCH):
+            views = await asyncio.to_thread(current_views)
+            results, errors = await asyncio.to_thread(recommend_records, profiles, views, limit)
+        
+        return FastJSONResponse({
+            "success": True,
+            "data": results,
+            "total_count": len(results),
+            "error_count": errors,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ 일괄 추천 실패: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="일괄 추천에 실패했습니다."
+        )
+
+def _validate_loan_options(method: Optional[str], scenario: str):
+    if method and method not in REPAYMENT_METHODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"지원하지 않는 상환방식입니다: {method} (가능: {', '.join(REPAYMENT_METHODS)})"
+        )
+    if scenario not in RATE_SCENARIOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"지원하지 않는 금리 시나리오입니다: {scenario} (가능: {', '.join(RATE_SCENARIOS)})"
+        )
+
+@router.get("/loan-comparison", status_code=status.HTTP_200_OK)
+async def compare_loan_costs(
+    principal: int,
+    months: int = 360,
+    method: Optional[str] = None,
+    scenario: str = "avg_rate",
+    annual_income: Optional[int] = None,
+    existing_annual_debt_service: int = 0,
+    max_dsr: Optional[float] = None,
+    limit: int = 20,
+    current_user: Any = Depends(get_current_user)
+):
+    """대출상품 총 상환비용 비교 (월 상환액 / 총이자 / DSR)"""
+
+    _validate_loan_options(method, scenario)
+    if principal <= 0 or months <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="대출금액과 기간은 0보다 커야 합니다."
+        )
+
+    catalog = get_product_catalog()
+    ranked = catalog.loan_engine.rank_by_total_cost(
+        principal,
+        months,
+        method=method,
+        scenario=scenario,
+        annual_income=annual_income,
+        existing_annual_debt_service=existing_annual_debt_service,
+        max_dsr=max_dsr,
+        limit=max(1, min(limit, 100))
+    )
+
+    results = []
+    for item in ranked:
+        product = catalog.products[item.pop("doc")]
+        results.append({
+            "name": product.get("name", ""),
+            "bank_name": product.get("provider", {}).get("name", ""),
+            "type": product.get("type", ""),
+            **item
+        })
+
+    return {
+        "success": True,
+        "principal": principal,
+        "months": months,
+        "scenario": scenario,
+        "data": results,
+        "total": len(results),
+        "catalog_version": catalog.version,
+        "timestamp": datetime.now().isoformat()
     }
-    
-    return enhanced
 
-def _determine_life_stage(profile: Dict[str, Any]) -> str:
-    """생애 주기 단계 결정"""
-    basic_info = profile.get("basic_info", {})
-    age = basic_info.get("age", "")
-    marital_status = basic_info.get("marital_status", "")
-    
-    if "20" in age:
-        return "young_professional"
-    elif "30" in age and marital_status == "미혼":
-        return "single_professional"
-    elif "30" in age or "40" in age:
-        return "family_building"
-    else:
-        return "pre_retirement"
+@router.get("/loan-schedule/{product_id}", status_code=status.HTTP_200_OK)
+async def get_loan_schedule(
+    product_id: str,
+    principal: int,
+    months: int = 360,
+    method: str = "equal_installment",
+    scenario: str = "avg_rate",
+    current_user: Any = Depends(get_current_user)
+):
+    """대출상품 월별 상환 스케줄"""
 
-def _assess_financial_stability(profile: Dict[str, Any]) -> str:
-    """재정적 안정성 평가"""
-    # 기본적인 직업 기반 안정성 평가
-    basic_info = profile.get("basic_info", {})
-    occupation = basic_info.get("occupation", "").lower()
-    
-    stable_occupations = ["공무원", "교사", "의사", "변호사", "회계사"]
-    if any(job in occupation for job in stable_occupations):
-        return "high"
-    else:
-        return "medium"
+    _validate_loan_options(method, scenario)
+    if principal <= 0 or not 0 < months <= 600:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="대출금액은 0보다 크고 기간은 1~600개월이어야 합니다."
+        )
 
-def _assess_investment_readiness(profile: Dict[str, Any]) -> str:
-    """투자 준비도 평가"""
-    investment_profile = profile.get("investment_profile", {})
-    knowledge_score = investment_profile.get("investment_knowledge", {}).get("score", 0)
-    
-    if knowledge_score >= 4:
-        return "advanced"
-    elif knowledge_score >= 2:
-        return "intermediate"
-    else:
-        return "beginner"
+    catalog = get_product_catalog()
+    schedule = catalog.loan_engine.schedule(product_id, principal, months, method=method, scenario=scenario)
+    if schedule is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"해당 상환방식의 금리 정보가 있는 대출상품을 찾을 수 없습니다: {product_id}"
+        )
 
-def _assess_goal_urgency(profile: Dict[str, Any]) -> str:
-    """목표 긴급도 평가"""
-    investment_profile = profile.get("investment_profile", {})
-    period = investment_profile.get("investment_period", {}).get("selected", "")
-    
-    if "1년" in period:
-        return "urgent"
-    elif "3년" in period:
-        return "medium"
-    else:
-        return "long_term"
+    return {
+        "success": True,
+        "principal": principal,
+        "scenario": scenario,
+        "data": schedule,
+        "catalog_version": catalog.version,
+        "timestamp": datetime.now().isoformat()
+    }
+
+# === 기존 헬퍼 함수들 ===
 
 def _determine_personalization_level(profile: Dict[str, Any]) -> str:
     """개인화 수준 결정"""
@@ -455,7 +699,7 @@ def _generate_user_insights(profile: Dict[str, Any]) -> Dict[str, Any]:
         "income_tier": income_tier,
         "risk_category": risk_category,
         "savings_capacity": 0.2 + (risk_score / 100),  # 20-50% 범위
-        "investment_readiness": _assess_investment_readiness(profile),
+        "investment_readiness": assess_investment_readiness(profile),
         "financial_goals": ["목돈 마련", "노후 준비"] if age_group == "young" else ["노후 준비", "자산 증식"]
     }
 
@@ -507,7 +751,6 @@ async def _generate_fallback_recommendations(query: str, products: List[Dict], l
     """폴백 추천 생성 - 사용자 프로필 적용"""
     
     # 간단한 키워드 기반 추천
-    keywords = query.lower().split()
     loan_keywords = ["대출", "빌리", "급전", "자금"]
     
     if any(keyword in query.lower() for keyword in loan_keywords):
@@ -517,43 +760,40 @@ async def _generate_fallback_recommendations(query: str, products: List[Dict], l
         domain = "예금/적금"
         filtered_products = [p for p in products if "예금" in p.get("type", "") or "적금" in p.get("type", "")]
     
-    # 상위 몇 개만 선택하되 사용자 프로필 적용
-    recommended_products = []
-    for i, product in enumerate(filtered_products[:limit]):
-        # 🔥 사용자 프로필 기반 맞춤 정보 계산
-        user_specific_info = {
-            "recommended_monthly_amount": _estimate_monthly_amount_with_profile(product, user_profile),
-            "risk_compatibility": _assess_risk_compatibility_simple(product, user_profile),
-            "age_appropriateness": _assess_age_appropriateness_simple(product, user_profile)
-        }
-        
-        recommended_products.append({
-            "product_id": product.get("id", f"fallback_{i}"),
-            "name": product.get("name", "상품명 없음"),
-            "bank_name": product.get("provider", {}).get("name", "은행명 없음"),
-            "type": product.get("type", ""),
-            "interest_rate": product.get("details", {}).get("interest_rate", 0),
-            "conditions": product.get("conditions", {}),
-            "features": [],
-            "ai_analysis": {
+    # 은행별 다양성을 고려해 상위 몇 개만 선택하되 사용자 프로필 적용
+    selected = select_diverse_top_k(
+        filtered_products,
+        limit,
+        score_fn=product_quality_score,
+        group_fn=provider_name,
+        constraints=SelectionConstraints(max_per_group=2)
+    )
+    
+    # 🔥 사용자 프로필 기반 맞춤 정보(user_specific)는 build_recommended_product에서 계산
+    recommended_products = [
+        build_recommended_product(
+            choice.item,
+            ai_analysis={
                 "suitability_score": 0.7,
                 "match_reasons": ["키워드 매칭"],
                 "risk_assessment": "보통",
                 "expected_benefit": "기본 추천 상품"
             },
-            "user_specific": user_specific_info  # 🔥 사용자 프로필 기반 정보
-        })
-    
-    return {
-        "success": True,
-        "data": recommended_products,
-        "personalization_level": _determine_personalization_level(user_profile) if user_profile else "none",
-        "user_insights": _generate_user_insights(user_profile) if user_profile else {},
-        "recommendation_reasoning": "키워드 기반 기본 추천",
-        "ai_metadata": {
+            user_profile=user_profile
+        )
+        for choice in selected
+    ]
+    
+    return RecommendationResult.payload(
+        recommendation_type="fallback",
+        data=recommended_products,
+        personalization_level=_determine_personalization_level(user_profile) if user_profile else "none",
+        user_insights=_generate_user_insights(user_profile) if user_profile else {},
+        recommendation_reasoning="키워드 기반 기본 추천",
+        ai_metadata={
             "domain": domain,
             "total_products_analyzed": len(products),
             "user_profile_completeness": _calculate_profile_completeness(user_profile) if user_profile else 0.0,
             "processing_time": 0
         }
-    }
\ No newline at end of file
+    )
\ No newline at end of file
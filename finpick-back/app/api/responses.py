@@ -0,0 +1,26 @@
+# finpick-back/app/api/responses.py
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_json(content: Any) -> bytes:
+    """orjson 한 번으로 직렬화 - orjson이 모르는 값(pydantic 모델, set 등)만 jsonable_encoder로 변환"""
+    return orjson.dumps(content, default=jsonable_encoder, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    """dict를 그대로 orjson으로 직렬화하는 JSON 응답
+
+    라우트가 dict를 반환하면 FastAPI가 jsonable_encoder로 전체를 복사한 뒤 다시 json.dumps 하므로
+    추천처럼 상품 목록이 큰 응답은 이 응답 객체를 직접 반환한다.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
@@ -4,11 +4,18 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
+import asyncio
 import math
 import logging
 
-from ..models.user import get_current_user
+from ..auth.dependencies import get_current_user
+from ..config import settings
+from ..services.admission import LANE_INTERACTIVE
 from ..services.gemini_service import GeminiService
+from ..services.goal_simulator import catalog_deposit_rate, simulate_goal
+from ..services.goal_solver import MAX_HORIZON_MONTHS, solve_required_monthly, solve_required_months
+from ..services.product_catalog import get_product_catalog
+from .admission import admit_or_429
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -20,6 +27,10 @@ class SimulationRequest(BaseModel):
     target_years: int = Field(..., ge=1, le=30, description="목표 기간(년)")
     expected_return: float = Field(..., ge=0.1, le=15.0, description="예상 수익률(%)")
     user_profile: Optional[Dict[str, Any]] = Field(None, description="사용자 프로필")
+    mode: str = Field("deterministic", pattern="^(deterministic|stochastic)$", description="계산 방식 (고정 수익률/금리 경로 몬테카를로)")
+    n_paths: int = Field(20000, ge=1000, le=100000, description="몬테카를로 경로 수")
+    seed: Optional[int] = Field(None, description="난수 시드 (같은 시드면 같은 결과)")
+    volatility: Optional[float] = Field(None, ge=0.0, le=5.0, description="연간 금리 변동성(%p)")
 
 class SimulationDataPoint(BaseModel):
     year: float
@@ -35,6 +46,7 @@ class SimulationResult(BaseModel):
     ai_analysis: Dict[str, Any]
     achievement_status: Dict[str, Any]
     recommendations: List[str]
+    stochastic: Optional[Dict[str, Any]] = None
 
 class AIAdviceRequest(BaseModel):
     scenario_id: str
@@ -311,7 +323,13 @@ async def calculate_simulation(
     request: SimulationRequest,
     current_user: dict = Depends(get_current_user)
 ):
-    """시뮬레이션 계산 실행"""
+    """시뮬레이션 계산 실행 - 사용자별 수락 제어(대화형 차선) 통과 후 실행"""
+    async with admit_or_429(current_user, LANE_INTERACTIVE):
+        return await _calculate_simulation(request)
+
+
+async def _calculate_simulation(request: SimulationRequest) -> SimulationResult:
+    """시뮬레이션 계산 (복리 차트, 확률 모드, AI 조언, 추천사항)"""
     
     try:
         # 시나리오 검증
@@ -335,6 +353,11 @@ async def calculate_simulation(
         achievement_rate = (final_amount / target_amount) * 100
         shortfall = max(0, target_amount - final_amount)
         
+        # 🎲 확률 모드: 카탈로그 예금금리 중심의 평균회귀 금리 경로로 분포 계산
+        stochastic = None
+        if request.mode == "stochastic":
+            stochastic = await _run_stochastic_simulation(request, target_amount)
+        
         # AI 조언 생성
         ai_service = SimulationAIService()
         ai_advice = await ai_service.generate_advice(AIAdviceRequest(
@@ -365,9 +388,14 @@ async def calculate_simulation(
                 "rate": round(achievement_rate, 1),
                 "shortfall": shortfall,
                 "surplus": max(0, final_amount - target_amount),
-                "status": "achieved" if achievement_rate >= 100 else "needs_adjustment"
+                "status": "achieved" if achievement_rate >= 100 else "needs_adjustment",
+                **({
+                    "success_probability": stochastic["success_probability"],
+                    "p50_final_amount": stochastic["final"]["p50"]
+                } if stochastic else {})
             },
-            recommendations=recommendations
+            recommendations=recommendations,
+            stochastic=stochastic
         )
         
     except Exception as e:
@@ -402,33 +430,72 @@ async def optimize_plan(
             detail="지원하지 않는 시나리오입니다."
         )
     
+    # 음수/0 입력은 목표 계산기에서 ValueError(500)가 되므로 여기서 400으로 거절
+    for name, value in (("target_amount", target_amount), ("available_monthly", available_monthly), ("target_years", target_years)):
+        if value is not None and value <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{name}은(는) 0보다 커야 합니다."
+            )
+    
     target = target_amount or scenario["target_amount"] 
     
     optimizations = []
     
-    # 가능한 월납입액이 주어진 경우
+    catalog = get_product_catalog()
+    
+    # 가능한 월납입액이 주어진 경우 - 상품별 실제 기간 금리로 필요 기간 계산
     if available_monthly:
-        required_years = CompoundInterestCalculator.calculate_required_years(
-            target, available_monthly, 4.2
+        options = _attach_product_names(
+            catalog, solve_required_months(catalog.yield_engine, target, available_monthly, limit=5)
         )
-        optimizations.append({
-            "type": "time_optimization",
-            "monthly_amount": available_monthly,
-            "required_years": required_years,
-            "description": f"월 {available_monthly:,}원으로 {required_years:.1f}년 후 달성 가능"
-        })
+        if options:
+            best = options[0]
+            optimizations.append({
+                "type": "time_optimization",
+                "monthly_amount": available_monthly,
+                "required_years": best["required_years"],
+                "description": f"월 {available_monthly:,}원을 {best['name']}({best['rate']}%)에 넣으면 {best['required_years']:.1f}년 후 달성 가능",
+                "product_options": options
+            })
+        else:
+            # 카탈로그에 가입 가능한 상품이 없으면 기본 수익률 가정
+            required_years = CompoundInterestCalculator.calculate_required_years(
+                target, available_monthly, 4.2
+            )
+            optimizations.append({
+                "type": "time_optimization",
+                "monthly_amount": available_monthly,
+                "required_years": required_years,
+                "description": f"월 {available_monthly:,}원으로 {required_years:.1f}년 후 달성 가능",
+                "product_options": []
+            })
     
-    # 목표 기간이 주어진 경우  
+    # 목표 기간이 주어진 경우 - 상품별 필요 월납입액 계산
     if target_years:
-        required_monthly = CompoundInterestCalculator.calculate_required_monthly(
-            target, target_years, 4.2
-        )
-        optimizations.append({
-            "type": "amount_optimization", 
-            "required_monthly": required_monthly,
-            "target_years": target_years,
-            "description": f"{target_years}년 안에 달성하려면 월 {required_monthly:,}원 필요"
-        })
+        options = _attach_product_names(
+            catalog, solve_required_monthly(catalog.yield_engine, target, target_years * 12, limit=5)
+        ) if target_years * 12 <= MAX_HORIZON_MONTHS else []
+        if options:
+            best = options[0]
+            optimizations.append({
+                "type": "amount_optimization",
+                "required_monthly": best["required_monthly"],
+                "target_years": target_years,
+                "description": f"{target_years}년 안에 달성하려면 {best['name']}({best['rate']}%)에 월 {best['required_monthly']:,}원 필요",
+                "product_options": options
+            })
+        else:
+            required_monthly = CompoundInterestCalculator.calculate_required_monthly(
+                target, target_years, 4.2
+            )
+            optimizations.append({
+                "type": "amount_optimization",
+                "required_monthly": required_monthly,
+                "target_years": target_years,
+                "description": f"{target_years}년 안에 달성하려면 월 {required_monthly:,}원 필요",
+                "product_options": []
+            })
     
     return {
         "scenario": scenario,
@@ -437,6 +504,35 @@ async def optimize_plan(
     }
 
 # 🛠️ 헬퍼 함수들
+def _attach_product_names(catalog, options: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """목표 계산 결과에 상품명/은행명 추가"""
+    for option in options:
+        product = catalog.products[option.pop("doc")]
+        option["name"] = product.get("name", "")
+        option["bank_name"] = product.get("provider", {}).get("name", "")
+    return options
+
+async def _run_stochastic_simulation(request: SimulationRequest, target_amount: int) -> Dict[str, Any]:
+    """몬테카를로 목표 달성 시뮬레이션 (CPU 작업이므로 스레드에서 실행)"""
+    
+    catalog_rate = catalog_deposit_rate(get_product_catalog())
+    anchor_rate = catalog_rate if catalog_rate is not None else request.expected_return
+    options = {"volatility": request.volatility} if request.volatility is not None else {}
+    
+    result = await asyncio.to_thread(
+        simulate_goal,
+        request.monthly_amount,
+        request.target_years,
+        anchor_rate,
+        target_amount=target_amount,
+        n_paths=request.n_paths,
+        seed=request.seed,
+        workers=settings.simulation_workers,
+        **options
+    )
+    result["rate_source"] = "catalog_deposit_median" if catalog_rate is not None else "expected_return"
+    return result
+
 def _generate_recommendations(
     request: SimulationRequest, 
     scenario: Dict, 
@@ -1,11 +1,28 @@
 # 📁 finpick-back/app/auth/firebase_auth.py
-import firebase_admin
-from firebase_admin import credentials, auth
 from app.config import settings
 import os
+import threading
 
 class FirebaseAuth:
+    """Firebase Admin 클라이언트 - SDK import와 초기화는 처음 사용할 때 한 번만 (워커 부팅 시간 단축)"""
+    
     def __init__(self):
+        self._auth = None
+        self._lock = threading.Lock()
+    
+    @property
+    def auth(self):
+        """초기화된 firebase_admin.auth 모듈"""
+        if self._auth is None:
+            with self._lock:
+                if self._auth is None:
+                    self._initialize()
+        return self._auth
+    
+    def _initialize(self):
+        import firebase_admin
+        from firebase_admin import credentials, auth
+        
         if not firebase_admin._apps:
             try:
                 json_path = "firebase-key.json"
@@ -25,11 +42,13 @@ class FirebaseAuth:
             except Exception as e:
                 print(f"❌ Firebase 초기화 실패: {str(e)}")
                 raise e
+        
+        self._auth = auth
     
     def verify_token(self, token: str):
         """Firebase ID 토큰 검증"""
         try:
-            decoded_token = auth.verify_id_token(token)
+            decoded_token = self.auth.verify_id_token(token)
             return decoded_token
         except Exception as e:
             raise Exception(f"토큰 검증 실패: {str(e)}")
@@ -47,7 +66,7 @@ class FirebaseAuth:
             if display_name:
                 user_data['display_name'] = display_name
                 
-            user = auth.create_user(**user_data)
+            user = self.auth.create_user(**user_data)
             return user
         except Exception as e:
             raise Exception(f"사용자 생성 실패: {str(e)}")
@@ -55,7 +74,7 @@ class FirebaseAuth:
     def get_user(self, uid: str):
         """사용자 정보 조회"""
         try:
-            user = auth.get_user(uid)
+            user = self.auth.get_user(uid)
             return user
         except Exception as e:
             raise Exception(f"사용자 조회 실패: {str(e)}")
@@ -14,6 +14,86 @@ class Settings(BaseSettings):
     gemini_api_key: str = ""
     fss_api_key: str = ""
     
+    # Gemini 단계 동시 실행 (관련성/도메인/요구사항 분석)
+    gemini_concurrent_stages: bool = True
+    
+    # Gemini 구조화 출력 (JSON 모드 + 단계별 response_schema)
+    gemini_structured_output: bool = True
+    
+    # Gemini generateContent 엔드포인트 직접 지정 (부하 테스트 대역 서버/프록시, 비우면 SDK 사용)
+    gemini_api_endpoint: str = ""
+    
+    # Gemini 호출 기록/재생 (record: 호출을 gzip 로그로 기록, replay: 로그 응답만 사용) - 경로는 로그 디렉터리
+    gemini_replay_mode: str = ""
+    gemini_replay_path: str = "gemini_traffic"
+    
+    # 상품 선택 프롬프트 고정 부분 컨텍스트 캐시 (카탈로그 버전별 상품 목록을 등록하고 사용자 부분만 전송)
+    prompt_context_cache: bool = True
+    prompt_context_cache_model: str = "models/gemini-2.0-flash-001"
+    prompt_context_cache_ttl: int = 3600
+    
+    # 상품 카탈로그 공유 메모리 모드 (pre-fork 워커 간 mmap 공유)
+    catalog_shared_mode: bool = False
+    catalog_shared_path: str = ""
+    
+    # 몬테카를로 시뮬레이션 프로세스 풀 워커 수 (0/1이면 단일 프로세스)
+    simulation_workers: int = 0
+    
+    # 자연어 질의 의미 캐시 (유사 질의의 도메인/요구사항 분석 재사용)
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.88
+    semantic_cache_max_entries: int = 2000
+    semantic_cache_audit_rate: float = 0.05
+    
+    # 사용자 유형별 추천 뷰 (카탈로그 버전마다 로컬 top-k 사전 계산)
+    segment_views_enabled: bool = True
+    segment_view_top_k: int = 10
+    
+    # 대량 배치 추천 (0이면 CPU 수만큼 워커)
+    batch_workers: int = 0
+    batch_chunk_size: int = 1000
+    
+    # 추천 이력/피드백 저장소 (sqlite | firestore) - 큐에 모아 배치로 기록 (큐가 가득 차면 enqueue_timeout초 대기 후 버림),
+    # 이력 LRU는 이 워커의 커밋 시 무효화 + TTL(초) 이내에 다른 워커 기록 반영
+    history_backend: str = "sqlite"
+    history_db_path: str = "finpick_history.sqlite3"
+    history_queue_size: int = 1000
+    history_batch_size: int = 100
+    history_flush_interval: float = 1.0
+    history_cache_users: int = 256
+    history_cache_sessions: int = 50
+    history_cache_ttl: float = 30.0
+    history_enqueue_timeout: float = 0.05
+    
+    # 요청 수락 제어 (사용자별 토큰 버킷, 차선별 동시 처리 상한 → 429) + Gemini 동시 호출 가중 공정 큐
+    admission_enabled: bool = True
+    admission_gemini_concurrency: int = 16
+    admission_user_rate: float = 1.0
+    admission_user_burst: int = 5
+    admission_interactive_max_in_flight: int = 200
+    admission_batch_user_rate: float = 0.2
+    admission_batch_user_burst: int = 2
+    admission_batch_max_in_flight: int = 20
+
+    # Gemini 토큰 사용량 집계 (단계×사용자×엔드포인트 증분을 주기적으로 JSONL 기록) + 100만 토큰당 USD 단가
+    token_usage_path: str = "token_usage"
+    token_usage_flush_interval: float = 60.0
+    gemini_input_price_per_million: float = 0.10
+    gemini_cached_input_price_per_million: float = 0.025
+    gemini_output_price_per_million: float = 0.40
+
+    # 요청 프로파일링 (관리자 헤더 X-Profile-Token 또는 표본 비율) - 둘 다 비어 있으면 미들웨어 미등록
+    profiling_admin_token: str = ""
+    profiling_sample_rate: float = 0.0
+    profiling_interval_ms: float = 5.0
+    profiling_path: str = "profiles"
+    profiling_max_artifacts: int = 200
+    profiling_max_concurrent: int = 2
+
+    # 워커 시작 워밍업 (카탈로그/색인/뷰/프롬프트/클라이언트 준비 후 /readyz 200) - 가상 질의 수
+    warmup_enabled: bool = True
+    warmup_synthetic_queries: int = 20
+
     # CORS 설정
     frontend_url: str = "http://localhost:3000"
     allowed_origins: list = ["http://localhost:3000", "http://localhost:5173"]
@@ -1,9 +1,18 @@
 # finpick-back/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config import settings
 from app.api import auth
 from app.api import recommendations 
+from app.api import simulation
+from app.api import profiles
+from app.services.history_store import get_history_store, shutdown_history_store
+from app.services.product_catalog import get_product_catalog
+from app.services.request_profiler import RequestProfilingMiddleware, profiling_enabled
+from app.services.segment_views import get_segment_view_store
+from app.services.token_usage import begin_request_usage, end_request_usage, get_token_usage_ledger, prometheus_text
+from app.services.warmup import component_state, get_warmup
 
 app = FastAPI(
     title="FinPick API",
@@ -23,6 +32,58 @@ app.add_middleware(
 # 라우터 등록
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(recommendations.router, prefix="/api/recommendations", tags=["recommendations"])  # 추가!
+app.include_router(simulation.router, prefix="/api/simulation", tags=["simulation"])
+app.include_router(profiles.router, prefix="/api/debug", tags=["debug"])
+
+@app.middleware("http")
+async def track_token_usage(request: Request, call_next):
+    """요청별 Gemini 토큰 사용량 범위 (엔드포인트 귀속) - 사용량은 응답 헤더로도 전달"""
+    usage, token = begin_request_usage(request.scope)
+    try:
+        response = await call_next(request)
+    finally:
+        end_request_usage(token)
+    if usage.counts["calls"]:
+        response.headers["X-Gemini-Calls"] = str(usage.counts["calls"])
+        response.headers["X-Gemini-Input-Tokens"] = str(usage.counts["input_tokens"])
+        response.headers["X-Gemini-Output-Tokens"] = str(usage.counts["output_tokens"])
+        response.headers["X-Gemini-Cost-USD"] = f"{usage.counts['cost_usd']:.6f}"
+    return response
+
+# 요청 프로파일링 (설정된 경우에만 등록 - 꺼져 있으면 요청 경로 비용 없음)
+if profiling_enabled():
+    app.add_middleware(RequestProfilingMiddleware)
+
+@app.on_event("startup")
+async def start_history_store():
+    """추천 이력 배치 기록 작업 시작"""
+    await get_history_store().start()
+
+@app.on_event("startup")
+async def start_warmup():
+    """카탈로그/색인/추천 뷰/프롬프트/클라이언트 워밍업을 백그라운드로 시작 (완료 전까지 /readyz 503)"""
+    if settings.warmup_enabled:
+        get_warmup().start()
+        return
+    # 워밍업을 끄면 사용자 유형별 추천 뷰만 백그라운드 계산 (카탈로그 버전이 바뀌면 조회 시 다시 계산)
+    segment_views = get_segment_view_store()
+    if segment_views is not None:
+        segment_views.schedule_refresh(get_product_catalog())
+
+@app.on_event("startup")
+async def start_token_usage_flush():
+    """토큰 사용량 증분 주기적 기록 시작"""
+    await get_token_usage_ledger().start()
+
+@app.on_event("shutdown")
+async def flush_history_store():
+    """종료 전 큐에 남은 추천 이력/피드백 저장"""
+    await shutdown_history_store()
+
+@app.on_event("shutdown")
+async def flush_token_usage():
+    """종료 전 남은 토큰 사용량 증분 기록"""
+    await get_token_usage_ledger().stop()
 
 @app.get("/")
 async def root():
@@ -33,29 +94,71 @@ async def root():
         "endpoints": {
             "auth": "/api/auth",
             "recommendations": "/api/recommendations",  # 추가!
+            "simulation": "/api/simulation",
             "docs": "/docs",
-            "health": "/health"
+            "health": "/health",
+            "livez": "/livez",
+            "readyz": "/readyz",
+            "metrics": "/metrics"
         }
     }
 
+def _readiness() -> dict:
+    warmup = get_warmup().state
+    # 워밍업을 끈 경우 카탈로그만 로드되어 있으면 준비된 것으로 판단
+    components = component_state()
+    ready = warmup.ready if settings.warmup_enabled else components["catalog"]["status"] == "ok"
+    return {"ready": ready, "warmup": warmup.snapshot(), "components": components}
+
+@app.get("/livez")
+async def liveness_check():
+    """프로세스/이벤트 루프 응답 여부만 (워밍업 중에도 200)"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness_check():
+    """트래픽 수신 가능 여부 - 워밍업 완료(필수 단계 성공) 전이면 503, 구성 요소 상태/워밍업 단계별 소요 시간 포함"""
+    readiness = _readiness()
+    body = {"status": "ready" if readiness["ready"] else "not_ready", **readiness}
+    return JSONResponse(body, status_code=status.HTTP_200_OK if readiness["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE)
+
 @app.get("/health")
 async def health_check():
+    """기존 형식의 상태 요약 (값은 실제 구성 요소 상태) - 트래픽 라우팅 판단은 /readyz 사용"""
+    readiness = _readiness()
+    components = readiness["components"]
+    warmup_status = readiness["warmup"]["status"]
+    if readiness["ready"]:
+        health = "degraded" if warmup_status == "degraded" else "healthy"
+    else:
+        health = "starting" if warmup_status in ("pending", "running") else "unhealthy"
     return {
-        "status": "healthy",
+        "status": health,
         "services": {
-            "database": "connected",
-            "financial_data": "loaded",
-            "ai_service": "ready"
+            "database": components["history_store"]["status"],
+            "financial_data": components["catalog"]["status"],
+            "ai_service": components["gemini"]["status"]
         }
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 텍스트 형식 지표 (Gemini 호출/토큰/비용)"""
+    return PlainTextResponse(prometheus_text(get_token_usage_ledger()), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/status")
 async def api_status():
     """API 상태 및 통계"""
     try:
         from app.services.recommendation_service import RecommendationService
+        from app.services.admission import get_admission_controller
+        from app.services.llm_json import llm_json_metrics
+        from app.services.prompt_compiler import get_prompt_compiler
+        from app.services.semantic_cache import get_semantic_cache
         service = RecommendationService()
         product_count = len(service.financial_products)
+        semantic_cache = get_semantic_cache()
+        segment_views = get_segment_view_store()
         
         return {
             "status": "operational",
@@ -65,9 +168,17 @@ async def api_status():
                 "product_types": ["정기예금", "적금", "신용대출"],
                 "last_updated": "2024-07-11T00:00:00Z"
             },
+            "semantic_cache": semantic_cache.metrics() if semantic_cache else {"enabled": False},
+            "history_store": get_history_store().metrics(),
+            "segment_views": segment_views.metrics() if segment_views else {"enabled": False},
+            "llm_json": llm_json_metrics.snapshot(),
+            "admission": get_admission_controller().metrics(),
+            "prompt_compiler": get_prompt_compiler().metrics(),
+            "token_usage": get_token_usage_ledger().metrics(),
             "api_endpoints": {
                 "auth": ["register", "login", "verify-token"],
-                "recommendations": ["analyze-profile", "generate", "natural-language", "history", "feedback"]
+                "recommendations": ["analyze-profile", "generate", "natural-language", "search", "best-rates", "maturity-comparison", "loan-comparison", "loan-schedule", "allocation", "batch", "history", "feedback"],
+                "simulation": ["calculate", "scenarios", "optimize"]
             }
         }
     except Exception as e:
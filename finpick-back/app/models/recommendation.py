@@ -4,6 +4,7 @@ from typing import List, Dict, Any, Optional,Union
 from datetime import datetime, timezone # timezone 임포트 추가
 from enum import Enum
 import uuid # uuid 임포트 추가
+import copy
 
 class InvestmentGoal(str, Enum):
     """투자 목표"""
@@ -37,10 +38,17 @@ class ProductType(str, Enum):
     
     @classmethod
     def normalize(cls, value: str) -> "ProductType":
-        """문자열을 표준 ProductType으로 변환"""
+        """문자열을 표준 ProductType으로 변환 (상품 타입 문자열 종류가 적어 결과를 캐시)"""
         if not value:
             return cls.DEPOSIT # 기본값
-            
+        
+        cached = _normalized_product_types.get(value)
+        if cached is None:
+            cached = _normalized_product_types[value] = cls._normalize(value)
+        return cached
+    
+    @classmethod
+    def _normalize(cls, value: str) -> "ProductType":
         value_lower = value.lower()
         
         # 직접 매칭
@@ -71,6 +79,8 @@ class ProductType(str, Enum):
             # 기본값
             return cls.DEPOSIT
 
+_normalized_product_types: Dict[str, ProductType] = {}
+
 # 기본 정보
 class BasicInfo(BaseModel):
     age: Optional[int] = None # Optional 및 타입 힌트 추가
@@ -144,6 +154,51 @@ class ProductRecommendation(BaseModel):
     ai_analysis: Optional[Dict[str, Any]] = None
 
 
+# 추천 상품 (자연어 추천 응답 data 항목 - 프론트엔드가 쓰는 필드 그대로)
+# 응답은 아래 두 스키마의 필드 그대로인 dict로 만들고 orjson으로 한 번 직렬화한다
+# (상품마다 model_construct + model_dump 하는 비용이 응답 전체를 dict로 만드는 비용보다 큼)
+class RecommendedProduct(BaseModel):
+    product_id: Optional[str] = None
+    name: Optional[str] = None
+    bank_name: Optional[str] = None
+    type: Optional[str] = None
+    interest_rate: Optional[float] = None
+    conditions: Dict[str, Any] = {}
+    features: List[Any] = []
+    ai_analysis: Dict[str, Any] = {}
+    user_specific: Dict[str, Any] = {}
+
+
+# 추천 결과 (AI/사용자 유형 뷰/폴백 공통 스키마 = /natural-language 응답 본문)
+class RecommendationResult(BaseModel):
+    success: bool = True
+    is_financial_related: bool = True
+    recommendation_type: str # 'financial_model_based', 'segment_view', 'fallback', 'error'
+    data: List[RecommendedProduct] = []
+    personalization_level: str = "none"
+    user_insights: Dict[str, Any] = {}
+    recommendation_reasoning: str = ""
+    ai_metadata: Dict[str, Any] = {}
+    session_id: Optional[str] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def payload(cls, **fields: Any) -> Dict[str, Any]:
+        """스키마 필드만 담은 응답 dict (빠진 필드는 기본값, 모델 생성/검증 없음)"""
+        unknown = fields.keys() - cls.model_fields.keys()
+        if unknown:
+            raise ValueError(f"RecommendationResult에 없는 필드: {sorted(unknown)}")
+        payload = {}
+        for name, field in cls.model_fields.items():
+            if name in fields:
+                payload[name] = fields[name]
+            elif field.is_required():
+                raise ValueError(f"RecommendationResult 필수 필드 누락: {name}")
+            else:
+                payload[name] = copy.copy(field.default)
+        return payload
+
+
 # 추천 결과
 class RecommendationResponse(BaseModel):
     user_id: str
@@ -0,0 +1,302 @@
+# finpick-back/app/services/admission.py
+"""사용자별 요청 수락 제어 + Gemini 호출 가중 공정 큐
+
+- 요청 수락: 사용자(uid)×차선별 토큰 버킷, 차선별 동시 처리 요청 상한 → 초과 시 AdmissionRejected(retry_after)
+- Gemini 호출: 프로세스 전체 동시 호출 수 제한, 대기 호출은 대화형 차선 우선,
+  같은 차선 안에서는 사용자별 가상 종료 시각(WFQ) 순으로 배정 → 한 사용자가 몰아 보내도 다른 사용자 호출이 끼어듦
+
+수락된 요청의 (uid, 차선)은 ContextVar로 전달되므로 GeminiService 단계/동시 실행 작업이 자동으로 같은 흐름에 속한다.
+워커 프로세스마다 독립적으로 동작한다.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from ..config import settings
+
+LANE_INTERACTIVE = "interactive"
+LANE_BATCH = "batch"
+LANES = (LANE_INTERACTIVE, LANE_BATCH)
+
+# 대기 시간 백분위 계산에 쓰는 최근 표본 수
+WAIT_SAMPLES = 1000
+# 토큰 버킷 정리 기준 (이 수를 넘으면 가득 찬 버킷 삭제)
+MAX_IDLE_BUCKETS = 10000
+
+
+class AdmissionTicket(NamedTuple):
+    uid: str
+    lane: str
+    weight: float = 1.0
+
+
+# 수락된 요청 밖(스크립트, 시작 작업 등)에서의 Gemini 호출은 배치 차선 시스템 흐름
+_SYSTEM_TICKET = AdmissionTicket("_system", LANE_BATCH)
+_current_ticket: ContextVar[Optional[AdmissionTicket]] = ContextVar("admission_ticket", default=None)
+
+
+class AdmissionRejected(Exception):
+    """요청 거절 (reason: rate_limited | queue_full), retry_after초 후 재시도 권장"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"{reason} (retry after {retry_after}s)")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """초당 rate개 충전, 최대 burst개 보관"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now: float) -> float:
+        """토큰 1개 사용 → 0.0, 부족하면 다음 토큰까지 남은 초"""
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+class FairQueue:
+    """가중 공정 큐 (start-time fair queuing) - 흐름별 가상 종료 시각이 가장 이른 대기자부터"""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._finish_tags: Dict[str, float] = {}
+        self.virtual_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, flow: str, weight: float, waiter: asyncio.Future):
+        start = max(self.virtual_time, self._finish_tags.get(flow, 0.0))
+        finish = start + 1.0 / weight
+        self._finish_tags[flow] = finish
+        heapq.heappush(self._heap, (finish, next(self._sequence), start, waiter))
+
+    def pop(self) -> Optional[asyncio.Future]:
+        """다음 대기자 (취소된 대기자는 건너뜀), 없으면 None"""
+        while self._heap:
+            _, _, start, waiter = heapq.heappop(self._heap)
+            self.virtual_time = max(self.virtual_time, start)
+            if not waiter.done():
+                return waiter
+        # 모든 흐름이 비었으면 가상 시각/흐름 태그 초기화 (유휴 사용자 태그가 쌓이지 않도록)
+        self._finish_tags.clear()
+        self.virtual_time = 0.0
+        return None
+
+    def discard_cancelled(self):
+        self._heap = [entry for entry in self._heap if not entry[3].done()]
+        heapq.heapify(self._heap)
+
+
+class _LaneStats:
+    def __init__(self):
+        self.admitted = 0
+        self.rejected_rate_limited = 0
+        self.rejected_queue_full = 0
+        self.in_flight = 0
+        self.gemini_calls = 0
+        self.gemini_waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        # 수락된 요청 처리 시간 EWMA (queue_full Retry-After 추정)
+        self.request_seconds = 1.0
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        enabled: bool = True,
+        gemini_concurrency: int = 16,
+        lane_limits: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        self.enabled = enabled
+        self.gemini_concurrency = gemini_concurrency
+        # 차선별 사용자 토큰 버킷(rate, burst)과 동시 처리 요청 상한(max_in_flight)
+        self.lane_limits = lane_limits or {
+            LANE_INTERACTIVE: {"rate": 1.0, "burst": 5, "max_in_flight": 200},
+            LANE_BATCH: {"rate": 0.2, "burst": 2, "max_in_flight": 20},
+        }
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._queues = {lane: FairQueue() for lane in LANES}
+        self._stats = {lane: _LaneStats() for lane in LANES}
+        self._running = 0
+
+    # 📥 요청 수락
+
+    def _check_bucket(self, uid: str, lane: str, now: float):
+        limits = self.lane_limits[lane]
+        key = (uid, lane)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_IDLE_BUCKETS:
+                self._buckets = {k: b for k, b in self._buckets.items() if not b.is_full(now)}
+            bucket = self._buckets[key] = TokenBucket(limits["rate"], limits["burst"], now)
+        wait = bucket.try_take(now)
+        if wait:
+            self._stats[lane].rejected_rate_limited += 1
+            raise AdmissionRejected("rate_limited", max(1, math.ceil(wait)))
+
+    @asynccontextmanager
+    async def admit(self, uid: str, lane: str = LANE_INTERACTIVE, weight: float = 1.0):
+        """요청 수락 - 블록 안의 Gemini 호출은 (uid, lane) 흐름으로 공정 큐에 들어감"""
+        if not self.enabled:
+            yield
+            return
+
+        stats = self._stats[lane]
+        now = time.monotonic()
+        if stats.in_flight >= self.lane_limits[lane]["max_in_flight"]:
+            stats.rejected_queue_full += 1
+            raise AdmissionRejected("queue_full", max(1, math.ceil(stats.request_seconds)))
+        self._check_bucket(uid, lane, now)
+
+        stats.admitted += 1
+        stats.in_flight += 1
+        token = _current_ticket.set(AdmissionTicket(uid, lane, weight))
+        try:
+            yield
+        finally:
+            _current_ticket.reset(token)
+            stats.in_flight -= 1
+            stats.request_seconds = 0.9 * stats.request_seconds + 0.1 * (time.monotonic() - now)
+
+    # 🤖 Gemini 호출 슬롯
+
+    @asynccontextmanager
+    async def gemini_slot(self):
+        """Gemini 호출 동시 수 제한 - 대화형 차선 우선, 차선 안에서는 사용자별 가중 공정 배정"""
+        if not self.enabled:
+            yield
+            return
+
+        ticket = _current_ticket.get() or _SYSTEM_TICKET
+        stats = self._stats[ticket.lane]
+        started = time.monotonic()
+
+        if self._running < self.gemini_concurrency and not any(self._queues.values()):
+            self._running += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._queues[ticket.lane].push(ticket.uid, ticket.weight, waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # 슬롯을 배정받은 직후 취소됨 → 다음 대기자에게 넘김
+                    self._release()
+                else:
+                    self._queues[ticket.lane].discard_cancelled()
+                raise
+
+        stats.gemini_calls += 1
+        stats.gemini_waits.append(time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        # 슬롯을 반납하지 않고 다음 대기자에게 바로 넘김 (대화형 차선 먼저)
+        for lane in LANES:
+            waiter = self._queues[lane].pop()
+            if waiter is not None:
+                waiter.set_result(None)
+                return
+        self._running -= 1
+
+    # 📊 지표
+
+    def metrics(self) -> Dict[str, Any]:
+        lanes = {}
+        for lane in LANES:
+            stats = self._stats[lane]
+            waits_ms = [wait * 1000 for wait in stats.gemini_waits]
+            lanes[lane] = {
+                "admitted": stats.admitted,
+                "rejected_rate_limited": stats.rejected_rate_limited,
+                "rejected_queue_full": stats.rejected_queue_full,
+                "in_flight": stats.in_flight,
+                "max_in_flight": self.lane_limits[lane]["max_in_flight"],
+                "gemini_queue_depth": len(self._queues[lane]),
+                "gemini_calls": stats.gemini_calls,
+                "gemini_wait_ms": {
+                    "p50": round(_percentile(waits_ms, 0.5), 2),
+                    "p95": round(_percentile(waits_ms, 0.95), 2),
+                    "max": round(max(waits_ms, default=0.0), 2),
+                },
+                "avg_request_seconds": round(stats.request_seconds, 3),
+            }
+        return {
+            "enabled": self.enabled,
+            "gemini_concurrency": self.gemini_concurrency,
+            "gemini_running": self._running,
+            "tracked_users": len(self._buckets),
+            "lanes": lanes,
+        }
+
+
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """설정 기반 프로세스 공용 수락 제어기"""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            enabled=settings.admission_enabled,
+            gemini_concurrency=settings.admission_gemini_concurrency,
+            lane_limits={
+                LANE_INTERACTIVE: {
+                    "rate": settings.admission_user_rate,
+                    "burst": settings.admission_user_burst,
+                    "max_in_flight": settings.admission_interactive_max_in_flight,
+                },
+                LANE_BATCH: {
+                    "rate": settings.admission_batch_user_rate,
+                    "burst": settings.admission_batch_user_burst,
+                    "max_in_flight": settings.admission_batch_max_in_flight,
+                },
+            }
+        )
+    return _admission_controller
+
+
+def current_ticket() -> AdmissionTicket:
+    """현재 작업 컨텍스트의 (uid, 차선) - 수락된 요청 밖이면 시스템 흐름"""
+    return _current_ticket.get() or _SYSTEM_TICKET
+
+
+def enter_background_lane():
+    """현재 작업 컨텍스트의 Gemini 호출을 배치 차선으로 전환 (create_task로 만든 백그라운드 작업 안에서 호출)"""
+    ticket = _current_ticket.get() or _SYSTEM_TICKET
+    _current_ticket.set(AdmissionTicket(ticket.uid, LANE_BATCH, ticket.weight))
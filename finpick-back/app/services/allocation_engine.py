@@ -0,0 +1,197 @@
+# finpick-back/app/services/allocation_engine.py
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .yield_engine import INTEREST_TAX_RATE, YieldEngine, maturity_interest
+
+# 배분 단위 (1만원)
+ALLOCATION_UNIT = 10000
+
+
+def monthly_budget_from_profile(user_profile: Any) -> Optional[int]:
+    """사용자 프로필의 goal_setting.monthly_budget (dict/pydantic 모두 지원)"""
+    if not user_profile:
+        return None
+    if hasattr(user_profile, "model_dump"):
+        user_profile = user_profile.model_dump()
+    if not isinstance(user_profile, dict):
+        return None
+    budget = (user_profile.get("goal_setting") or {}).get("monthly_budget")
+    try:
+        return int(budget) if budget else None
+    except (TypeError, ValueError):
+        return None
+
+
+def installment_candidates(engine: YieldEngine, period_months: int, metric: str = "max_rate") -> Dict[str, np.ndarray]:
+    """해당 기간 적금의 상품별 최고 세후 연환산 수익률 (수익률 내림차순)
+
+    적금 이자는 월 납입액에 비례하므로 1원 기준 수익률로 비교할 수 있다.
+    """
+    cols = engine.columns
+    rows = np.flatnonzero(cols["is_installment"] & (cols["period"] == period_months))
+    if not len(rows):
+        return {key: np.empty(0) for key in ("row", "doc", "yield", "minimum_amount", "maximum_amount")}
+
+    months = cols["period"][rows]
+    gross = maturity_interest(np.ones(len(rows)), months, cols[metric][rows], cols["is_compound"][rows], np.ones(len(rows), dtype=bool))
+    # 평균 예치 잔액((n+1)/2) 대비 연환산 세후 수익률(%)
+    effective = gross * (1.0 - INTEREST_TAX_RATE) / ((months + 1) / 2.0) / (months / 12.0) * 100
+
+    docs = cols["doc"][rows]
+    order = np.lexsort((-effective, docs))
+    rows, docs, effective = rows[order], docs[order], effective[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = docs[1:] != docs[:-1]
+    rows, docs, effective = rows[first], docs[first], effective[first]
+
+    order = np.lexsort((docs, -effective))
+    rows = rows[order]
+    return {
+        "row": rows,
+        "doc": docs[order],
+        "yield": effective[order],
+        "minimum_amount": cols["minimum_amount"][rows],
+        "maximum_amount": cols["maximum_amount"][rows],
+    }
+
+
+def _fill(candidates: Dict[str, np.ndarray], selection: List[int], budget: int) -> Optional[Dict[int, int]]:
+    """고른 상품 집합에 예산을 수익률 순으로 한도까지 채움 - 최소금액을 못 채우면 None"""
+    remaining = budget
+    amounts: Dict[int, int] = {}
+    for i in sorted(selection, key=lambda index: (-candidates["yield"][index], index)):
+        amount = int(min(remaining, candidates["maximum_amount"][i]) // ALLOCATION_UNIT) * ALLOCATION_UNIT
+        if amount <= 0 or amount < candidates["minimum_amount"][i]:
+            return None
+        amounts[i] = amount
+        remaining -= amount
+    return amounts
+
+
+def _objective(candidates: Dict[str, np.ndarray], amounts: Optional[Dict[int, int]]) -> float:
+    if amounts is None:
+        return -1.0
+    return sum(candidates["yield"][i] * amount for i, amount in amounts.items())
+
+
+def allocate_monthly_budget(
+    engine: YieldEngine,
+    products,
+    monthly_budget: int,
+    period_months: int = 12,
+    max_products: int = 3,
+    max_per_provider: int = 1,
+    metric: str = "max_rate"
+) -> Dict[str, Any]:
+    """월 저축 예산을 여러 적금에 나눠 담기 (그리디 + 1:1 교환 개선)
+
+    제약: 상품별 최소/최대 납입액, 최대 상품 수, 은행별 최대 상품 수. 목표는 세후 이자 최대화.
+    1) 수익률 높은 상품부터 한도까지 채우는 그리디로 초기해를 만들고
+    2) 고른 상품 하나를 안 고른 상품 하나로 바꿔 이자가 늘면 교환하는 과정을 개선이 없을 때까지 반복한다.
+    상품 수 제한 때문에 한도가 작은 고금리 상품만 고르면 예산이 남는 경우를
+    한도가 큰 상품으로 바꿔 남는 예산을 줄인다.
+    """
+    if monthly_budget <= 0:
+        raise ValueError("월 예산은 0보다 커야 합니다")
+
+    candidates = installment_candidates(engine, period_months, metric)
+    budget = (int(monthly_budget) // ALLOCATION_UNIT) * ALLOCATION_UNIT
+    providers = [
+        (products[int(doc)].get("provider", {}) or {}).get("name", "") or f"provider_{int(doc)}"
+        for doc in candidates["doc"]
+    ]
+
+    def provider_ok(selection: List[int]) -> bool:
+        counts: Dict[str, int] = {}
+        for index in selection:
+            counts[providers[index]] = counts.get(providers[index], 0) + 1
+            if counts[providers[index]] > max_per_provider:
+                return False
+        return True
+
+    # 1) 그리디 초기해
+    selection: List[int] = []
+    remaining = budget
+    for i in range(len(candidates["row"])):
+        if len(selection) >= max_products or remaining <= 0:
+            break
+        if not provider_ok(selection + [i]) or candidates["minimum_amount"][i] > remaining:
+            continue
+        amount = int(min(remaining, candidates["maximum_amount"][i]) // ALLOCATION_UNIT) * ALLOCATION_UNIT
+        if amount <= 0 or amount < candidates["minimum_amount"][i]:
+            continue
+        selection.append(i)
+        remaining -= amount
+
+    # 2) 교환 개선 (상품 수가 한도보다 적으면 추가도 시도)
+    best_amounts = _fill(candidates, selection, budget) if selection else {}
+    best_value = _objective(candidates, best_amounts)
+    improved = True
+    while improved:
+        improved = False
+        chosen = set(selection)
+        moves = [selection[:position] + selection[position + 1:] for position in range(len(selection))]
+        if len(selection) < max_products:
+            moves.append(list(selection))
+        for base in moves:
+            for i in range(len(candidates["row"])):
+                if i in chosen:
+                    continue
+                trial = base + [i]
+                if not provider_ok(trial):
+                    continue
+                amounts = _fill(candidates, trial, budget)
+                value = _objective(candidates, amounts)
+                if value > best_value + 1e-9:
+                    selection, best_amounts, best_value = trial, amounts, value
+                    improved = True
+                    break
+            if improved:
+                break
+
+    chosen = [
+        {
+            "index": i,
+            "doc": int(candidates["doc"][i]),
+            "provider": providers[i],
+            "amount": best_amounts[i],
+            "cap": float(candidates["maximum_amount"][i]),
+        }
+        for i in sorted(best_amounts, key=lambda index: (-candidates["yield"][index], index))
+    ]
+
+    allocations = []
+    allocated = 0
+    weighted_yield = 0.0
+    for item in chosen:
+        product = products[item["doc"]]
+        effective_yield = float(candidates["yield"][item["index"]])
+        row = int(candidates["row"][item["index"]])
+        allocations.append({
+            "product_id": product.get("id", ""),
+            "name": product.get("name", ""),
+            "bank_name": item["provider"],
+            "monthly_amount": item["amount"],
+            "rate": float(engine.columns[metric][row]),
+            "rate_type": "복리" if engine.columns["is_compound"][row] else "단리",
+            "effective_annual_rate": round(effective_yield, 4),
+            "maximum_amount": None if np.isinf(item["cap"]) else int(item["cap"]),
+        })
+        allocated += item["amount"]
+        weighted_yield += effective_yield * item["amount"]
+
+    blended_yield = weighted_yield / allocated if allocated else 0.0
+    # 만기 세후 이자 = 연환산 수익률 × 평균 잔액 × 기간
+    expected_net_interest = blended_yield / 100 * allocated * (period_months + 1) / 2.0 * (period_months / 12.0)
+    return {
+        "monthly_budget": int(monthly_budget),
+        "period_months": period_months,
+        "allocations": allocations,
+        "allocated_amount": allocated,
+        "unallocated_amount": int(monthly_budget) - allocated,
+        "blended_effective_rate": round(blended_yield, 4),
+        "expected_net_interest": int(expected_net_interest),
+        "candidate_count": int(len(candidates["row"])),
+    }
@@ -0,0 +1,288 @@
+# finpick-back/app/services/batch_recommender.py
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from .product_catalog import get_product_catalog
+from .profile_analytics import (
+    enhance_product_with_user_context,
+    enhance_user_profile_with_analytics,
+    standardize_user_profile
+)
+from .segment_views import build_segment_views, generic_query_domain, get_segment_view_store, view_key
+
+# 배치 결과에 남기는 상품 필드 (상세 조건 텍스트는 제외 - 수십만 건 출력 크기 절감)
+RESULT_PRODUCT_FIELDS = ("product_id", "name", "bank_name", "type", "interest_rate")
+PARQUET_BATCH_ROWS = 10000
+
+# 워커 프로세스별 사용자 유형 뷰 (initializer에서 한 번 계산)
+_worker_views: Optional[Dict] = None
+
+# 가상 고객 프로필 값 (벤치마크/부하 테스트/워밍업 공용)
+PROFILE_AGES = ["20대", "30대", "40대", "50대", "60대 이상"]
+PROFILE_OCCUPATIONS = ["회사원", "공무원", "학생", "의사", "자영업"]
+PROFILE_BUDGETS = ["10만원 미만", "10-30만원", "30-50만원", "50-100만원", "100-200만원", "200만원 이상"]
+PROFILE_PERIODS = ["6개월", "1년", "2년", "3년"]
+
+
+def random_profile(rng: random.Random) -> Dict[str, Any]:
+    """온보딩 원본 형식의 가상 고객 프로필"""
+    return {
+        "basicInfo": {
+            "age": rng.choice(PROFILE_AGES),
+            "occupation": rng.choice(PROFILE_OCCUPATIONS),
+            "maritalStatus": rng.choice(["미혼", "기혼"]),
+        },
+        "investmentProfile": {
+            "totalScore": rng.randint(5, 60),
+            "investmentPeriod": {"selected": rng.choice(PROFILE_PERIODS)},
+        },
+        "financialStatus": {"monthlyInvestment": rng.choice(PROFILE_BUDGETS)},
+    }
+
+
+def checkpoint_path(output_path: str) -> str:
+    return f"{output_path}.checkpoint.json"
+
+
+def iter_profiles(input_path: str) -> Iterator[Dict[str, Any]]:
+    """JSONL 또는 Parquet 고객 프로필을 한 건씩 읽기 (파일 전체를 메모리에 올리지 않음)"""
+    if input_path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet 입력에는 pyarrow 패키지가 필요합니다") from e
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=PARQUET_BATCH_ROWS):
+            yield from batch.to_pylist()
+        return
+
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def recommend_profile(record: Dict[str, Any], views: Dict, limit: int) -> Dict[str, Any]:
+    """고객 한 명 추천 - 프로필 표준화/분석 후 사용자 유형 뷰의 로컬 top-k에 맞춤 정보 추가
+
+    record: {"user_id", "profile"(온보딩 원본 형식), "domain"/"query"(선택)} 또는 프로필 자체
+    """
+    raw_profile = record.get("profile")
+    if isinstance(raw_profile, str):
+        raw_profile = json.loads(raw_profile)
+    if raw_profile is None:
+        raw_profile = record
+
+    profile = enhance_user_profile_with_analytics(standardize_user_profile(raw_profile))
+    domain = record.get("domain") or generic_query_domain(record.get("query") or "") or "예금적금"
+    key = view_key(domain, profile)
+
+    recommendations = []
+    for item in views.get(key, [])[:limit]:
+        product = enhance_product_with_user_context(item, profile)
+        recommendations.append({
+            **{field: product.get(field) for field in RESULT_PRODUCT_FIELDS},
+            "suitability_score": product["ai_analysis"].get("suitability_score"),
+            "user_specific": product["user_specific"],
+        })
+
+    return {
+        "user_id": record.get("user_id") or record.get("customer_id"),
+        "domain": domain,
+        "segment": list(key[1]),
+        "recommendations": recommendations,
+    }
+
+
+def recommend_records(records: Iterable[Dict[str, Any]], views: Dict, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+    """여러 건 추천 - 실패한 건은 error 필드로 남기고 계속 진행"""
+    results, errors = [], 0
+    for record in records:
+        try:
+            results.append(recommend_profile(record, views, limit))
+        except Exception as e:
+            errors += 1
+            results.append({"user_id": record.get("user_id") or record.get("customer_id"), "error": str(e)})
+    return results, errors
+
+
+def current_views() -> Dict:
+    """현재 카탈로그 버전의 사용자 유형 뷰 (공용 뷰가 최신이 아니면 직접 계산)"""
+    catalog = get_product_catalog()
+    store = get_segment_view_store()
+    if store is not None and store.version == catalog.version:
+        return store.views
+    return build_segment_views(catalog.products, settings.segment_view_top_k)
+
+
+def _init_worker():
+    global _worker_views
+    _worker_views = current_views()
+
+
+def _process_chunk(chunk_index: int, records: List[Dict[str, Any]], limit: int) -> Tuple[int, bytes, int, int]:
+    """워커에서 한 청크 처리 → (청크 번호, JSONL 바이트, 건수, 오류 수)"""
+    results, errors = recommend_records(records, _worker_views, limit)
+    payload = "".join(json.dumps(result, ensure_ascii=False) + "\n" for result in results)
+    return chunk_index, payload.encode("utf-8"), len(results), errors
+
+
+def _load_checkpoint(output_path: str, input_path: str, chunk_size: int) -> Optional[Dict[str, Any]]:
+    path = checkpoint_path(output_path)
+    if not os.path.exists(path) or not os.path.exists(output_path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("input_path") != os.path.abspath(input_path) or checkpoint.get("chunk_size") != chunk_size:
+        raise ValueError("체크포인트의 입력 파일/청크 크기가 현재 실행과 다릅니다 (--resume 없이 다시 실행하세요)")
+    return checkpoint
+
+
+def _save_checkpoint(output_path: str, checkpoint: Dict[str, Any]):
+    """임시 파일에 쓴 뒤 교체 - 중간에 죽어도 이전 체크포인트가 남음"""
+    path = checkpoint_path(output_path)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    workers: int = 0,
+    chunk_size: int = 1000,
+    limit: int = 5,
+    resume: bool = False,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """대량 배치 추천
+
+    - 입력을 chunk_size 건씩 나눠 프로세스 풀에 보내고 (동시에 workers×2 청크까지만 - 메모리 상한)
+    - 결과는 입력 순서대로 출력 JSONL에 바로 이어 쓰며
+    - 청크를 쓸 때마다 (완료 청크 수, 출력 바이트 수) 체크포인트를 남겨
+      resume=True로 다시 실행하면 마지막 체크포인트 이후부터 이어서 처리한다.
+    """
+    if chunk_size <= 0:
+        raise ValueError("청크 크기는 0보다 커야 합니다")
+
+    checkpoint = _load_checkpoint(output_path, input_path, chunk_size) if resume else None
+    if checkpoint is None:
+        checkpoint = {
+            "input_path": os.path.abspath(input_path),
+            "chunk_size": chunk_size,
+            "completed_chunks": 0,
+            "records": 0,
+            "errors": 0,
+            "output_bytes": 0,
+            "completed": False,
+        }
+    resumed_from = checkpoint["completed_chunks"]
+    if checkpoint["completed"]:
+        return {**checkpoint, "resumed_from": resumed_from, "processed": 0, "seconds": 0.0, "records_per_second": 0.0}
+
+    records = iter_profiles(input_path)
+    # 이미 처리한 청크는 건너뜀
+    for _ in itertools.islice(records, resumed_from * chunk_size):
+        pass
+    chunks = enumerate(iter(lambda: list(itertools.islice(records, chunk_size)), []), start=resumed_from)
+
+    mode = "r+b" if resumed_from else "wb"
+    if not os.path.exists(output_path):
+        mode = "wb"
+    start = time.perf_counter()
+    processed = 0
+
+    with open(output_path, mode) as output:
+        output.truncate(checkpoint["output_bytes"])
+        output.seek(checkpoint["output_bytes"])
+
+        def write(result: Tuple[int, bytes, int, int]):
+            nonlocal processed
+            _, payload, count, errors = result
+            output.write(payload)
+            output.flush()
+            processed += count
+            checkpoint["completed_chunks"] += 1
+            checkpoint["records"] += count
+            checkpoint["errors"] += errors
+            checkpoint["output_bytes"] = output.tell()
+            _save_checkpoint(output_path, checkpoint)
+            if progress:
+                elapsed = time.perf_counter() - start
+                progress({
+                    "records": checkpoint["records"],
+                    "chunks": checkpoint["completed_chunks"],
+                    "errors": checkpoint["errors"],
+                    "elapsed": elapsed,
+                    "records_per_second": processed / elapsed if elapsed else 0.0,
+                })
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                in_flight, finished = set(), {}
+                next_index = resumed_from
+
+                def collect(max_pending: int):
+                    """대기 청크(실행 중 + 순서 대기)가 max_pending 미만이 될 때까지 완료분을 순서대로 기록"""
+                    nonlocal in_flight, next_index
+                    while in_flight and len(in_flight) + len(finished) >= max_pending:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            result = future.result()
+                            finished[result[0]] = result
+                        while next_index in finished:
+                            write(finished.pop(next_index))
+                            next_index += 1
+
+                for index, chunk in chunks:
+                    in_flight.add(executor.submit(_process_chunk, index, chunk, limit))
+                    collect(workers * 2)
+                collect(1)
+        else:
+            _init_worker()
+            for index, chunk in chunks:
+                write(_process_chunk(index, chunk, limit))
+
+    checkpoint["completed"] = True
+    _save_checkpoint(output_path, checkpoint)
+    seconds = time.perf_counter() - start
+    return {
+        **checkpoint,
+        "resumed_from": resumed_from,
+        "processed": processed,
+        "seconds": round(seconds, 3),
+        "records_per_second": round(processed / seconds, 1) if seconds else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """대량 배치 추천: python -m app.services.batch_recommender profiles.jsonl results.jsonl --workers 4"""
+    parser = argparse.ArgumentParser(description="고객 프로필 대량 추천 (JSONL/Parquet → JSONL)")
+    parser.add_argument("input_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--workers", type=int, default=settings.batch_workers or os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=settings.batch_chunk_size)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--resume", action="store_true", help="체크포인트 이후부터 이어서 처리")
+    args = parser.parse_args(argv)
+
+    def report(status: Dict[str, Any]):
+        print(f"📦 {status['records']:,}건 처리 (청크 {status['chunks']}, 오류 {status['errors']}) - {status['records_per_second']:,.0f}건/초")
+
+    summary = run_batch(
+        args.input_path, args.output_path,
+        workers=args.workers, chunk_size=args.chunk_size, limit=args.limit,
+        resume=args.resume, progress=report
+    )
+    print(f"✅ 배치 추천 완료: {summary['records']:,}건 ({summary['seconds']}초, {summary['records_per_second']:,}건/초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# finpick-back/app/services/gemini_replay.py
+import asyncio
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..config import settings
+
+# GEMINI_REPLAY_MODE: record(실제 호출 + 로그 기록) | replay(로그 응답만 사용, 네트워크 없음)
+REPLAY_MODES = ("record", "replay")
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class TrafficLog:
+    """gzip JSONL 추가 전용 로그 - 레코드마다 flush (프로세스가 죽어도 앞선 레코드는 읽을 수 있음)
+
+    워커 프로세스끼리 섞이지 않도록 디렉터리 아래 프로세스별 파일에 기록한다.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, f"traffic-{datetime.now():%Y%m%d%H%M%S}-{os.getpid()}.jsonl.gz")
+        self._lock = threading.Lock()
+        self._file = None
+        self.records = 0
+
+    def append(self, record: Dict[str, Any]):
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = gzip.open(self.path, "ab")
+            self._file.write(line)
+            self._file.flush()
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def traffic_files(path: str) -> List[str]:
+    """로그 파일 또는 디렉터리 → 로그 파일 목록 (이름순)"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.jsonl.gz")))
+    return [path]
+
+
+def read_traffic(path: str) -> Iterator[Dict[str, Any]]:
+    """로그 레코드 순회 - 비정상 종료로 잘린 마지막 레코드/gzip 끝부분은 건너뜀"""
+    for file_path in traffic_files(path):
+        with gzip.open(file_path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        break
+            except (EOFError, gzip.BadGzipFile):
+                pass
+
+
+class _ReplayResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ReplayMiss(LookupError):
+    """기록에 없는 프롬프트 (프롬프트 문구/입력이 바뀐 경우)"""
+
+
+class RecordingModel:
+    """실제 모델 호출을 그대로 하면서 프롬프트 해시/프롬프트/응답/지연을 로그에 기록"""
+
+    # 기록 키가 전체 프롬프트여야 하므로 컨텍스트 캐시(접미부만 전송)는 사용하지 않음
+    supports_context_cache = False
+
+    def __init__(self, model: Any, log: TrafficLog):
+        self.model = model
+        self.log = log
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None):
+        started = time.perf_counter()
+        if generation_config is None:
+            response = await self.model.generate_content_async(prompt)
+        else:
+            response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+        self.log.append({
+            "kind": "call",
+            "prompt_hash": prompt_hash(prompt),
+            "prompt": prompt,
+            "response": response.text,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "structured": generation_config is not None,
+            "recorded_at": datetime.now().isoformat(),
+        })
+        return response
+
+
+class ReplayModel:
+    """기록된 응답만 돌려주는 모델 (네트워크 없음) - 없는 프롬프트는 ReplayMiss"""
+
+    supports_context_cache = False
+
+    def __init__(self, responses: Dict[str, str], latencies: Optional[Dict[str, float]] = None, simulate_latency: bool = False):
+        self.responses = responses
+        self.latencies = latencies or {}
+        self.simulate_latency = simulate_latency
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_records(cls, records: Iterator[Dict[str, Any]], simulate_latency: bool = False) -> "ReplayModel":
+        # 같은 프롬프트가 여러 번 기록되었으면 처음 응답 사용 (재생 결과가 항상 같도록)
+        responses: Dict[str, str] = {}
+        latencies: Dict[str, float] = {}
+        for record in records:
+            if record.get("kind") == "call" and record["prompt_hash"] not in responses:
+                responses[record["prompt_hash"]] = record["response"]
+                latencies[record["prompt_hash"]] = record.get("latency_ms", 0.0)
+        return cls(responses, latencies, simulate_latency)
+
+    def lookup(self, prompt: str) -> str:
+        key = prompt_hash(prompt)
+        text = self.responses.get(key)
+        if text is None:
+            self.misses += 1
+            raise ReplayMiss(f"기록에 없는 프롬프트 {key[:12]}")
+        self.hits += 1
+        return text
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None):
+        text = self.lookup(prompt)
+        if self.simulate_latency:
+            await asyncio.sleep(self.latencies.get(prompt_hash(prompt), 0.0) / 1000)
+        return _ReplayResponse(text)
+
+    def session(self) -> "ReplaySession":
+        return ReplaySession(self)
+
+
+class ReplaySession:
+    """질의 하나 단위로 적중/미스를 세는 재생 모델 보기 (응답 사전은 공유)"""
+
+    supports_context_cache = False
+
+    def __init__(self, replay: ReplayModel):
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None):
+        try:
+            response = await self.replay.generate_content_async(prompt, generation_config)
+        except ReplayMiss:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return response
+
+
+_traffic_log: Optional[TrafficLog] = None
+_traffic_log_lock = threading.Lock()
+
+
+def get_traffic_log() -> Optional[TrafficLog]:
+    """기록 모드일 때 프로세스 공용 로그 (아니면 None)"""
+    global _traffic_log
+    if settings.gemini_replay_mode != "record":
+        return None
+    with _traffic_log_lock:
+        if _traffic_log is None:
+            _traffic_log = TrafficLog(settings.gemini_replay_path)
+        return _traffic_log
+
+
+def replay_model_for(model_factory) -> Any:
+    """설정된 모드에 맞는 모델 - replay면 로그 재생 모델(SDK 미사용), record면 기록 래퍼, 아니면 model_factory()"""
+    if settings.gemini_replay_mode == "replay":
+        return ReplayModel.from_records(read_traffic(settings.gemini_replay_path))
+    model = model_factory()
+    log = get_traffic_log()
+    return RecordingModel(model, log) if log is not None else model
+
+
+def record_query(user_query: str, user_profile: Optional[Dict], limit: int, available_products: Optional[List[Dict]] = None):
+    """기록 모드면 recommend_financial_model 입력을 로그에 남김 (오프라인 재생 실행기의 질의 목록)"""
+    log = get_traffic_log()
+    if log is None:
+        return
+    log.append({
+        "kind": "query",
+        "user_query": user_query,
+        "user_profile": user_profile,
+        "limit": limit,
+        "product_count": len(available_products) if available_products is not None else None,
+        "recorded_at": datetime.now().isoformat(),
+    })
@@ -0,0 +1,93 @@
+# finpick-back/app/services/gemini_rest.py
+import asyncio
+from typing import Any, Dict, Optional
+
+import httpx
+
+# SDK generation_config 키 → REST generationConfig 키 (response_schema는 SDK 경로에서만 전달)
+_GENERATION_CONFIG_KEYS = {
+    "response_mime_type": "responseMimeType",
+    "temperature": "temperature",
+    "max_output_tokens": "maxOutputTokens",
+    "top_p": "topP",
+    "top_k": "topK",
+}
+
+
+class GeminiRESTError(RuntimeError):
+    """generateContent 호출 실패 (HTTP 오류 응답)"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Gemini REST {status_code}: {message}")
+        self.status_code = status_code
+
+
+class InvalidArgument(GeminiRESTError):
+    """400 응답 - SDK의 InvalidArgument와 같은 이름으로 구조화 출력 전환 로직에서 처리"""
+
+
+class GeminiRESTResponse:
+    """SDK 응답과 같은 `.text`/`.usage_metadata` 속성만 제공"""
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self.usage_metadata = payload.get("usageMetadata", {})
+
+    @property
+    def text(self) -> str:
+        candidates = self.payload.get("candidates") or []
+        if not candidates:
+            raise ValueError("Gemini 응답에 후보가 없습니다")
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+
+class GeminiRESTModel:
+    """generateContent REST 엔드포인트를 직접 호출하는 모델 (GEMINI_API_ENDPOINT 설정 시 사용)
+
+    부하 테스트용 로컬 대역 서버나 프록시를 가리킬 때 쓰며, SDK 없이 httpx로 호출한다.
+    """
+
+    supports_context_cache = False
+
+    def __init__(self, api_key: str, endpoint: str, model_name: str, timeout: float = 30.0):
+        self.api_key = api_key
+        self.url = f"{endpoint.rstrip('/')}/v1beta/models/{model_name}:generateContent"
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # 연결 풀은 이벤트 루프에 묶이므로 루프가 바뀌면 새로 생성
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._client_loop = loop
+        return self._client
+
+    async def warm_connection(self):
+        """연결 풀에 엔드포인트 연결을 미리 열어 둠 (워밍업용 - 응답 상태는 무시)"""
+        await self._get_client().get(self.url.split("/v1beta/")[0] + "/")
+
+    @staticmethod
+    def build_request(prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        body: Dict[str, Any] = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        config = {
+            _GENERATION_CONFIG_KEYS[key]: value
+            for key, value in (generation_config or {}).items()
+            if key in _GENERATION_CONFIG_KEYS
+        }
+        if config:
+            body["generationConfig"] = config
+        return body
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> GeminiRESTResponse:
+        response = await self._get_client().post(
+            self.url,
+            params={"key": self.api_key},
+            json=self.build_request(prompt, generation_config)
+        )
+        if response.status_code != 200:
+            error_class = InvalidArgument if response.status_code == 400 else GeminiRESTError
+            raise error_class(response.status_code, response.text[:200])
+        return GeminiRESTResponse(response.json())
@@ -1,11 +1,71 @@
 # finpick-back/app/services/gemini_service.py
-import json
+import asyncio
+import copy
 import os
+import time
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-import google.generativeai as genai
+import threading
 from dotenv import load_dotenv
 
+from ..config import settings
+from .admission import enter_background_lane, get_admission_controller
+from .gemini_replay import record_query, replay_model_for
+from .llm_json import LLMJSONError, parse_stage_response, structured_output_config
+from .product_catalog import loaded_catalog_version
+from .prompt_compiler import PromptPrefix, get_prompt_compiler, is_missing_cache_error
+from .loan_engine import estimate_monthly_payment
+from .rate_index import preferred_period_months, product_rate_for_period
+from .selection_engine import select_diverse_top_k, product_quality_score, provider_name
+from .semantic_cache import get_semantic_cache
+from .token_usage import get_token_usage_ledger
+
+# 요구사항 분석 실패 시 기본 분석 (의미 캐시에는 저장하지 않음)
+DEFAULT_USER_ANALYSIS = {
+    "financial_goal": "일반적인 금융 목표",
+    "time_horizon": "중기",
+    "priority_factors": ["안전성", "수익성"],
+    "domain_specific": {
+        "key_requirements": ["기본 요구사항"],
+        "success_criteria": "목표 달성"
+    }
+}
+
+# 의미 캐시 적중 검증(표본) 백그라운드 작업 참조 보관
+_audit_tasks: set = set()
+
+# 구조화 출력 설정을 모델/SDK가 거부하면 해당 단계만 일정 시간 일반 텍스트 호출로 전환 (단계 → 재시도 시각)
+STRUCTURED_OUTPUT_RETRY_SECONDS = 600.0
+_structured_output_disabled_until: Dict[str, float] = {}
+
+# Gemini 모델 클라이언트 (API 키별 프로세스 공용) - SDK import는 첫 호출 시
+GEMINI_MODEL_NAME = 'gemini-2.0-flash'
+_gemini_models: Dict[str, Any] = {}
+_gemini_models_lock = threading.Lock()
+
+
+def get_gemini_model(api_key: str):
+    """google.generativeai를 처음 쓸 때 import/설정하고 모델 객체를 재사용
+
+    GEMINI_API_ENDPOINT가 설정되어 있으면 SDK 대신 해당 엔드포인트를 REST로 호출한다.
+    GEMINI_REPLAY_MODE가 record면 호출을 로그에 기록하고, replay면 로그 응답만 사용한다(네트워크 없음).
+    """
+    with _gemini_models_lock:
+        model = _gemini_models.get(api_key)
+        if model is None:
+            model = replay_model_for(lambda: _create_gemini_model(api_key))
+            _gemini_models[api_key] = model
+        return model
+
+
+def _create_gemini_model(api_key: str):
+    if settings.gemini_api_endpoint:
+        from .gemini_rest import GeminiRESTModel
+        return GeminiRESTModel(api_key, settings.gemini_api_endpoint, GEMINI_MODEL_NAME)
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(GEMINI_MODEL_NAME)
+
 def classify_product_domain(product_type: str) -> str:
     """상품 타입을 2개 도메인으로 분류"""
     if not product_type:
@@ -21,16 +81,34 @@ def classify_product_domain(product_type: str) -> str:
     # 예금/적금 관련 (기본값)
     return "예금적금"
 
+def guess_query_domain(user_query: str) -> str:
+    """AI 분류 전 키워드 기반으로 도메인 추정 (추측 실행용)"""
+    if not user_query:
+        return "예금적금"
+    
+    query_lower = user_query.lower()
+    loan_keywords = ["대출", "빌리", "빌려", "융자", "급전", "자금조달", "주택담보", "마이너스", "loan"]
+    if any(keyword in query_lower for keyword in loan_keywords):
+        return "대출"
+    
+    return "예금적금"
+
 class GeminiService:
-    def __init__(self):
+    def __init__(self, concurrent_stages: Optional[bool] = None, use_semantic_cache: bool = True):
         load_dotenv()
         self.api_key = os.getenv('GEMINI_API_KEY')
         
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
         
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        # 모델 클라이언트는 첫 AI 호출 때 생성 (model 속성)
+        self._model = None
+        
+        # 🚀 독립 단계(관련성/도메인/요구사항 분석) 동시 실행 여부
+        self.concurrent_stages = settings.gemini_concurrent_stages if concurrent_stages is None else concurrent_stages
+        
+        # 🧠 유사 질의의 도메인/요구사항 분석 재사용 (설정으로 끈 경우 None)
+        self.semantic_cache = get_semantic_cache() if use_semantic_cache else None
         
         # 🔥 2개 도메인으로 단순화된 데이터셋 정의
         self.domain_datasets = {
@@ -50,6 +128,79 @@ class GeminiService:
         
         print("✅ 2개 도메인 GeminiService 초기화 성공")
     
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = get_gemini_model(self.api_key)
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._model = value
+    
+    async def _generate(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        prefix: Optional[PromptPrefix] = None,
+        stage: str = "generate"
+    ):
+        """Gemini 호출 - 수락 제어기의 공정 큐에서 동시 호출 슬롯을 받은 뒤 실행
+        
+        prefix(카탈로그 버전별 고정 부분)가 컨텍스트 캐시에 등록되어 있으면 prompt(사용자별 부분)만 전송한다.
+        응답 토큰 사용량은 stage(단계) 이름으로 집계된다.
+        """
+        model = self.model
+        if prefix is not None:
+            compiler = get_prompt_compiler()
+            cached_model = await compiler.cached_model(prefix, model)
+            if cached_model is not None:
+                try:
+                    return await self._call_model(cached_model, prompt, generation_config, stage)
+                except Exception as e:
+                    # 일시 오류(429/503 등)는 캐시가 유효하므로 그대로 전달 - 재전송하면 제한 중 부하만 두 배
+                    if not is_missing_cache_error(e):
+                        raise
+                    compiler.invalidate(prefix)
+                    print(f"⚠️ 컨텍스트 캐시 만료, 전체 프롬프트로 재시도: {e}")
+            prompt = prefix.text + prompt
+        return await self._call_model(model, prompt, generation_config, stage)
+    
+    @staticmethod
+    async def _call_model(model: Any, prompt: str, generation_config: Optional[Dict[str, Any]], stage: str):
+        async with get_admission_controller().gemini_slot():
+            if generation_config is None:
+                response = await model.generate_content_async(prompt)
+            else:
+                response = await model.generate_content_async(prompt, generation_config=generation_config)
+        get_token_usage_ledger().record(stage, response)
+        return response
+    
+    async def _generate_json_text(self, prompt: str, stage: str, prefix: Optional[PromptPrefix] = None) -> str:
+        """JSON 응답 단계 호출 - 가능하면 Gemini 구조화 출력(JSON 모드 + 단계 스키마) 사용
+        
+        호출 자체가 설정을 거부하면(SDK TypeError/ValueError, 400 InvalidArgument) 그 단계만
+        STRUCTURED_OUTPUT_RETRY_SECONDS 동안 일반 응답으로 전환한다. REST는 모든 400이 InvalidArgument이므로
+        영구 전환하지 않는다. 차단/빈 응답의 .text 오류는 응답 단위 오류이므로 전환하지 않고 호출자에게 전달.
+        """
+        generation_config = None
+        if time.monotonic() >= _structured_output_disabled_until.get(stage, 0.0):
+            generation_config = structured_output_config(stage)
+        
+        response = None
+        if generation_config:
+            try:
+                response = await self._generate(prompt, generation_config, prefix, stage)
+            except Exception as e:
+                if not isinstance(e, (TypeError, ValueError)) and type(e).__name__ != "InvalidArgument":
+                    raise
+                _structured_output_disabled_until[stage] = time.monotonic() + STRUCTURED_OUTPUT_RETRY_SECONDS
+                print(f"⚠️ {stage} 구조화 출력 거부, {STRUCTURED_OUTPUT_RETRY_SECONDS:.0f}초간 일반 응답으로 전환: {e}")
+        
+        if response is None:
+            response = await self._generate(prompt, prefix=prefix, stage=stage)
+        return response.text
+
     async def is_financial_related_query(self, user_query: str) -> Dict[str, Any]:
         """사용자 질문이 금융 상품(대출/예금/적금)과 관련있는지 AI가 판단"""
         
@@ -80,17 +231,11 @@ class GeminiService:
 관련 없다고 판단되면 suggested_response에 친근하고 자연스러운 안내 메시지를 포함해주세요.
 """
 
-            response = await self.model.generate_content_async(prompt)
-            response_text = response.text.strip()
+            response_text = await self._generate_json_text(prompt, "relevance")
             
-            # JSON 파싱
+            # JSON 파싱 (코드 펜스/후행 쉼표/잘린 응답 복구 + 스키마 검증)
             try:
-                if '```json' in response_text:
-                    response_text = response_text.split('```json')[1].split('```')[0]
-                elif '```' in response_text:
-                    response_text = response_text.split('```')[1]
-                
-                result = json.loads(response_text)
+                result = parse_stage_response("relevance", response_text)
                 
                 print(f"🤖 AI 관련성 판단: {result.get('is_related')} (신뢰도: {result.get('confidence', 0)})")
                 
@@ -102,7 +247,7 @@ class GeminiService:
                         "죄송해요, 저는 대출, 예금, 적금 상품 추천을 도와드리는 AI입니다. 금융 상품에 대해 궁금한 점이 있으시면 언제든 말씀해 주세요! 😊")
                 }
                 
-            except json.JSONDecodeError as e:
+            except LLMJSONError as e:
                 print(f"❌ AI 응답 JSON 파싱 실패: {e}")
                 print(f"원본 응답: {response_text}")
                 
@@ -157,7 +302,7 @@ class GeminiService:
 """
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self._generate(prompt, stage="domain")
             domain = response.text.strip().replace('"', '')
             
             if domain in ["예금적금", "대출"]:
@@ -178,17 +323,12 @@ class GeminiService:
         domain_config = self.domain_datasets.get(domain, self.domain_datasets["예금적금"])
         
         # 🔥 실시간 도메인 분류를 사용해서 상품 필터링
-        filtered_products = []
-        
         print(f"🔍 {domain} 도메인 상품 필터링 시작...")
         
-        for product in products:
-            product_type = product.get('type', '')
-            product_domain = classify_product_domain(product_type)
-            
-            if product_domain == domain:
-                filtered_products.append(product)
-                print(f"✅ 매칭: {product.get('name', '')} ({product_type})")
+        filtered_products = self._filter_domain_products(products, domain)
+        
+        for product in filtered_products:
+            print(f"✅ 매칭: {product.get('name', '')} ({product.get('type', '')})")
         
         print(f"📊 {domain} 도메인 필터링 완료: {len(filtered_products)}개 상품")
         
@@ -207,11 +347,27 @@ class GeminiService:
             "total_count": len(filtered_products),
             "product_types": self._get_product_type_breakdown(filtered_products),
             "market_analysis": self._analyze_market_conditions(filtered_products, domain),
-            "recommendation_strategy": domain_config["analysis_focus"]
+            "recommendation_strategy": domain_config["analysis_focus"],
+            # 프로세스 공용 카탈로그에서 온 목록이면 버전 (프롬프트 고정 부분 재사용 키)
+            "catalog_version": loaded_catalog_version(products)
         }
         
         return dataset
     
+    def _filter_domain_products(self, products: List[Dict], domain: str) -> List[Dict]:
+        """도메인에 속하는 상품만 추출 (로그 없음)"""
+        return [
+            product for product in products
+            if classify_product_domain(product.get('type', '')) == domain
+        ]
+
+    def _speculative_fallback_selection(self, products: List[Dict], domain: str, limit: int, user_profile: Optional[Dict] = None) -> List[Dict]:
+        """추측 도메인 기준으로 폴백 추천을 미리 계산 (AI 추천 실패 대비)"""
+        domain_products = self._filter_domain_products(products, domain) or products[:10]
+        if not domain_products:
+            return []
+        return self._fallback_diverse_selection(domain_products, limit, user_profile)
+
     def _get_product_type_breakdown(self, products: List[Dict]) -> Dict:
         """상품 타입별 분포"""
         breakdown = {}
@@ -240,45 +396,25 @@ class GeminiService:
         
         try:
             print(f"🚀 금융모델 추천 시작: {user_query}")
+            record_query(user_query, user_profile, limit, available_products)
             
-            # 🔥 1단계: 금융 관련성 검증
-            relevance_check = await self.is_financial_related_query(user_query)
-            
-            if not relevance_check.get("is_related", False):
-                print(f"❌ 금융 관련 없는 요청 감지: {relevance_check.get('reason')}")
-                return {
-                    "success": False,
-                    "is_financial_related": False,
-                    "suggested_response": relevance_check.get("suggested_response"),
-                    "confidence": relevance_check.get("confidence", 0),
-                    "reason": relevance_check.get("reason", "")
-                }
-            
-            print("✅ 금융 관련 요청 확인됨, 추천 진행")
-            
-            # 기존 로직 그대로 유지하되 user_profile 전달
-            domain = await self.classify_financial_domain(user_query)
-            dataset = self.prepare_domain_dataset(available_products or [], domain)
-            user_analysis = await self._analyze_user_requirements_v2(user_query, user_profile, domain)
-            
-            # 🔥 user_profile 전달
-            recommendations = await self._recommend_products_v2(user_analysis, dataset, limit, user_profile)
+            if self.semantic_cache is not None:
+                cached = self.semantic_cache.lookup(user_query, user_profile)
+                if cached:
+                    return await self._recommend_from_cached_analysis(
+                        user_query, user_profile, available_products or [], limit, cached
+                    )
             
-            result = {
-                "success": True,
-                "is_financial_related": True,
-                "domain": domain,
-                "user_analysis": user_analysis,
-                "recommended_products": recommendations,
-                "ai_insights": {
-                    "confidence_score": 0.85,
-                    "recommendation_summary": f"{domain} 도메인에서 {len(recommendations)}개 상품 추천",
-                    "method": "2-Domain AI Analysis"
-                },
-                "portfolio_analysis": f"{domain} 포트폴리오 최적화 완료"
-            }
+            if self.concurrent_stages:
+                result = await self._recommend_financial_model_concurrent(
+                    user_query, user_profile, available_products or [], limit
+                )
+            else:
+                result = await self._recommend_financial_model_sequential(
+                    user_query, user_profile, available_products or [], limit
+                )
             
-            print(f"✅ 금융모델 추천 완료: {len(recommendations)}개 상품")
+            self._remember_analysis(user_query, user_profile, result)
             return result
             
         except Exception as e:
@@ -289,6 +425,207 @@ class GeminiService:
                 "fallback": True
             }
 
+    async def _recommend_financial_model_sequential(
+        self,
+        user_query: str,
+        user_profile: Optional[Dict],
+        available_products: List[Dict],
+        limit: int
+    ) -> Dict:
+        """단계 순차 실행 버전"""
+        
+        # 🔥 1단계: 금융 관련성 검증
+        relevance_check = await self.is_financial_related_query(user_query)
+        
+        if not relevance_check.get("is_related", False):
+            return self._build_unrelated_result(relevance_check)
+        
+        print("✅ 금융 관련 요청 확인됨, 추천 진행")
+        
+        # 기존 로직 그대로 유지하되 user_profile 전달
+        domain = await self.classify_financial_domain(user_query)
+        dataset = self.prepare_domain_dataset(available_products, domain)
+        user_analysis = await self._analyze_user_requirements_v2(user_query, user_profile, domain)
+        
+        # 🔥 user_profile 전달
+        recommendations = await self._recommend_products_v2(user_analysis, dataset, limit, user_profile)
+        
+        return self._build_model_result(domain, user_analysis, recommendations)
+
+    async def _recommend_from_cached_analysis(
+        self,
+        user_query: str,
+        user_profile: Optional[Dict],
+        available_products: List[Dict],
+        limit: int,
+        cached: Dict[str, Any]
+    ) -> Dict:
+        """의미 캐시 적중 - 관련성/도메인/요구사항 분석을 건너뛰고 상품 선택만 실행"""
+        
+        domain = cached["value"]["domain"]
+        user_analysis = copy.deepcopy(cached["value"]["user_analysis"])
+        print(f"🧠 의미 캐시 적중 ({cached['similarity']:.2f}): '{cached['cached_query']}' 분석 재사용")
+        
+        if self.semantic_cache.should_audit():
+            task = asyncio.create_task(self._audit_cached_domain(user_query, domain))
+            _audit_tasks.add(task)
+            task.add_done_callback(_audit_tasks.discard)
+        
+        dataset = self.prepare_domain_dataset(available_products, domain)
+        recommendations = await self._recommend_products_v2(user_analysis, dataset, limit, user_profile)
+        
+        result = self._build_model_result(domain, user_analysis, recommendations)
+        result["ai_insights"]["semantic_cache"] = {
+            "similarity": round(cached["similarity"], 4),
+            "cached_query": cached["cached_query"]
+        }
+        return result
+
+    async def _audit_cached_domain(self, user_query: str, cached_domain: str):
+        """표본 적중에 대해 실제 도메인 분류를 다시 실행해 오적중 여부 기록"""
+        enter_background_lane()
+        try:
+            domain = await self.classify_financial_domain(user_query)
+        except Exception as e:
+            print(f"⚠️ 의미 캐시 검증 실패: {e}")
+            return
+        self.semantic_cache.record_audit(domain == cached_domain)
+
+    def _remember_analysis(self, user_query: str, user_profile: Optional[Dict], result: Dict):
+        """AI 분석이 정상 완료된 금융 질의만 의미 캐시에 저장"""
+        if self.semantic_cache is None:
+            return
+        if not (result.get("success") and result.get("is_financial_related")):
+            return
+        if result.get("user_analysis") == DEFAULT_USER_ANALYSIS:
+            return
+        self.semantic_cache.store(user_query, user_profile, {
+            "domain": result["domain"],
+            "user_analysis": copy.deepcopy(result["user_analysis"])
+        })
+
+    async def _recommend_financial_model_concurrent(
+        self,
+        user_query: str,
+        user_profile: Optional[Dict],
+        available_products: List[Dict],
+        limit: int
+    ) -> Dict:
+        """독립 단계 동시 실행 버전 - 순차 실행과 동일한 결과 반환
+        
+        관련성 판단, 도메인 분류, 요구사항 분석(추측 도메인 기준), 로컬 폴백 순위를
+        한 번에 시작하고 관련성 결과에 따라 불필요한 작업은 취소/폐기한다.
+        """
+        
+        guessed_domain = guess_query_domain(user_query)
+        
+        relevance_task = asyncio.create_task(self.is_financial_related_query(user_query))
+        domain_task = asyncio.create_task(self.classify_financial_domain(user_query))
+        analysis_task = asyncio.create_task(
+            self._analyze_user_requirements_v2(user_query, user_profile, guessed_domain)
+        )
+        fallback_task = asyncio.create_task(asyncio.to_thread(
+            self._speculative_fallback_selection, available_products, guessed_domain, limit, user_profile
+        ))
+        speculative_tasks = [domain_task, analysis_task, fallback_task]
+        
+        try:
+            relevance_check = await relevance_task
+            
+            if not relevance_check.get("is_related", False):
+                return self._build_unrelated_result(relevance_check)
+            
+            print("✅ 금융 관련 요청 확인됨, 추천 진행")
+            
+            domain = await domain_task
+            dataset = self.prepare_domain_dataset(available_products, domain)
+            
+            if domain == guessed_domain:
+                user_analysis = await analysis_task
+                precomputed_fallback = await fallback_task
+            else:
+                # 추측이 틀리면 추측 작업은 폐기하고 실제 도메인으로 다시 분석
+                print(f"🔁 추측 도메인 불일치 ({guessed_domain} → {domain}), 요구사항 재분석")
+                analysis_task.cancel()
+                fallback_task.cancel()
+                user_analysis = await self._analyze_user_requirements_v2(user_query, user_profile, domain)
+                precomputed_fallback = None
+            
+            recommendations = await self._recommend_products_v2(
+                user_analysis, dataset, limit, user_profile,
+                precomputed_fallback=precomputed_fallback
+            )
+            
+            return self._build_model_result(domain, user_analysis, recommendations)
+            
+        finally:
+            for task in speculative_tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _build_unrelated_result(self, relevance_check: Dict[str, Any]) -> Dict:
+        """금융 관련 없는 요청에 대한 응답 구성"""
+        print(f"❌ 금융 관련 없는 요청 감지: {relevance_check.get('reason')}")
+        return {
+            "success": False,
+            "is_financial_related": False,
+            "suggested_response": relevance_check.get("suggested_response"),
+            "confidence": relevance_check.get("confidence", 0),
+            "reason": relevance_check.get("reason", "")
+        }
+
+    def _build_model_result(self, domain: str, user_analysis: Dict, recommendations: List[Dict]) -> Dict:
+        """금융모델 추천 결과 구성"""
+        result = {
+            "success": True,
+            "is_financial_related": True,
+            "domain": domain,
+            "user_analysis": user_analysis,
+            "recommended_products": recommendations,
+            "ai_insights": {
+                "confidence_score": 0.85,
+                "recommendation_summary": f"{domain} 도메인에서 {len(recommendations)}개 상품 추천",
+                "method": "2-Domain AI Analysis"
+            },
+            "portfolio_analysis": f"{domain} 포트폴리오 최적화 완료"
+        }
+        
+        print(f"✅ 금융모델 추천 완료: {len(recommendations)}개 상품")
+        return result
+
+    async def generate_recommendation_narrative(
+        self,
+        user_query: str,
+        domain: str,
+        products: List[Dict],
+        user_profile: Optional[Dict] = None
+    ) -> Optional[str]:
+        """이미 정해진 추천 상품에 대한 설명 문구만 생성 (순위는 바꾸지 않음)"""
+        
+        factors = (user_profile or {}).get("personalization_factors", {})
+        product_lines = "\n".join(
+            f"- {product.get('name')} ({product.get('bank_name')}, {product.get('type')}, {product.get('interest_rate')}%)"
+            for product in products
+        )
+        prompt = f"""
+사용자 요청: "{user_query}"
+도메인: {domain}
+사용자 특성: 위험성향 {factors.get('risk_category', '알 수 없음')}, 생애주기 {factors.get('life_stage', '알 수 없음')}
+
+아래 추천 상품들이 이 사용자에게 왜 적합한지 2~3문장의 한국어로 설명해주세요.
+상품 순서나 목록은 바꾸지 말고 설명 문장만 작성하세요.
+
+{product_lines}
+"""
+        
+        try:
+            response = await self._generate(prompt, stage="narrative")
+            narrative = (response.text or "").strip()
+            return narrative or None
+        except Exception as e:
+            print(f"⚠️ 추천 설명 생성 실패: {e}")
+            return None
+
     async def _analyze_user_requirements_v2(self, user_query: str, user_profile: Optional[Dict], domain: str) -> Dict:
         """사용자 요구사항 분석 - 간소화 버전"""
         
@@ -314,25 +651,23 @@ class GeminiService:
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            response_text = self._clean_json_response(response.text)
-            result = json.loads(response_text)
+            response_text = await self._generate_json_text(prompt, "user_analysis")
+            result = parse_stage_response("user_analysis", response_text)
             print(f"✅ 사용자 분석 완료")
             return result
             
         except Exception as e:
             print(f"⚠️ 사용자 분석 실패: {e}")
-            return {
-                "financial_goal": "일반적인 금융 목표",
-                "time_horizon": "중기",
-                "priority_factors": ["안전성", "수익성"],
-                "domain_specific": {
-                    "key_requirements": ["기본 요구사항"],
-                    "success_criteria": "목표 달성"
-                }
-            }
+            return copy.deepcopy(DEFAULT_USER_ANALYSIS)
 
-    async def _recommend_products_v2(self, user_analysis: Dict, dataset: Dict, limit: int, user_profile: Optional[Dict] = None) -> List[Dict]:
+    async def _recommend_products_v2(
+        self,
+        user_analysis: Dict,
+        dataset: Dict,
+        limit: int,
+        user_profile: Optional[Dict] = None,
+        precomputed_fallback: Optional[List[Dict]] = None
+    ) -> List[Dict]:
         """AI가 전체 상품을 보고 실제로 추천하는 개선된 버전 - 사용자 프로필 적용"""
         
         products = dataset["products"]
@@ -344,67 +679,37 @@ class GeminiService:
         
         print(f"🤖 AI가 {len(products)}개 {domain} 상품 전체 분석 시작...")
         
+        # 📅 사용자 선호 가입 기간 (기간별 금리 비교에 사용)
+        period_months = preferred_period_months(user_profile)
+        
         # 🔥 AI에게 전체 상품 데이터를 보여주고 추천받기
         try:
-            # 상품 데이터를 AI가 이해할 수 있는 형태로 요약
-            products_summary = []
-            for i, product in enumerate(products):
-                summary = {
-                    "index": i,
-                    "id": product.get('id', f'product_{i}'),
-                    "name": product.get('name', ''),
-                    "bank": product.get('provider', {}).get('name', ''),
-                    "type": product.get('type', ''),
-                    "interest_rate": self._extract_product_interest_rate(product),
-                    "min_amount": product.get('details', {}).get('minimum_amount', 0),
-                    "join_ways": product.get('conditions', {}).get('join_way', []),
-                    "special_conditions": product.get('conditions', {}).get('special_conditions', '')
-                }
-                products_summary.append(summary)
+            # 도메인/상품 목록 부분은 카탈로그 버전마다 한 번만 렌더링 (컨텍스트 캐시 등록 시 사용자 부분만 전송)
+            prefix = get_prompt_compiler().prefix(
+                ("product_selection", domain, period_months),
+                dataset.get("catalog_version"),
+                lambda: self._render_product_selection_prefix(products, domain, period_months)
+            )
             
-            # AI 프롬프트 구성
+            # 사용자별 부분
             prompt = f"""
-당신은 금융 전문가입니다. 사용자의 요구사항을 분석하여 가장 적합한 {limit}개의 상품을 추천해주세요.
-
 **사용자 분석 결과:**
 - 금융 목표: {user_analysis.get('financial_goal', '')}
 - 우선순위: {', '.join(user_analysis.get('priority_factors', []))}
 - 핵심 요구사항: {', '.join(user_analysis.get('domain_specific', {}).get('key_requirements', []))}
 
-**분석할 전체 상품 목록 ({len(products)}개):**
-{self._format_products_for_ai(products_summary)}
-
-**추천 기준:**
-1. 사용자 요구사항과의 적합성
-2. 금리 경쟁력 
-3. 은행별 다양성 (같은 은행 중복 최소화)
-4. 가입 조건의 접근성
-5. 상품 타입의 다양성
-
-**응답 형식 (정확한 JSON만):**
-{{
-    "selected_products": [
-        {{
-            "index": 상품_인덱스_번호,
-            "score": 0-100점_적합도,
-            "reason": "추천_이유",
-            "strengths": ["장점1", "장점2"],
-            "considerations": ["고려사항1", "고려사항2"]
-        }}
-    ]
-}}
-
 반드시 {limit}개를 선택하고, 다양한 은행과 조건의 상품을 포함하여 추천해주세요.
 """
             
             # AI 호출
-            response = self.model.generate_content(prompt)
-            response_text = self._clean_json_response(response.text)
-            ai_recommendation = json.loads(response_text)
+            response_text = await self._generate_json_text(prompt, "product_selection", prefix)
+            ai_recommendation = parse_stage_response("product_selection", response_text)
             
-            # AI 추천 결과를 원본 상품과 매칭
+            # AI 추천 결과를 원본 상품과 매칭 (스키마에 맞지 않는 항목은 이미 제외됨)
             final_recommendations = []
-            selected_products = ai_recommendation.get("selected_products", [])
+            selected_products = ai_recommendation["selected_products"]
+            if not selected_products:
+                raise LLMJSONError("유효한 선택 상품 없음")
             
             print(f"✅ AI가 선택한 상품 수: {len(selected_products)}")
             
@@ -419,7 +724,7 @@ class GeminiService:
                             "name": original_product.get('name', ''),
                             "bank_name": original_product.get('provider', {}).get('name', ''),
                             "type": original_product.get('type', ''),
-                            "interest_rate": self._extract_product_interest_rate(original_product),
+                            "interest_rate": self._extract_product_interest_rate(original_product, period_months),
                             "conditions": original_product.get('conditions', {}),
                             "features": original_product.get('benefits', []),
                             "ai_analysis": {
@@ -443,9 +748,58 @@ class GeminiService:
             
         except Exception as e:
             print(f"❌ AI 추천 실패: {e}")
+            if precomputed_fallback is not None:
+                # 동시 실행 모드에서 미리 계산해둔 폴백 사용
+                return precomputed_fallback
             # 🔥 폴백에도 user_profile 전달
             return self._fallback_diverse_selection(products, limit, user_profile)
     
+    def _render_product_selection_prefix(self, products: List[Dict], domain: str, period_months: Optional[int]) -> str:
+        """상품 선택 프롬프트의 고정 부분 (역할, 상품 목록, 추천 기준, 응답 형식) - 사용자 정보 없음"""
+        
+        # 상품 데이터를 AI가 이해할 수 있는 형태로 요약
+        products_summary = []
+        for i, product in enumerate(products):
+            summary = {
+                "index": i,
+                "id": product.get('id', f'product_{i}'),
+                "name": product.get('name', ''),
+                "bank": product.get('provider', {}).get('name', ''),
+                "type": product.get('type', ''),
+                "interest_rate": self._extract_product_interest_rate(product, period_months),
+                "min_amount": product.get('details', {}).get('minimum_amount', 0),
+                "join_ways": product.get('conditions', {}).get('join_way', []),
+                "special_conditions": product.get('conditions', {}).get('special_conditions', '')
+            }
+            products_summary.append(summary)
+        
+        return f"""
+당신은 금융 전문가입니다. 아래 {domain} 상품 중에서 사용자의 요구사항에 가장 적합한 상품을 추천해주세요.
+
+**분석할 전체 상품 목록 ({len(products)}개):**
+{self._format_products_for_ai(products_summary)}
+
+**추천 기준:**
+1. 사용자 요구사항과의 적합성
+2. 금리 경쟁력 
+3. 은행별 다양성 (같은 은행 중복 최소화)
+4. 가입 조건의 접근성
+5. 상품 타입의 다양성
+
+**응답 형식 (정확한 JSON만):**
+{{
+    "selected_products": [
+        {{
+            "index": 상품_인덱스_번호,
+            "score": 0-100점_적합도,
+            "reason": "추천_이유",
+            "strengths": ["장점1", "장점2"],
+            "considerations": ["고려사항1", "고려사항2"]
+        }}
+    ]
+}}
+"""
+    
     def _format_products_for_ai(self, products_summary: List[Dict]) -> str:
         """AI가 읽기 쉬운 형태로 상품 정보 포맷팅"""
         
@@ -469,37 +823,19 @@ class GeminiService:
         
         print(f"🔄 폴백 모드: 다양성 기반 선택")
         
-        # 은행별로 그룹화
-        bank_groups = {}
-        for i, product in enumerate(products):
-            bank = product.get('provider', {}).get('name', 'Unknown')
-            if bank not in bank_groups:
-                bank_groups[bank] = []
-            bank_groups[bank].append((i, product))
-        
-        # 각 은행에서 1개씩 선택
-        selected = []
-        banks_used = set()
-        
-        # 1차: 서로 다른 은행에서 선택
-        for bank, bank_products in bank_groups.items():
-            if len(selected) >= limit:
-                break
-            if bank not in banks_used:
-                product_index, product = bank_products[0]  # 각 은행의 첫 번째 상품
-                selected.append(self._create_fallback_recommendation(product, 85 - len(selected) * 3, user_profile))
-                banks_used.add(bank)
-        
-        # 2차: 부족하면 추가 선택
-        while len(selected) < limit and len(selected) < len(products):
-            remaining_products = [p for i, p in enumerate(products) if i >= len(selected)]
-            if remaining_products:
-                product = remaining_products[0]
-                selected.append(self._create_fallback_recommendation(product, 85 - len(selected) * 3, user_profile))
-            else:
-                break
+        # 은행별 금리(선호 기간 기준) 상위 상품을 라운드로빈으로 선택 (중복 선택 없음)
+        period_months = preferred_period_months(user_profile)
+        selected = select_diverse_top_k(
+            products,
+            limit,
+            score_fn=lambda product: product_quality_score(product, period_months),
+            group_fn=provider_name
+        )
         
-        return selected
+        return [
+            self._create_fallback_recommendation(choice.item, 85 - choice.rank * 3, user_profile)
+            for choice in selected
+        ]
     
     def _create_fallback_recommendation(self, product: Dict, score: int, user_profile: Optional[Dict] = None) -> Dict:
         """폴백 추천 객체 생성 - 사용자 프로필 기반"""
@@ -508,7 +844,7 @@ class GeminiService:
             "name": product.get('name', ''),
             "bank_name": product.get('provider', {}).get('name', ''),
             "type": product.get('type', ''),
-            "interest_rate": self._extract_product_interest_rate(product),
+            "interest_rate": self._extract_product_interest_rate(product, preferred_period_months(user_profile)),
             "conditions": product.get('conditions', {}),
             "features": [],
             "ai_analysis": {
@@ -612,7 +948,7 @@ class GeminiService:
         elif "예금" in product_type:
             type_multiplier = 3.0  # 예금은 목돈이므로 더 큰 금액
         elif "대출" in product_type:
-            return 0  # 대출은 월 납입액 개념이 없음
+            return estimate_monthly_payment(product)  # 대출은 예상 월 상환액 (금리 정보 없으면 0)
         
         # 최종 계산
         calculated_amount = int(base_amount * income_multiplier * age_multiplier * risk_multiplier * type_multiplier)
@@ -723,8 +1059,13 @@ class GeminiService:
         
         return "적합"
     
-    def _extract_product_interest_rate(self, product: Dict) -> float:
-        """상품에서 금리 정보 추출"""
+    def _extract_product_interest_rate(self, product: Dict, period_months: Optional[int] = None) -> float:
+        """상품에서 금리 정보 추출 - 선호 기간이 있으면 해당 기간 금리 우선"""
+        # 0. 사용자 선호 기간의 금리표 값
+        period_rate = product_rate_for_period(product, period_months)
+        if period_rate:
+            return period_rate
+        
         # 1. details에서 직접 추출
         details = product.get('details', {})
         if details.get('interest_rate'):
@@ -743,21 +1084,3 @@ class GeminiService:
         """월 납입액 추정"""
         min_amount = product.get('details', {}).get('minimum_amount', 100000)
         return max(100000, min_amount // 10)  # 최소 10만원
-
-    def _clean_json_response(self, response_text: str) -> str:
-        """AI 응답에서 JSON 부분만 추출"""
-        try:
-            # JSON 블록 찾기
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_text = response_text[start_idx:end_idx]
-                return json_text
-            else:
-                print(f"⚠️ JSON 형식을 찾을 수 없음: {response_text}")
-                return "{}"
-                
-        except Exception as e:
-            print(f"❌ JSON 정리 실패: {e}")
-            return "{}"
\ No newline at end of file
@@ -0,0 +1,135 @@
+# finpick-back/app/services/goal_simulator.py
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# 한 블록당 경로 수 - 시드는 블록 단위로 나누므로 워커 수와 무관하게 결과가 같다
+PATHS_PER_BLOCK = 10000
+
+# 금리 경로 기본 파라미터 (연율, %)
+DEFAULT_MEAN_REVERSION = 0.3   # 장기 평균으로 돌아가는 속도 (1/년)
+DEFAULT_VOLATILITY = 0.6       # 연간 금리 변동성 (%p)
+PERCENTILES = (10, 50, 90)
+
+
+def catalog_deposit_rate(catalog: Any, period_months: int = 12, metric: str = "base_rate") -> Optional[float]:
+    """카탈로그 예금 기간별 금리의 중앙값 (금리 경로의 출발점/장기 평균)"""
+    rate_index = getattr(catalog, "rate_index", None)
+    if rate_index is None:
+        return None
+    _, entries = rate_index.top_products("예금", period_months, metric=metric, limit=len(catalog.products) or 1)
+    rates = [getattr(entry, metric) for entry in entries if getattr(entry, metric) > 0]
+    return statistics.median(rates) if rates else None
+
+
+def _simulate_block(
+    seed: np.random.SeedSequence,
+    n_paths: int,
+    monthly_amount: float,
+    months: int,
+    initial_rate: float,
+    long_run_rate: float,
+    mean_reversion: float,
+    volatility: float
+) -> np.ndarray:
+    """한 블록의 연말 잔액 (연도, 경로) - 평균회귀(Ornstein-Uhlenbeck) 월 금리 경로
+
+    난수 생성이 비용의 대부분이라 대조변수(antithetic) 쌍으로 절반만 뽑는다:
+    앞쪽 절반 경로는 +z, 뒤쪽 절반은 −z 충격을 받는다.
+    """
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / 12.0
+    decay = mean_reversion * dt
+    shock_scale = volatility * np.sqrt(dt)
+    half = (n_paths + 1) // 2
+
+    rate = np.full((2, half), initial_rate)
+    balance = np.zeros((2, half))
+    yearly = np.empty((months // 12, 2, half))
+    shock = np.empty(half)
+
+    for month in range(1, months + 1):
+        rate += decay * (long_run_rate - rate)
+        rng.standard_normal(half, out=shock)
+        shock *= shock_scale
+        rate[0] += shock
+        rate[1] -= shock
+        np.maximum(rate, 0.0, out=rate)
+        # 월말 납입 (기존 월복리 계산과 동일한 적립 시점)
+        balance *= 1.0 + rate / 1200.0
+        balance += monthly_amount
+        if month % 12 == 0:
+            yearly[month // 12 - 1] = balance
+    return yearly.reshape(months // 12, 2 * half)[:, :n_paths]
+
+
+def _simulate_block_args(args) -> np.ndarray:
+    return _simulate_block(*args)
+
+
+def simulate_goal(
+    monthly_amount: float,
+    years: int,
+    initial_rate: float,
+    long_run_rate: Optional[float] = None,
+    target_amount: Optional[float] = None,
+    n_paths: int = 20000,
+    seed: Optional[int] = None,
+    mean_reversion: float = DEFAULT_MEAN_REVERSION,
+    volatility: float = DEFAULT_VOLATILITY,
+    workers: int = 0
+) -> Dict[str, Any]:
+    """목표 달성 몬테카를로 시뮬레이션
+
+    경로를 PATHS_PER_BLOCK 단위 블록으로 나누고 블록마다 SeedSequence 자식 시드를 쓴다.
+    workers > 1 이고 블록이 여러 개면 프로세스 풀에 블록을 나눠 실행한다.
+    """
+    if years <= 0 or n_paths <= 0:
+        raise ValueError("기간과 경로 수는 0보다 커야 합니다")
+    long_run_rate = initial_rate if long_run_rate is None else long_run_rate
+    months = years * 12
+
+    block_sizes = [PATHS_PER_BLOCK] * (n_paths // PATHS_PER_BLOCK)
+    if n_paths % PATHS_PER_BLOCK:
+        block_sizes.append(n_paths % PATHS_PER_BLOCK)
+    seeds = np.random.SeedSequence(seed).spawn(len(block_sizes))
+    jobs = [
+        (block_seed, size, float(monthly_amount), months, float(initial_rate),
+         float(long_run_rate), float(mean_reversion), float(volatility))
+        for block_seed, size in zip(seeds, block_sizes)
+    ]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            blocks = list(executor.map(_simulate_block_args, jobs))
+    else:
+        blocks = [_simulate_block_args(job) for job in jobs]
+    yearly = np.concatenate(blocks, axis=1)
+
+    bands = np.percentile(yearly, PERCENTILES, axis=1)
+    final = yearly[-1]
+    result = {
+        "n_paths": int(n_paths),
+        "seed": seed,
+        "initial_rate": round(float(initial_rate), 4),
+        "long_run_rate": round(float(long_run_rate), 4),
+        "volatility": volatility,
+        "mean_reversion": mean_reversion,
+        "bands": [
+            {
+                "year": year + 1,
+                "principal": int(monthly_amount * 12 * (year + 1)),
+                **{f"p{p}": int(bands[i, year]) for i, p in enumerate(PERCENTILES)}
+            }
+            for year in range(years)
+        ],
+        "final": {f"p{p}": int(bands[i, -1]) for i, p in enumerate(PERCENTILES)},
+        "mean_final_amount": int(final.mean()),
+    }
+    if target_amount:
+        result["target_amount"] = int(target_amount)
+        result["success_probability"] = round(float((final >= target_amount).mean()), 4)
+    return result
+
@@ -0,0 +1,147 @@
+# finpick-back/app/services/goal_solver.py
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .yield_engine import INTEREST_TAX_RATE, YieldEngine, maturity_interest
+
+# 필요 기간 탐색 상한 (50년)
+MAX_HORIZON_MONTHS = 600
+
+
+def _cycle_values(engine: YieldEngine, metric: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """금리 행별 1주기 세후 가치 (납입 1원 기준)
+
+    - 예금: 1원을 한 주기 예치한 뒤 원리금 (성장률 g)
+    - 적금: 매월 1원씩 한 주기 납입한 뒤 만기 원리금 (p + 세후이자)
+    """
+    cols = engine.columns
+    ones = np.ones(len(engine))
+    gross = maturity_interest(ones, cols["period"], cols[metric], cols["is_compound"], cols["is_installment"])
+    net = gross * (1.0 - INTEREST_TAX_RATE)
+    lump_growth = 1.0 + net
+    installment_value = cols["period"] + net
+    return cols["period"].astype(np.int64), lump_growth, installment_value
+
+
+def unit_values(engine: YieldEngine, metric: str = "max_rate") -> np.ndarray:
+    """금리 행 × 기간(1..MAX_HORIZON_MONTHS) 별 '매월 1원 납입' 시 기간 말 세후 평가액
+
+    같은 상품을 만기마다 다시 가입하는 풍차돌리기 기준:
+    - 예금: 매월 새 예금에 넣고 만기 원리금을 같은 상품에 재예치.
+      기간 말 j개월 전에 넣은 돈은 floor(j/p)번 만기를 거친다 → U(H) = Σ_{j=1..H} g^floor(j/p)
+    - 적금: p개월 주기로 재가입, 만기 수령액은 재투자하지 않고 보유, 미완료 주기는 원금만
+      → U(H) = floor(H/p)·(p + 세후이자) + H mod p
+    카탈로그 단위로 한 번 계산해 engine.derived에 보관한다. 결과 shape (금리 행, MAX_HORIZON_MONTHS)
+    """
+    key = ("unit_values", metric)
+    if key in engine.derived:
+        return engine.derived[key]
+
+    period, lump_growth, installment_value = _cycle_values(engine, metric)
+    horizons = np.arange(1, MAX_HORIZON_MONTHS + 1)
+
+    cycles = horizons[None, :] // period[:, None]
+    lump = np.cumsum(np.power(lump_growth[:, None], cycles), axis=1)
+    installment = cycles * installment_value[:, None] + horizons[None, :] % period[:, None]
+    values = np.where(engine.columns["is_installment"][:, None], installment, lump)
+    engine.derived[key] = values
+    return values
+
+
+def _best_per_product(engine: YieldEngine, rows: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """상품별로 key가 가장 작은 금리 행 하나 (동점은 카탈로그 순서)"""
+    docs = engine.columns["doc"][rows]
+    order = np.lexsort((keys, docs))
+    rows, docs, keys = rows[order], docs[order], keys[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = docs[1:] != docs[:-1]
+    rows, keys = rows[first], keys[first]
+    return rows[np.lexsort((engine.columns["doc"][rows], keys))]
+
+
+def _describe(engine: YieldEngine, row: int, metric: str) -> Dict:
+    cols = engine.columns
+    return {
+        "doc": int(cols["doc"][row]),
+        "product_id": engine.product_ids[int(cols["doc"][row])],
+        "product_type": "적금" if cols["is_installment"][row] else "예금",
+        "period_months": int(cols["period"][row]),
+        "rate": float(cols[metric][row]),
+        "rate_type": "복리" if cols["is_compound"][row] else "단리",
+        "strategy": "적금 만기 재가입" if cols["is_installment"][row] else "예금 풍차돌리기",
+    }
+
+
+def solve_required_monthly(
+    engine: YieldEngine,
+    target_amount: float,
+    months: int,
+    metric: str = "max_rate",
+    limit: Optional[int] = 10
+) -> List[Dict]:
+    """목표 기간 안에 목표 금액을 모으기 위한 상품별 필요 월 납입액 (오름차순)
+
+    필요 금액이 최소가입금액보다 작으면 최소가입금액으로 올리고,
+    최대가입금액을 넘으면 해당 상품으로는 불가능하므로 제외한다.
+    """
+    if target_amount <= 0 or not 0 < months <= MAX_HORIZON_MONTHS:
+        raise ValueError("목표 금액은 0보다 크고 기간은 1~600개월이어야 합니다")
+    if not len(engine):
+        return []
+
+    cols = engine.columns
+    values = unit_values(engine, metric)[:, months - 1]
+    required = np.ceil(target_amount / values)
+    required = np.maximum(required, cols["minimum_amount"])
+    feasible = np.flatnonzero((cols["period"] <= months) & (required <= cols["maximum_amount"]))
+
+    results = []
+    for row in _best_per_product(engine, feasible, required[feasible])[:limit]:
+        results.append({
+            **_describe(engine, row, metric),
+            "required_monthly": int(required[row]),
+            "months": months,
+            "expected_amount": int(required[row] * values[row]),
+        })
+    return results
+
+
+def solve_required_months(
+    engine: YieldEngine,
+    target_amount: float,
+    monthly_amount: float,
+    metric: str = "max_rate",
+    limit: Optional[int] = 10,
+    max_months: int = MAX_HORIZON_MONTHS
+) -> List[Dict]:
+    """월 납입액으로 목표 금액에 도달하는 상품별 최단 기간 (오름차순)"""
+    if target_amount <= 0 or monthly_amount <= 0:
+        raise ValueError("목표 금액과 월 납입액은 0보다 커야 합니다")
+    if not len(engine):
+        return []
+
+    cols = engine.columns
+    eligible = np.flatnonzero(
+        (cols["minimum_amount"] <= monthly_amount) & (cols["maximum_amount"] >= monthly_amount)
+    )
+    if not len(eligible):
+        return []
+
+    max_months = min(max_months, MAX_HORIZON_MONTHS)
+    reached = monthly_amount * unit_values(engine, metric)[eligible, :max_months] >= target_amount
+    feasible = reached.any(axis=1)
+    eligible, reached = eligible[feasible], reached[feasible]
+    required_months = reached.argmax(axis=1) + 1
+
+    results = []
+    position = {row: i for i, row in enumerate(eligible)}
+    for row in _best_per_product(engine, eligible, required_months)[:limit]:
+        months = int(required_months[position[row]])
+        results.append({
+            **_describe(engine, row, metric),
+            "monthly_amount": int(monthly_amount),
+            "required_months": months,
+            "required_years": round(months / 12, 1),
+        })
+    return results
@@ -0,0 +1,474 @@
+# finpick-back/app/services/history_store.py
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from ..config import settings
+
+# 큐 항목 종류
+HISTORY_KIND = "history"
+FEEDBACK_KIND = "feedback"
+
+# Firestore 배치 쓰기 최대 문서 수
+FIRESTORE_BATCH_LIMIT = 500
+
+# 저장 실패 배치 재시도 간격 상한(초), 종료 시 재시도 횟수
+RETRY_BACKOFF_MAX = 30.0
+STOP_RETRY_ATTEMPTS = 3
+
+
+class HistoryBackend(Protocol):
+    """추천 이력/피드백 영구 저장소 인터페이스 (동기 - 이벤트 루프 밖에서 호출)"""
+
+    def write_batch(self, sessions: List[Dict[str, Any]], feedback: List[Dict[str, Any]]) -> None: ...
+
+    def read_history(self, user_id: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]: ...
+
+    def count_history(self, user_id: str) -> int: ...
+
+    def close(self) -> None: ...
+
+
+class SQLiteHistoryBackend:
+    """로컬 SQLite 저장소 (WAL 모드 - 여러 워커 프로세스가 같은 파일 사용 가능)"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS recommendation_history (
+                session_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_history_user_created
+                ON recommendation_history (user_id, created_at DESC);
+            CREATE TABLE IF NOT EXISTS recommendation_feedback (
+                feedback_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                recommendation_id TEXT,
+                created_at TEXT NOT NULL,
+                payload TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def write_batch(self, sessions: List[Dict[str, Any]], feedback: List[Dict[str, Any]]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO recommendation_history VALUES (?, ?, ?, ?)",
+                [
+                    (s["session_id"], s["user_id"], s["created_at"], json.dumps(s, ensure_ascii=False, default=str))
+                    for s in sessions
+                ]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO recommendation_feedback VALUES (?, ?, ?, ?, ?)",
+                [
+                    (f["feedback_id"], f["user_id"], f.get("recommendation_id"), f["created_at"],
+                     json.dumps(f, ensure_ascii=False, default=str))
+                    for f in feedback
+                ]
+            )
+
+    def read_history(self, user_id: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM recommendation_history WHERE user_id = ? "
+                "ORDER BY created_at DESC, session_id DESC LIMIT ? OFFSET ?",
+                (user_id, limit, offset)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count_history(self, user_id: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM recommendation_history WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class FirestoreHistoryBackend:
+    """Firestore 저장소 - users/{uid}/recommendation_history, users/{uid}/recommendation_feedback"""
+
+    def __init__(self, client: Any = None):
+        if client is None:
+            from firebase_admin import firestore
+            from ..auth.firebase_auth import firebase_auth
+            firebase_auth.auth  # Firebase 앱 초기화 (처음 사용 시 한 번)
+            client = firestore.client()
+        self.client = client
+
+    def _collection(self, user_id: str, name: str):
+        return self.client.collection("users").document(user_id).collection(name)
+
+    def write_batch(self, sessions: List[Dict[str, Any]], feedback: List[Dict[str, Any]]) -> None:
+        writes = [(self._collection(s["user_id"], "recommendation_history").document(s["session_id"]), s) for s in sessions]
+        writes += [(self._collection(f["user_id"], "recommendation_feedback").document(f["feedback_id"]), f) for f in feedback]
+        for start in range(0, len(writes), FIRESTORE_BATCH_LIMIT):
+            batch = self.client.batch()
+            for reference, document in writes[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.set(reference, document)
+            batch.commit()
+
+    def read_history(self, user_id: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        query = (
+            self._collection(user_id, "recommendation_history")
+            .order_by("created_at", direction="DESCENDING")
+            .offset(offset)
+            .limit(limit)
+        )
+        return [snapshot.to_dict() for snapshot in query.stream()]
+
+    def count_history(self, user_id: str) -> int:
+        result = self._collection(user_id, "recommendation_history").count().get()
+        return int(result[0][0].value)
+
+    def close(self) -> None:
+        pass
+
+
+class HistoryStore:
+    """추천 이력/피드백 write-behind 저장소
+
+    - 기록은 asyncio 큐에 넣고 바로 반환, 백그라운드 작업이 batch_size 또는 flush_interval
+      단위로 모아 저장소에 한 번에 쓴다 (큐가 가득 차면 최대 enqueue_timeout초만 기다리고
+      그래도 자리가 없으면 버리고 dropped로 집계 - 요청 경로는 저장소 장애로 멈추지 않음)
+    - 최근 조회한 사용자의 최신 세션을 LRU로 보관해 /history 페이지를 저장소 없이 응답
+    - LRU 항목은 저장소에서 읽은 뒤부터 새 기록을 앞에 붙여 저장소와 같은 순서를 유지
+    - 쓰기 스레드가 커밋할 때마다 사용자별 세대를 올리고, 읽은 뒤 세대가 바뀐 항목은 다음 조회에서
+      다시 읽음 (조회 경로에는 저장소 질의 없음). 다른 워커 프로세스의 기록은 cache_ttl 이내에 반영
+    - 저장 실패 배치는 버리지 않고 백오프 후 재시도, 재시도 대기 중에도 큐는 계속 비워 다음 시도에 포함
+      (보관 상한 queue_size, 넘치면 오래된 것부터 버림), flush()/stop()도 남은 실패 배치를 다시 시도
+    """
+
+    def __init__(
+        self,
+        backend: HistoryBackend,
+        queue_size: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        cache_users: int = 256,
+        cache_sessions: int = 50,
+        cache_ttl: float = 30.0,
+        enqueue_timeout: float = 0.05
+    ):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.cache_users = cache_users
+        self.cache_sessions = cache_sessions
+        self.cache_ttl = cache_ttl
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        # user_id → {"sessions": deque(최신순), "total": 전체 세션 수, "generation": 읽을 때 세대, "loaded_at": 읽은 시각}
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # user_id → 이 워커가 커밋한 세션 배치 수 (LRU에 있는 사용자만 유지)
+        self._generations: Dict[str, int] = {}
+        # 저장에 실패해 재시도를 기다리는 항목
+        self._failed: List[Tuple[str, Dict[str, Any]]] = []
+        self._retry_attempts = 0
+
+        self.written_sessions = 0
+        self.written_feedback = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.backpressure_waits = 0
+        self.dropped = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_refreshes = 0
+
+    def _ensure_started(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._write_lock = asyncio.Lock()
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def start(self):
+        self._ensure_started()
+
+    async def _enqueue(self, item: Tuple[str, Dict[str, Any]]) -> bool:
+        """큐에 넣기 - 가득 차 있으면 enqueue_timeout초까지만 기다리고 못 넣으면 버림 (False)"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.backpressure_waits += 1
+        try:
+            await asyncio.wait_for(self._queue.put(item), self.enqueue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            print(f"⚠️ 추천 이력 큐가 가득 차 기록을 버립니다 (누적 {self.dropped}건)")
+            return False
+
+    async def record_session(self, session: Dict[str, Any]):
+        """추천 세션 기록 (session_id, user_id, created_at 필수)"""
+        if not await self._enqueue((HISTORY_KIND, session)):
+            return
+        entry = self._recent.get(session["user_id"])
+        if entry is not None:
+            entry["sessions"].appendleft(session)
+            entry["total"] += 1
+
+    async def record_feedback(self, feedback: Dict[str, Any]):
+        """피드백 기록 (feedback_id, user_id, created_at 필수)"""
+        await self._enqueue((FEEDBACK_KIND, feedback))
+
+    def _retry_delay(self) -> float:
+        return min(self.flush_interval * 2 ** max(0, self._retry_attempts - 1), RETRY_BACKOFF_MAX)
+
+    async def _write_loop(self):
+        while True:
+            await self._write(await self._collect())
+
+    async def _collect(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """다음 배치로 쓸 큐 항목 (최대 batch_size)
+
+        실패 배치 재시도 대기 중에는 백오프 시간 동안 들어온 항목을 실패 배치 뒤에 옮겨 두고(상한 queue_size)
+        빈 목록을 돌려준다 → 다음 _write([])가 함께 재시도. 큐에서 꺼낸 항목을 쥔 채 기다리지 않으므로
+        flush()의 join도 백오프 동안 멈추지 않는다.
+        """
+        loop = asyncio.get_running_loop()
+        if self._failed:
+            deadline = loop.time() + self._retry_delay()
+            while True:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                if len(self._failed) >= self.queue_size:
+                    await asyncio.sleep(timeout)
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                self._failed.append(item)
+                self._queue.task_done()
+            return []
+
+        items = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(items) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    def _drain(self) -> List[Tuple[str, Dict[str, Any]]]:
+        items = []
+        while self._queue is not None and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        return items
+
+    async def _write(self, items: List[Tuple[str, Dict[str, Any]]]):
+        """이전 실패분 + items를 한 번에 기록 (실패하면 전부 다음 재시도로 보관)"""
+        async with self._write_lock:
+            batch, self._failed = self._failed + items, []
+            sessions = [record for kind, record in batch if kind == HISTORY_KIND]
+            feedback = [record for kind, record in batch if kind == FEEDBACK_KIND]
+            try:
+                if batch:
+                    await asyncio.to_thread(self.backend.write_batch, sessions, feedback)
+                    self.batches += 1
+                    self.written_sessions += len(sessions)
+                    self.written_feedback += len(feedback)
+                    self._retry_attempts = 0
+                    self._bump_generations(sessions)
+            except Exception as e:
+                self.write_errors += 1
+                self._retry_attempts += 1
+                # 쓰는 동안 재시도 대기열에 옮겨진 항목은 뒤에 유지
+                failed = batch + self._failed
+                overflow = len(failed) - self.queue_size
+                if overflow > 0:
+                    # 장애가 길어져도 보관량은 queue_size로 제한 (오래된 것부터 버림)
+                    self.dropped += overflow
+                    self._bump_generations([record for kind, record in failed[:overflow] if kind == HISTORY_KIND])
+                    failed = failed[overflow:]
+                self._failed = failed
+                print(f"❌ 추천 이력 저장 실패 ({len(failed)}건, {self._retry_delay():.1f}초 후 재시도): {e}")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _bump_generations(self, sessions: List[Dict[str, Any]]):
+        """커밋(또는 버린) 세션의 사용자 LRU 항목을 무효화 - 다음 조회에서 저장소를 다시 읽음"""
+        for user_id in {session["user_id"] for session in sessions}:
+            # LRU에 있거나 읽는 중인 사용자만 (나머지는 항목이 없으니 무효화할 것도 없음)
+            if user_id in self._generations:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    async def flush(self):
+        """큐에 남은 기록과 쓰기 중인 배치를 모두 저장소에 반영"""
+        if self._queue is None:
+            return
+        self._ensure_started()
+        pending = self._drain()
+        for start in range(0, len(pending), self.batch_size):
+            await self._write(pending[start:start + self.batch_size])
+        await self._queue.join()
+        if self._failed:
+            await self._write([])
+
+    async def stop(self):
+        """종료 시 남은 기록을 모두 쓰고 저장소 닫기 (실패 배치는 백오프하며 몇 번 더 시도)"""
+        await self.flush()
+        for _ in range(STOP_RETRY_ATTEMPTS):
+            if not self._failed:
+                break
+            await asyncio.sleep(self._retry_delay())
+            await self._write([])
+        if self._failed:
+            print(f"❌ 추천 이력 {len(self._failed)}건을 저장하지 못하고 종료합니다")
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        self.backend.close()
+
+    async def _load_entry(self, user_id: str) -> Dict[str, Any]:
+        await self.flush()
+        # 읽는 도중 커밋된 기록은 세대가 달라져 다음 조회에서 다시 읽음
+        self._generations.setdefault(user_id, 0)
+        generation = self._generations[user_id]
+        sessions = await asyncio.to_thread(self.backend.read_history, user_id, self.cache_sessions, 0)
+        total = await asyncio.to_thread(self.backend.count_history, user_id)
+        entry = {
+            "sessions": deque(sessions, maxlen=self.cache_sessions),
+            "total": total,
+            "generation": generation,
+            "loaded_at": time.monotonic()
+        }
+        self._recent[user_id] = entry
+        while len(self._recent) > self.cache_users:
+            evicted, _ = self._recent.popitem(last=False)
+            self._generations.pop(evicted, None)
+        return entry
+
+    def _entry_is_current(self, user_id: str, entry: Dict[str, Any]) -> bool:
+        """읽은 뒤 이 워커가 커밋했거나 TTL이 지났으면 False (저장소 질의 없음)"""
+        if time.monotonic() - entry["loaded_at"] > self.cache_ttl:
+            return False
+        return entry["generation"] == self._generations.get(user_id)
+
+    async def get_history(self, user_id: str, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
+        """사용자 추천 이력 페이지 (최신순)"""
+        offset = (page - 1) * page_size
+        entry = self._recent.get(user_id)
+        if entry is None:
+            self.cache_misses += 1
+            entry = await self._load_entry(user_id)
+            source = "store"
+        elif not self._entry_is_current(user_id, entry):
+            self.cache_refreshes += 1
+            entry = await self._load_entry(user_id)
+            source = "store"
+        else:
+            self.cache_hits += 1
+            source = "cache"
+        self._recent.move_to_end(user_id)
+
+        cached = entry["sessions"]
+        if offset + page_size <= len(cached) or len(cached) >= entry["total"]:
+            items = list(cached)[offset:offset + page_size]
+        else:
+            # LRU에 없는 오래된 페이지는 저장소에서 읽음
+            await self.flush()
+            items = await asyncio.to_thread(self.backend.read_history, user_id, page_size, offset)
+            source = "store"
+
+        return {
+            "items": items,
+            "page": page,
+            "page_size": page_size,
+            "total": entry["total"],
+            "has_next": offset + len(items) < entry["total"],
+            "source": source,
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "backend": type(self.backend).__name__,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "written_sessions": self.written_sessions,
+            "written_feedback": self.written_feedback,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+            "retry_pending": len(self._failed),
+            "backpressure_waits": self.backpressure_waits,
+            "dropped": self.dropped,
+            "cached_users": len(self._recent),
+            "cache_refreshes": self.cache_refreshes,
+            "cache_hit_rate": round(self.cache_hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_history_backend(name: Optional[str] = None) -> HistoryBackend:
+    name = (name or settings.history_backend).lower()
+    if name == "firestore":
+        return FirestoreHistoryBackend()
+    if name == "sqlite":
+        return SQLiteHistoryBackend(settings.history_db_path)
+    raise ValueError(f"지원하지 않는 이력 저장소: {name}")
+
+
+_store: Optional[HistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """프로세스 공용 추천 이력 저장소"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore(
+                create_history_backend(),
+                queue_size=settings.history_queue_size,
+                batch_size=settings.history_batch_size,
+                flush_interval=settings.history_flush_interval,
+                cache_users=settings.history_cache_users,
+                cache_sessions=settings.history_cache_sessions,
+                cache_ttl=settings.history_cache_ttl,
+                enqueue_timeout=settings.history_enqueue_timeout
+            )
+        return _store
+
+
+async def shutdown_history_store():
+    """앱 종료 시 남은 기록 flush (저장소를 만든 적이 없으면 아무것도 하지 않음)"""
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        await store.stop()
@@ -0,0 +1,282 @@
+# finpick-back/app/services/llm_json.py
+import json
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import TypedDict
+
+from ..config import settings
+
+# 🧾 Gemini 단계별 응답 스키마 (검증 + 구조화 출력 response_schema 공용)
+
+
+class _RelevanceRequired(TypedDict):
+    is_related: bool
+
+
+class RelevanceCheck(_RelevanceRequired, total=False):
+    confidence: float
+    reason: str
+    suggested_response: str
+
+
+class DomainSpecific(TypedDict, total=False):
+    key_requirements: List[str]
+    success_criteria: str
+
+
+class UserAnalysis(TypedDict, total=False):
+    financial_goal: str
+    time_horizon: str
+    priority_factors: List[str]
+    domain_specific: DomainSpecific
+
+
+class _SelectedProductRequired(TypedDict):
+    index: int
+    score: float
+
+
+class SelectedProduct(_SelectedProductRequired, total=False):
+    reason: str
+    strengths: List[str]
+    considerations: List[str]
+
+
+class ProductSelection(TypedDict):
+    selected_products: List[SelectedProduct]
+
+
+STAGE_SCHEMAS = {
+    "relevance": RelevanceCheck,
+    "user_analysis": UserAnalysis,
+    "product_selection": ProductSelection,
+}
+
+# 스키마에 맞지 않는 항목을 걸러내며 다시 검증하는 최대 횟수
+MAX_VALIDATION_PASSES = 5
+
+# JSON 시작으로 시도해 볼 `{` 위치 수 (설명 문장 속 중괄호 건너뛰기)
+MAX_OBJECT_STARTS = 8
+
+_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.S)
+_decoder = json.JSONDecoder()
+
+
+class LLMJSONError(ValueError):
+    """복구할 수 없는 LLM JSON 응답"""
+
+
+def _strip_code_fence(text: str) -> str:
+    match = _FENCE_PATTERN.search(text)
+    return match.group(1) if match else text
+
+
+def _remove_trailing_commas(text: str) -> str:
+    """문자열 밖의 `,}` / `,]` 쉼표 제거"""
+    result = []
+    in_string = escape = False
+    length = len(text)
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ",":
+            j = i + 1
+            while j < length and text[j].isspace():
+                j += 1
+            if j < length and text[j] in "}]":
+                continue
+        result.append(ch)
+    return "".join(result)
+
+
+def _truncation_candidates(text: str) -> List[str]:
+    """잘린 JSON을 닫은 후보들 - 열린 괄호만 닫은 것, 마지막으로 완성된 요소까지 자르고 닫은 것
+
+    `{"selected_products": [{...}, {"index": 3, "sco` → `{"selected_products": [{...}, {"index": 3}]}`
+    """
+    stack: List[str] = []
+    in_string = escape = False
+    cut, cut_stack = 0, []
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            cut, cut_stack = i + 1, list(stack)
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return [text[:i + 1]]
+            cut, cut_stack = i + 1, list(stack)
+        elif ch == ",":
+            cut, cut_stack = i, list(stack)
+
+    # 숫자로 끝나면 잘린 숫자일 수 있으므로 (`"score": 8` ← 85) 마지막 요소를 버리는 후보만 사용
+    tail = text.rstrip()
+    candidates = [] if in_string or tail[-1:].isdigit() else [tail + "".join(reversed(stack))]
+    candidates.append(text[:cut] + "".join(reversed(cut_stack)))
+    return candidates
+
+
+def _decode_object(candidate: str) -> Any:
+    """candidate 맨 앞의 JSON 값 (후행 쉼표/잘린 배열·객체 복구) - 실패하면 ValueError"""
+    for repair in (lambda value: value, _remove_trailing_commas):
+        candidate = repair(candidate)
+        try:
+            return _decoder.raw_decode(candidate)[0]
+        except ValueError:
+            pass
+
+    for closed in _truncation_candidates(candidate):
+        try:
+            return json.loads(_remove_trailing_commas(closed))
+        except ValueError:
+            pass
+    raise ValueError(candidate[:100])
+
+
+def loads_tolerant(text: str) -> Tuple[Any, bool]:
+    """LLM 응답 텍스트 → (JSON 값, 복구 여부)
+
+    코드 펜스/앞뒤 설명 문장/후행 쉼표/잘린 배열·객체를 순서대로 처리한다.
+    단계 스키마는 모두 객체이므로 설명 문장 속 `[1]` 같은 괄호는 건너뛰고 `{` 위치부터 차례로 시도한다.
+    """
+    stripped = (text or "").strip()
+    try:
+        return json.loads(stripped), False
+    except ValueError:
+        pass
+
+    body = _strip_code_fence(stripped)
+    start = body.find("{")
+    if start == -1:
+        raise LLMJSONError("응답에서 JSON을 찾을 수 없습니다")
+
+    first_candidate = body[start:]
+    for _ in range(MAX_OBJECT_STARTS):
+        try:
+            return _decode_object(body[start:]), True
+        except ValueError:
+            pass
+        start = body.find("{", start + 1)
+        if start == -1:
+            break
+    raise LLMJSONError(f"JSON 복구 실패: {first_candidate[:100]}")
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: type) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def _drop_invalid_parts(value: Any, errors: List[Dict[str, Any]], required_keys: frozenset) -> int:
+    """검증 오류 위치의 목록 항목/선택 필드를 제거하고 제거 수 반환 (필수 필드 오류면 0)"""
+    list_items, optional_keys = set(), set()
+    for error in errors:
+        loc = error["loc"]
+        index_pos = next((pos for pos, part in enumerate(loc) if isinstance(part, int)), None)
+        if index_pos is not None:
+            list_items.add((loc[:index_pos], loc[index_pos]))
+        elif loc and isinstance(value, dict) and loc[0] not in required_keys:
+            optional_keys.add(loc[0])
+        else:
+            return 0
+
+    # 같은 목록에서 여러 항목을 지울 때 인덱스가 밀리지 않도록 뒤에서부터 제거
+    for path, index in sorted(list_items, key=lambda item: -item[1]):
+        container = value
+        for part in path:
+            container = container[part]
+        del container[index]
+    for key in optional_keys:
+        value.pop(key, None)
+    return len(list_items) + len(optional_keys)
+
+
+def validate_stage(stage: str, value: Any) -> Tuple[Any, int]:
+    """단계 스키마 검증 → (검증된 값, 버린 항목 수) - 잘못된 목록 항목/선택 필드는 버리고 나머지는 사용"""
+    schema = STAGE_SCHEMAS[stage]
+    adapter = _adapter(schema)
+    required_keys = getattr(schema, "__required_keys__", frozenset())
+    dropped = 0
+    for _ in range(MAX_VALIDATION_PASSES):
+        try:
+            return adapter.validate_python(value), dropped
+        except ValidationError as e:
+            removed = _drop_invalid_parts(value, e.errors(), required_keys)
+            if not removed:
+                raise LLMJSONError(f"{stage} 응답 스키마 불일치: {e.errors()[0]['loc']} {e.errors()[0]['msg']}") from e
+            dropped += removed
+    raise LLMJSONError(f"{stage} 응답 스키마 불일치 (항목 정리 {MAX_VALIDATION_PASSES}회 초과)")
+
+
+class LLMJSONMetrics:
+    """단계별 파싱 결과 카운터 (직접 파싱/복구/실패, 버린 항목 수)"""
+
+    OUTCOMES = ("direct", "repaired", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, int]] = {}
+
+    def record(self, stage: str, outcome: str, dropped_items: int = 0):
+        with self._lock:
+            counts = self._stages.setdefault(stage, {**{name: 0 for name in self.OUTCOMES}, "dropped_items": 0})
+            counts[outcome] += 1
+            counts["dropped_items"] += dropped_items
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {stage: dict(counts) for stage, counts in self._stages.items()}
+        for counts in stages.values():
+            total = sum(counts[name] for name in self.OUTCOMES)
+            counts["total"] = total
+            counts["repair_rate"] = round(counts["repaired"] / total, 4) if total else 0.0
+            counts["failure_rate"] = round(counts["failed"] / total, 4) if total else 0.0
+        return stages
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+llm_json_metrics = LLMJSONMetrics()
+
+
+def parse_stage_response(stage: str, text: str) -> Dict[str, Any]:
+    """Gemini 단계 응답 텍스트 → 스키마 검증된 dict (복구 불가면 LLMJSONError)"""
+    try:
+        value, repaired = loads_tolerant(text)
+        result, dropped = validate_stage(stage, value)
+    except LLMJSONError:
+        llm_json_metrics.record(stage, "failed")
+        raise
+    llm_json_metrics.record(stage, "repaired" if repaired or dropped else "direct", dropped)
+    return result
+
+
+def structured_output_config(stage: str) -> Optional[Dict[str, Any]]:
+    """Gemini 구조화 출력 설정 (JSON 모드 + 단계 스키마), 비활성화 시 None"""
+    if not settings.gemini_structured_output:
+        return None
+    return {"response_mime_type": "application/json", "response_schema": STAGE_SCHEMAS[stage]}
@@ -0,0 +1,389 @@
+# finpick-back/app/services/loan_engine.py
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# 상환방식: 원리금균등 / 원금균등 / 만기일시
+EQUAL_INSTALLMENT = "equal_installment"
+EQUAL_PRINCIPAL = "equal_principal"
+BULLET = "bullet"
+REPAYMENT_METHODS = (EQUAL_INSTALLMENT, EQUAL_PRINCIPAL, BULLET)
+REPAYMENT_METHOD_NAMES = {
+    EQUAL_INSTALLMENT: "원리금균등상환",
+    EQUAL_PRINCIPAL: "원금균등상환",
+    BULLET: "만기일시상환",
+}
+
+# 금리 시나리오: 최저 / 평균 / 최고 금리
+RATE_SCENARIOS = ("min_rate", "avg_rate", "max_rate")
+
+# 대출기간 미지정 시 기본값 (신용대출 5년, 주택담보대출 30년)
+DEFAULT_CREDIT_LOAN_MONTHS = 60
+DEFAULT_MORTGAGE_MONTHS = 360
+
+
+def _repayment_methods(repay_type: str) -> List[str]:
+    """금감원 repay_type → 계산할 상환방식 (분할상환은 원리금균등/원금균등 모두)"""
+    if "만기" in (repay_type or ""):
+        return [BULLET]
+    return [EQUAL_INSTALLMENT, EQUAL_PRINCIPAL]
+
+
+def _scenario_rates(row: Dict) -> Optional[List[float]]:
+    """(최저, 평균, 최고) 금리 - 평균금리가 0/누락이면 최저·최고의 중간값"""
+    min_rate = row.get("min_rate") or None
+    max_rate = row.get("max_rate") or None
+    if min_rate is None and max_rate is None:
+        return None
+    min_rate = float(min_rate if min_rate is not None else max_rate)
+    max_rate = float(max_rate if max_rate is not None else min_rate)
+    avg_rate = float(row.get("avg_rate") or (min_rate + max_rate) / 2)
+    # 공시 평균금리가 최저~최고 범위를 벗어나는 경우가 있어 범위 안으로 보정
+    return [min_rate, min(max(avg_rate, min_rate), max_rate), max_rate]
+
+
+def default_loan_months(product: Dict) -> int:
+    """상품 타입별 기본 대출기간 (최대 대출기간 이내)"""
+    months = DEFAULT_MORTGAGE_MONTHS if "주택" in (product.get("type", "") or "") else DEFAULT_CREDIT_LOAN_MONTHS
+    period_max = (product.get("details", {}) or {}).get("loan_period_max")
+    return min(months, int(period_max)) if period_max else months
+
+
+def amortization_schedule(
+    principal: np.ndarray,
+    annual_rate: np.ndarray,
+    months: np.ndarray,
+    method_codes: np.ndarray,
+    horizon: int
+) -> Dict[str, np.ndarray]:
+    """월별 상환 스케줄 (벡터 연산)
+
+    입력은 같은 shape로 브로드캐스트되며 결과는 마지막 축에 월(1..horizon)이 붙는다.
+    대출기간이 끝난 뒤의 월은 0으로 채운다. method_codes는 REPAYMENT_METHODS의 인덱스.
+    """
+    principal, annual_rate, months, method_codes = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(annual_rate, dtype=np.float64),
+        np.asarray(months, dtype=np.float64),
+        np.asarray(method_codes)
+    )
+    shape = principal.shape + (horizon,)
+    # 상환방식별로 해당 행만 계산하도록 (행, 월) 2차원으로 평탄화
+    principal = principal.reshape(-1, 1)
+    monthly = annual_rate.reshape(-1, 1) / 100.0 / 12.0
+    n = months.reshape(-1, 1)
+    codes = method_codes.reshape(-1)
+    k = np.arange(1, horizon + 1, dtype=np.float64)
+
+    interest = np.zeros((principal.shape[0], horizon))
+    principal_paid = np.zeros_like(interest)
+
+    rows = codes == REPAYMENT_METHODS.index(EQUAL_INSTALLMENT)
+    if rows.any():
+        # 원리금균등: 직전 잔액 = P((1+i)^n − (1+i)^(k−1)) / ((1+i)^n − 1)
+        p, i, m = principal[rows], monthly[rows], n[rows]
+        safe_i = np.where(i > 0, i, 1.0)
+        growth_n = np.power(1.0 + safe_i, m)
+        balance_prev = np.where(
+            i > 0,
+            p * (growth_n - np.power(1.0 + safe_i, k - 1)) / (growth_n - 1.0),
+            p * (1.0 - (k - 1) / m)
+        )
+        payment = np.where(i > 0, p * safe_i * growth_n / (growth_n - 1.0), p / m)
+        interest[rows] = balance_prev * i
+        principal_paid[rows] = payment - interest[rows]
+
+    rows = codes == REPAYMENT_METHODS.index(EQUAL_PRINCIPAL)
+    if rows.any():
+        # 원금균등: 매월 P/n 상환, 이자는 직전 잔액 기준
+        p, i, m = principal[rows], monthly[rows], n[rows]
+        interest[rows] = p * (1.0 - (k - 1) / m) * i
+        principal_paid[rows] = np.broadcast_to(p / m, (len(p), horizon))
+
+    rows = codes == REPAYMENT_METHODS.index(BULLET)
+    if rows.any():
+        # 만기일시: 매월 이자만, 마지막 달 원금 일시 상환
+        p, i, m = principal[rows], monthly[rows], n[rows]
+        interest[rows] = np.broadcast_to(p * i, (len(p), horizon))
+        principal_paid[rows] = np.where(k == m, p, 0.0)
+
+    # 대출기간이 끝난 뒤의 월은 0
+    active = k <= n
+    interest = np.where(active, interest, 0.0).reshape(shape)
+    principal_paid = np.where(active, principal_paid, 0.0).reshape(shape)
+    payment = interest + principal_paid
+    balance = principal.reshape(shape[:-1] + (1,)) - np.cumsum(principal_paid, axis=-1)
+
+    return {
+        "payment": payment,
+        "interest": interest,
+        "principal": principal_paid,
+        "balance": np.maximum(balance, 0.0),
+    }
+
+
+def repayment_summary(
+    principal: np.ndarray,
+    annual_rate: np.ndarray,
+    months: np.ndarray,
+    method_codes: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """스케줄 없이 닫힌 식으로 첫 달 상환액 / 총이자 / 연간 원리금 (DSR용)"""
+    principal = np.asarray(principal, dtype=np.float64)
+    monthly = np.asarray(annual_rate, dtype=np.float64) / 100.0 / 12.0
+    n = np.asarray(months, dtype=np.float64)
+    codes = np.asarray(method_codes)
+
+    safe_monthly = np.where(monthly > 0, monthly, 1.0)
+    growth_n = np.power(1.0 + safe_monthly, n)
+    installment_payment = np.where(
+        monthly > 0, principal * safe_monthly * growth_n / (growth_n - 1.0), principal / n
+    )
+
+    first_payment = np.select(
+        [codes == 0, codes == 1],
+        [installment_payment, principal / n + principal * monthly],
+        principal * monthly
+    )
+    total_interest = np.select(
+        [codes == 0, codes == 1],
+        [installment_payment * n - principal, principal * monthly * (n + 1) / 2.0],
+        principal * monthly * n
+    )
+
+    # 연간 원리금: 첫 12개월 상환액 합 (만기일시는 DSR 산정 관행대로 원금을 대출기간에 나눠 반영)
+    first_year = np.minimum(n, 12.0)
+    equal_principal_year = principal / n * first_year + principal * monthly * (first_year - first_year * (first_year - 1) / (2.0 * n))
+    annual_debt_service = np.select(
+        [codes == 0, codes == 1],
+        [installment_payment * first_year, equal_principal_year],
+        principal * monthly * first_year + principal / n * first_year
+    )
+
+    return {
+        "first_payment": first_payment,
+        "total_interest": total_interest,
+        "total_cost": principal + total_interest,
+        "annual_debt_service": annual_debt_service,
+    }
+
+
+class LoanEngine:
+    """전체 대출상품의 상환액/총이자/DSR을 한 번의 NumPy 연산으로 계산
+
+    행 하나 = (상품, 금리 행, 상환방식). 금리는 (최저, 평균, 최고) 시나리오 열로 보관한다.
+    금리 정보가 없는 상품(일부 신용대출)은 계산 대상에서 제외된다.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], product_ids: List[str]):
+        self.columns = columns
+        self.product_ids = product_ids
+        self._doc_by_id = {product_id: doc for doc, product_id in enumerate(product_ids)}
+
+    @classmethod
+    def build(cls, products: Iterable) -> "LoanEngine":
+        docs, methods, rates, period_max, minimum, maximum = [], [], [], [], [], []
+        product_ids = []
+
+        for doc, product in enumerate(products):
+            product_ids.append(product.get("id", f"product_{doc}"))
+            if "대출" not in (product.get("type", "") or ""):
+                continue
+            details = product.get("details", {}) or {}
+            for row in product.get("rates", []) or []:
+                scenario_rates = _scenario_rates(row)
+                if scenario_rates is None:
+                    continue
+                for method in _repayment_methods(row.get("repay_type", "")):
+                    docs.append(doc)
+                    methods.append(REPAYMENT_METHODS.index(method))
+                    rates.append(scenario_rates)
+                    period_max.append(details.get("loan_period_max") or DEFAULT_MORTGAGE_MONTHS)
+                    minimum.append(details.get("minimum_amount") or 0)
+                    maximum.append(details.get("maximum_amount") or np.inf)
+
+        columns = {
+            "doc": np.asarray(docs, dtype=np.int64),
+            "method": np.asarray(methods, dtype=np.int8),
+            "rates": np.asarray(rates, dtype=np.float64).reshape(-1, len(RATE_SCENARIOS)),
+            "loan_period_max": np.asarray(period_max, dtype=np.float64),
+            "minimum_amount": np.asarray(minimum, dtype=np.float64),
+            "maximum_amount": np.asarray(maximum, dtype=np.float64),
+        }
+        return cls(columns, product_ids)
+
+    def __len__(self) -> int:
+        return len(self.columns["doc"])
+
+    def _eligible(self, principal: float, months: int, method: Optional[str]) -> np.ndarray:
+        cols = self.columns
+        mask = (
+            (cols["minimum_amount"] <= principal)
+            & (cols["maximum_amount"] >= principal)
+            & (cols["loan_period_max"] >= months)
+        )
+        if method:
+            if method not in REPAYMENT_METHODS:
+                raise ValueError(f"지원하지 않는 상환방식: {method}")
+            mask &= cols["method"] == REPAYMENT_METHODS.index(method)
+        return mask
+
+    def compute(
+        self,
+        principal: float,
+        months: int,
+        method: Optional[str] = None,
+        annual_income: Optional[float] = None,
+        existing_annual_debt_service: float = 0.0
+    ) -> Dict[str, np.ndarray]:
+        """가입 가능한 모든 (상품, 상환방식) 행 × 금리 시나리오 요약 - 결과 shape (행, 시나리오)"""
+        if months <= 0 or principal <= 0:
+            raise ValueError("대출금액과 기간은 0보다 커야 합니다")
+        mask = self._eligible(principal, months, method)
+        rates = self.columns["rates"][mask]
+        codes = np.broadcast_to(self.columns["method"][mask][:, None], rates.shape)
+
+        summary = repayment_summary(np.full(rates.shape, float(principal)), rates, np.full(rates.shape, float(months)), codes)
+        if annual_income:
+            summary["dsr"] = (summary["annual_debt_service"] + existing_annual_debt_service) / annual_income * 100
+        summary["doc"] = self.columns["doc"][mask]
+        summary["method"] = self.columns["method"][mask]
+        summary["rates"] = rates
+        return summary
+
+    def schedules(self, principal: float, months: int, method: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """가입 가능한 모든 행 × 금리 시나리오 × 월 스케줄 - 결과 shape (행, 시나리오, 월)"""
+        if months <= 0 or principal <= 0:
+            raise ValueError("대출금액과 기간은 0보다 커야 합니다")
+        mask = self._eligible(principal, months, method)
+        rates = self.columns["rates"][mask]
+        codes = np.broadcast_to(self.columns["method"][mask][:, None], rates.shape)
+        result = amortization_schedule(np.full(rates.shape, float(principal)), rates, np.full(rates.shape, float(months)), codes, months)
+        result["doc"] = self.columns["doc"][mask]
+        return result
+
+    def rank_by_total_cost(
+        self,
+        principal: float,
+        months: int,
+        method: Optional[str] = None,
+        scenario: str = "avg_rate",
+        annual_income: Optional[float] = None,
+        existing_annual_debt_service: float = 0.0,
+        max_dsr: Optional[float] = None,
+        limit: Optional[int] = 20
+    ) -> List[Dict]:
+        """총 상환비용 오름차순 (상품별 가장 저렴한 금리 행/상환방식 1개)"""
+        if scenario not in RATE_SCENARIOS:
+            raise ValueError(f"지원하지 않는 금리 시나리오: {scenario}")
+        column = RATE_SCENARIOS.index(scenario)
+        summary = self.compute(principal, months, method, annual_income, existing_annual_debt_service)
+
+        total_cost = summary["total_cost"][:, column]
+        keep = np.ones(total_cost.shape, dtype=bool)
+        if max_dsr is not None and "dsr" in summary:
+            keep &= summary["dsr"][:, column] <= max_dsr
+
+        rows = np.flatnonzero(keep)
+        order = rows[np.lexsort((summary["doc"][rows], total_cost[rows]))]
+        seen = set()
+        ranked = []
+        for row in order:
+            doc = int(summary["doc"][row])
+            if doc in seen:
+                continue
+            seen.add(doc)
+            method_name = REPAYMENT_METHODS[int(summary["method"][row])]
+            item = {
+                "doc": doc,
+                "product_id": self.product_ids[doc],
+                "repayment_method": method_name,
+                "repayment_method_name": REPAYMENT_METHOD_NAMES[method_name],
+                "rate": float(summary["rates"][row, column]),
+                "rate_scenarios": {
+                    name: round(float(summary["total_cost"][row, i]))
+                    for i, name in enumerate(RATE_SCENARIOS)
+                },
+                "first_monthly_payment": round(float(summary["first_payment"][row, column])),
+                "total_interest": round(float(summary["total_interest"][row, column])),
+                "total_cost": round(float(total_cost[row])),
+                "annual_debt_service": round(float(summary["annual_debt_service"][row, column])),
+            }
+            if "dsr" in summary:
+                item["dsr"] = round(float(summary["dsr"][row, column]), 2)
+            ranked.append(item)
+            if limit is not None and len(ranked) >= limit:
+                break
+        return ranked
+
+    def schedule(
+        self,
+        product_id: str,
+        principal: float,
+        months: int,
+        method: str = EQUAL_INSTALLMENT,
+        scenario: str = "avg_rate"
+    ) -> Optional[Dict]:
+        """단일 상품 월별 상환 스케줄 (해당 상환방식의 최저 금리 행 기준)"""
+        if method not in REPAYMENT_METHODS:
+            raise ValueError(f"지원하지 않는 상환방식: {method}")
+        if scenario not in RATE_SCENARIOS:
+            raise ValueError(f"지원하지 않는 금리 시나리오: {scenario}")
+        doc = self._doc_by_id.get(product_id)
+        if doc is None:
+            return None
+        rows = np.flatnonzero(
+            (self.columns["doc"] == doc) & (self.columns["method"] == REPAYMENT_METHODS.index(method))
+        )
+        if not len(rows):
+            return None
+
+        rate = float(self.columns["rates"][rows, RATE_SCENARIOS.index(scenario)].min())
+        result = amortization_schedule(
+            np.array(float(principal)), np.array(rate), np.array(float(months)),
+            np.array(REPAYMENT_METHODS.index(method)), months
+        )
+        return {
+            "product_id": product_id,
+            "repayment_method": method,
+            "repayment_method_name": REPAYMENT_METHOD_NAMES[method],
+            "rate": rate,
+            "months": [
+                {
+                    "month": month + 1,
+                    "payment": round(float(result["payment"][month])),
+                    "principal": round(float(result["principal"][month])),
+                    "interest": round(float(result["interest"][month])),
+                    "balance": round(float(result["balance"][month])),
+                }
+                for month in range(months)
+            ],
+            "total_interest": round(float(result["interest"].sum())),
+            "total_payment": round(float(result["payment"].sum())),
+        }
+
+
+def estimate_monthly_payment(product: Dict, principal: Optional[float] = None, months: Optional[int] = None) -> int:
+    """단일 대출상품의 평균금리 기준 첫 달 상환액 (원금: 최소대출금액, 기간: 기본 대출기간)
+
+    금리 정보가 없으면 0을 반환한다.
+    """
+    principal = float(principal or (product.get("details", {}) or {}).get("minimum_amount") or 10000000)
+    months = int(months or default_loan_months(product))
+    rates, codes = [], []
+    for row in product.get("rates", []) or []:
+        scenario_rates = _scenario_rates(row)
+        if scenario_rates is None:
+            continue
+        for method in _repayment_methods(row.get("repay_type", "")):
+            rates.append(scenario_rates[RATE_SCENARIOS.index("avg_rate")])
+            codes.append(REPAYMENT_METHODS.index(method))
+    if not rates:
+        return 0
+    summary = repayment_summary(
+        np.full(len(rates), principal), np.asarray(rates), np.full(len(rates), float(months)), np.asarray(codes)
+    )
+    # 원금까지 갚아 나가는 분할상환 기준을 우선 (만기일시만 있으면 이자만 납부)
+    amortizing = np.asarray(codes) != REPAYMENT_METHODS.index(BULLET)
+    payments = summary["first_payment"][amortizing] if amortizing.any() else summary["first_payment"]
+    return int(round(float(payments.min())))
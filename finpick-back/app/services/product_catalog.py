@@ -0,0 +1,354 @@
+# finpick-back/app/services/product_catalog.py
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from .loan_engine import LoanEngine
+from .rate_index import RateIndex
+from .search_index import ProductSearchIndex
+from .yield_engine import YieldEngine
+
+CATALOG_FILE_NAME = "financial_products.json"
+
+# 🗂️ 공유 카탈로그 버퍼 레이아웃
+#   header  : magic(8) | version(40, sha1 hex) | count(u32) | blob_offset(u64)
+#   columns : 아래 COLUMNS 순서대로 count개의 8바이트 값
+#   blob    : 상품별 [요약 JSON | 색인 JSON | 전체 JSON] 바이트
+SHARED_MAGIC = b"FPCAT002"
+HEADER_FORMAT = "<8s40sIQ4x"  # 64바이트 (컬럼 8바이트 정렬)
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+COLUMNS = (
+    ("summary_offset", "Q"),
+    ("summary_length", "Q"),
+    ("index_offset", "Q"),
+    ("index_length", "Q"),
+    ("full_offset", "Q"),
+    ("full_length", "Q"),
+    ("interest_rate", "d"),
+    ("max_interest_rate", "d"),
+    ("minimum_amount", "d"),
+    ("maximum_amount", "d"),
+)
+NUMERIC_DETAIL_COLUMNS = ("interest_rate", "max_interest_rate", "minimum_amount", "maximum_amount")
+
+# 요약 JSON에 담는 최상위 필드 (전체 JSON 파싱 없이 필터링에 사용)
+SUMMARY_KEYS = ("id", "name", "type", "category")
+SUMMARY_FIELDS = frozenset(SUMMARY_KEYS + ("provider",))
+
+# 색인 JSON에 담는 필드 (검색/금리/만기/대출 색인 구축에 필요한 것만 - 설명/혜택 등은 제외)
+INDEX_CONDITION_KEYS = ("special_conditions", "notes")
+INDEX_DETAIL_KEYS = ("minimum_amount", "maximum_amount", "loan_period_max")
+
+
+def find_catalog_path() -> Optional[str]:
+    """financial_products.json 파일 경로 찾기"""
+    current_dir = os.path.dirname(__file__)
+    possible_paths = [
+        os.path.join(current_dir, "../../financial_products.json"),
+        os.path.join(current_dir, "../financial_products.json"),
+        os.path.join(current_dir, "financial_products.json"),
+        CATALOG_FILE_NAME
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+
+    print("❌ financial_products.json 파일을 찾을 수 없습니다.")
+    print("📁 검색한 경로들:")
+    for path in possible_paths:
+        print(f"   - {os.path.abspath(path)}")
+    return None
+
+
+def load_catalog_products(file_path: str) -> Tuple[List[Dict], str]:
+    """카탈로그 JSON을 읽어 (상품 목록, 버전 해시) 반환"""
+    with open(file_path, 'rb') as f:
+        raw_bytes = f.read()
+
+    version = hashlib.sha1(raw_bytes).hexdigest()
+    raw_data = json.loads(raw_bytes.decode('utf-8'))
+
+    if isinstance(raw_data, dict):
+        all_products = []
+        for category, products in raw_data.items():
+            if isinstance(products, list):
+                all_products.extend(products)
+        return all_products, version
+    elif isinstance(raw_data, list):
+        return raw_data, version
+    else:
+        raise ValueError(f"예상과 다른 데이터 형식: {type(raw_data)}")
+
+
+def default_shared_path() -> str:
+    """공유 버퍼 파일 기본 경로 (/dev/shm 우선)"""
+    if settings.catalog_shared_path:
+        return settings.catalog_shared_path
+    base_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base_dir, "finpick_catalog.bin")
+
+
+def _numeric(value: Any) -> float:
+    try:
+        return float(value) if value is not None else float("nan")
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def index_record(product: Dict) -> Dict:
+    """색인 구축용 상품 투영 (ProductSearchIndex/RateIndex/YieldEngine/LoanEngine이 읽는 필드)"""
+    conditions = product.get("conditions", {}) or {}
+    details = product.get("details", {}) or {}
+    record = {key: product[key] for key in ("id", "name", "type") if key in product}
+    record["provider"] = {"name": (product.get("provider", {}) or {}).get("name", "")}
+    record["conditions"] = {key: conditions[key] for key in INDEX_CONDITION_KEYS if key in conditions}
+    record["details"] = {key: details[key] for key in INDEX_DETAIL_KEYS if key in details}
+    record["rates"] = product.get("rates", []) or []
+    return record
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def compile_shared_catalog(products: List[Dict], version: str, path: str) -> str:
+    """상품 목록을 읽기 전용 공유 버퍼 파일로 컴파일 (원자적 교체)"""
+    count = len(products)
+    column_bytes = count * 8 * len(COLUMNS)
+    blob_offset = HEADER_SIZE + column_bytes
+
+    columns: Dict[str, List] = {name: [] for name, _ in COLUMNS}
+    blob = bytearray()
+
+    for product in products:
+        summary = {key: product[key] for key in SUMMARY_KEYS + ("provider",) if key in product}
+        summary_bytes = _encode(summary)
+        index_bytes = _encode(index_record(product))
+        full_bytes = _encode(product)
+
+        columns["summary_offset"].append(blob_offset + len(blob))
+        columns["summary_length"].append(len(summary_bytes))
+        blob += summary_bytes
+        columns["index_offset"].append(blob_offset + len(blob))
+        columns["index_length"].append(len(index_bytes))
+        blob += index_bytes
+        columns["full_offset"].append(blob_offset + len(blob))
+        columns["full_length"].append(len(full_bytes))
+        blob += full_bytes
+
+        details = product.get("details", {}) or {}
+        for name in NUMERIC_DETAIL_COLUMNS:
+            columns[name].append(_numeric(details.get(name)))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".finpick_catalog_")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, SHARED_MAGIC, version.encode('ascii'), count, blob_offset))
+            for name, fmt in COLUMNS:
+                f.write(struct.pack(f"<{count}{fmt}", *columns[name]))
+            f.write(blob)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    print(f"📦 공유 카탈로그 컴파일 완료: {count}개 상품 → {path} ({blob_offset + len(blob):,} bytes)")
+    return path
+
+
+class ProductView(Mapping):
+    """공유 버퍼 위의 상품 뷰 - 필요한 시점에만 dict로 역직렬화
+
+    역직렬화 결과는 이 뷰 객체에만 보관되고 카탈로그는 뷰를 붙잡지 않으므로,
+    요청이 끝나 뷰가 버려지면 워커 메모리도 함께 해제된다.
+    """
+
+    __slots__ = ("_catalog", "_index", "_summary", "_data")
+
+    def __init__(self, catalog: "SharedCatalog", index: int):
+        self._catalog = catalog
+        self._index = index
+        self._summary = None
+        self._data = None
+
+    def _load_summary(self) -> Dict:
+        if self._summary is None:
+            self._summary = self._catalog._read_json(self._index, "summary")
+        return self._summary
+
+    def to_dict(self) -> Dict:
+        """전체 상품 dict 생성 (호출 시점에 역직렬화)"""
+        if self._data is None:
+            self._data = self._catalog._read_json(self._index, "full")
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        if self._data is None and key in SUMMARY_FIELDS:
+            return self._load_summary()[key]
+        return self.to_dict()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"ProductView({self._index}, {self._load_summary().get('id')})"
+
+
+class SharedCatalog(Sequence):
+    """mmap으로 연결된 읽기 전용 컬럼형 카탈로그 (워커 간 메모리 공유)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, blob_offset = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        if magic != SHARED_MAGIC:
+            self._mmap.close()
+            raise ValueError(f"공유 카탈로그 형식이 아닙니다: {path}")
+
+        self.version = version.decode('ascii')
+        self._count = count
+        self._columns: Dict[str, memoryview] = {}
+
+        buffer = memoryview(self._mmap)
+        offset = HEADER_SIZE
+        for name, fmt in COLUMNS:
+            self._columns[name] = buffer[offset:offset + count * 8].cast(fmt)
+            offset += count * 8
+
+    def column(self, name: str) -> memoryview:
+        """숫자 컬럼을 복사 없이 반환 (NaN = 값 없음)"""
+        return self._columns[name]
+
+    def _read_json(self, index: int, part: str) -> Dict:
+        start = self._columns[f"{part}_offset"][index]
+        length = self._columns[f"{part}_length"][index]
+        return json.loads(self._mmap[start:start + length].decode('utf-8'))
+
+    def index_records(self) -> Iterator[Dict]:
+        """색인 구축용 상품 투영을 행 순서대로 하나씩 역직렬화 (보관하지 않음)"""
+        for index in range(self._count):
+            yield self._read_json(index, "index")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ProductView(self, i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return ProductView(self, index)
+
+
+def attach_shared_catalog(source_path: str, version: str, products: Optional[List[Dict]] = None) -> SharedCatalog:
+    """공유 버퍼에 연결 - 없거나 버전이 다르면 컴파일 후 연결"""
+    shared_path = default_shared_path()
+
+    if os.path.exists(shared_path):
+        try:
+            catalog = SharedCatalog(shared_path)
+            if catalog.version == version:
+                print(f"🔗 공유 카탈로그 연결: {shared_path} ({len(catalog)}개 상품)")
+                return catalog
+        except Exception as e:
+            print(f"⚠️ 공유 카탈로그 연결 실패, 재컴파일합니다: {e}")
+
+    if products is None:
+        products, version = load_catalog_products(source_path)
+    compile_shared_catalog(products, version, shared_path)
+    return SharedCatalog(shared_path)
+
+
+def _source_version(file_path: str) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class ProductCatalog:
+    """프로세스 단위로 한 번만 로드되는 상품 카탈로그"""
+
+    def __init__(self, products: Sequence, version: str, source_path: Optional[str], shared: bool = False):
+        self.products = products
+        self.version = version
+        self.source_path = source_path
+        self.shared = shared
+        
+        # 🔎 키워드 검색 역색인 / 기간별 금리 색인 / 세후 만기·대출 상환 계산 배열 (카탈로그 로드 시 한 번 구축)
+        # 공유 모드는 버퍼의 색인 JSON을 한 건씩 읽어 구축 → 상품 dict를 워커에 모아 두지 않음
+        self.search_index = ProductSearchIndex.build(self._index_records())
+        self.rate_index = RateIndex.build(self._index_records())
+        self.yield_engine = YieldEngine.build(self._index_records())
+        self.loan_engine = LoanEngine.build(self._index_records())
+
+    def _index_records(self) -> Iterable[Dict]:
+        return self.products.index_records() if self.shared else self.products
+
+    @classmethod
+    def load(cls, shared_mode: Optional[bool] = None) -> "ProductCatalog":
+        shared_mode = settings.catalog_shared_mode if shared_mode is None else shared_mode
+        file_path = find_catalog_path()
+        if not file_path:
+            return cls([], "empty", None)
+
+        if shared_mode:
+            # 공유 모드: 원본 JSON은 해시만 확인하고 파싱은 컴파일이 필요할 때만
+            catalog = attach_shared_catalog(file_path, _source_version(file_path))
+            return cls(catalog, catalog.version, file_path, shared=True)
+
+        products, version = load_catalog_products(file_path)
+        print(f"✅ 금융상품 {len(products)}개 로드 완료")
+        return cls(products, version, file_path)
+
+
+_catalog: Optional[ProductCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_product_catalog(reload: bool = False) -> ProductCatalog:
+    """프로세스 공용 카탈로그 (요청마다 다시 읽지 않음)"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None or reload:
+            _catalog = ProductCatalog.load()
+        return _catalog
+
+
+def loaded_catalog_version(products: Any) -> Optional[str]:
+    """이미 로드된 프로세스 공용 카탈로그의 상품 목록이면 그 버전 (아니면 None, 새로 로드하지 않음)"""
+    catalog = _catalog
+    if catalog is not None and products is catalog.products:
+        return catalog.version
+    return None
+
+
+def main():
+    """pre-fork 마스터에서 카탈로그를 미리 컴파일: python -m app.services.product_catalog"""
+    file_path = find_catalog_path()
+    if not file_path:
+        raise SystemExit(1)
+    products, version = load_catalog_products(file_path)
+    compile_shared_catalog(products, version, default_shared_path())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# finpick-back/app/services/profile_analytics.py
+from typing import Any, Dict, Optional
+
+from .loan_engine import estimate_monthly_payment
+from .segment_views import user_segment
+
+# 사용자 프로필 표준화/분석 + 상품별 사용자 맞춤 정보 (API와 배치 추천에서 공용)
+
+
+DEFAULT_AI_ANALYSIS = {
+    "suitability_score": 0.5,
+    "match_reasons": [],
+    "risk_assessment": "보통",
+    "expected_benefit": ""
+}
+
+
+def user_specific_info(product_data: Dict[str, Any], user_profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """상품별 사용자 맞춤 정보 (월 납입액/위험 적합도/연령 적합도)"""
+    return {
+        "recommended_monthly_amount": estimate_monthly_amount_with_profile(product_data, user_profile),
+        "risk_compatibility": assess_risk_compatibility(product_data, user_profile),
+        "age_appropriateness": assess_age_appropriateness(product_data, user_profile)
+    }
+
+
+def enhance_product_with_user_context(
+    product_data: Dict[str, Any], 
+    user_profile: Dict[str, Any]
+) -> Dict[str, Any]:
+    """새로운 AI 응답 구조를 위한 상품 컨텍스트 추가 함수 - 사용자 프로필 기반 (RecommendedProduct 필드 그대로인 dict)"""
+    
+    # 🔥 GeminiService에서 이미 사용자 프로필 기반으로 계산된 데이터를 사용
+    # user_specific 정보가 이미 계산되어 있으면 그대로 사용
+    user_specific = product_data.get('user_specific')
+    return {
+        "product_id": product_data.get('product_id'),
+        "name": product_data.get('name'),
+        "bank_name": product_data.get('bank_name'),
+        "type": product_data.get('type'),
+        "interest_rate": product_data.get('interest_rate'),
+        "conditions": product_data.get('conditions', {}),
+        "features": product_data.get('features', []),
+        "ai_analysis": product_data.get('ai_analysis', dict(DEFAULT_AI_ANALYSIS)),
+        "user_specific": user_specific if user_specific is not None else user_specific_info(product_data, user_profile)
+    }
+
+
+def estimate_monthly_amount_with_profile(product_data: Dict, user_profile: Optional[Dict]) -> int:
+    """사용자 프로필 기반 월 납입액 추정 - 단순화 버전"""
+    
+    if not user_profile:
+        return 300000  # 기본값
+    
+    basic_info = user_profile.get("basic_info", {})
+    min_amount = product_data.get('conditions', {}).get('minimum_amount', 100000)
+    if isinstance(min_amount, str):
+        try:
+            min_amount = int(min_amount)
+        except:
+            min_amount = 100000
+    
+    base_amount = max(100000, min_amount)
+    
+    # 직업 기반 조정
+    occupation = basic_info.get("occupation", "").lower()
+    if any(job in occupation for job in ["의사", "변호사", "회계사"]):
+        multiplier = 2.0
+    elif any(job in occupation for job in ["공무원", "교사"]):
+        multiplier = 1.5
+    elif any(job in occupation for job in ["학생"]):
+        multiplier = 0.5
+    else:
+        multiplier = 1.0
+    
+    # 연령 기반 조정
+    age = basic_info.get("age", "")
+    if "20" in age:
+        multiplier *= 0.8
+    elif "40" in age or "50" in age:
+        multiplier *= 1.3
+    
+    # 상품 타입별 조정
+    product_type = product_data.get('type', '').lower()
+    if "예금" in product_type:
+        multiplier *= 2.5  # 예금은 목돈
+    elif "대출" in product_type:
+        return estimate_monthly_payment(product_data)  # 대출은 예상 월 상환액
+    
+    calculated = int(base_amount * multiplier)
+    return max(100000, min(1000000, calculated))
+
+
+def assess_risk_compatibility(product_data: Dict, user_profile: Optional[Dict]) -> str:
+    """간단한 위험도 적합성 평가"""
+    
+    if not user_profile:
+        return "적합"
+    
+    investment_profile = user_profile.get("investment_profile", {})
+    risk_score = investment_profile.get("total_score", 25)
+    
+    product_type = product_data.get('type', '').lower()
+    
+    if any(keyword in product_type for keyword in ["예금", "적금"]):
+        if risk_score <= 20:
+            return "매우 적합"
+        else:
+            return "적합"
+    elif "대출" in product_type:
+        if risk_score <= 20:
+            return "신중히 검토"
+        else:
+            return "적합"
+    
+    return "적합"
+
+
+def assess_age_appropriateness(product_data: Dict, user_profile: Optional[Dict]) -> str:
+    """간단한 연령 적합성 평가"""
+    
+    if not user_profile:
+        return "적합"
+    
+    basic_info = user_profile.get("basic_info", {})
+    age = basic_info.get("age", "")
+    product_type = product_data.get('type', '').lower()
+    
+    if "20" in age:
+        if "대출" in product_type:
+            return "신중한 계획 필요"
+        else:
+            return "목돈 마련에 적합"
+    elif "30" in age or "40" in age:
+        return "적합"
+    elif "50" in age or "60" in age:
+        if "대출" in product_type:
+            return "상환 계획 검토"
+        else:
+            return "안정 운용에 적합"
+    
+    return "적합"
+
+
+def standardize_user_profile(raw_profile: Dict[str, Any]) -> Dict[str, Any]:
+    """원시 사용자 프로필을 표준화된 형식으로 변환"""
+    
+    if not raw_profile:
+        return {}
+    
+    standardized = {
+        "basic_info": {
+            "age": raw_profile.get("basicInfo", {}).get("age", ""),
+            "gender": raw_profile.get("basicInfo", {}).get("gender", ""),
+            "occupation": raw_profile.get("basicInfo", {}).get("occupation", ""),
+            "residence": raw_profile.get("basicInfo", {}).get("residence", ""),
+            "marital_status": raw_profile.get("basicInfo", {}).get("maritalStatus", ""),
+            "dependents": raw_profile.get("basicInfo", {}).get("dependents", "")
+        },
+        "investment_profile": {
+            "risk_tolerance": raw_profile.get("investmentProfile", {}).get("riskTolerance", {}),
+            "investment_period": raw_profile.get("investmentProfile", {}).get("investmentPeriod", {}),
+            "investment_knowledge": raw_profile.get("investmentProfile", {}).get("investmentKnowledge", {}),
+            "return_expectation": raw_profile.get("investmentProfile", {}).get("returnExpectation", {}),
+            "total_score": raw_profile.get("investmentProfile", {}).get("totalScore", 0)
+        },
+        "financial_status": raw_profile.get("financialStatus"),
+        "investment_goals": raw_profile.get("investmentGoals")
+    }
+    
+    return standardized
+
+
+def enhance_user_profile_with_analytics(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """사용자 프로필에 분석 요소 추가"""
+    
+    enhanced = profile.copy()
+    
+    # 위험 성향(투자성향 점수) / 연령대 / 생애 주기 분류 - 사용자 유형별 추천 뷰와 같은 기준
+    risk_category, age_group, stage = user_segment(profile)
+    
+    enhanced["personalization_factors"] = {
+        "risk_category": risk_category,
+        "age_group": age_group,
+        "life_stage": stage,
+        "financial_stability": assess_financial_stability(profile),
+        "investment_readiness": assess_investment_readiness(profile),
+        "goal_urgency": assess_goal_urgency(profile)
+    }
+    
+    return enhanced
+
+
+def assess_financial_stability(profile: Dict[str, Any]) -> str:
+    """재정적 안정성 평가"""
+    # 기본적인 직업 기반 안정성 평가
+    basic_info = profile.get("basic_info", {})
+    occupation = basic_info.get("occupation", "").lower()
+    
+    stable_occupations = ["공무원", "교사", "의사", "변호사", "회계사"]
+    if any(job in occupation for job in stable_occupations):
+        return "high"
+    else:
+        return "medium"
+
+
+def assess_investment_readiness(profile: Dict[str, Any]) -> str:
+    """투자 준비도 평가"""
+    investment_profile = profile.get("investment_profile", {})
+    knowledge_score = investment_profile.get("investment_knowledge", {}).get("score", 0)
+    
+    if knowledge_score >= 4:
+        return "advanced"
+    elif knowledge_score >= 2:
+        return "intermediate"
+    else:
+        return "beginner"
+
+
+def assess_goal_urgency(profile: Dict[str, Any]) -> str:
+    """목표 긴급도 평가"""
+    investment_profile = profile.get("investment_profile", {})
+    period = investment_profile.get("investment_period", {}).get("selected", "")
+    
+    if "1년" in period:
+        return "urgent"
+    elif "3년" in period:
+        return "medium"
+    else:
+        return "long_term"
@@ -0,0 +1,240 @@
+# finpick-back/app/services/prompt_compiler.py
+import asyncio
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from ..config import settings
+
+# 캐시가 만료/삭제되어 없다는 오류 (google.api_core NotFound 또는 메시지) - 이때만 캐시를 폐기하고 전체 프롬프트로 재시도
+_MISSING_CACHE_ERRORS = ("NotFound",)
+_MISSING_CACHE_MESSAGE = re.compile(r"cache[ds]?[ _]?contents?\S*.*(not found|expired|does not exist)", re.I | re.S)
+
+
+def is_missing_cache_error(error: Exception) -> bool:
+    """만료/삭제된 컨텍스트 캐시로 호출했을 때의 오류인지 (429/503 등 일시 오류는 False)"""
+    return type(error).__name__ in _MISSING_CACHE_ERRORS or bool(_MISSING_CACHE_MESSAGE.search(str(error)))
+
+
+class PromptPrefix:
+    """카탈로그 버전별로 한 번 렌더링한 프롬프트 고정 부분 (+ 등록된 컨텍스트 캐시 핸들)"""
+
+    __slots__ = ("key", "text", "catalog_version", "render_ms", "cache_handle", "cache_state", "cache_expires_at")
+
+    def __init__(self, key: Hashable, text: str, catalog_version: Optional[str], render_ms: float):
+        self.key = key
+        self.text = text
+        self.catalog_version = catalog_version
+        self.render_ms = render_ms
+        self.cache_handle: Any = None
+        # None(미등록) | "creating" | "ready" | "failed"
+        self.cache_state: Optional[str] = None
+        self.cache_expires_at = float("inf")
+
+
+class ContextCacheBackend:
+    """접두부를 모델 쪽 캐시에 등록하고, 캐시에 묶인 모델(접미부만 전송)을 돌려주는 백엔드"""
+
+    name = "none"
+    # 등록한 캐시의 서버 쪽 만료 시간 (None이면 만료 없음)
+    ttl_seconds: Optional[int] = None
+
+    async def create(self, text: str) -> Any:
+        raise NotImplementedError
+
+    def model_for(self, handle: Any, base_model: Any) -> Any:
+        raise NotImplementedError
+
+    async def delete(self, handle: Any):
+        pass
+
+
+class GeminiContextCache(ContextCacheBackend):
+    """google.generativeai CachedContent (SDK 호출은 블로킹이라 스레드에서 실행)"""
+
+    name = "gemini"
+
+    def __init__(self, model_name: str, ttl_seconds: int):
+        self.model_name = model_name
+        self.ttl_seconds = ttl_seconds
+
+    async def create(self, text: str) -> Any:
+        import datetime
+        from google.generativeai import caching
+        return await asyncio.to_thread(
+            caching.CachedContent.create,
+            model=self.model_name,
+            display_name="finpick-product-catalog",
+            contents=[text],
+            ttl=datetime.timedelta(seconds=self.ttl_seconds)
+        )
+
+    def model_for(self, handle: Any, base_model: Any) -> Any:
+        import google.generativeai as genai
+        return genai.GenerativeModel.from_cached_content(cached_content=handle)
+
+    async def delete(self, handle: Any):
+        await asyncio.to_thread(handle.delete)
+
+
+class _PrefixedModel:
+    """스텁 캐시 모델 - 서버 대신 접두부를 붙여 기본 모델 호출 (실제 전송분 길이는 backend에 기록)"""
+
+    def __init__(self, backend: "StubContextCache", base_model: Any, prefix: str):
+        self.backend = backend
+        self.base_model = base_model
+        self.prefix = prefix
+
+    async def generate_content_async(self, prompt: str, **kwargs):
+        self.backend.sent_chars.append(len(prompt))
+        return await self.base_model.generate_content_async(self.prefix + prompt, **kwargs)
+
+
+class StubContextCache(ContextCacheBackend):
+    """테스트/로컬용 메모리 컨텍스트 캐시"""
+
+    name = "stub"
+
+    def __init__(self):
+        self.contents: Dict[str, str] = {}
+        self.deleted = 0
+        self.sent_chars: List[int] = []
+
+    async def create(self, text: str) -> Any:
+        handle = f"cachedContents/stub-{len(self.contents) + self.deleted}"
+        self.contents[handle] = text
+        return handle
+
+    def model_for(self, handle: Any, base_model: Any) -> Any:
+        return _PrefixedModel(self, base_model, self.contents[handle])
+
+    async def delete(self, handle: Any):
+        if self.contents.pop(handle, None) is not None:
+            self.deleted += 1
+
+
+class PromptCompiler:
+    """프롬프트 고정 부분(도메인/카탈로그 상품 목록)을 카탈로그 버전마다 한 번만 렌더링
+
+    카탈로그 버전이 바뀌면 이전 버전 접두부와 컨텍스트 캐시를 버린다.
+    버전을 알 수 없는 상품 목록(샘플/테스트 데이터)은 매번 렌더링한다.
+    """
+
+    def __init__(self, backend: Optional[ContextCacheBackend] = None):
+        self.backend = backend
+        self.version: Optional[str] = None
+        self._prefixes: Dict[Hashable, PromptPrefix] = {}
+        self._lock = threading.Lock()
+        self._stale_handles: List[Any] = []
+        self._stats = {"hits": 0, "misses": 0, "uncached": 0, "cache_created": 0, "cache_failed": 0}
+
+    def prefix(self, key: Hashable, catalog_version: Optional[str], render: Callable[[], str]) -> PromptPrefix:
+        if catalog_version is None:
+            with self._lock:
+                self._stats["uncached"] += 1
+            return self._render(key, None, render)
+
+        with self._lock:
+            if catalog_version != self.version:
+                self._stale_handles.extend(
+                    prefix.cache_handle for prefix in self._prefixes.values() if prefix.cache_handle is not None
+                )
+                self._prefixes = {}
+                self.version = catalog_version
+            prefix = self._prefixes.get(key)
+            if prefix is not None:
+                self._stats["hits"] += 1
+                return prefix
+
+        prefix = self._render(key, catalog_version, render)
+        with self._lock:
+            self._stats["misses"] += 1
+            if catalog_version == self.version:
+                # 동시에 렌더링한 경우 먼저 저장된 것을 사용 (컨텍스트 캐시 중복 등록 방지)
+                prefix = self._prefixes.setdefault(key, prefix)
+        return prefix
+
+    @staticmethod
+    def _render(key: Hashable, catalog_version: Optional[str], render: Callable[[], str]) -> PromptPrefix:
+        started = time.perf_counter()
+        text = render()
+        return PromptPrefix(key, text, catalog_version, (time.perf_counter() - started) * 1000)
+
+    async def cached_model(self, prefix: PromptPrefix, base_model: Any) -> Optional[Any]:
+        """접두부가 컨텍스트 캐시에 등록되어 있으면 캐시에 묶인 모델 (처음 요청 시 등록, 실패하면 None)"""
+        if self.backend is None or prefix.catalog_version is None:
+            return None
+        if not getattr(base_model, "supports_context_cache", True):
+            # REST/기록/재생 모델은 전체 프롬프트 사용
+            return None
+        await self._delete_stale()
+        if prefix.cache_state == "ready" and time.monotonic() >= prefix.cache_expires_at:
+            # 서버 쪽 TTL 만료 직전이면 다시 등록
+            self.invalidate(prefix)
+        if prefix.cache_state == "ready":
+            return self.backend.model_for(prefix.cache_handle, base_model)
+        if prefix.cache_state is not None:
+            # 등록 중이거나 실패(최소 토큰 수 미달 등) → 전체 프롬프트 전송
+            return None
+
+        prefix.cache_state = "creating"
+        try:
+            prefix.cache_handle = await self.backend.create(prefix.text)
+        except Exception as e:
+            prefix.cache_state = "failed"
+            self._stats["cache_failed"] += 1
+            print(f"⚠️ 컨텍스트 캐시 등록 실패, 전체 프롬프트 전송: {e}")
+            return None
+        prefix.cache_state = "ready"
+        if self.backend.ttl_seconds:
+            prefix.cache_expires_at = time.monotonic() + self.backend.ttl_seconds * 0.9
+        self._stats["cache_created"] += 1
+        return self.backend.model_for(prefix.cache_handle, base_model)
+
+    def invalidate(self, prefix: PromptPrefix):
+        """캐시 핸들 폐기 (만료/삭제된 캐시로 호출 실패 시) - 다음 요청에서 다시 등록"""
+        if prefix.cache_handle is not None:
+            with self._lock:
+                self._stale_handles.append(prefix.cache_handle)
+        prefix.cache_handle = None
+        prefix.cache_state = None
+        prefix.cache_expires_at = float("inf")
+
+    async def _delete_stale(self):
+        with self._lock:
+            handles, self._stale_handles = self._stale_handles, []
+        for handle in handles:
+            try:
+                await self.backend.delete(handle)
+            except Exception as e:
+                print(f"⚠️ 이전 카탈로그 컨텍스트 캐시 삭제 실패: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            prefixes = list(self._prefixes.values())
+        return {
+            "version": self.version,
+            "prefixes": len(prefixes),
+            **self._stats,
+            "context_cache": {
+                "backend": self.backend.name if self.backend else "none",
+                "active": sum(1 for prefix in prefixes if prefix.cache_state == "ready"),
+            },
+        }
+
+
+_prompt_compiler: Optional[PromptCompiler] = None
+_prompt_compiler_lock = threading.Lock()
+
+
+def get_prompt_compiler() -> PromptCompiler:
+    """프로세스 공용 프롬프트 컴파일러 - SDK 경로에서만 Gemini 컨텍스트 캐시 사용"""
+    global _prompt_compiler
+    with _prompt_compiler_lock:
+        if _prompt_compiler is None:
+            backend = None
+            if settings.prompt_context_cache and not settings.gemini_api_endpoint:
+                backend = GeminiContextCache(settings.prompt_context_cache_model, settings.prompt_context_cache_ttl)
+            _prompt_compiler = PromptCompiler(backend)
+        return _prompt_compiler
@@ -0,0 +1,204 @@
+# finpick-back/app/services/rate_index.py
+import bisect
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+RATE_METRICS = ("max_rate", "base_rate")
+
+_PERIOD_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(년|개월|달)")
+_RANGE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*[-~]\s*\d+(?:\.\d+)?\s*(년|개월|달)")
+
+
+class RateEntry(NamedTuple):
+    """(상품 타입, 기간) 금리표의 한 행"""
+    doc: int
+    base_rate: float
+    max_rate: float
+    minimum_amount: float
+    rate_type: str
+
+
+def normalize_rate_product_type(product_type: str) -> Optional[str]:
+    """금리표를 가진 상품 타입으로 정규화 (예금/적금)"""
+    if not product_type:
+        return None
+    if "적금" in product_type:
+        return "적금"
+    if "예금" in product_type:
+        return "예금"
+    return None
+
+
+def parse_period_months(text: Any) -> Optional[int]:
+    """'12개월', '2-3년', '1년 이하' 같은 표현을 개월 수로 변환 (첫 번째 값 기준)"""
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return int(text) if text > 0 else None
+    if isinstance(text, dict):
+        text = text.get("selected") or text.get("value") or ""
+
+    text = str(text)
+
+    # '2-3년'처럼 단위가 뒤에만 붙은 범위는 앞 값 기준
+    range_match = _RANGE_PATTERN.search(text)
+    if range_match:
+        value = float(range_match.group(1))
+        return int(round(value * 12)) if range_match.group(2) == "년" else int(round(value))
+
+    match = _PERIOD_PATTERN.search(text)
+    if match:
+        value = float(match.group(1))
+        return int(round(value * 12)) if match.group(2) == "년" else int(round(value))
+    return None
+
+
+def preferred_period_months(user_profile: Any) -> Optional[int]:
+    """사용자 프로필에서 선호 가입 기간(개월) 추출 - dict/pydantic 모두 지원"""
+    if not user_profile:
+        return None
+    if hasattr(user_profile, "model_dump"):
+        user_profile = user_profile.model_dump()
+    if not isinstance(user_profile, dict):
+        return None
+
+    candidates = [
+        (user_profile.get("investment_profile") or {}).get("investment_period"),
+        (user_profile.get("investment_personality") or {}).get("preferred_period"),
+        (user_profile.get("goal_setting") or {}).get("timeframe"),
+        (user_profile.get("investment_goals") or {}).get("timeframe") if isinstance(user_profile.get("investment_goals"), dict) else None,
+    ]
+    for candidate in candidates:
+        months = parse_period_months(candidate)
+        if months:
+            return months
+    return None
+
+
+def _best_rows_by_period(product: Dict) -> Dict[int, Dict]:
+    """기간별로 최고금리가 가장 높은 금리 행만 남김 (적립방식/이자방식 중복 제거)"""
+    best: Dict[int, Dict] = {}
+    for row in product.get("rates", []) or []:
+        period = row.get("period_months")
+        if not period or (row.get("max_rate") is None and row.get("base_rate") is None):
+            continue
+        current = best.get(period)
+        if current is None or (row.get("max_rate") or 0) > (current.get("max_rate") or 0):
+            best[period] = row
+    return best
+
+
+def _resolve_period(periods: Sequence[int], period_months: int) -> Optional[int]:
+    """정확히 일치하는 기간이 없으면 요청 이하 중 가장 긴 기간, 없으면 가장 짧은 기간"""
+    if not periods:
+        return None
+    position = bisect.bisect_right(periods, period_months)
+    if position and periods[position - 1] == period_months:
+        return period_months
+    return periods[position - 1] if position else periods[0]
+
+
+def product_rate_for_period(product: Dict, period_months: Optional[int], metric: str = "max_rate") -> Optional[float]:
+    """단일 상품의 기간별 금리 (기간이 없으면 None)"""
+    if not period_months:
+        return None
+    rows = _best_rows_by_period(product)
+    period = _resolve_period(sorted(rows), period_months)
+    if period is None:
+        return None
+    row = rows[period]
+    value = row.get(metric)
+    if value is None:
+        value = row.get("max_rate") if metric == "base_rate" else row.get("base_rate")
+    return float(value) if value is not None else None
+
+
+class _RateTable:
+    """한 (타입, 기간, 지표)의 최소가입금액 임계값별 금리 내림차순 배열"""
+
+    def __init__(self, entries: List[RateEntry], metric: str):
+        thresholds = sorted({entry.minimum_amount for entry in entries})
+        self.thresholds = thresholds
+        self.sorted_by_threshold: List[List[RateEntry]] = []
+
+        by_amount = sorted(entries, key=lambda entry: entry.minimum_amount)
+        cursor = 0
+        eligible: List[RateEntry] = []
+        for threshold in thresholds:
+            while cursor < len(by_amount) and by_amount[cursor].minimum_amount <= threshold:
+                eligible.append(by_amount[cursor])
+                cursor += 1
+            self.sorted_by_threshold.append(
+                sorted(eligible, key=lambda entry: (-getattr(entry, metric), entry.doc))
+            )
+
+    def top(self, limit: int, max_min_amount: Optional[float] = None) -> List[RateEntry]:
+        """O(log n) 임계값 탐색 + O(k) 슬라이스"""
+        if not self.thresholds:
+            return []
+        if max_min_amount is None:
+            position = len(self.thresholds)
+        else:
+            position = bisect.bisect_right(self.thresholds, max_min_amount)
+        if position == 0:
+            return []
+        return self.sorted_by_threshold[position - 1][:limit]
+
+
+class RateIndex:
+    """(상품 타입, 가입기간)별 금리 색인 - 기간 지정 최고금리 상품 조회"""
+
+    def __init__(self, tables: Dict[Tuple[str, int, str], _RateTable], periods: Dict[str, List[int]]):
+        self._tables = tables
+        self._periods = periods
+
+    @classmethod
+    def build(cls, products: Iterable) -> "RateIndex":
+        grouped: Dict[Tuple[str, int], List[RateEntry]] = defaultdict(list)
+
+        for doc, product in enumerate(products):
+            product_type = normalize_rate_product_type(product.get("type", ""))
+            if not product_type:
+                continue
+            minimum_amount = float((product.get("details", {}) or {}).get("minimum_amount") or 0)
+            for period, row in _best_rows_by_period(product).items():
+                base_rate = row.get("base_rate")
+                max_rate = row.get("max_rate")
+                base_rate = float(base_rate if base_rate is not None else max_rate)
+                max_rate = float(max_rate if max_rate is not None else base_rate)
+                grouped[(product_type, int(period))].append(
+                    RateEntry(doc, base_rate, max_rate, minimum_amount, row.get("rate_type") or "")
+                )
+
+        tables = {}
+        periods: Dict[str, set] = defaultdict(set)
+        for (product_type, period), entries in grouped.items():
+            periods[product_type].add(period)
+            for metric in RATE_METRICS:
+                tables[(product_type, period, metric)] = _RateTable(entries, metric)
+
+        return cls(tables, {product_type: sorted(values) for product_type, values in periods.items()})
+
+    def periods(self, product_type: str) -> List[int]:
+        return self._periods.get(normalize_rate_product_type(product_type) or "", [])
+
+    def resolve_period(self, product_type: str, period_months: int) -> Optional[int]:
+        return _resolve_period(self.periods(product_type), period_months)
+
+    def top_products(
+        self,
+        product_type: str,
+        period_months: int,
+        metric: str = "max_rate",
+        limit: int = 10,
+        max_min_amount: Optional[float] = None
+    ) -> Tuple[Optional[int], List[RateEntry]]:
+        """기간별 금리 상위 상품 (실제 적용된 기간, 결과) 반환"""
+        if metric not in RATE_METRICS:
+            raise ValueError(f"지원하지 않는 금리 기준: {metric}")
+        normalized_type = normalize_rate_product_type(product_type)
+        period = self.resolve_period(product_type, period_months)
+        if not normalized_type or period is None:
+            return None, []
+        return period, self._tables[(normalized_type, period, metric)].top(limit, max_min_amount)
@@ -6,14 +6,57 @@ import os
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
-from ..models.recommendation import RecommendationRequest, ProductRecommendation, ProductType
+from ..models.recommendation import RecommendationRequest, RecommendationResult
 from .gemini_service import GeminiService
+from .product_catalog import get_product_catalog
+from .profile_analytics import user_specific_info
+from .rate_index import preferred_period_months, product_rate_for_period
+from .search_index import ProductSearchIndex
+from .selection_engine import SelectionConstraints, select_diverse_top_k, provider_name
+from .yield_engine import (
+    DEFAULT_LUMP_SUM, DEFAULT_MONTHLY_INSTALLMENT, INSTALLMENT_TYPE, INTEREST_TAX_RATE, LUMP_SUM_TYPE, YieldEngine
+)
 
 logger = logging.getLogger(__name__)
 
+
+def _number(value: Any, cast=float, default=0):
+    try:
+        return cast(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+def build_recommended_product(
+    product: Dict,
+    ai_analysis: Dict[str, Any],
+    user_profile: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """원본 카탈로그 상품 → RecommendedProduct 필드 그대로인 dict (서비스 AI/폴백, API 폴백 공통)
+    
+    카탈로그 데이터라 필드 타입을 여기서 맞추고 검증 없이 한 번에 생성
+    """
+    return {
+        "product_id": product.get('id'),
+        "name": product.get('name', '상품명 없음'),
+        "bank_name": (product.get('provider') or {}).get('name', '은행명 없음'),
+        "type": product.get('type', ''),
+        "interest_rate": _number((product.get('details') or {}).get('interest_rate'), float, 0.0),
+        "conditions": product.get('conditions') or {},
+        "features": list(product.get('benefits') or []),
+        "ai_analysis": ai_analysis,
+        "user_specific": user_specific_info(product, user_profile)
+    }
+
+
 class RecommendationService:
     def __init__(self):
         """추천 서비스 초기화 - 금융모델 중심으로 개편"""
+        self.catalog_version = "sample"
+        self.search_index: Optional[ProductSearchIndex] = None
+        self.yield_engine: Optional[YieldEngine] = None
+        self._products_by_id: Dict[str, Dict] = {}
+        self._products_by_id_source: Optional[List[Dict]] = None
         self.financial_products = self._load_financial_products()
         
         # 🔥 새로운 Gemini 서비스 통합
@@ -29,52 +72,31 @@ class RecommendationService:
         print(f"✅ RecommendationService 초기화 완료 - {len(self.financial_products)}개 상품 로드됨")
         print("🎯 금융모델 기반 추천 시스템 활성화")
 
-    def _load_financial_products(self) -> List[Dict]:
-        """금융상품 데이터 로드 (금감원 API 데이터)"""
+    def _load_financial_products(self, reload: bool = False) -> List[Dict]:
+        """금융상품 데이터 로드 (금감원 API 데이터) - 프로세스 공용 카탈로그 사용"""
         try:
-            # financial_products.json 파일 경로 찾기
-            current_dir = os.path.dirname(__file__)
-            possible_paths = [
-                os.path.join(current_dir, "../../financial_products.json"),
-                os.path.join(current_dir, "../financial_products.json"),
-                os.path.join(current_dir, "financial_products.json"),
-                "financial_products.json"
-            ]
-            
-            file_path = None
-            for path in possible_paths:
-                if os.path.exists(path):
-                    file_path = path
-                    break
+            catalog = get_product_catalog(reload=reload)
             
-            if not file_path:
-                print("❌ financial_products.json 파일을 찾을 수 없습니다.")
-                print("📁 검색한 경로들:")
-                for path in possible_paths:
-                    print(f"   - {os.path.abspath(path)}")
-                return self._get_sample_products()
+            if not catalog.products:
+                return self._use_sample_products()
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
-
-            if isinstance(raw_data, dict):
-                all_products = []
-                for category, products in raw_data.items():
-                    if isinstance(products, list):
-                        all_products.extend(products)
-                print(f"✅ 금융상품 {len(all_products)}개 로드 완료")
-                return all_products
-            elif isinstance(raw_data, list):
-                print(f"✅ 금융상품 {len(raw_data)}개 로드 완료")
-                return raw_data
-            else:
-                print(f"❌ 예상과 다른 데이터 형식: {type(raw_data)}")
-                return self._get_sample_products()
+            self.catalog_version = catalog.version
+            self.search_index = catalog.search_index
+            self.yield_engine = catalog.yield_engine
+            return catalog.products
                 
         except Exception as e:
             print(f"❌ 금융상품 데이터 로드 실패: {e}")
             print("🔄 샘플 데이터로 대체합니다...")
-            return self._get_sample_products()
+            return self._use_sample_products()
+
+    def _use_sample_products(self) -> List[Dict]:
+        """샘플 데이터로 대체하고 검색 색인도 샘플 기준으로 구축"""
+        products = self._get_sample_products()
+        self.catalog_version = "sample"
+        self.search_index = ProductSearchIndex.build(products)
+        self.yield_engine = YieldEngine.build(products)
+        return products
 
     def _get_sample_products(self) -> List[Dict]:
         """샘플 금융상품 데이터 (테스트용)"""
@@ -138,7 +160,7 @@ class RecommendationService:
             }
         ]
 
-    async def get_ai_recommendations(self, request: RecommendationRequest) -> Dict[str, Any]:
+    async def get_ai_recommendations(self, request: RecommendationRequest) -> Optional[Dict[str, Any]]:
         """AI 기반 추천 - 새로운 금융모델 중심 로직"""
         
         try:
@@ -159,72 +181,50 @@ class RecommendationService:
             if ai_result.get("success"):
                 print("✅ 금융모델 기반 AI 추천 성공")
                 
-                # AI 결과를 ProductRecommendation 객체들로 변환
                 recommendations = []
-                
                 for product_data in ai_result.get("recommended_products", []):
-                    original_product = product_data.get("original_product")
+                    original_product = product_data.get("original_product") or self._product_by_id(product_data.get("product_id"))
+                    if not original_product:
+                        continue
                     
-                    if original_product:
-                        # ProductType 정규화
-                        product_type = ProductType.normalize(original_product.get('type', ''))
-                        
-                        rec_result = ProductRecommendation(
-                            product_id=original_product.get('id', ''),
-                            name=original_product.get('name', ''),
-                            type=product_type,
-                            provider=original_product.get('provider', {}).get('name', ''),
-                            interest_rate=original_product.get('details', {}).get('interest_rate', 0.0),
-                            minimum_amount=original_product.get('details', {}).get('minimum_amount', 0),
-                            maximum_amount=original_product.get('details', {}).get('maximum_amount', 0),
-                            
-                            # AI 분석 결과
-                            match_score=float(product_data.get("model_fit_score", 0)),
-                            recommendation_reason=product_data.get("contribution", "AI 추천"),
-                            pros=product_data.get("match_reasons", ["AI 분석 완료"]),
-                            cons=["상세 조건 확인 필요"],
-                            
-                            join_conditions={
-                                "join_way": original_product.get('conditions', {}).get('join_way', []),
-                                "join_member": original_product.get('conditions', {}).get('join_member', ''),
-                                "special_conditions": original_product.get('conditions', {}).get('special_conditions', '')
-                            },
-                            special_benefits=original_product.get('benefits', []),
-                            
-                            # 🆕 AI 분석 정보 확장
-                            ai_analysis={
-                                "financial_model_based": True,
-                                "model_fit_score": product_data.get("model_fit_score", 0),
-                                "role_in_model": product_data.get("role_in_model", ""),
-                                "match_reasons": product_data.get("match_reasons", []),
-                                "contribution": product_data.get("contribution", ""),
-                                "synergy_effect": product_data.get("synergy_effect", ""),
-                                "implementation_priority": product_data.get("implementation_priority", 1)
-                            }
-                        )
-                        recommendations.append(rec_result)
+                    ai_analysis = product_data.get("ai_analysis", {})
+                    match_reasons = product_data.get("match_reasons") or ai_analysis.get("match_reasons") or ["AI 분석 완료"]
+                    model_fit_score = product_data.get("model_fit_score", ai_analysis.get("suitability_score", 0) * 100)
+                    recommendations.append(build_recommended_product(
+                        original_product,
+                        # 🆕 AI 분석 정보 확장
+                        ai_analysis={
+                            "suitability_score": float(model_fit_score) / 100,
+                            "match_reasons": match_reasons,
+                            "risk_assessment": ai_analysis.get("risk_assessment", "보통"),
+                            "expected_benefit": product_data.get("contribution") or ai_analysis.get("expected_benefit") or "AI 추천",
+                            "financial_model_based": True,
+                            "model_fit_score": model_fit_score,
+                            "role_in_model": product_data.get("role_in_model", ""),
+                            "synergy_effect": product_data.get("synergy_effect", ""),
+                            "implementation_priority": product_data.get("implementation_priority", 1)
+                        }
+                    ))
                 
-                # 🎯 확장된 AI 인사이트 구성
-                enhanced_ai_insights = {
-                    "method": "Gemini AI 금융모델 분석",
-                    "confidence": ai_result.get("ai_insights", {}).get("confidence_score", 0.8),
-                    "user_analysis": ai_result.get("user_analysis", {}),
-                    "financial_model": ai_result.get("financial_model", {}),
-                    "portfolio_analysis": ai_result.get("portfolio_analysis", {}),
-                    "classified_domain": ai_result.get("classified_domain", ""),
-                    "next_steps": ai_result.get("next_steps", []),
-                    "products_analyzed": len(self.financial_products),
-                    "note": f"AI가 {ai_result.get('classified_domain', '')} 도메인에서 맞춤 금융모델을 설계하고 최적 상품 {len(recommendations)}개를 추천했습니다."
-                }
+                classified_domain = ai_result.get("classified_domain") or ai_result.get("domain", "")
                 
-                return type('AIRecommendationResult', (), {
-                    'success': True,
-                    'recommendations': recommendations,
-                    'ai_insights': enhanced_ai_insights,
-                    'filters_applied': ["AI 금융모델 기반", f"도메인: {ai_result.get('classified_domain', '')}"],
-                    'created_at': datetime.now(),
-                    'recommendation_type': 'financial_model_based'
-                })()
+                return RecommendationResult.payload(
+                    recommendation_type="financial_model_based",
+                    data=recommendations,
+                    recommendation_reasoning=f"AI가 {classified_domain} 도메인에서 맞춤 금융모델을 설계하고 최적 상품 {len(recommendations)}개를 추천했습니다.",
+                    # 🎯 확장된 AI 인사이트 구성
+                    ai_metadata={
+                        "method": "Gemini AI 금융모델 분석",
+                        "domain": classified_domain,
+                        "confidence": ai_result.get("ai_insights", {}).get("confidence_score", 0.8),
+                        "user_analysis": ai_result.get("user_analysis", {}),
+                        "financial_model": ai_result.get("financial_model", {}),
+                        "portfolio_analysis": ai_result.get("portfolio_analysis", {}),
+                        "next_steps": ai_result.get("next_steps", []),
+                        "total_products_analyzed": len(self.financial_products),
+                        "filters_applied": ["AI 금융모델 기반", f"도메인: {classified_domain}"]
+                    }
+                )
                 
             else:
                 print("⚠️ AI 추천 실패, 폴백 모드 활성화")
@@ -235,6 +235,13 @@ class RecommendationService:
             logger.error(f"AI 추천 오류: {e}")
             return None
 
+    def _product_by_id(self, product_id: Optional[str]) -> Optional[Dict]:
+        """상품 ID → 원본 상품 (상품 목록이 바뀌면 다시 구축)"""
+        if self._products_by_id_source is not self.financial_products:
+            self._products_by_id = {product.get('id'): product for product in self.financial_products}
+            self._products_by_id_source = self.financial_products
+        return self._products_by_id.get(product_id)
+
     async def _fallback_recommendations(self, request: RecommendationRequest) -> Dict[str, Any]:
         """폴백 추천 시스템 - 기존 로직 기반"""
         
@@ -247,106 +254,67 @@ class RecommendationService:
             # 단순 점수 기반 추천
             scored_products = self._calculate_basic_scores(filtered_products, request)
             
-            # 상위 N개 선택
-            top_products = sorted(scored_products, key=lambda x: x['score'], reverse=True)[:request.limit]
+            # 상위 N개 선택 (같은 은행은 최대 2개까지)
+            top_products = [
+                choice.item for choice in select_diverse_top_k(
+                    scored_products,
+                    request.limit,
+                    score_fn=lambda x: x['score'],
+                    group_fn=lambda x: provider_name(x['product']),
+                    constraints=SelectionConstraints(max_per_group=2)
+                )
+            ]
             
-            # ProductRecommendation 객체로 변환
-            recommendations = []
-            for i, product_data in enumerate(top_products):
-                product = product_data['product']
-                score = product_data['score']
-                
-                # ProductType 정규화
-                product_type = ProductType.normalize(product.get('type', ''))
-                
-                rec_result = ProductRecommendation(
-                    product_id=product.get('id', ''),
-                    name=product.get('name', ''),
-                    type=product_type,
-                    provider=product.get('provider', {}).get('name', ''),
-                    interest_rate=product.get('details', {}).get('interest_rate', 0.0),
-                    minimum_amount=product.get('details', {}).get('minimum_amount', 0),
-                    maximum_amount=product.get('details', {}).get('maximum_amount', 0),
-                    
-                    match_score=score,
-                    recommendation_reason="기본 점수 기반 추천",
-                    pros=["안정성 확보", "조건 적합"],
-                    cons=["상세 검토 필요"],
-                    
-                    join_conditions={
-                        "join_way": product.get('conditions', {}).get('join_way', []),
-                        "join_member": product.get('conditions', {}).get('join_member', ''),
-                        "special_conditions": product.get('conditions', {}).get('special_conditions', '')
-                    },
-                    special_benefits=product.get('benefits', []),
-                    
+            recommendations = [
+                build_recommended_product(
+                    product_data['product'],
                     ai_analysis={
+                        "suitability_score": product_data['score'] / 100,
+                        "match_reasons": ["안정성 확보", "조건 적합"],
+                        "risk_assessment": "보통",
+                        "expected_benefit": "기본 점수 기반 추천",
                         "fallback_mode": True,
-                        "basic_score": score,
-                        "ranking": i + 1,
-                        "note": "기본 점수 기반 추천"
+                        "basic_score": product_data['score'],
+                        "ranking": i + 1
                     }
                 )
-                recommendations.append(rec_result)
+                for i, product_data in enumerate(top_products)
+            ]
             
-            # 폴백 응답 구성
-            return {
-                "success": True,
-                "recommendation_type": "fallback",
-                "recommendations": [
-                    {
-                        "product_id": rec.product_id,
-                        "product_name": rec.name,
-                        "product_type": rec.type.value,  # Enum을 문자열로
-                        "provider_name": rec.provider,
-                        "interest_rate": rec.interest_rate,
-                        "minimum_amount": rec.minimum_amount,
-                        "maximum_amount": rec.maximum_amount,
-                        "match_score": rec.match_score,
-                        "recommendation_reason": rec.recommendation_reason,
-                        "pros": rec.pros,
-                        "cons": rec.cons,
-                        "join_conditions": rec.join_conditions,
-                        "special_benefits": rec.special_benefits,
-                        "ai_analysis": rec.ai_analysis
-                    }
-                    for rec in recommendations
-                ],
-                "ai_insights": {
+            return RecommendationResult.payload(
+                recommendation_type="fallback",
+                data=recommendations,
+                recommendation_reasoning=f"기본 추천 시스템으로 {len(recommendations)}개 상품을 추천했습니다.",
+                ai_metadata={
                     "method": "기본 규칙 기반 추천",
                     "confidence": 0.6,
-                    "products_analyzed": len(filtered_products),
-                    "note": f"기본 추천 시스템으로 {len(recommendations)}개 상품을 추천했습니다."
-                },
-                "metadata": {
-                    "filters_applied": ["기본 필터링"],
-                    "timestamp": datetime.now().isoformat(),
-                    "api_version": "3.0-fallback"
+                    "total_products_analyzed": len(filtered_products),
+                    "filters_applied": ["기본 필터링"]
                 }
-            }
+            )
             
         except Exception as e:
             print(f"❌ 폴백 추천도 실패: {e}")
             logger.error(f"폴백 추천 오류: {e}")
             
             # 최종 응급 처리
-            return {
-                "success": False,
-                "error": "추천 시스템에 일시적인 문제가 발생했습니다.",
-                "recommendations": [],
-                "ai_insights": {
+            return RecommendationResult.payload(
+                success=False,
+                recommendation_type="error",
+                error="추천 시스템에 일시적인 문제가 발생했습니다.",
+                recommendation_reasoning="시스템 오류로 인해 추천을 생성할 수 없습니다.",
+                ai_metadata={
                     "method": "응급 처리",
-                    "confidence": 0.0,
-                    "note": "시스템 오류로 인해 추천을 생성할 수 없습니다."
+                    "confidence": 0.0
                 }
-            }
+            )
 
-    def _apply_basic_filters(self, products: List[Dict], request: RecommendationRequest) -> List[Dict]:
-        """기본 필터링 로직"""
+    def _apply_basic_filters(self, products: List[Dict], request: RecommendationRequest) -> List[Tuple[int, Dict]]:
+        """기본 필터링 로직 - (카탈로그 행 번호, 상품) 목록 (색인 점수는 행 번호로 찾음)"""
         
         filtered = []
         
-        for product in products:
+        for row, product in enumerate(products):
             # 기본 유효성 검사
             if not product.get('name') or not product.get('type'):
                 continue
@@ -371,21 +339,34 @@ class RecommendationService:
                 if min_amount > filters['max_minimum_amount']:
                     continue
             
-            filtered.append(product)
+            filtered.append((row, product))
         
         print(f"📊 기본 필터링: {len(products)} → {len(filtered)}개 상품")
         return filtered
 
-    def _calculate_basic_scores(self, products: List[Dict], request: RecommendationRequest) -> List[Dict]:
+    def _calculate_basic_scores(self, products: List[Tuple[int, Dict]], request: RecommendationRequest) -> List[Dict]:
         """기본 점수 계산 로직"""
         
         scored_products = []
         
-        for product in products:
+        # 🔎 역색인 BM25 점수 (조사가 붙은 한국어 질의도 n-gram으로 매칭)
+        keyword_scores = self._keyword_scores(request.natural_query)
+        
+        # 📅 사용자 선호 기간 기준 금리 사용
+        period_months = preferred_period_months(request.user_profile)
+        
+        # 💰 선호 기간이 있으면 예금/적금은 세후 만기 이자 기준으로 비교 (단리/복리 차이 반영)
+        after_tax_rates = self._after_tax_effective_rates(period_months)
+        
+        for row, product in products:
             score = 50.0  # 기본 점수
             
             # 금리 점수 (높을수록 좋음)
-            interest_rate = product.get('details', {}).get('interest_rate', 0)
+            interest_rate = (
+                after_tax_rates.get(row)
+                or product_rate_for_period(product, period_months)
+                or product.get('details', {}).get('interest_rate', 0)
+            )
             if interest_rate > 0:
                 score += min(interest_rate * 10, 30)  # 최대 30점
             
@@ -395,13 +376,10 @@ class RecommendationService:
             if any(bank in bank_name for bank in major_banks):
                 score += 10
             
-            # 상품명 키워드 점수
-            product_name = product.get('name', '').lower()
-            query_keywords = request.natural_query.lower().split() if request.natural_query else []
-            
-            for keyword in query_keywords:
-                if keyword in product_name:
-                    score += 5
+            # 키워드 검색 점수 (최대 15점)
+            keyword_score = keyword_scores.get(row, 0.0)
+            if keyword_score > 0:
+                score += min(keyword_score * 2, 15)
             
             # 가입 조건 간소함 점수
             join_ways = product.get('conditions', {}).get('join_way', [])
@@ -415,6 +393,30 @@ class RecommendationService:
         
         return scored_products
 
+    def _keyword_scores(self, query: Optional[str]) -> Dict[int, float]:
+        """카탈로그 행 번호별 BM25 점수 (ID가 같은 상품끼리 점수를 덮어쓰지 않도록 행 번호로 찾음)
+
+        색인은 self.financial_products와 같은 순서로 구축된다.
+        """
+        if not query or not self.search_index:
+            return {}
+        return {
+            row: score
+            for row, score in self.search_index.score_documents(query).items()
+            if row < len(self.financial_products)
+        }
+
+    def _after_tax_effective_rates(self, period_months: Optional[int]) -> Dict[int, float]:
+        """카탈로그 행 번호별 세후 연환산 수익률을 세전 금리 척도로 환산 (대출 등 다른 상품과 같은 척도로 점수화)"""
+        if not period_months or not self.yield_engine:
+            return {}
+        
+        rates: Dict[int, float] = {}
+        for product_type, amount in ((LUMP_SUM_TYPE, DEFAULT_LUMP_SUM), (INSTALLMENT_TYPE, DEFAULT_MONTHLY_INSTALLMENT)):
+            for row, effective_rate in self.yield_engine.effective_rates(product_type, amount, period_months).items():
+                rates[row] = effective_rate / (1 - INTEREST_TAX_RATE)
+        return rates
+
     # 🧪 테스트/개발용 메서드들
     async def test_domain_classification(self, query: str) -> str:
         """도메인 분류 테스트"""
@@ -451,7 +453,7 @@ class RecommendationService:
         """상품 데이터 리프레시"""
         try:
             print("🔄 상품 데이터 리프레시 시작...")
-            self.financial_products = self._load_financial_products()
+            self.financial_products = self._load_financial_products(reload=True)
             print(f"✅ 상품 데이터 리프레시 완료: {len(self.financial_products)}개 상품")
             
         except Exception as e:
@@ -460,12 +462,12 @@ class RecommendationService:
 
     # 기존 코드와의 호환성을 위한 메서드들
     async def generate_recommendations(self, request: RecommendationRequest) -> Dict[str, Any]:
-        """추천 생성 (메인 엔트리 포인트)"""
+        """추천 생성 (메인 엔트리 포인트) - RecommendationResult 필드 그대로인 dict"""
         
         # AI 추천 시도
         ai_result = await self.get_ai_recommendations(request)
         
-        if ai_result and ai_result.success:
+        if ai_result and ai_result["success"]:
             return ai_result
         else:
             # 폴백 추천
@@ -0,0 +1,237 @@
+# finpick-back/app/services/replay_runner.py
+"""기록된 Gemini 트래픽으로 recommend_financial_model 오프라인 재생/비교
+
+  python -m app.services.replay_runner run gemini_traffic before.jsonl --workers 4
+  (코드 변경 후) python -m app.services.replay_runner run gemini_traffic after.jsonl --workers 4
+  python -m app.services.replay_runner diff before.jsonl after.jsonl
+
+재생 중에는 네트워크 호출이 없고, 기록에 없는 프롬프트(프롬프트 문구가 바뀐 단계)는 미스로 세어 폴백 경로로 처리된다.
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from .gemini_replay import ReplayModel, read_traffic
+
+DIFF_EXAMPLES = 10
+
+# 워커 프로세스별 재생 모델 (initializer에서 로그를 한 번 읽음)
+_worker_replay: Optional[ReplayModel] = None
+
+
+def query_key(record: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        [record.get("user_query"), record.get("user_profile"), record.get("limit")],
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_queries(log_path: str) -> List[Dict[str, Any]]:
+    """기록된 질의 (같은 입력은 한 번만, 기록 순서 유지)"""
+    queries: Dict[str, Dict[str, Any]] = {}
+    for record in read_traffic(log_path):
+        if record.get("kind") == "query":
+            queries.setdefault(query_key(record), record)
+    return [dict(record, query_key=key) for key, record in queries.items()]
+
+
+def summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """비교용 결과 요약 - 처리 시간 등 실행마다 바뀌는 값 제외"""
+    if not result.get("is_financial_related", True):
+        return {"success": result.get("success", False), "is_financial_related": False}
+    return {
+        "success": result.get("success", False),
+        "is_financial_related": True,
+        "fallback": result.get("fallback", False),
+        "domain": result.get("domain"),
+        "products": [
+            {
+                "product_id": product.get("product_id"),
+                "score": product.get("ai_analysis", {}).get("suitability_score"),
+                "match_reasons": product.get("ai_analysis", {}).get("match_reasons", []),
+            }
+            for product in result.get("recommended_products", [])
+        ],
+    }
+
+
+async def replay_queries(queries: List[Dict[str, Any]], replay: ReplayModel, products: List[Dict], concurrency: int = 64) -> List[Dict[str, Any]]:
+    """질의들을 동시에 재생 - 입력 순서대로 결과 반환"""
+    os.environ.setdefault("GEMINI_API_KEY", "replay")
+    from .gemini_service import GeminiService
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(query: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            service = GeminiService(use_semantic_cache=False)
+            session = replay.session()
+            service.model = session
+            result = await service.recommend_financial_model(
+                user_query=query["user_query"],
+                user_profile=query.get("user_profile"),
+                available_products=products,
+                limit=query.get("limit") or 5
+            )
+            return {
+                "query_key": query["query_key"],
+                "user_query": query["user_query"],
+                "replay": {"hits": session.hits, "misses": session.misses},
+                "result": summarize_result(result),
+            }
+
+    return await asyncio.gather(*(run_one(query) for query in queries))
+
+
+def _quiet_replay(queries: List[Dict[str, Any]], replay: ReplayModel, concurrency: int) -> List[Dict[str, Any]]:
+    from .product_catalog import get_product_catalog
+    products = get_product_catalog().products
+    # 추천 경로의 디버그 출력은 버림 (수천 건 재생 시 출력 I/O가 대부분의 시간을 차지)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return asyncio.run(replay_queries(queries, replay, products, concurrency))
+
+
+def _init_worker(log_path: str):
+    global _worker_replay
+    _worker_replay = ReplayModel.from_records(read_traffic(log_path))
+
+
+def _replay_chunk(args) -> List[Dict[str, Any]]:
+    queries, concurrency = args
+    return _quiet_replay(queries, _worker_replay, concurrency)
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def run_replay(
+    log_path: str,
+    output_path: str,
+    workers: int = 1,
+    chunk_size: int = 200,
+    concurrency: int = 64,
+    max_queries: Optional[int] = None
+) -> Dict[str, Any]:
+    """기록된 질의 전체를 재생해 요약 결과를 JSONL로 저장"""
+    started = time.perf_counter()
+    queries = load_queries(log_path)[:max_queries]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(log_path,)) as pool:
+            outputs = [
+                output
+                for chunk_outputs in pool.map(_replay_chunk, ((chunk, concurrency) for chunk in _chunks(queries, chunk_size)))
+                for output in chunk_outputs
+            ]
+    else:
+        outputs = _quiet_replay(queries, ReplayModel.from_records(read_traffic(log_path)), concurrency)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        for output in outputs:
+            f.write(json.dumps(output, ensure_ascii=False) + "\n")
+
+    seconds = time.perf_counter() - started
+    misses = sum(output["replay"]["misses"] for output in outputs)
+    return {
+        "queries": len(outputs),
+        "calls": sum(output["replay"]["hits"] + output["replay"]["misses"] for output in outputs),
+        "misses": misses,
+        "queries_with_misses": sum(1 for output in outputs if output["replay"]["misses"]),
+        "fallbacks": sum(1 for output in outputs if output["result"].get("fallback") or not output["result"].get("success")),
+        "seconds": round(seconds, 3),
+        "queries_per_second": round(len(outputs) / seconds, 1) if seconds else 0.0,
+    }
+
+
+def _read_outputs(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return {output["query_key"]: output for output in map(json.loads, filter(str.strip, f))}
+
+
+def _product_ids(output: Dict[str, Any]) -> List[str]:
+    return [product["product_id"] for product in output["result"].get("products", [])]
+
+
+def diff_outputs(before_path: str, after_path: str) -> Dict[str, Any]:
+    """두 재생 결과 비교 - 동일/변경 건수, 도메인 변경, 추천 상품 겹침(Jaccard), 순위만 바뀐 건수"""
+    before, after = _read_outputs(before_path), _read_outputs(after_path)
+    common = [key for key in before if key in after]
+    changed, domain_changed, reordered, overlaps = [], 0, 0, []
+
+    for key in common:
+        old, new = before[key], after[key]
+        if old["result"] == new["result"]:
+            overlaps.append(1.0)
+            continue
+        old_ids, new_ids = _product_ids(old), _product_ids(new)
+        union = set(old_ids) | set(new_ids)
+        overlaps.append(len(set(old_ids) & set(new_ids)) / len(union) if union else 1.0)
+        domain_changed += old["result"].get("domain") != new["result"].get("domain")
+        reordered += old_ids != new_ids and sorted(old_ids) == sorted(new_ids)
+        changed.append({"query_key": key, "user_query": new["user_query"], "before": old_ids, "after": new_ids})
+
+    return {
+        "compared": len(common),
+        "identical": len(common) - len(changed),
+        "changed": len(changed),
+        "domain_changed": domain_changed,
+        "reordered_only": reordered,
+        "mean_product_overlap": round(sum(overlaps) / len(overlaps), 4) if overlaps else 1.0,
+        "only_before": len(before) - len(common),
+        "only_after": len(after) - len(common),
+        "examples": changed[:DIFF_EXAMPLES],
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="기록된 Gemini 트래픽 오프라인 재생/비교")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="기록된 질의 재생 → 결과 JSONL")
+    run_parser.add_argument("log_path", help="트래픽 로그 파일 또는 디렉터리")
+    run_parser.add_argument("output_path")
+    run_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    run_parser.add_argument("--chunk-size", type=int, default=200)
+    run_parser.add_argument("--concurrency", type=int, default=64, help="프로세스별 동시 재생 질의 수")
+    run_parser.add_argument("--max-queries", type=int)
+
+    diff_parser = commands.add_parser("diff", help="두 재생 결과 비교")
+    diff_parser.add_argument("before_path")
+    diff_parser.add_argument("after_path")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        summary = run_replay(
+            args.log_path, args.output_path,
+            workers=args.workers, chunk_size=args.chunk_size,
+            concurrency=args.concurrency, max_queries=args.max_queries
+        )
+        print(
+            f"✅ 재생 완료: 질의 {summary['queries']:,}건, 호출 {summary['calls']:,}건 "
+            f"({summary['seconds']}초, {summary['queries_per_second']:,}건/초)"
+        )
+        if summary["misses"]:
+            print(f"⚠️ 기록에 없는 프롬프트 {summary['misses']:,}건 (질의 {summary['queries_with_misses']:,}건) - 해당 단계는 폴백 처리됨")
+        return
+
+    summary = diff_outputs(args.before_path, args.after_path)
+    print(f"🔍 비교 {summary['compared']:,}건: 동일 {summary['identical']:,}, 변경 {summary['changed']:,} "
+          f"(도메인 변경 {summary['domain_changed']}, 순서만 변경 {summary['reordered_only']}), "
+          f"평균 상품 겹침 {summary['mean_product_overlap']:.1%}")
+    if summary["only_before"] or summary["only_after"]:
+        print(f"   한쪽에만 있는 질의: 이전 {summary['only_before']}, 이후 {summary['only_after']}")
+    for example in summary["examples"]:
+        print(f"   - {example['user_query'][:40]}: {example['before']} → {example['after']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+# finpick-back/app/services/request_profiler.py
+"""요청 단위 온디맨드 프로파일링 (표본 추출 방식, flamegraph용 collapsed stack 결과물)
+
+- 관리자 헤더(X-Profile-Token = PROFILING_ADMIN_TOKEN) 또는 PROFILING_SAMPLE_RATE 비율로 선택된 요청만 측정
+- 샘플러 스레드가 interval마다 요청에 속한 asyncio 작업들의 스택을 기록한다.
+  실행 중인 작업은 이벤트 루프 스레드의 실제 스택(동기 CPU 구간 포함),
+  대기 중인 작업은 코루틴 await 체인 + 대기 대상([await Future] 등) → Gemini 대기/수락 큐 대기도 벽시계 시간으로 보인다.
+  실행 차례를 기다리는 작업은 [runnable] (다른 작업이 루프를 붙잡고 있는 시간)
+- 요청에 속한 작업은 측정 중인 요청 컨텍스트에서 만들어진 작업 (asyncio 작업 팩토리로 추적)
+- 결과물: PROFILING_PATH/<id>.collapsed (flamegraph.pl / speedscope) + <id>.json (요청 정보)
+
+두 설정이 모두 비어 있으면 미들웨어를 등록하지 않으므로 요청 경로 비용이 없다.
+"""
+import asyncio
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# 스택 깊이 상한 (재귀 등으로 깊어져도 샘플 하나의 비용 제한)
+MAX_STACK_DEPTH = 128
+
+
+def profiling_enabled() -> bool:
+    return bool(settings.profiling_admin_token) or settings.profiling_sample_rate > 0
+
+
+def is_profiling_admin(token: Optional[str]) -> bool:
+    return bool(settings.profiling_admin_token) and bool(token) and hmac.compare_digest(token, settings.profiling_admin_token)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _coroutine_frames(coro) -> Tuple[List[Any], Any]:
+    """코루틴 await 체인의 프레임 (바깥 → 안쪽) 과 마지막 대기 대상"""
+    frames = []
+    awaited = None
+    while coro is not None and len(frames) < MAX_STACK_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is not None:
+            frames.append(frame)
+        next_coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+        if next_coro is None or not hasattr(next_coro, "cr_frame") and not hasattr(next_coro, "gi_frame") and not hasattr(next_coro, "ag_frame"):
+            awaited = next_coro
+            break
+        coro = next_coro
+    return frames, awaited
+
+
+def _await_label(awaited) -> str:
+    """대기 중인 작업의 마지막 프레임 - 대기 대상이 없으면 실행 가능하지만 루프가 바빠 차례를 기다리는 상태"""
+    if awaited is None:
+        return "[runnable]"
+    name = type(awaited).__name__
+    return f"[await {'Future' if name == 'FutureIter' else name}]"
+
+
+def _thread_frames(frame, stop_frame) -> Optional[List[Any]]:
+    """스레드 스택에서 stop_frame(작업의 가장 바깥 코루틴 프레임)부터 현재 프레임까지 (없으면 None)"""
+    frames = []
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        frames.append(frame)
+        if frame is stop_frame:
+            frames.reverse()
+            return frames
+        frame = frame.f_back
+    return None
+
+
+class ProfileSession:
+    """요청 하나의 표본 수집 (샘플러 스레드 1개)"""
+
+    def __init__(self, loop_thread_id: int, interval: float):
+        self.profile_id = uuid.uuid4().hex
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.tasks: set = set()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.profile_id[:8]}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration_ms = round((time.perf_counter() - self.started) * 1000, 2)
+
+    def _task_snapshot(self) -> List[asyncio.Task]:
+        # 이벤트 루프 스레드에서 작업이 추가되는 중일 수 있음
+        for _ in range(3):
+            try:
+                return [task for task in list(self.tasks) if not task.done()]
+            except RuntimeError:
+                continue
+        return []
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        loop_frame = sys._current_frames().get(self.loop_thread_id)
+        for task in self._task_snapshot():
+            frames, awaited = _coroutine_frames(task.get_coro())
+            if not frames:
+                continue
+            running = _thread_frames(loop_frame, frames[0])
+            if running is not None:
+                labels = [_frame_label(frame) for frame in running]
+            else:
+                labels = [_frame_label(frame) for frame in frames]
+                labels.append(_await_label(awaited))
+            self.stacks[";".join(labels)] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# 측정 중인 요청 컨텍스트 (이 컨텍스트에서 만들어진 작업을 세션에 등록)
+_current_session: ContextVar[Optional[ProfileSession]] = ContextVar("profile_session", default=None)
+
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop):
+    """측정 중인 요청에서 만든 작업을 추적하는 작업 팩토리 (기존 팩토리가 있으면 감쌈, 루프당 한 번)"""
+    previous = loop.get_task_factory()
+    if getattr(previous, "_profiling", False):
+        return
+
+    def factory(loop, coro, **kwargs):
+        task = previous(loop, coro, **kwargs) if previous is not None else asyncio.Task(coro, loop=loop, **kwargs)
+        session = _current_session.get()
+        if session is not None:
+            session.tasks.add(task)
+            task.add_done_callback(session.tasks.discard)
+        return task
+
+    factory._profiling = True
+    loop.set_task_factory(factory)
+
+
+class ProfileStore:
+    """결과물 디렉터리 (오래된 것부터 max_artifacts개 초과분 삭제)"""
+
+    def __init__(self, path: str, max_artifacts: int = 200):
+        self.path = path
+        self.max_artifacts = max_artifacts
+
+    def _file(self, profile_id: str, extension: str) -> str:
+        return os.path.join(self.path, f"{profile_id}.{extension}")
+
+    def save(self, session: ProfileSession, meta: Dict[str, Any]):
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file(session.profile_id, "collapsed"), "w", encoding="utf-8") as f:
+            f.write(session.collapsed())
+        with open(self._file(session.profile_id, "json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        self._prune()
+
+    def _prune(self):
+        metas = sorted(
+            (os.path.join(self.path, name) for name in os.listdir(self.path) if name.endswith(".json")),
+            key=os.path.getmtime
+        )
+        for meta_path in metas[:max(0, len(metas) - self.max_artifacts)]:
+            for path in (meta_path, meta_path[:-len(".json")] + ".collapsed"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.path):
+            return []
+        metas = []
+        for name in os.listdir(self.path):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.path, name), "r", encoding="utf-8") as f:
+                        metas.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        metas.sort(key=lambda meta: meta.get("created_at", ""), reverse=True)
+        return metas[:limit]
+
+    def collapsed(self, profile_id: str) -> Optional[str]:
+        """collapsed stack 텍스트 (없거나 잘못된 id면 None)"""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        try:
+            with open(self._file(profile_id, "collapsed"), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+def get_profile_store() -> ProfileStore:
+    return ProfileStore(settings.profiling_path, settings.profiling_max_artifacts)
+
+
+class RequestProfilingMiddleware:
+    """선택된 요청을 ProfileSession으로 측정하고 응답 헤더에 X-Profile-Id를 붙이는 ASGI 미들웨어"""
+
+    def __init__(self, app, store: Optional[ProfileStore] = None):
+        self.app = app
+        self.store = store or get_profile_store()
+        self.active = 0
+        self.profiled = 0
+        self.skipped = 0
+
+    def _trigger(self, scope) -> Optional[str]:
+        if scope["type"] != "http":
+            return None
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_TOKEN_HEADER.encode() and is_profiling_admin(value.decode("latin-1")):
+                return "admin"
+        if settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        if self.active >= settings.profiling_max_concurrent:
+            self.skipped += 1
+            await self.app(scope, receive, send)
+            return
+
+        _install_task_factory(asyncio.get_running_loop())
+        session = ProfileSession(threading.get_ident(), settings.profiling_interval_ms / 1000)
+        session.tasks.add(asyncio.current_task())
+        status_code = {"value": None}
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                status_code["value"] = message["status"]
+                message = dict(message, headers=[*message.get("headers", []), (PROFILE_ID_HEADER, session.profile_id.encode())])
+            await send(message)
+
+        self.active += 1
+        token = _current_session.set(session)
+        session.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            session.stop()
+            _current_session.reset(token)
+            self.active -= 1
+            self.profiled += 1
+            meta = {
+                "profile_id": session.profile_id,
+                "created_at": datetime.now().isoformat(),
+                "trigger": trigger,
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "status_code": status_code["value"],
+                "duration_ms": session.duration_ms,
+                "samples": session.samples,
+                "interval_ms": settings.profiling_interval_ms,
+            }
+            try:
+                await asyncio.to_thread(self.store.save, session, meta)
+            except Exception as e:
+                print(f"❌ 프로파일 저장 실패 ({session.profile_id}): {e}")
@@ -0,0 +1,121 @@
+# finpick-back/app/services/search_index.py
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 필드별 가중치 (상품명 > 은행명 > 우대조건/유의사항)
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "provider": 2.0,
+    "special_conditions": 1.0,
+    "notes": 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+
+
+def normalize_text(text: str) -> List[str]:
+    """소문자화 후 한글/영문/숫자 단어만 남김"""
+    if not text:
+        return []
+    return [word for word in _NON_WORD.split(str(text).lower()) if word]
+
+
+def tokenize_ngrams(text: str, sizes: Tuple[int, ...] = (2, 3)) -> List[str]:
+    """단어별 문자 bigram/trigram 토큰화
+
+    조사가 붙은 "적금을", "대출이"도 "적금", "대출" bigram으로 상품명과 매칭된다.
+    한 글자 단어는 그대로 토큰으로 사용.
+    """
+    tokens = []
+    for word in normalize_text(text):
+        if len(word) == 1:
+            tokens.append(word)
+            continue
+        for size in sizes:
+            if len(word) < size:
+                continue
+            tokens.extend(word[i:i + size] for i in range(len(word) - size + 1))
+    return tokens
+
+
+def _product_fields(product) -> Dict[str, str]:
+    conditions = product.get('conditions', {}) or {}
+    return {
+        "name": product.get('name', '') or '',
+        "provider": (product.get('provider', {}) or {}).get('name', '') or '',
+        "special_conditions": conditions.get('special_conditions', '') or '',
+        "notes": conditions.get('notes', '') or '',
+    }
+
+
+class ProductSearchIndex:
+    """상품 키워드 검색용 역색인 (BM25 점수를 색인 시점에 미리 계산)
+
+    posting 원소는 (문서 번호, 해당 토큰의 BM25 점수)이므로
+    검색 비용은 카탈로그 크기가 아니라 매칭된 posting 수에 비례한다.
+    문서 번호 = 카탈로그 행 번호 (카탈로그에는 ID가 같은 상품이 있으므로 ID로 묶지 않음)
+    """
+
+    def __init__(self, postings: Dict[str, List[Tuple[int, float]]], product_ids: List[str], product_types: List[str]):
+        self.postings = postings
+        self.product_ids = product_ids
+        self.product_types = product_types
+
+    @classmethod
+    def build(cls, products: Iterable) -> "ProductSearchIndex":
+        """카탈로그 로드 시 한 번 색인"""
+        term_freqs: List[Dict[str, float]] = []
+        doc_lengths: List[float] = []
+        product_ids: List[str] = []
+        product_types: List[str] = []
+        doc_freq: Dict[str, int] = defaultdict(int)
+
+        for doc, product in enumerate(products):
+            tf: Dict[str, float] = defaultdict(float)
+            for field, text in _product_fields(product).items():
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize_ngrams(text):
+                    tf[token] += weight
+            for token in tf:
+                doc_freq[token] += 1
+            term_freqs.append(tf)
+            doc_lengths.append(sum(tf.values()))
+            product_ids.append(product.get('id', f'product_{doc}'))
+            product_types.append(product.get('type', '') or '')
+
+        doc_count = len(term_freqs)
+        avg_length = (sum(doc_lengths) / doc_count) if doc_count else 0.0
+
+        postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for doc, tf in enumerate(term_freqs):
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * (doc_lengths[doc] / avg_length if avg_length else 0.0))
+            for token, freq in tf.items():
+                idf = math.log(1 + (doc_count - doc_freq[token] + 0.5) / (doc_freq[token] + 0.5))
+                postings[token].append((doc, idf * freq * (BM25_K1 + 1) / (freq + length_norm)))
+
+        return cls(dict(postings), product_ids, product_types)
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
+
+    def score_documents(self, query: str) -> Dict[int, float]:
+        """질의 토큰의 posting만 순회하여 문서별 BM25 점수 누적"""
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(tokenize_ngrams(query)):
+            for doc, weight in self.postings.get(token, ()):
+                scores[doc] += weight
+        return scores
+
+    def search(self, query: str, limit: int = 10, product_type: Optional[str] = None) -> List[Tuple[int, float]]:
+        """상위 limit개 (문서 번호, 점수) 반환 - 동점은 카탈로그 순서"""
+        scores = self.score_documents(query)
+        if product_type:
+            type_lower = product_type.lower()
+            scores = {doc: score for doc, score in scores.items() if type_lower in self.product_types[doc].lower()}
+        return heapq.nsmallest(limit, ((doc, score) for doc, score in scores.items()), key=lambda pair: (-pair[1], pair[0]))
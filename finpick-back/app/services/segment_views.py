@@ -0,0 +1,342 @@
+# finpick-back/app/services/segment_views.py
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .allocation_engine import monthly_budget_from_profile
+from .rate_index import preferred_period_months, product_rate_for_period
+from .selection_engine import product_quality_score, provider_name, select_diverse_top_k
+from .semantic_cache import normalize_query
+
+DOMAINS = ("예금적금", "대출")
+RISK_CATEGORIES = ("conservative", "moderate", "aggressive")
+# 연령대 → 가능한 생애 주기 (_determine_life_stage 규칙과 동일)
+AGE_LIFE_STAGES = (
+    ("young", "young_professional"),
+    ("middle", "single_professional"),
+    ("middle", "family_building"),
+    ("senior", "pre_retirement"),
+)
+SEGMENTS = tuple(
+    (risk, age_group, life_stage)
+    for risk in RISK_CATEGORIES
+    for age_group, life_stage in AGE_LIFE_STAGES
+)
+# 예금/적금 뷰 기간 (None = 선호 기간 없음)
+VIEW_PERIODS = (None, 6, 12, 24, 36)
+# 월 저축 가능 금액 구간 하한 (온보딩 선택지: 10만원 미만/10-30/30-50/50-100/100-200/200만원 이상)
+BUDGET_BUCKETS = (10000, 100000, 300000, 500000, 1000000, 2000000)
+
+# 생애 주기별 상품 유형 가산점 (%p) - 사회초년생은 적금, 은퇴 준비는 예금 우선
+LIFE_STAGE_TYPE_BONUS = {
+    "young_professional": {"적금": 0.2},
+    "single_professional": {"적금": 0.1},
+    "pre_retirement": {"예금": 0.2},
+}
+# 월 예산을 다 담을 수 없는(월 한도 < 예산) 적금 감점 (%p)
+CAPACITY_PENALTY = 0.5
+
+# 자유 질의 없이 상품 유형만 말한 요청 ("적금 추천해줘", "대출 상품 알려줘" ...)
+_GENERIC_FILLER = re.compile(r"(상품|추천|좋은|괜찮은|하나|좀|요즘|인기)")
+_GENERIC_DOMAIN_TERMS = {
+    "예금": "예금적금", "적금": "예금적금", "예적금": "예금적금", "예금적금": "예금적금",
+    "정기예금": "예금적금", "정기적금": "예금적금", "저축": "예금적금", "금융": "예금적금",
+    "대출": "대출", "신용대출": "대출", "주택담보대출": "대출", "주담대": "대출",
+}
+
+ViewKey = Tuple[str, Tuple[str, str, str], Optional[int], Optional[int]]
+
+
+def risk_category(total_score: Any) -> str:
+    """투자성향 점수 → 위험 성향 분류"""
+    score = total_score if isinstance(total_score, (int, float)) else 0
+    if score <= 20:
+        return "conservative"
+    if score <= 40:
+        return "moderate"
+    return "aggressive"
+
+
+def age_group(age: str) -> str:
+    age = age or ""
+    if "20" in age:
+        return "young"
+    if "30" in age or "40" in age:
+        return "middle"
+    return "senior"
+
+
+def life_stage(basic_info: Dict[str, Any]) -> str:
+    """생애 주기 단계 (연령대 + 결혼 여부)"""
+    age = basic_info.get("age", "") or ""
+    if "20" in age:
+        return "young_professional"
+    if "30" in age and basic_info.get("marital_status", "") == "미혼":
+        return "single_professional"
+    if "30" in age or "40" in age:
+        return "family_building"
+    return "pre_retirement"
+
+
+def user_segment(profile: Optional[Dict[str, Any]]) -> Tuple[str, str, str]:
+    """표준화된 프로필 → (위험 성향, 연령대, 생애 주기)"""
+    profile = profile or {}
+    basic_info = profile.get("basic_info", {}) or {}
+    investment_profile = profile.get("investment_profile", {}) or {}
+    return (
+        risk_category(investment_profile.get("total_score", 0)),
+        age_group(basic_info.get("age", "")),
+        life_stage(basic_info),
+    )
+
+
+def profile_monthly_budget(profile: Optional[Dict[str, Any]]) -> Optional[int]:
+    """월 저축 가능 금액 - goal_setting.monthly_budget 또는 온보딩 응답(financial_status.monthlyInvestment)"""
+    budget = monthly_budget_from_profile(profile)
+    if budget:
+        return budget
+    financial_status = (profile or {}).get("financial_status") or {}
+    answer = financial_status.get("monthlyInvestment") or financial_status.get("monthly_investment")
+    if isinstance(answer, (int, float)):
+        return int(answer) or None
+    numbers = re.findall(r"\d+", str(answer or ""))
+    if not numbers:
+        return None
+    # "10만원 미만" → 최저 구간, "10-30만원" → 구간 하한
+    if "미만" in str(answer) and len(numbers) == 1:
+        return BUDGET_BUCKETS[0]
+    return int(numbers[0]) * 10000
+
+
+def budget_bucket(monthly_budget: Optional[int]) -> Optional[int]:
+    """월 예산이 속한 구간 하한 (예산 정보가 없으면 None)"""
+    if not monthly_budget or monthly_budget < BUDGET_BUCKETS[0]:
+        return None
+    return max(floor for floor in BUDGET_BUCKETS if floor <= monthly_budget)
+
+
+def view_period(period_months: Optional[int]) -> Optional[int]:
+    """선호 기간을 가장 가까운 뷰 기간으로 (짧은 쪽 우선)"""
+    if not period_months:
+        return None
+    periods = [period for period in VIEW_PERIODS if period]
+    return min(periods, key=lambda period: (abs(period - period_months), period))
+
+
+def generic_query_domain(query: str) -> Optional[str]:
+    """상품 유형만 있는 단순 요청이면 해당 도메인, 자유 서술이 섞여 있으면 None"""
+    text = _GENERIC_FILLER.sub("", normalize_query(query))
+    return _GENERIC_DOMAIN_TERMS.get(text)
+
+
+def view_key(domain: str, profile: Optional[Dict[str, Any]]) -> ViewKey:
+    """요청 → 뷰 키 (대출은 기간/예산 구간과 무관)"""
+    if domain == "대출":
+        return (domain, user_segment(profile), None, None)
+    return (
+        domain,
+        user_segment(profile),
+        view_period(preferred_period_months(profile)),
+        budget_bucket(profile_monthly_budget(profile)),
+    )
+
+
+def _amount(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _segment_rate(product: Dict, period_months: Optional[int], risk: str) -> float:
+    """위험 성향별 기준 금리 - 보수형은 기본금리(확정), 공격형은 최고금리(우대조건 충족 가정)"""
+    base = product_rate_for_period(product, period_months, "base_rate")
+    best = product_quality_score(product, period_months)
+    if base is None:
+        return best
+    if risk == "conservative":
+        return base
+    if risk == "moderate":
+        return (base + best) / 2.0
+    return best
+
+
+def _view_item(product: Dict, rank: int, period_months: Optional[int]) -> Dict[str, Any]:
+    """뷰에 저장하는 추천 상품 (사용자별 정보 user_specific은 응답 시 계산)
+
+    user_specific 계산에 쓰이는 원본 details/rates도 함께 담는다 (대출 예상 월 상환액 등).
+    """
+    details = product.get("details", {}) or {}
+    rate = product_rate_for_period(product, period_months) or details.get("interest_rate", 0)
+    return {
+        "product_id": product.get("id", ""),
+        "name": product.get("name", ""),
+        "bank_name": provider_name(product),
+        "type": product.get("type", ""),
+        "interest_rate": rate,
+        "conditions": product.get("conditions", {}),
+        "features": [],
+        "details": details,
+        "rates": product.get("rates", []) or [],
+        "ai_analysis": {
+            "suitability_score": round((85 - rank * 3) / 100, 2),
+            "match_reasons": ["사용자 유형별 사전 계산 순위"],
+            "risk_assessment": "보통",
+            "expected_benefit": "같은 유형 사용자 기준 최적 조합",
+        },
+    }
+
+
+def build_segment_views(products, top_k: int = 10) -> Dict[ViewKey, List[Dict[str, Any]]]:
+    """모든 (도메인, 사용자 유형, 기간, 예산 구간) 조합의 로컬 top-k 계산
+
+    금리 점수는 (기간, 위험 성향)마다 한 번만 계산하고, 생애 주기 가산점과 예산 적격성만
+    조합별로 달리 적용한 뒤 은행별 다양성 선택(select_diverse_top_k)으로 순위를 정한다.
+    """
+    by_domain: Dict[str, List[Dict]] = {domain: [] for domain in DOMAINS}
+    for product in products:
+        domain = "대출" if "대출" in (product.get("type") or "") else "예금적금"
+        by_domain[domain].append(product)
+
+    views: Dict[ViewKey, List[Dict[str, Any]]] = {}
+
+    # 대출은 금리가 낮을수록 우수 - 사용자 유형과 무관하게 같은 순위
+    loan_view = [
+        _view_item(choice.item, choice.rank, None)
+        for choice in select_diverse_top_k(by_domain["대출"], top_k, score_fn=product_quality_score, group_fn=provider_name)
+    ]
+    for segment in SEGMENTS:
+        views[("대출", segment, None, None)] = loan_view
+
+    savings = by_domain["예금적금"]
+    is_installment = ["적금" in (product.get("type") or "") for product in savings]
+    minimum = [_amount((product.get("details") or {}).get("minimum_amount")) or 0.0 for product in savings]
+    maximum = [_amount((product.get("details") or {}).get("maximum_amount")) for product in savings]
+
+    for period in VIEW_PERIODS:
+        for risk in RISK_CATEGORIES:
+            rates = [_segment_rate(product, period, risk) for product in savings]
+            for stage in {stage for _, stage in AGE_LIFE_STAGES}:
+                bonus = LIFE_STAGE_TYPE_BONUS.get(stage, {})
+                staged = [
+                    rate + bonus.get("적금" if installment else "예금", 0.0)
+                    for rate, installment in zip(rates, is_installment)
+                ]
+                for bucket in (None,) + BUDGET_BUCKETS:
+                    scores = list(staged)
+                    eligible = []
+                    for i in range(len(savings)):
+                        if bucket is not None:
+                            # 적금은 월 예산, 예금은 1년치 예산을 한 번에 넣을 수 있어야 함
+                            budget = bucket if is_installment[i] else bucket * 12
+                            if minimum[i] > budget:
+                                continue
+                            if is_installment[i] and maximum[i] is not None and maximum[i] < bucket:
+                                scores[i] -= CAPACITY_PENALTY
+                        eligible.append(i)
+
+                    selected = select_diverse_top_k(
+                        eligible, top_k,
+                        score_fn=lambda i: scores[i],
+                        group_fn=lambda i: provider_name(savings[i])
+                    )
+                    view = [_view_item(savings[choice.item], choice.rank, period) for choice in selected]
+                    for risk_segment, age, life in SEGMENTS:
+                        if risk_segment == risk and life == stage:
+                            views[("예금적금", (risk, age, life), period, bucket)] = view
+    return views
+
+
+class SegmentViewStore:
+    """카탈로그 버전별 사용자 유형 추천 뷰
+
+    카탈로그 버전이 바뀌면 백그라운드 스레드에서 전체 뷰를 다시 계산하고,
+    계산이 끝날 때까지는 이전 버전 뷰를 쓰지 않는다 (조회 시 None → 일반 추천 경로).
+    """
+
+    def __init__(self, top_k: int = 10):
+        self.top_k = top_k
+        self.version: Optional[str] = None
+        self.views: Dict[ViewKey, List[Dict[str, Any]]] = {}
+        self.build_seconds = 0.0
+        self.builds = 0
+        self.hits = 0
+        self.misses = 0
+        self._building: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, catalog: Any):
+        """카탈로그 기준으로 뷰 전체 재계산 (동기)"""
+        start = time.perf_counter()
+        views = build_segment_views(catalog.products, self.top_k)
+        with self._lock:
+            self.views = views
+            self.build_seconds = time.perf_counter() - start
+            self.builds += 1
+            # 버전은 마지막에 (잠금 없이 버전만 보는 조회가 반쯤 갱신된 상태를 보지 않도록)
+            self.version = catalog.version
+            if self._building == catalog.version:
+                self._building = None
+        print(f"🧮 사용자 유형별 추천 뷰 {len(views)}개 계산 완료 ({self.build_seconds * 1000:.0f}ms)")
+
+    def schedule_refresh(self, catalog: Any) -> bool:
+        """버전이 바뀌었으면 백그라운드 재계산 시작 - 이미 최신이면 False"""
+        with self._lock:
+            if self.version == catalog.version or self._building == catalog.version:
+                return False
+            self._building = catalog.version
+        threading.Thread(target=self._refresh_safely, args=(catalog,), daemon=True).start()
+        return True
+
+    def _refresh_safely(self, catalog: Any):
+        try:
+            self.refresh(catalog)
+        except Exception as e:
+            print(f"❌ 사용자 유형별 추천 뷰 계산 실패: {e}")
+            with self._lock:
+                self._building = None
+
+    def lookup(self, catalog: Any, domain: str, profile: Optional[Dict[str, Any]], limit: int) -> Optional[List[Dict[str, Any]]]:
+        """현재 카탈로그 버전의 뷰 (없거나 재계산 중이거나 limit이 뷰 크기보다 크면 None)"""
+        if limit > self.top_k:
+            self.misses += 1
+            return None
+        if self.version != catalog.version:
+            self.schedule_refresh(catalog)
+            self.misses += 1
+            return None
+        view = self.views.get(view_key(domain, profile))
+        if view is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [dict(item) for item in view[:limit]]
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "views": len(self.views),
+            "builds": self.builds,
+            "build_ms": round(self.build_seconds * 1000, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_store: Optional[SegmentViewStore] = None
+_store_lock = threading.Lock()
+
+
+def get_segment_view_store() -> Optional[SegmentViewStore]:
+    """프로세스 공용 사용자 유형별 추천 뷰 (설정으로 끈 경우 None)"""
+    global _store
+    if not settings.segment_views_enabled:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = SegmentViewStore(top_k=settings.segment_view_top_k)
+        return _store
@@ -0,0 +1,136 @@
+# finpick-back/app/services/selection_engine.py
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .rate_index import product_rate_for_period
+
+
+@dataclass(frozen=True)
+class SelectionConstraints:
+    """다양성 선택 제약 조건"""
+    max_per_group: Optional[int] = None             # 같은 은행(그룹)에서 최대 선택 수
+    required_types: Dict[str, int] = field(default_factory=dict)  # 타입별 최소 포함 개수
+
+
+@dataclass(frozen=True)
+class SelectedItem:
+    """선택 결과 (원본 인덱스, 원본 객체, 품질 점수, 선택 순위)"""
+    index: int
+    item: Any
+    score: float
+    rank: int
+
+
+def product_quality_score(product: Dict, period_months: Optional[int] = None) -> float:
+    """폴백 선택용 상품 품질 점수 (예금/적금은 금리가 높을수록, 대출은 낮을수록 우수)"""
+    details = product.get('details', {}) or {}
+    rate = product_rate_for_period(product, period_months) or details.get('interest_rate') or 0.0
+    if not rate:
+        rates = product.get('rates', []) or []
+        rate = max((r.get('max_rate') or 0.0 for r in rates), default=0.0)
+
+    if '대출' in (product.get('type') or ''):
+        # 금리 정보가 없는 대출은 가장 뒤로
+        return -float(rate) if rate else -100.0
+    return float(rate)
+
+
+def provider_name(product: Dict) -> str:
+    """상품의 제공 은행명"""
+    return (product.get('provider') or {}).get('name', 'Unknown')
+
+
+def select_diverse_top_k(
+    items: Sequence[Any],
+    k: int,
+    score_fn: Callable[[Any], float],
+    group_fn: Callable[[Any], str],
+    type_fn: Optional[Callable[[Any], str]] = None,
+    constraints: Optional[SelectionConstraints] = None
+) -> List[SelectedItem]:
+    """품질 점수 기반 은행별 라운드로빈 top-k 선택
+
+    - 그룹(은행)별 크기 제한 min-heap으로 상위 후보만 유지: O(n log k)
+    - 1라운드에는 각 은행의 최고 상품을 점수순으로, 2라운드에는 두 번째 상품을... 순서로 배치
+    - 동점은 원본 인덱스로 정렬하여 결과가 항상 동일(결정적)
+    - 같은 상품은 두 번 선택되지 않음
+    """
+
+    if k <= 0 or not items:
+        return []
+
+    constraints = constraints or SelectionConstraints()
+    per_group_cap = k if constraints.max_per_group is None else max(0, min(k, constraints.max_per_group))
+    if per_group_cap == 0:
+        return []
+
+    # 1. 그룹별 상위 후보 유지 (heap 원소: (score, -index) → 가장 약한 후보가 heap[0])
+    #    필수 타입이 있으면 (그룹, 타입)별 후보도 따로 유지해 제약을 만족시킬 수 있게 함
+    required_types = constraints.required_types if type_fn is not None else {}
+    candidate_heaps: Dict[Any, List] = {}
+
+    def _offer(key, entry):
+        heap = candidate_heaps.setdefault(key, [])
+        if len(heap) < per_group_cap:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    for index, item in enumerate(items):
+        group = group_fn(item)
+        entry = (float(score_fn(item)), -index)
+        _offer((group, None), entry)
+        if required_types:
+            item_type = type_fn(item)
+            if item_type in required_types:
+                _offer((group, item_type), entry)
+
+    group_candidates: Dict[str, Dict[int, float]] = {}
+    for (group, _), heap in candidate_heaps.items():
+        for score, neg_index in heap:
+            group_candidates.setdefault(group, {})[-neg_index] = score
+
+    # 2. 라운드로빈 순서 구성: (라운드, -점수, 인덱스) 기준 병합
+    ordered = []
+    for candidates in group_candidates.values():
+        ranked = sorted(candidates.items(), key=lambda pair: (-pair[1], pair[0]))
+        for round_no, (index, score) in enumerate(ranked):
+            ordered.append((round_no, -score, index))
+    ordered.sort()
+
+    # 3. 필수 타입 먼저 채우고 나머지는 순서대로 채움 (은행별 최대 개수 유지)
+    chosen: Dict[int, float] = {}
+    group_counts: Dict[str, int] = {}
+
+    def _take(index, score):
+        group = group_fn(items[index])
+        if group_counts.get(group, 0) >= per_group_cap:
+            return False
+        chosen[index] = score
+        group_counts[group] = group_counts.get(group, 0) + 1
+        return True
+
+    if required_types:
+        remaining = dict(required_types)
+        for _, neg_score, index in ordered:
+            if len(chosen) >= k or not any(count > 0 for count in remaining.values()):
+                break
+            item_type = type_fn(items[index])
+            if remaining.get(item_type, 0) > 0 and _take(index, -neg_score):
+                remaining[item_type] -= 1
+
+    for _, neg_score, index in ordered:
+        if len(chosen) >= k:
+            break
+        if index not in chosen:
+            _take(index, -neg_score)
+
+    # 최종 순서는 라운드로빈 순서를 따름
+    position = {index: pos for pos, (_, _, index) in enumerate(ordered)}
+    selected_indices = sorted(chosen, key=lambda index: position[index])
+
+    return [
+        SelectedItem(index=index, item=items[index], score=chosen[index], rank=rank)
+        for rank, index in enumerate(selected_indices)
+    ]
@@ -0,0 +1,247 @@
+# finpick-back/app/services/semantic_cache.py
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+from .rate_index import preferred_period_months
+
+# 해시 n-gram 버킷 수 (float32 기준 항목당 8KB)
+EMBEDDING_DIM = 2048
+# 색인 배열 증가 단위 (항목 수) - 최대 용량만큼 미리 잡지 않고 찬 만큼 늘림
+GROW_ENTRIES = 128
+NGRAM_SIZES = (2, 3)
+
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+_NUMBER = re.compile(r"(\d+(?:\.\d+)?)\s*(천만원|백만원|만원|억|원|년|개월|달|%|세|살)?")
+# 의미 없는 요청 어미 ("추천해줘", "알려 주세요" ...) - 어미 차이로 유사도가 떨어지지 않도록 제거
+_REQUEST_SUFFIX = re.compile(
+    r"(을|를|좀)?\s*(추천|알려|찾아|보여|소개)?\s*(해|하여)?\s*(줘|줘요|주세요|주실래요|줄래|줄래요|주라|주시겠어요|봐|봐요|바람|부탁해|부탁드려요|부탁합니다)\s*[?.!~]*\s*$"
+)
+_LOAN_KEYWORDS = ["대출", "빌리", "빌려", "융자", "급전", "자금조달", "주택담보", "마이너스", "loan"]
+
+
+def normalize_query(query: str) -> str:
+    """소문자화 + 요청 어미 제거 + 공백/기호 제거"""
+    text = (query or "").strip().lower()
+    text = _REQUEST_SUFFIX.sub("", text)
+    return _NON_WORD.sub("", text)
+
+
+def numeric_signature(query: str) -> Tuple[str, ...]:
+    """금액/기간 등 숫자 표현 - 숫자가 다르면 의미가 달라지므로 임베딩과 별도로 정확히 일치해야 함"""
+    return tuple(sorted(f"{number}{unit or ''}" for number, unit in _NUMBER.findall(query or "")))
+
+
+def profile_bucket(user_profile: Any) -> Tuple:
+    """캐시 재사용 범위를 나누는 거친 프로필 구간 (연령대/투자성향/선호기간)"""
+    if not user_profile:
+        return ()
+    if hasattr(user_profile, "model_dump"):
+        user_profile = user_profile.model_dump()
+    if not isinstance(user_profile, dict):
+        return ()
+    basic_info = user_profile.get("basic_info") or {}
+    investment = user_profile.get("investment_profile") or user_profile.get("investment_personality") or {}
+    risk_score = investment.get("total_score")
+    risk_band = int(risk_score) // 10 if isinstance(risk_score, (int, float)) else investment.get("risk_tolerance")
+    return (
+        str(basic_info.get("age", "") or "")[:2],
+        risk_band,
+        preferred_period_months(user_profile),
+    )
+
+
+def _query_domain(query: str) -> str:
+    lowered = (query or "").lower()
+    return "대출" if any(keyword in lowered for keyword in _LOAN_KEYWORDS) else "예금적금"
+
+
+def hashed_ngram_counts(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """정규화된 질의의 문자 n-gram을 crc32로 해싱한 빈도 벡터 (프로세스 간 동일한 해시)"""
+    counts = np.zeros(dim, dtype=np.float32)
+    for size in NGRAM_SIZES:
+        for i in range(len(text) - size + 1):
+            counts[zlib.crc32(text[i:i + size].encode("utf-8")) % dim] += 1.0
+    if not counts.any() and text:
+        counts[zlib.crc32(text.encode("utf-8")) % dim] = 1.0
+    return counts
+
+
+class SemanticQueryCache:
+    """자연어 질의 → (도메인, 요구사항 분석) 의미 기반 캐시
+
+    - 질의를 해시 문자 n-gram TF-IDF로 임베딩 (외부 모델/네트워크 없음)
+    - TF(1+log)는 항목별로 저장하고 IDF는 지금까지 저장된 질의 기준으로 조회 시 적용
+    - (추정 도메인, 숫자 표현, 프로필 구간)이 같은 항목 중 코사인 top-1이 임계값 이상이면 적중
+    - 같은 (버킷, 정규화 질의)는 새 항목을 만들지 않고 기존 항목 값을 교체
+    - 색인 배열은 GROW_ENTRIES 단위로 늘리고, 최대 용량이 차면 가장 오래 사용하지 않은 항목을 교체
+    """
+
+    def __init__(self, max_entries: int = 2000, threshold: float = 0.88, audit_rate: float = 0.05, dim: int = EMBEDDING_DIM):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.audit_rate = audit_rate
+        self.dim = dim
+
+        capacity = min(max_entries, GROW_ENTRIES)
+        self._tf = np.zeros((capacity, dim), dtype=np.float32)
+        self._present = np.zeros((capacity, dim), dtype=bool)
+        self._doc_freq = np.zeros(dim, dtype=np.float32)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._keys: list = [None] * max_entries
+        self._values: list = [None] * max_entries
+        self._queries: list = [None] * max_entries
+        self._slots_by_key: Dict[Tuple, set] = {}
+        self._slot_by_query: Dict[Tuple, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.audits = 0
+        self.false_hits = 0
+
+    def _idf(self) -> np.ndarray:
+        count = max(self._size, 1)
+        return np.log((1.0 + count) / (1.0 + self._doc_freq)) + 1.0
+
+    def _grow(self):
+        """색인 배열을 GROW_ENTRIES만큼 (최대 max_entries까지) 확장"""
+        capacity = min(self.max_entries, len(self._last_used) + GROW_ENTRIES)
+        extra = capacity - len(self._last_used)
+        self._tf = np.concatenate([self._tf, np.zeros((extra, self.dim), dtype=np.float32)])
+        self._present = np.concatenate([self._present, np.zeros((extra, self.dim), dtype=bool)])
+        self._last_used = np.concatenate([self._last_used, np.zeros(extra, dtype=np.float64)])
+
+    @staticmethod
+    def _tf_vector(query: str, dim: int) -> np.ndarray:
+        counts = hashed_ngram_counts(normalize_query(query), dim)
+        return np.where(counts > 0, 1.0 + np.log(np.maximum(counts, 1.0)), 0.0).astype(np.float32)
+
+    @staticmethod
+    def bucket_key(query: str, user_profile: Any) -> Tuple:
+        return (_query_domain(query), numeric_signature(query), profile_bucket(user_profile))
+
+    def lookup(self, query: str, user_profile: Any = None) -> Optional[Dict[str, Any]]:
+        """임계값 이상 가장 유사한 항목 반환 ({value, similarity, cached_query}) - 없으면 None"""
+        key = self.bucket_key(query, user_profile)
+        tf = self._tf_vector(query, self.dim)
+
+        with self._lock:
+            candidates = np.fromiter(self._slots_by_key.get(key, ()), dtype=np.int64)
+            if not len(candidates) or not tf.any():
+                self.misses += 1
+                return None
+
+            idf = self._idf()
+            query_vector = tf * idf
+            query_norm = float(np.linalg.norm(query_vector))
+            rows = self._tf[candidates] * idf
+            row_norms = np.linalg.norm(rows, axis=1)
+            similarities = rows @ query_vector / np.maximum(row_norms * query_norm, 1e-12)
+
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+
+            slot = int(candidates[best])
+            self._last_used[slot] = time.monotonic()
+            self.hits += 1
+            return {"value": self._values[slot], "similarity": similarity, "cached_query": self._queries[slot]}
+
+    def store(self, query: str, user_profile: Any, value: Dict[str, Any]):
+        tf = self._tf_vector(query, self.dim)
+        if not tf.any():
+            return
+        key = self.bucket_key(query, user_profile)
+        query_key = (key, normalize_query(query))
+
+        with self._lock:
+            slot = self._slot_by_query.get(query_key)
+            if slot is not None:
+                # 같은 질의는 TF 벡터도 같으므로 값만 교체
+                self._last_used[slot] = time.monotonic()
+                self._values[slot] = value
+                self._queries[slot] = query
+                self.stores += 1
+                return
+
+            if self._size < self.max_entries:
+                if self._size == len(self._last_used):
+                    self._grow()
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+                self._doc_freq -= self._present[slot]
+                self._slots_by_key[self._keys[slot]].discard(slot)
+                del self._slot_by_query[(self._keys[slot], normalize_query(self._queries[slot]))]
+                self.evictions += 1
+
+            self._tf[slot] = tf
+            self._present[slot] = tf > 0
+            self._doc_freq += self._present[slot]
+            self._last_used[slot] = time.monotonic()
+            self._keys[slot] = key
+            self._slots_by_key.setdefault(key, set()).add(slot)
+            self._slot_by_query[query_key] = slot
+            self._values[slot] = value
+            self._queries[slot] = query
+            self.stores += 1
+
+    def should_audit(self) -> bool:
+        """적중 중 일부를 표본으로 골라 실제 결과와 비교 (오적중률 추정)"""
+        return random.random() < self.audit_rate
+
+    def record_audit(self, matched: bool):
+        with self._lock:
+            self.audits += 1
+            if not matched:
+                self.false_hits += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "index_bytes": int(self._tf.nbytes + self._present.nbytes + self._doc_freq.nbytes),
+            "threshold": self.threshold,
+            "lookups": lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "audits": self.audits,
+            "false_hits": self.false_hits,
+            "false_hit_rate": round(self.false_hits / self.audits, 4) if self.audits else 0.0,
+        }
+
+
+_cache: Optional[SemanticQueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticQueryCache]:
+    """프로세스 공용 의미 캐시 (설정으로 끈 경우 None)"""
+    global _cache
+    if not settings.semantic_cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticQueryCache(
+                max_entries=settings.semantic_cache_max_entries,
+                threshold=settings.semantic_cache_threshold,
+                audit_rate=settings.semantic_cache_audit_rate
+            )
+        return _cache
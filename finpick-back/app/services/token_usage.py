@@ -0,0 +1,329 @@
+# finpick-back/app/services/token_usage.py
+"""Gemini 토큰 사용량/비용 집계 (단계 × 사용자 × 엔드포인트)
+
+- GeminiService의 모든 호출이 응답 usage_metadata를 record()로 전달 (없으면 미계량 호출로 집계)
+- 사용자는 수락 제어 티켓(uid), 엔드포인트는 요청 미들웨어가 연 RequestUsage 범위에서 결정
+- 프로세스 메모리에 누적하고 주기적으로 직전 flush 이후 증분을 JSONL로 기록 → report 명령이 워커별 파일을 합산
+
+  python -m app.services.token_usage --by user --top 20
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import threading
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from .admission import current_ticket
+
+COUNT_FIELDS = ("calls", "unmetered_calls", "input_tokens", "cached_input_tokens", "output_tokens")
+REPORT_GROUPS = ("user", "stage", "endpoint")
+
+# 요청 범위 밖(스크립트, 시작 작업 등)의 호출
+NO_ENDPOINT = "-"
+
+
+def extract_usage(response: Any) -> Optional[Tuple[int, int, int]]:
+    """SDK/REST 응답 → (입력 토큰, 그중 컨텍스트 캐시 토큰, 출력 토큰), 사용량 정보가 없으면 None"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+
+    def field(name: str, rest_name: str) -> int:
+        value = usage.get(rest_name, 0) if isinstance(usage, dict) else getattr(usage, name, 0)
+        return int(value or 0)
+
+    counts = (
+        field("prompt_token_count", "promptTokenCount"),
+        field("cached_content_token_count", "cachedContentTokenCount"),
+        field("candidates_token_count", "candidatesTokenCount"),
+    )
+    return counts if any(counts) else None
+
+
+def token_cost(input_tokens: int, cached_input_tokens: int, output_tokens: int) -> float:
+    """USD 비용 - 입력 토큰 수에는 컨텍스트 캐시 토큰이 포함되어 있어 캐시 단가로 따로 계산"""
+    return (
+        (input_tokens - cached_input_tokens) * settings.gemini_input_price_per_million
+        + cached_input_tokens * settings.gemini_cached_input_price_per_million
+        + output_tokens * settings.gemini_output_price_per_million
+    ) / 1_000_000
+
+
+def _empty_counts() -> Dict[str, float]:
+    return {**{name: 0 for name in COUNT_FIELDS}, "cost_usd": 0.0}
+
+
+def _add_counts(counts: Dict[str, float], usage: Optional[Tuple[int, int, int]], cost: float):
+    counts["calls"] += 1
+    if usage is None:
+        counts["unmetered_calls"] += 1
+        return
+    counts["input_tokens"] += usage[0]
+    counts["cached_input_tokens"] += usage[1]
+    counts["output_tokens"] += usage[2]
+    counts["cost_usd"] += cost
+
+
+def _route_template(path: str, route: Any, path_params: Dict[str, Any]) -> str:
+    """요청 경로 → 라우터 접두사 + 경로 템플릿 (경로 변수 값으로 라벨이 늘어나지 않도록)
+
+    포함된 라우터의 route.path에는 접두사가 없으므로 실제 경로에서 라우트 부분만 템플릿으로 바꾼다.
+    """
+    template = getattr(route, "path", None)
+    if not template:
+        return path
+    try:
+        concrete = getattr(route, "path_format", template).format(**{key: str(value) for key, value in path_params.items()})
+    except (KeyError, IndexError, ValueError):
+        return template
+    return path[:-len(concrete)] + template if concrete and path.endswith(concrete) else template
+
+
+class RequestUsage:
+    """HTTP 요청 하나의 사용량 (응답 디버그 메타데이터용) - 엔드포인트는 라우팅 후 경로 템플릿으로 결정"""
+
+    def __init__(self, scope: Optional[Dict[str, Any]] = None, endpoint: Optional[str] = None):
+        self._scope = scope
+        self._endpoint = endpoint
+        self.counts = _empty_counts()
+        self.stages: Dict[str, int] = defaultdict(int)
+
+    @property
+    def endpoint(self) -> str:
+        if self._endpoint is None and self._scope is not None:
+            route = self._scope.get("route")
+            path = self._scope.get("path", NO_ENDPOINT)
+            if route is None:
+                return path
+            self._endpoint = _route_template(path, route, self._scope.get("path_params", {}))
+        return self._endpoint or NO_ENDPOINT
+
+    def add(self, stage: str, usage: Optional[Tuple[int, int, int]], cost: float):
+        _add_counts(self.counts, usage, cost)
+        self.stages[stage] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **{name: self.counts[name] for name in COUNT_FIELDS},
+            "cost_usd": round(self.counts["cost_usd"], 6),
+            "stages": dict(self.stages),
+        }
+
+
+# 미들웨어가 요청마다 설정 (create_task로 만든 단계 작업도 같은 객체를 공유)
+_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("request_usage", default=None)
+
+
+def begin_request_usage(scope: Optional[Dict[str, Any]] = None, endpoint: Optional[str] = None):
+    """현재 컨텍스트에 요청 사용량 범위 시작 → (RequestUsage, reset 토큰)"""
+    usage = RequestUsage(scope, endpoint)
+    return usage, _request_usage.set(usage)
+
+
+def end_request_usage(token):
+    _request_usage.reset(token)
+
+
+def current_request_usage() -> Optional[Dict[str, Any]]:
+    """현재 요청의 지금까지 사용량 (요청 범위 밖이면 None)"""
+    usage = _request_usage.get()
+    return usage.as_dict() if usage is not None else None
+
+
+class TokenUsageLedger:
+    """사용량 누적 - 누적 합계(단계×엔드포인트)는 /metrics용, 사용자별 증분은 flush 때 파일로 내보내고 비움"""
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = 60.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(_empty_counts)
+        self._pending: Dict[Tuple[str, str, str], Dict[str, float]] = defaultdict(_empty_counts)
+        self._flusher: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.flush_errors = 0
+
+    def record(self, stage: str, response: Any):
+        usage = extract_usage(response)
+        cost = token_cost(*usage) if usage is not None else 0.0
+        request_usage = _request_usage.get()
+        endpoint = request_usage.endpoint if request_usage is not None else NO_ENDPOINT
+        ticket = current_ticket()
+        with self._lock:
+            _add_counts(self._totals[(stage, endpoint)], usage, cost)
+            _add_counts(self._pending[(stage, ticket.uid, endpoint)], usage, cost)
+        if request_usage is not None:
+            request_usage.add(stage, usage, cost)
+
+    def _take_pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(_empty_counts)
+        flushed_at = datetime.now().isoformat()
+        return [
+            {"flushed_at": flushed_at, "stage": stage, "user": uid, "endpoint": endpoint, **counts}
+            for (stage, uid, endpoint), counts in pending.items()
+        ]
+
+    def _write_rows(self, rows: List[Dict[str, Any]]):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, f"usage-{os.getpid()}.jsonl"), "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+    async def flush(self):
+        """직전 flush 이후 증분을 파일에 추가 (경로가 없으면 버림)"""
+        rows = self._take_pending()
+        if not rows or not self.path:
+            return
+        try:
+            await asyncio.to_thread(self._write_rows, rows)
+            self.flushes += 1
+            self.flushed_rows += len(rows)
+        except Exception as e:
+            self.flush_errors += 1
+            print(f"❌ 토큰 사용량 기록 실패 ({len(rows)}건): {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def start(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    def totals(self) -> Dict[Tuple[str, str], Dict[str, float]]:
+        with self._lock:
+            return {key: dict(counts) for key, counts in self._totals.items()}
+
+    def metrics(self) -> Dict[str, Any]:
+        by_stage: Dict[str, Dict[str, float]] = defaultdict(_empty_counts)
+        for (stage, _), counts in self.totals().items():
+            for name, value in counts.items():
+                by_stage[stage][name] += value
+        for counts in by_stage.values():
+            counts["cost_usd"] = round(counts["cost_usd"], 6)
+        return {
+            "stages": dict(by_stage),
+            "total_cost_usd": round(sum(counts["cost_usd"] for counts in by_stage.values()), 6),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "flush_errors": self.flush_errors,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+            self._pending.clear()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(ledger: "TokenUsageLedger") -> str:
+    """Prometheus 텍스트 형식 카운터 (단계×엔드포인트 - 사용자는 카디널리티 때문에 report 명령에서만)"""
+    lines = [
+        "# HELP finpick_gemini_calls_total Gemini 호출 수",
+        "# TYPE finpick_gemini_calls_total counter",
+        "# HELP finpick_gemini_unmetered_calls_total 사용량 정보가 없는 Gemini 호출 수",
+        "# TYPE finpick_gemini_unmetered_calls_total counter",
+        "# HELP finpick_gemini_tokens_total Gemini 토큰 수 (kind: input | cached_input | output)",
+        "# TYPE finpick_gemini_tokens_total counter",
+        "# HELP finpick_gemini_cost_usd_total Gemini 추정 비용 (USD)",
+        "# TYPE finpick_gemini_cost_usd_total counter",
+    ]
+    for (stage, endpoint), counts in sorted(ledger.totals().items()):
+        labels = f'stage="{_label(stage)}",endpoint="{_label(endpoint)}"'
+        lines.append(f"finpick_gemini_calls_total{{{labels}}} {counts['calls']}")
+        lines.append(f"finpick_gemini_unmetered_calls_total{{{labels}}} {counts['unmetered_calls']}")
+        for kind in ("input", "cached_input", "output"):
+            lines.append(f'finpick_gemini_tokens_total{{{labels},kind="{kind}"}} {counts[f"{kind}_tokens"]}')
+        lines.append(f"finpick_gemini_cost_usd_total{{{labels}}} {counts['cost_usd']:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+_ledger: Optional[TokenUsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_token_usage_ledger() -> TokenUsageLedger:
+    """프로세스 공용 토큰 사용량 집계기"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = TokenUsageLedger(settings.token_usage_path, settings.token_usage_flush_interval)
+        return _ledger
+
+
+def read_usage_rows(path: str, since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """flush된 증분 행 순회 (since: ISO 날짜/시각 이후만)"""
+    files = sorted(glob.glob(os.path.join(path, "*.jsonl"))) if os.path.isdir(path) else [path]
+    for file_path in files:
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if since is None or row.get("flushed_at", "") >= since:
+                    yield row
+
+
+def usage_report(rows: Iterator[Dict[str, Any]], group_by: List[str], top: int = 20) -> List[Dict[str, Any]]:
+    """group_by 기준 합산 → 비용(같으면 입력 토큰) 내림차순 상위 top개"""
+    groups: Dict[Tuple[str, ...], Dict[str, float]] = defaultdict(_empty_counts)
+    for row in rows:
+        counts = groups[tuple(row.get(name, NO_ENDPOINT) for name in group_by)]
+        for name in counts:
+            counts[name] += row.get(name, 0)
+    ranked = sorted(groups.items(), key=lambda item: (item[1]["cost_usd"], item[1]["input_tokens"]), reverse=True)
+    return [{**dict(zip(group_by, key)), **counts} for key, counts in ranked[:top]]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Gemini 토큰 사용량 상위 소비자 보고서")
+    parser.add_argument("--path", default=settings.token_usage_path, help="사용량 JSONL 파일 또는 디렉터리")
+    parser.add_argument("--by", default="stage", help=f"그룹 기준 (쉼표로 조합: {', '.join(REPORT_GROUPS)})")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--since", help="이 시각(ISO 형식) 이후 기록만")
+    args = parser.parse_args(argv)
+
+    group_by = [name.strip() for name in args.by.split(",") if name.strip()]
+    unknown = [name for name in group_by if name not in REPORT_GROUPS]
+    if not group_by or unknown:
+        parser.error(f"알 수 없는 그룹 기준: {', '.join(unknown) or args.by}")
+    if not os.path.exists(args.path):
+        parser.error(f"사용량 기록이 없습니다: {args.path}")
+
+    rows = list(read_usage_rows(args.path, args.since))
+    report = usage_report(iter(rows), group_by, args.top)
+    total_cost = sum(row.get("cost_usd", 0.0) for row in rows)
+    print(f"💰 Gemini 사용량 ({'×'.join(group_by)} 기준 상위 {len(report)}개, 전체 추정 비용 ${total_cost:,.4f})")
+    for row in report:
+        name = " / ".join(str(row[key]) for key in group_by)
+        share = row["cost_usd"] / total_cost if total_cost else 0.0
+        print(
+            f"  {name:<50} 호출 {row['calls']:>7,}  입력 {row['input_tokens']:>12,} (캐시 {row['cached_input_tokens']:,})"
+            f"  출력 {row['output_tokens']:>10,}  ${row['cost_usd']:,.4f} ({share:.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# finpick-back/app/services/warmup.py
+"""워커 시작 워밍업 + 준비 상태(/readyz) 판단
+
+워커가 시작되면 첫 사용자 요청이 치르던 콜드 경로 비용을 미리 치른다.
+- catalog: 카탈로그 로드 + 검색/금리/만기/대출 색인 구축 (필수 - 실패하면 준비 안 됨)
+- segment_views: 현재 카탈로그 버전의 사용자 유형별 추천 뷰 계산
+- prompt_cache: 도메인×가입 기간별 상품 선택 프롬프트 고정 부분 렌더링, 의미 캐시 생성
+- gemini: 모델 클라이언트 생성(SDK import/설정, 재생 로그 로드), REST 엔드포인트면 연결 풀에 연결 확보
+- auth: Firebase Admin 초기화
+- history_store: 이력 저장소 조회 확인
+- synthetic_queries: 가상 프로필/질의로 로컬 추천 경로(뷰 조회, 검색 색인, 다양성 선택) 실행
+
+필수 단계가 모두 성공하면 ready, 선택 단계 중 실패가 있으면 degraded(트래픽은 받음 - 폴백 경로로 처리).
+"""
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..config import settings
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_READY = "ready"
+STATUS_DEGRADED = "degraded"
+STATUS_FAILED = "failed"
+
+# 트래픽을 받아도 되는 상태
+READY_STATUSES = (STATUS_READY, STATUS_DEGRADED)
+
+# 프롬프트 고정 부분을 미리 만들 가입 기간 (None: 기간 미지정)
+WARMUP_PERIOD_MONTHS = (None, 6, 12, 24, 36)
+WARMUP_DOMAINS = ("예금적금", "대출")
+WARMUP_SEARCH_QUERIES = ("정기예금 금리 높은", "자유적금 비대면", "신용대출 금리 낮은", "주택담보대출")
+
+def synthetic_profiles(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """가상 질의 단계 입력 (배치 추천 벤치마크와 같은 프로필 생성기, 도메인은 번갈아)"""
+    from .batch_recommender import random_profile
+
+    rng = random.Random(seed)
+    return [
+        {"user_id": f"warmup_{i}", "domain": WARMUP_DOMAINS[i % len(WARMUP_DOMAINS)], "profile": random_profile(rng)}
+        for i in range(count)
+    ]
+
+
+class WarmupState:
+    """워밍업 진행 상태 - 단계별 결과/소요 시간"""
+
+    def __init__(self):
+        self.status = STATUS_PENDING
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.duration_ms = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.status in READY_STATUSES
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_ms": self.duration_ms,
+            "steps": {name: dict(step) for name, step in self.steps.items()},
+        }
+
+
+class Warmup:
+    """단계를 순서대로 실행 (동기 단계는 스레드에서 - 워밍업 중에도 /livez 등은 응답)"""
+
+    def __init__(self):
+        self.state = WarmupState()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _step(self, name: str, run: Callable[[], Awaitable[Optional[Dict[str, Any]]]], required: bool = False):
+        started = time.perf_counter()
+        step: Dict[str, Any] = {"status": STATUS_RUNNING, "required": required}
+        self.state.steps[name] = step
+        try:
+            detail = await run()
+            step["status"] = "skipped" if detail is None else "ok"
+            step.update(detail or {})
+        except Exception as e:
+            step["status"] = STATUS_FAILED
+            step["error"] = str(e)[:200]
+            print(f"⚠️ 워밍업 {name} 실패: {e}")
+        step["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def run(self) -> WarmupState:
+        state = self.state
+        state.status = STATUS_RUNNING
+        state.started_at = datetime.now().isoformat()
+        started = time.perf_counter()
+
+        await self._step("catalog", _warm_catalog, required=True)
+        if state.steps["catalog"]["status"] == "ok":
+            await self._step("segment_views", _warm_segment_views)
+            await self._step("prompt_cache", _warm_prompt_cache)
+        await self._step("gemini", _warm_gemini)
+        await self._step("auth", _warm_auth)
+        await self._step("history_store", _warm_history_store)
+        if state.steps["catalog"]["status"] == "ok":
+            await self._step("synthetic_queries", _warm_synthetic_queries)
+
+        failed = [name for name, step in state.steps.items() if step["status"] == STATUS_FAILED]
+        if any(state.steps[name]["required"] for name in failed):
+            state.status = STATUS_FAILED
+        else:
+            state.status = STATUS_DEGRADED if failed else STATUS_READY
+        state.finished_at = datetime.now().isoformat()
+        state.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        print(f"🔥 워밍업 {state.status} ({state.duration_ms:.0f}ms){' - 실패: ' + ', '.join(failed) if failed else ''}")
+        return state
+
+    def start(self) -> asyncio.Task:
+        """백그라운드 워밍업 시작 (이미 시작했으면 그 작업)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+
+async def _warm_catalog() -> Dict[str, Any]:
+    from .product_catalog import get_product_catalog
+
+    catalog = await asyncio.to_thread(get_product_catalog)
+    if not catalog.products:
+        raise RuntimeError("상품 카탈로그가 비어 있습니다")
+    return {"products": len(catalog.products), "version": catalog.version[:12], "indexed_documents": len(catalog.search_index)}
+
+
+async def _warm_segment_views() -> Optional[Dict[str, Any]]:
+    from .product_catalog import get_product_catalog
+    from .segment_views import get_segment_view_store
+
+    store = get_segment_view_store()
+    if store is None:
+        return None
+    catalog = get_product_catalog()
+    if store.version != catalog.version:
+        await asyncio.to_thread(store.refresh, catalog)
+    return {"views": len(store.views)}
+
+
+def _render_prompt_prefixes() -> int:
+    from .gemini_service import GeminiService
+    from .product_catalog import get_product_catalog
+    from .prompt_compiler import get_prompt_compiler
+
+    catalog = get_product_catalog()
+    compiler = get_prompt_compiler()
+    service = GeminiService(use_semantic_cache=False)
+    rendered = 0
+    for domain in WARMUP_DOMAINS:
+        products = service._filter_domain_products(catalog.products, domain)
+        for period_months in WARMUP_PERIOD_MONTHS:
+            compiler.prefix(
+                ("product_selection", domain, period_months),
+                catalog.version,
+                lambda: service._render_product_selection_prefix(products, domain, period_months)
+            )
+            rendered += 1
+    return rendered
+
+
+def _gemini_api_key() -> str:
+    # GeminiService와 같은 방식으로 .env까지 확인
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("GEMINI_API_KEY") or ""
+
+
+async def _warm_prompt_cache() -> Optional[Dict[str, Any]]:
+    from .semantic_cache import get_semantic_cache
+
+    # API 키가 없으면 AI 경로를 쓰지 않으므로 프롬프트를 만들 필요 없음
+    if not _gemini_api_key():
+        return None
+    get_semantic_cache()
+    return {"prompt_prefixes": await asyncio.to_thread(_render_prompt_prefixes)}
+
+
+async def _warm_gemini() -> Optional[Dict[str, Any]]:
+    from .gemini_service import get_gemini_model
+
+    api_key = _gemini_api_key()
+    if not api_key:
+        return None
+    model = await asyncio.to_thread(get_gemini_model, api_key)
+    # 기록 모드면 실제 모델은 감싼 객체 안에 있음
+    warm_connection = getattr(model, "warm_connection", None) or getattr(getattr(model, "model", None), "warm_connection", None)
+    if warm_connection is not None:
+        await warm_connection()
+    return {"model": type(model).__name__, "connection_warmed": warm_connection is not None}
+
+
+async def _warm_auth() -> Optional[Dict[str, Any]]:
+    from ..auth.firebase_auth import firebase_auth
+
+    if not os.path.exists("firebase-key.json"):
+        return None
+    await asyncio.to_thread(lambda: firebase_auth.auth)
+    return {"project_id": settings.firebase_project_id}
+
+
+async def _warm_history_store() -> Dict[str, Any]:
+    from .history_store import get_history_store
+
+    store = get_history_store()
+    await asyncio.to_thread(store.backend.count_history, "__warmup__")
+    return {"backend": type(store.backend).__name__}
+
+
+def _run_synthetic_queries(count: int) -> Dict[str, Any]:
+    from .batch_recommender import current_views, recommend_records
+    from .gemini_service import GeminiService
+    from .product_catalog import get_product_catalog
+
+    catalog = get_product_catalog()
+    records = synthetic_profiles(count)
+    results, errors = recommend_records(records, current_views(), 5)
+    searches = sum(len(catalog.search_index.search(query, limit=10)) for query in WARMUP_SEARCH_QUERIES)
+    if _gemini_api_key():
+        # AI 경로와 동시에 미리 계산하는 다양성 선택 폴백
+        service = GeminiService(use_semantic_cache=False)
+        for record in records[:len(WARMUP_DOMAINS)]:
+            products = service._filter_domain_products(catalog.products, record["domain"])
+            service._speculative_fallback_selection(products, record["domain"], 5)
+    if errors:
+        raise RuntimeError(f"가상 질의 {errors}/{len(records)}건 실패")
+    return {"queries": len(results), "search_hits": searches}
+
+
+async def _warm_synthetic_queries() -> Optional[Dict[str, Any]]:
+    if settings.warmup_synthetic_queries <= 0:
+        return None
+    return await asyncio.to_thread(_run_synthetic_queries, settings.warmup_synthetic_queries)
+
+
+def component_state() -> Dict[str, Dict[str, Any]]:
+    """현재 구성 요소 상태 (워밍업 결과가 아니라 조회 시점 값) - 아직 만들지 않은 구성 요소는 새로 만들지 않음"""
+    from . import gemini_service, product_catalog, segment_views
+    from ..auth.firebase_auth import firebase_auth
+    from .history_store import get_history_store
+
+    catalog = product_catalog._catalog
+    components: Dict[str, Dict[str, Any]] = {
+        "catalog": (
+            {"status": "ok" if catalog.products else "empty", "products": len(catalog.products), "version": catalog.version[:12], "shared": catalog.shared}
+            if catalog is not None else {"status": "not_loaded"}
+        ),
+    }
+
+    store = segment_views._store
+    if not settings.segment_views_enabled:
+        components["segment_views"] = {"status": "disabled"}
+    elif store is None or catalog is None or store.version != catalog.version:
+        components["segment_views"] = {"status": "stale" if store is not None and store.version else "not_built"}
+    else:
+        components["segment_views"] = {"status": "ok", "views": len(store.views)}
+
+    models = list(gemini_service._gemini_models.values())
+    components["gemini"] = {
+        "status": "ready" if models else "not_initialized",
+        "client": type(models[0]).__name__ if models else None,
+        "replay_mode": settings.gemini_replay_mode or None,
+    }
+    components["auth"] = {"status": "ready" if firebase_auth._auth is not None else "not_initialized"}
+
+    history = get_history_store().metrics()
+    components["history_store"] = {
+        "status": "degraded" if history["write_errors"] else "ok",
+        "backend": history["backend"],
+        "queued": history["queued"],
+        "write_errors": history["write_errors"],
+    }
+    return components
+
+
+_warmup: Optional[Warmup] = None
+
+
+def get_warmup() -> Warmup:
+    """프로세스 공용 워밍업"""
+    global _warmup
+    if _warmup is None:
+        _warmup = Warmup()
+    return _warmup
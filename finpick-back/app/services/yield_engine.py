@@ -0,0 +1,219 @@
+# finpick-back/app/services/yield_engine.py
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .rate_index import RATE_METRICS, normalize_rate_product_type
+
+# 이자소득세 15.4% (소득세 14% + 지방소득세 1.4%)
+INTEREST_TAX_RATE = 0.154
+
+# 예금: 목돈 일시 예치 / 적금: 매월 납입
+LUMP_SUM_TYPE = "예금"
+INSTALLMENT_TYPE = "적금"
+
+# 추천 점수 계산 시 사용자 금액 정보가 없을 때의 기준 금액
+DEFAULT_MONTHLY_INSTALLMENT = 300000
+DEFAULT_LUMP_SUM = 10000000
+
+
+def _amount(value) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def maturity_interest(
+    principal: np.ndarray,
+    months: np.ndarray,
+    annual_rate: np.ndarray,
+    is_compound: np.ndarray,
+    is_installment: np.ndarray
+) -> np.ndarray:
+    """세전 만기 이자 (벡터 연산)
+
+    - 예금 단리: P × r × n/12
+    - 예금 복리(월복리): P × ((1 + r/12)^n − 1)
+    - 적금 단리: M × r/12 × n(n+1)/2
+    - 적금 복리(월복리): M × [(1+i)((1+i)^n − 1)/i − n], i = r/12
+    `principal`은 예금이면 예치금, 적금이면 월 납입액.
+    """
+    monthly = annual_rate / 100.0 / 12.0
+    growth = np.power(1.0 + monthly, months)
+
+    lump_simple = principal * monthly * months
+    lump_compound = principal * (growth - 1.0)
+
+    safe_monthly = np.where(monthly > 0, monthly, 1.0)
+    installment_simple = principal * monthly * months * (months + 1) / 2.0
+    installment_compound = np.where(
+        monthly > 0,
+        principal * ((1.0 + safe_monthly) * (growth - 1.0) / safe_monthly - months),
+        0.0
+    )
+
+    return np.where(
+        is_installment,
+        np.where(is_compound, installment_compound, installment_simple),
+        np.where(is_compound, lump_compound, lump_simple)
+    )
+
+
+class YieldEngine:
+    """예금/적금 전체 카탈로그의 세후 만기 수령액을 한 번의 NumPy 연산으로 계산"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], product_ids: List[str]):
+        self.columns = columns
+        self.product_ids = product_ids
+        # 카탈로그가 바뀌지 않는 동안 재사용하는 파생 배열 (목표 계산기 등)
+        self.derived: Dict[tuple, np.ndarray] = {}
+
+    @classmethod
+    def build(cls, products: Iterable) -> "YieldEngine":
+        """카탈로그의 모든 금리 행을 컬럼 배열로 평탄화"""
+        rows = {
+            "doc": [], "period": [], "base_rate": [], "max_rate": [],
+            "is_compound": [], "is_installment": [], "minimum_amount": [], "maximum_amount": []
+        }
+        product_ids = []
+
+        for doc, product in enumerate(products):
+            product_ids.append(product.get("id", f"product_{doc}"))
+            product_type = normalize_rate_product_type(product.get("type", ""))
+            if not product_type:
+                continue
+            details = product.get("details", {}) or {}
+            minimum_amount = _amount(details.get("minimum_amount"))
+            maximum_amount = _amount(details.get("maximum_amount"))
+
+            for rate in product.get("rates", []) or []:
+                period = rate.get("period_months")
+                base_rate = rate.get("base_rate")
+                max_rate = rate.get("max_rate")
+                if not period or (base_rate is None and max_rate is None):
+                    continue
+                rows["doc"].append(doc)
+                rows["period"].append(period)
+                rows["base_rate"].append(base_rate if base_rate is not None else max_rate)
+                rows["max_rate"].append(max_rate if max_rate is not None else base_rate)
+                rows["is_compound"].append(rate.get("rate_type") == "복리")
+                rows["is_installment"].append(product_type == INSTALLMENT_TYPE)
+                rows["minimum_amount"].append(0.0 if np.isnan(minimum_amount) else minimum_amount)
+                rows["maximum_amount"].append(np.inf if np.isnan(maximum_amount) else maximum_amount)
+
+        columns = {
+            "doc": np.asarray(rows["doc"], dtype=np.int64),
+            "period": np.asarray(rows["period"], dtype=np.float64),
+            "base_rate": np.asarray(rows["base_rate"], dtype=np.float64),
+            "max_rate": np.asarray(rows["max_rate"], dtype=np.float64),
+            "is_compound": np.asarray(rows["is_compound"], dtype=bool),
+            "is_installment": np.asarray(rows["is_installment"], dtype=bool),
+            "minimum_amount": np.asarray(rows["minimum_amount"], dtype=np.float64),
+            "maximum_amount": np.asarray(rows["maximum_amount"], dtype=np.float64),
+        }
+        return cls(columns, product_ids)
+
+    def __len__(self) -> int:
+        return len(self.columns["doc"])
+
+    def compute(
+        self,
+        product_type: str,
+        amount: float,
+        period_months: int,
+        metric: str = "max_rate",
+        tax_rate: float = INTEREST_TAX_RATE
+    ) -> Dict[str, np.ndarray]:
+        """가입 가능한 모든 상품의 세전이자/세금/세후 수령액 (상품당 최적 금리 행 1개)"""
+        if metric not in RATE_METRICS:
+            raise ValueError(f"지원하지 않는 금리 기준: {metric}")
+        normalized_type = normalize_rate_product_type(product_type)
+        if not normalized_type:
+            raise ValueError(f"만기 계산을 지원하지 않는 상품 타입: {product_type}")
+
+        cols = self.columns
+        installment = normalized_type == INSTALLMENT_TYPE
+        mask = (
+            (cols["is_installment"] == installment)
+            & (cols["period"] == period_months)
+            & (cols["minimum_amount"] <= amount)
+            & (cols["maximum_amount"] >= amount)
+        )
+
+        docs = cols["doc"][mask]
+        rates = cols[metric][mask]
+        is_compound = cols["is_compound"][mask]
+        principal_per_row = np.full(docs.shape, float(amount))
+        months = np.full(docs.shape, float(period_months))
+
+        gross = maturity_interest(principal_per_row, months, rates, is_compound, cols["is_installment"][mask])
+        tax = np.floor(gross * tax_rate)
+        net = gross - tax
+
+        # 같은 상품의 여러 금리 행(단리/복리, 적립방식) 중 세후 이자가 가장 큰 행만 유지
+        order = np.lexsort((-net, docs))
+        docs, rates, is_compound = docs[order], rates[order], is_compound[order]
+        gross, tax, net = gross[order], tax[order], net[order]
+        first = np.ones(docs.shape, dtype=bool)
+        first[1:] = docs[1:] != docs[:-1]
+
+        total_principal = float(amount) * (period_months if installment else 1)
+        return {
+            "doc": docs[first],
+            "rate": rates[first],
+            "is_compound": is_compound[first],
+            "principal": np.full(int(first.sum()), total_principal),
+            "gross_interest": gross[first],
+            "tax": tax[first],
+            "net_interest": net[first],
+            "net_proceeds": total_principal + net[first],
+        }
+
+    def compare(
+        self,
+        product_type: str,
+        amount: float,
+        period_months: int,
+        metric: str = "max_rate",
+        limit: Optional[int] = 20
+    ) -> List[Dict]:
+        """세후 수령액 내림차순 비교 결과"""
+        result = self.compute(product_type, amount, period_months, metric)
+        order = np.lexsort((result["doc"], -result["net_interest"]))
+        if limit is not None:
+            order = order[:limit]
+
+        years = period_months / 12.0
+        # 적금은 평균 예치 잔액이 총 납입액의 (n+1)/2n 이므로 그 기준으로 연환산
+        balance_ratio = (period_months + 1) / (2 * period_months) if product_type_is_installment(product_type) else 1.0
+        comparisons = []
+        for i in order:
+            principal = float(result["principal"][i])
+            average_balance = principal * balance_ratio
+            comparisons.append({
+                "doc": int(result["doc"][i]),
+                "product_id": self.product_ids[int(result["doc"][i])],
+                "rate": float(result["rate"][i]),
+                "rate_type": "복리" if result["is_compound"][i] else "단리",
+                "principal": int(principal),
+                "gross_interest": int(result["gross_interest"][i]),
+                "tax": int(result["tax"][i]),
+                "net_interest": int(result["net_interest"][i]),
+                "net_proceeds": int(result["net_proceeds"][i]),
+                "effective_annual_rate": round(
+                    float(result["net_interest"][i]) / average_balance / years * 100, 4
+                ) if average_balance and years else 0.0
+            })
+        return comparisons
+
+    def effective_rates(self, product_type: str, amount: float, period_months: int) -> Dict[int, float]:
+        """카탈로그 행 번호별 연환산 세후 수익률(%) - 추천 점수 계산용 (ID가 같은 상품끼리 덮어쓰지 않도록 행 번호 기준)"""
+        return {
+            item["doc"]: item["effective_annual_rate"]
+            for item in self.compare(product_type, amount, period_months, limit=None)
+        }
+
+
+def product_type_is_installment(product_type: str) -> bool:
+    return normalize_rate_product_type(product_type) == INSTALLMENT_TYPE
@@ -0,0 +1,103 @@
+# finpick-back/app/startup_profile.py
+"""모듈별 import 시간 리포트: python -m app.startup_profile [--module app.main] [--top 20] [--check]
+
+새 인터프리터에서 `python -X importtime -c "import <module>"`를 실행해
+모듈별 self/누적 import 시간과 패키지별 합계를 출력한다.
+--check를 주면 무거운 SDK(HEAVY_MODULES)가 import된 경우 종료 코드 1로 실패한다.
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, Iterable, List, NamedTuple
+
+# 앱 import 시점에 로드되면 안 되는 SDK (첫 사용 시 지연 import)
+HEAVY_MODULES = (
+    "google.generativeai",
+    "google.ai",
+    "google.cloud",
+    "google.api_core",
+    "grpc",
+    "firebase_admin",
+)
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """-X importtime 출력(stderr) 파싱"""
+    timings = []
+    for line in output.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return timings
+
+
+def heavy_modules_loaded(modules: Iterable[str]) -> List[str]:
+    """import된 모듈 중 HEAVY_MODULES에 해당하는 것"""
+    return sorted(
+        module for module in modules
+        if any(module == heavy or module.startswith(heavy + ".") for heavy in HEAVY_MODULES)
+    )
+
+
+def package_totals(timings: List[ImportTiming]) -> Dict[str, int]:
+    """최상위 패키지별 self 시간 합계 (μs)"""
+    totals: Dict[str, int] = {}
+    for timing in timings:
+        package = timing.module.split(".")[0]
+        totals[package] = totals.get(package, 0) + timing.self_us
+    return totals
+
+
+def profile_imports(module: str = "app.main") -> List[ImportTiming]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="모듈별 import 시간 리포트")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--check", action="store_true", help="무거운 SDK가 import되면 실패")
+    args = parser.parse_args(argv)
+
+    timings = profile_imports(args.module)
+    target = next((timing for timing in timings if timing.module == args.module), None)
+    total_ms = target.cumulative_us / 1000 if target else sum(timing.self_us for timing in timings) / 1000
+
+    print(f"⏱️ import {args.module}: {total_ms:.1f}ms ({len(timings)}개 모듈)")
+
+    print(f"\n📦 패키지별 self 시간 상위 {args.top}")
+    for package, self_us in sorted(package_totals(timings).items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f}ms  {package}")
+
+    print(f"\n🐢 모듈별 누적 시간 상위 {args.top}")
+    for timing in sorted(timings, key=lambda timing: -timing.cumulative_us)[:args.top]:
+        print(f"  {timing.cumulative_us / 1000:8.1f}ms (self {timing.self_us / 1000:6.1f}ms)  {timing.module}")
+
+    heavy = heavy_modules_loaded(timing.module for timing in timings)
+    if heavy:
+        print(f"\n⚠️ import 시점에 로드된 무거운 SDK: {', '.join(heavy[:10])}{' ...' if len(heavy) > 10 else ''}")
+        return 1 if args.check else 0
+    print("\n✅ 무거운 SDK 지연 로드 확인")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
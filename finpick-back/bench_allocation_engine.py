@@ -0,0 +1,35 @@
+# finpick-back/bench_allocation_engine.py - 월 예산 배분 벤치마크 (python bench_allocation_engine.py)
+
+import time
+
+from app.services.allocation_engine import allocate_monthly_budget, installment_candidates
+from app.services.product_catalog import find_catalog_path, load_catalog_products
+from app.services.yield_engine import YieldEngine
+
+SCENARIOS = [(300000, 12, 3), (1500000, 12, 3), (3000000, 24, 5), (5000000, 36, 5)]
+ROUNDS = 50
+
+
+def main():
+    path = find_catalog_path()
+    if not path:
+        print("❌ financial_products.json을 찾을 수 없습니다")
+        return
+    products, version = load_catalog_products(path)
+    engine = YieldEngine.build(products)
+    print(f"📦 카탈로그 {len(products)}개 상품 (version {version[:8]})")
+
+    for budget, period, max_products in SCENARIOS:
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            result = allocate_monthly_budget(engine, products, budget, period, max_products=max_products)
+        elapsed_ms = (time.perf_counter() - started) * 1000 / ROUNDS
+        candidates = len(installment_candidates(engine, period)["row"])
+        print(
+            f"⚡ 월 {budget:,}원 / {period}개월 / 최대 {max_products}개 (후보 {candidates}개): {elapsed_ms:.2f}ms "
+            f"→ {len(result['allocations'])}개 상품, 세후 {result['blended_effective_rate']:.2f}%, 미배분 {result['unallocated_amount']:,}원"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# finpick-back/bench_batch_recommender.py - 대량 배치 추천 처리량 벤치마크 (python bench_batch_recommender.py [건수])
+
+import json
+import os
+import random
+import sys
+import tempfile
+
+from app.services.batch_recommender import random_profile, run_batch
+
+CHUNK_SIZE = 2000
+
+
+def write_profiles(path: str, count: int, seed: int = 42):
+    """온보딩 원본 형식의 가상 고객 프로필 JSONL 생성"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            record = {
+                "user_id": f"customer_{i}",
+                "domain": rng.choice(["예금적금", "예금적금", "대출"]),
+                "profile": random_profile(rng),
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    worker_options = sorted({1, 2, os.cpu_count() or 1})
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "profiles.jsonl")
+        write_profiles(input_path, count)
+        print(f"📦 가상 고객 프로필 {count:,}건 (청크 {CHUNK_SIZE:,}건)")
+
+        for workers in worker_options:
+            output_path = os.path.join(directory, f"results_{workers}.jsonl")
+            summary = run_batch(input_path, output_path, workers=workers, chunk_size=CHUNK_SIZE)
+            size_mb = os.path.getsize(output_path) / 1024 / 1024
+            print(
+                f"⚡ 워커 {workers}개: {summary['seconds']:.2f}초 → {summary['records_per_second']:,.0f}건/초 "
+                f"(오류 {summary['errors']}건, 출력 {size_mb:.1f}MB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# finpick-back/bench_goal_simulator.py - 몬테카를로 시뮬레이션 벤치마크 (python bench_goal_simulator.py)
+
+import os
+import time
+
+from app.services.goal_simulator import catalog_deposit_rate, simulate_goal
+from app.services.product_catalog import get_product_catalog
+
+RUNS = [(30, 50000, 0), (30, 100000, 0), (30, 400000, os.cpu_count() or 1)]
+
+
+def main():
+    anchor_rate = catalog_deposit_rate(get_product_catalog()) or 3.0
+    print(f"📈 카탈로그 12개월 예금 기본금리 중앙값: {anchor_rate:.2f}%")
+
+    for years, n_paths, workers in RUNS:
+        started = time.perf_counter()
+        result = simulate_goal(1500000, years, anchor_rate, target_amount=1000000000, n_paths=n_paths, seed=2024, workers=workers)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"⚡ {years}년 × {n_paths:,}경로 (workers={workers}): {elapsed_ms:.1f}ms "
+            f"P50 {result['final']['p50']:,}원 / 달성확률 {result['success_probability']:.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
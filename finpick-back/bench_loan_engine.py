@@ -0,0 +1,49 @@
+# finpick-back/bench_loan_engine.py - 대출 상환 계산 벤치마크 (python bench_loan_engine.py)
+
+import time
+
+from app.services.loan_engine import RATE_SCENARIOS, LoanEngine
+from app.services.product_catalog import find_catalog_path, load_catalog_products
+
+PRINCIPAL = 300000000
+MONTHS = 360
+ROUNDS = 50
+
+
+def main():
+    path = find_catalog_path()
+    if not path:
+        print("❌ financial_products.json을 찾을 수 없습니다")
+        return
+    products, version = load_catalog_products(path)
+
+    started = time.perf_counter()
+    engine = LoanEngine.build(products)
+    build_ms = (time.perf_counter() - started) * 1000
+    loan_count = len(set(engine.columns["doc"].tolist()))
+    print(f"📦 금리 정보가 있는 대출상품 {loan_count}개 / (상품, 상환방식) 행 {len(engine)}개 (version {version[:8]})")
+    print(f"🔧 배열 구축: {build_ms:.2f}ms")
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        engine.compute(PRINCIPAL, MONTHS, annual_income=80000000)
+    summary_ms = (time.perf_counter() - started) * 1000 / ROUNDS
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = engine.schedules(PRINCIPAL, MONTHS)
+    schedule_ms = (time.perf_counter() - started) * 1000 / ROUNDS
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        engine.rank_by_total_cost(PRINCIPAL, MONTHS, annual_income=80000000, limit=20)
+    rank_ms = (time.perf_counter() - started) * 1000 / ROUNDS
+
+    rows, scenarios, months = result["payment"].shape
+    print(f"⚡ 요약(월 상환액/총이자/DSR) {len(engine)}행 × {len(RATE_SCENARIOS)}시나리오: {summary_ms:.3f}ms")
+    print(f"⚡ 전체 스케줄 {rows}행 × {scenarios}시나리오 × {months}개월: {schedule_ms:.3f}ms")
+    print(f"⚡ 총비용 순위 상위 20개: {rank_ms:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# finpick-back/bench_prompt_compiler.py - 상품 선택 프롬프트 구성 시간/전송 입력 크기 벤치마크 (python bench_prompt_compiler.py [반복 횟수])
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "bench-key")
+
+import app.services.gemini_service as gemini_module
+from app.services.gemini_service import GeminiService
+from app.services.product_catalog import get_product_catalog
+from app.services.prompt_compiler import PromptCompiler, StubContextCache
+
+USER_ANALYSIS = {
+    "financial_goal": "결혼자금 마련",
+    "time_horizon": "3년",
+    "priority_factors": ["금리", "안전성"],
+    "domain_specific": {"key_requirements": ["월 50만원 적립"], "success_criteria": "3년 후 2천만원"},
+}
+PROFILE = {"investment_profile": {"investment_period": "3년"}}
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _CountingModel:
+    """전송된 프롬프트 길이만 기록하는 모델"""
+
+    def __init__(self):
+        self.sent_chars = []
+
+    async def generate_content_async(self, prompt: str, generation_config=None):
+        self.sent_chars.append(len(prompt))
+        return _Response(json.dumps({"selected_products": [{"index": i, "score": 80} for i in range(5)]}))
+
+
+def estimated_tokens(chars: float) -> float:
+    # 한국어 위주 프롬프트 근사치 (문자 2개 ≈ 토큰 1개)
+    return chars / 2
+
+
+async def run_mode(compiler: PromptCompiler, dataset, repeat: int):
+    """요청 repeat회 - (요청당 프롬프트 구성 ms, 요청당 전송 문자 수)"""
+    model = _CountingModel()
+    gemini_module.get_prompt_compiler = lambda: compiler
+
+    build_seconds = 0.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = GeminiService(use_semantic_cache=False)
+        service.model = model
+        for _ in range(repeat):
+            started = time.perf_counter()
+            compiler.prefix(
+                ("product_selection", dataset["domain"], 36),
+                dataset["catalog_version"],
+                lambda: service._render_product_selection_prefix(dataset["products"], dataset["domain"], 36)
+            )
+            build_seconds += time.perf_counter() - started
+            await service._recommend_products_v2(USER_ANALYSIS, dataset, 5, PROFILE)
+    # 컨텍스트 캐시를 쓰면 모델에 실제로 전송된 것은 사용자별 부분뿐 (첫 요청은 렌더링/캐시 등록이라 제외)
+    sent = compiler.backend.sent_chars if compiler.backend else model.sent_chars[1:]
+    return build_seconds / repeat * 1000, sum(sent) / len(sent)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    catalog = get_product_catalog()
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = GeminiService(use_semantic_cache=False)
+        datasets = [service.prepare_domain_dataset(catalog.products, domain) for domain in ("예금적금", "대출")]
+    print(f"📦 카탈로그 {len(catalog.products)}개 상품 (버전 {catalog.version[:8]}), 요청 {repeat}회")
+
+    original = gemini_module.get_prompt_compiler
+    try:
+        for dataset in datasets:
+            uncached = dict(dataset, catalog_version=None)
+            baseline_ms, baseline_chars = asyncio.run(run_mode(PromptCompiler(), uncached, repeat))
+            compiled_ms, compiled_chars = asyncio.run(run_mode(PromptCompiler(), dataset, repeat))
+            _, cached_chars = asyncio.run(run_mode(PromptCompiler(StubContextCache()), dataset, repeat))
+
+            print(f"\n🗂️ {dataset['domain']} ({dataset['total_count']}개 상품)")
+            print(f"  매 요청 렌더링  : 구성 {baseline_ms:7.3f}ms, 전송 {baseline_chars:8,.0f}자 (≈{estimated_tokens(baseline_chars):,.0f} 토큰)")
+            print(f"  고정 부분 재사용: 구성 {compiled_ms:7.3f}ms ({baseline_ms / max(compiled_ms, 1e-6):,.0f}배), 전송 {compiled_chars:8,.0f}자")
+            print(
+                f"  + 컨텍스트 캐시 : 전송 {cached_chars:8,.0f}자 (≈{estimated_tokens(cached_chars):,.0f} 토큰, "
+                f"{1 - cached_chars / baseline_chars:.1%} 감소)"
+            )
+    finally:
+        gemini_module.get_prompt_compiler = original
+
+
+if __name__ == "__main__":
+    main()
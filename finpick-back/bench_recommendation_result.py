@@ -0,0 +1,129 @@
+# finpick-back/bench_recommendation_result.py - /natural-language 추천 응답 생성/직렬화 벤치마크 (python bench_recommendation_result.py [반복 횟수])
+
+import json
+import sys
+import time
+import tracemalloc
+
+from app.api.responses import encode_json
+from app.models.recommendation import RecommendationResult, RecommendedProduct
+from app.services.batch_recommender import random_profile
+from app.services.product_catalog import get_product_catalog
+from app.services.profile_analytics import (
+    assess_age_appropriateness,
+    assess_risk_compatibility,
+    enhance_user_profile_with_analytics,
+    enhance_product_with_user_context,
+    estimate_monthly_amount_with_profile,
+    standardize_user_profile,
+    user_specific_info
+)
+
+PRODUCT_COUNTS = (5, 20, 50)
+
+
+def gemini_products(products, profile):
+    """GeminiService 추천 결과 형태 (user_specific 계산 완료)"""
+    return [
+        {
+            "product_id": product.get("id"),
+            "name": product.get("name"),
+            "bank_name": (product.get("provider") or {}).get("name"),
+            "type": product.get("type"),
+            "interest_rate": (product.get("details") or {}).get("interest_rate"),
+            "conditions": product.get("conditions", {}),
+            "features": list(product.get("benefits") or []),
+            "ai_analysis": {"suitability_score": 0.8, "match_reasons": ["금리"], "risk_assessment": "보통", "expected_benefit": ""},
+            "user_specific": user_specific_info(product, profile),
+        }
+        for product in products
+    ]
+
+
+def dict_path(products, profile, debug_dump: bool = True):
+    """기존 API: 상품마다 dict 재구성(user_specific 기본값도 매번 계산) + 디버그 json.dumps + orjson"""
+    recommended = []
+    for product_data in products:
+        recommended.append({
+            "product_id": product_data.get("product_id"),
+            "name": product_data.get("name"),
+            "bank_name": product_data.get("bank_name"),
+            "type": product_data.get("type"),
+            "interest_rate": product_data.get("interest_rate"),
+            "conditions": product_data.get("conditions", {}),
+            "features": product_data.get("features", []),
+            "ai_analysis": product_data.get("ai_analysis", {}),
+            "user_specific": product_data.get("user_specific", {
+                "recommended_monthly_amount": estimate_monthly_amount_with_profile(product_data, profile),
+                "risk_compatibility": assess_risk_compatibility(product_data, profile),
+                "age_appropriateness": assess_age_appropriateness(product_data, profile)
+            })
+        })
+    if debug_dump:
+        json.dumps(recommended, indent=2)
+    return encode_json({"success": True, "is_financial_related": True, "data": recommended, "ai_metadata": {}})
+
+
+def dict_path_without_dump(products, profile):
+    """기존 API에서 디버그 json.dumps만 뺀 경우 (모델 생성/직렬화 자체 비용 비교용)"""
+    return dict_path(products, profile, debug_dump=False)
+
+
+def typed_path(products, profile):
+    """이전 시도: RecommendedProduct model_construct + RecommendationResult model_dump_json 한 번"""
+    result = RecommendationResult.model_construct(
+        recommendation_type="financial_model_based",
+        data=[RecommendedProduct.model_construct(**enhance_product_with_user_context(product_data, profile)) for product_data in products],
+        ai_metadata={}
+    )
+    return result.model_dump_json().encode()
+
+
+def schema_dict_path(products, profile):
+    """현재 API: 스키마 필드 dict (RecommendationResult.payload) + orjson 한 번"""
+    return encode_json(RecommendationResult.payload(
+        recommendation_type="financial_model_based",
+        data=[enhance_product_with_user_context(product_data, profile) for product_data in products],
+        ai_metadata={}
+    ))
+
+
+def measure(build, products, profile, repeat: int):
+    build(products, profile)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        build(products, profile)
+    micros = (time.perf_counter() - start) / repeat * 1e6
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    build(products, profile)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return micros, peak
+
+
+def main():
+    import random
+
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    profile = enhance_user_profile_with_analytics(standardize_user_profile(random_profile(random.Random(0))))
+    catalog = [product for product in get_product_catalog().products if "적금" in product.get("type", "")]
+
+    for count in PRODUCT_COUNTS:
+        products = gemini_products(catalog[:count], profile)
+        print(f"\n📦 상품 {count}개 추천 응답")
+        baseline = None
+        for label, build in (
+            ("dict 재구성 + 디버그 dump + orjson", dict_path),
+            ("dict 재구성 + orjson (dump 제외)", dict_path_without_dump),
+            ("model_construct + model_dump_json", typed_path),
+            ("스키마 dict + orjson (현재)", schema_dict_path),
+        ):
+            micros, peak = measure(build, products, profile, repeat)
+            baseline = baseline or micros
+            print(f"  {label:<34} {micros:8.1f}μs  x{baseline / micros:4.1f}  할당 peak {peak / 1024:6.1f}KB")
+
+
+if __name__ == "__main__":
+    main()
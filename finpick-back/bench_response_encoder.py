@@ -0,0 +1,96 @@
+# finpick-back/bench_response_encoder.py - 추천 응답 직렬화 벤치마크 (python bench_response_encoder.py [반복 횟수])
+
+import json
+import sys
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+
+from app.services.product_catalog import get_product_catalog
+from app.api.responses import encode_json
+
+PRODUCT_COUNTS = (5, 10, 20, 50)
+
+
+def build_payload(products, count: int):
+    """자연어 추천 응답과 같은 구조의 응답 dict (상품 정적 필드는 카탈로그 객체 그대로)"""
+    data = []
+    for i, product in enumerate(products[:count]):
+        data.append({
+            "product_id": product.get("id", ""),
+            "name": product.get("name", ""),
+            "bank_name": product.get("provider", {}).get("name", ""),
+            "type": product.get("type", ""),
+            "interest_rate": product.get("details", {}).get("interest_rate", 0),
+            "conditions": product.get("conditions", {}),
+            "features": product.get("benefits", []) if i % 2 else [],
+            "ai_analysis": {
+                "suitability_score": 0.9 - i * 0.01,
+                "match_reasons": ["금리 경쟁력", "가입 편의성"],
+                "risk_assessment": "보통",
+                "expected_benefit": "AI 추천 상품",
+            },
+            "user_specific": {
+                "recommended_monthly_amount": 300000,
+                "risk_compatibility": "적합",
+                "age_appropriateness": "적합",
+            },
+        })
+    return {
+        "success": True,
+        "is_financial_related": True,
+        "data": data,
+        "personalization_level": "high",
+        "user_insights": {"risk_profile": "안정형", "investment_capacity": "보통"},
+        "recommendation_reasoning": "사용자 프로필 기반 추천",
+        "ai_metadata": {"domain": "예금/적금", "total_products_analyzed": len(products), "processing_time": 1.2},
+        "session_id": "00000000-0000-0000-0000-000000000000",
+    }
+
+
+def fastapi_default(payload):
+    """기존 경로: jsonable_encoder → JSONResponse.render (json.dumps)"""
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def measure(encode, payload, repeat: int):
+    encode(payload)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode(payload)
+    micros = (time.perf_counter() - start) / repeat * 1e6
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    encode(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return micros, peak - before
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    catalog = get_product_catalog()
+    products = [product for product in catalog.products if "적금" in product.get("type", "") or "예금" in product.get("type", "")]
+
+    encoders = (
+        ("jsonable_encoder + json", fastapi_default),
+        ("orjson (FastJSONResponse)", encode_json),
+    )
+    for count in PRODUCT_COUNTS:
+        payload = build_payload(products, count)
+        size = len(fastapi_default(payload))
+        print(f"\n📦 상품 {count}개 응답 ({size / 1024:.1f}KB)")
+        baseline = None
+        for label, encode in encoders:
+            micros, peak = measure(encode, payload, repeat)
+            baseline = baseline or micros
+            print(f"  {label:<26} {micros:8.1f}μs  x{baseline / micros:5.1f}  할당 peak {peak / 1024:7.1f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# finpick-back/bench_yield_engine.py - 세후 만기 계산 벤치마크 (python bench_yield_engine.py)
+
+import time
+
+from app.services.product_catalog import find_catalog_path, load_catalog_products
+from app.services.rate_index import normalize_rate_product_type
+from app.services.yield_engine import INTEREST_TAX_RATE, YieldEngine
+
+SCENARIOS = [
+    ("예금", 10000000, 6), ("예금", 10000000, 12), ("예금", 10000000, 24), ("예금", 10000000, 36),
+    ("적금", 300000, 6), ("적금", 300000, 12), ("적금", 300000, 24), ("적금", 300000, 36),
+]
+ROUNDS = 200
+
+
+def python_loop(products, product_type, amount, period_months):
+    """비교용 상품별 파이썬 루프 구현"""
+    best = {}
+    for product in products:
+        if normalize_rate_product_type(product.get("type", "")) != product_type:
+            continue
+        details = product.get("details", {}) or {}
+        if (details.get("minimum_amount") or 0) > amount:
+            continue
+        if details.get("maximum_amount") and details["maximum_amount"] < amount:
+            continue
+        for rate in product.get("rates", []) or []:
+            if rate.get("period_months") != period_months:
+                continue
+            monthly = (rate.get("max_rate") or rate.get("base_rate") or 0) / 100 / 12
+            if product_type == "적금":
+                if rate.get("rate_type") == "복리":
+                    gross = sum(amount * ((1 + monthly) ** k - 1) for k in range(1, period_months + 1))
+                else:
+                    gross = amount * monthly * period_months * (period_months + 1) / 2
+            else:
+                if rate.get("rate_type") == "복리":
+                    gross = amount * ((1 + monthly) ** period_months - 1)
+                else:
+                    gross = amount * monthly * period_months
+            net = gross - int(gross * INTEREST_TAX_RATE)
+            best[product["id"]] = max(best.get(product["id"], 0), net)
+    return best
+
+
+def main():
+    path = find_catalog_path()
+    if not path:
+        print("❌ financial_products.json을 찾을 수 없습니다")
+        return
+    products, version = load_catalog_products(path)
+
+    started = time.perf_counter()
+    engine = YieldEngine.build(products)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"📦 카탈로그 {len(products)}개 상품 / 금리 행 {len(engine)}개 (version {version[:8]})")
+    print(f"🔧 배열 구축: {build_ms:.2f}ms")
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for product_type, amount, period in SCENARIOS:
+            engine.compute(product_type, amount, period)
+    vector_ms = (time.perf_counter() - started) * 1000 / (ROUNDS * len(SCENARIOS))
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for product_type, amount, period in SCENARIOS:
+            python_loop(products, product_type, amount, period)
+    loop_ms = (time.perf_counter() - started) * 1000 / (ROUNDS * len(SCENARIOS))
+
+    print(f"⚡ NumPy 전체 카탈로그 1회 계산: {vector_ms:.3f}ms")
+    print(f"🐢 파이썬 루프 1회 계산: {loop_ms:.3f}ms ({loop_ms / vector_ms:.1f}배)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+# finpick-back/gunicorn.conf.py
+# 실행: gunicorn -c gunicorn.conf.py app.main:app
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# 🗂️ 워커들이 하나의 mmap 카탈로그를 공유하도록 설정
+os.environ.setdefault("CATALOG_SHARED_MODE", "true")
+
+
+def on_starting(server):
+    """마스터 프로세스에서 fork 전에 카탈로그를 한 번만 컴파일"""
+    from app.services.product_catalog import main as compile_catalog
+    compile_catalog()
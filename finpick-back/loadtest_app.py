@@ -0,0 +1,23 @@
+# finpick-back/loadtest_app.py - 부하 테스트용 앱 진입점 (Firebase 토큰 검증 대신 테스트 검증기)
+# 실행: uvicorn loadtest_app:app --workers 4  (운영 배포에는 사용하지 말 것)
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.auth.dependencies import get_current_user
+from app.main import app
+from app.models.user import User
+
+LOADTEST_TOKEN_PREFIX = "loadtest-"
+
+
+async def loadtest_current_user(credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer())) -> User:
+    """`Bearer loadtest-<uid>` 토큰을 해당 uid 사용자로 인정"""
+    token = credentials.credentials
+    if not token.startswith(LOADTEST_TOKEN_PREFIX):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="부하 테스트 토큰이 아닙니다")
+    uid = token[len(LOADTEST_TOKEN_PREFIX):]
+    return User(uid=uid, email=f"{uid}@loadtest.local", email_verified=True)
+
+
+app.dependency_overrides[get_current_user] = loadtest_current_user
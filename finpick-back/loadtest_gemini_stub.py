@@ -0,0 +1,236 @@
+# finpick-back/loadtest_gemini_stub.py - Gemini generateContent 로컬 대역 서버 (부하 테스트용)
+# 실행: python loadtest_gemini_stub.py --port 8799 --latency lognormal:0.4,2.0 --error-rate 0.02
+# 앱 쪽은 GEMINI_API_ENDPOINT=http://127.0.0.1:8799 로 이 서버를 호출한다.
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# 프롬프트 유형 판별 표식 (gemini_service 프롬프트 문구 기준, 앞에서부터 검사)
+PROMPT_MARKERS = (
+    ("relevance", "관련이 있는지 판단"),
+    ("domain", "어떤 금융 도메인에 해당하는지"),
+    ("user_analysis", "도메인 관점에서 분석"),
+    ("product_selection", "selected_products"),
+    ("narrative", "2~3문장"),
+)
+JSON_PROMPT_TYPES = ("relevance", "user_analysis", "product_selection")
+
+_Z99 = 2.3263  # 표준정규분포 99분위
+
+
+def classify_prompt(prompt: str) -> str:
+    for prompt_type, marker in PROMPT_MARKERS:
+        if marker in prompt:
+            return prompt_type
+    return "generic"
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """지연 분포 문자열 → 샘플러 (초)
+
+    fixed:0.2 | uniform:0.1-0.5 | lognormal:<중앙값>,<p99>
+    """
+    kind, _, args = spec.partition(":")
+    if kind == "fixed":
+        value = float(args)
+        return lambda rng: value
+    if kind == "uniform":
+        low, high = (float(part) for part in args.split("-"))
+        return lambda rng: rng.uniform(low, high)
+    if kind == "lognormal":
+        median, p99 = (float(part) for part in args.split(","))
+        mu, sigma = math.log(median), math.log(p99 / median) / _Z99
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"알 수 없는 지연 분포: {spec}")
+
+
+def _quoted_after(prompt: str, label: str) -> str:
+    match = re.search(label + r'\s*"([^"]*)"', prompt)
+    return match.group(1) if match else ""
+
+
+def default_response(prompt_type: str, prompt: str, rng: random.Random) -> str:
+    """프롬프트 유형별 기본 응답 (도메인/상품 인덱스는 프롬프트 내용에 맞춤)"""
+    if prompt_type == "relevance":
+        return json.dumps({"is_related": True, "confidence": 0.95, "reason": "금융 상품 관련 질문"}, ensure_ascii=False)
+    if prompt_type == "domain":
+        return "대출" if "대출" in _quoted_after(prompt, "사용자 요구사항:") else "예금적금"
+    if prompt_type == "user_analysis":
+        return json.dumps({
+            "financial_goal": "안정적인 목돈 마련",
+            "time_horizon": "1-2년",
+            "priority_factors": ["금리", "안전성"],
+            "domain_specific": {"key_requirements": ["높은 금리"], "success_criteria": "목표 금액 달성"},
+        }, ensure_ascii=False)
+    if prompt_type == "product_selection":
+        total = re.search(r"전체 상품 목록 \((\d+)개\)", prompt)
+        limit = re.search(r"반드시 (\d+)개를 선택", prompt)
+        # 프롬프트에는 앞 50개 상품만 나열됨
+        candidates = min(int(total.group(1)) if total else 0, 50)
+        count = min(int(limit.group(1)) if limit else 5, candidates)
+        return json.dumps({"selected_products": [
+            {"index": index, "score": rng.randint(70, 95), "reason": "조건 적합", "strengths": ["금리 경쟁력"], "considerations": ["우대 조건 확인"]}
+            for index in rng.sample(range(candidates), count)
+        ]}, ensure_ascii=False)
+    if prompt_type == "narrative":
+        return "고객님의 목표 기간과 위험 성향에 맞춰 금리 경쟁력이 높은 상품을 골랐습니다. 우대 조건을 함께 확인해 보세요."
+    return json.dumps({"main_comment": "꾸준히 저축하고 있어요! 👍", "action_items": ["월 저축액 점검"], "motivation": "조금만 더 힘내요!", "tone": "positive"}, ensure_ascii=False)
+
+
+class StubConfig:
+    """대역 서버 동작 설정 (지연 분포, 오류율, 고정 응답)"""
+
+    def __init__(
+        self,
+        latency: str = "lognormal:0.4,2.0",
+        stage_latency: Optional[Dict[str, str]] = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        responses: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency = parse_latency(latency)
+        self.stage_latency = {stage: parse_latency(spec) for stage, spec in (stage_latency or {}).items()}
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        # 유형별 고정 응답 (문자열 또는 문자열 목록 - 목록이면 무작위 선택)
+        self.responses = responses or {}
+        self.rng = random.Random(seed)
+
+
+class GeminiStub:
+    """generateContent를 흉내 내는 ASGI 앱 + 유형별 호출/주입 오류 통계 (GET /stats, POST /stats/reset)"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, prompt_type: str, outcome: str):
+        with self._lock:
+            counts = self._stats.setdefault(prompt_type, {"ok": 0, "error": 0, "rate_limited": 0, "malformed": 0})
+            counts[outcome] += 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {prompt_type: dict(counts) for prompt_type, counts in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def _response_text(self, prompt_type: str, prompt: str) -> str:
+        canned = self.config.responses.get(prompt_type)
+        if isinstance(canned, list):
+            return self.config.rng.choice(canned)
+        if canned is not None:
+            return canned
+        return default_response(prompt_type, prompt, self.config.rng)
+
+    async def generate(self, body: Dict[str, Any]):
+        """요청 본문 → (HTTP 상태, 응답 dict)"""
+        config, rng = self.config, self.config.rng
+        prompt = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+        prompt_type = classify_prompt(prompt)
+        await asyncio.sleep(config.stage_latency.get(prompt_type, config.latency)(rng))
+
+        roll = rng.random()
+        if roll < config.error_rate:
+            self._count(prompt_type, "error")
+            return 503, {"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}}
+        if roll < config.error_rate + config.rate_limit_rate:
+            self._count(prompt_type, "rate_limited")
+            return 429, {"error": {"code": 429, "message": "Resource has been exhausted.", "status": "RESOURCE_EXHAUSTED"}}
+
+        text = self._response_text(prompt_type, prompt)
+        if prompt_type in JSON_PROMPT_TYPES and rng.random() < config.malformed_rate:
+            # 출력 토큰 한도에 걸린 것처럼 JSON 중간에서 자름
+            text = text[:max(1, int(len(text) * rng.uniform(0.3, 0.9)))]
+            self._count(prompt_type, "malformed")
+        else:
+            self._count(prompt_type, "ok")
+
+        prompt_tokens, output_tokens = len(prompt) // 2, len(text) // 2
+        return 200, {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": output_tokens,
+                "totalTokenCount": prompt_tokens + output_tokens,
+            },
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        path, method = scope["path"], scope["method"]
+        if method == "POST" and path.startswith("/v1beta/models/") and path.endswith(":generateContent"):
+            chunks = []
+            while True:
+                message = await receive()
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    break
+            status, payload = await self.generate(json.loads(b"".join(chunks) or b"{}"))
+        elif method == "GET" and path == "/stats":
+            status, payload = 200, self.stats()
+        elif method == "POST" and path == "/stats/reset":
+            self.reset()
+            status, payload = 200, {"reset": True}
+        else:
+            status, payload = 404, {"error": {"code": 404, "message": f"{method} {path}", "status": "NOT_FOUND"}}
+
+        content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await send({"type": "http.response.start", "status": status, "headers": [
+            (b"content-type", b"application/json; charset=utf-8"),
+            (b"content-length", str(len(content)).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": content})
+
+
+def _parse_stage_latency(values: List[str]) -> Dict[str, str]:
+    return dict(value.split("=", 1) for value in values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gemini generateContent 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency", default="lognormal:0.4,2.0", help="fixed:0.2 | uniform:0.1-0.5 | lognormal:<중앙값>,<p99>")
+    parser.add_argument("--stage-latency", action="append", default=[], help="유형별 지연 (예: product_selection=lognormal:1.2,4.0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 응답 비율")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="잘린 JSON 응답 비율")
+    parser.add_argument("--responses", help="유형별 고정 응답 JSON 파일 ({유형: 문자열 | [문자열, ...]})")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    responses = None
+    if args.responses:
+        with open(args.responses, "r", encoding="utf-8") as f:
+            responses = json.load(f)
+
+    import uvicorn
+    stub = GeminiStub(StubConfig(
+        latency=args.latency,
+        stage_latency=_parse_stage_latency(args.stage_latency),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        responses=responses,
+        seed=args.seed
+    ))
+    print(f"🤖 Gemini 대역 서버: http://{args.host}:{args.port} (지연 {args.latency}, 오류율 {args.error_rate:.1%})")
+    uvicorn.run(stub, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# finpick-back/loadtest_recommendations.py - 자연어 추천/시뮬레이션 API 부하 테스트
+# 실행: python loadtest_recommendations.py --workers 1,2,4 --rps 20 --duration 30 --latency lognormal:0.4,2.0 --error-rate 0.05
+#
+# 워커 수마다 Gemini 대역 서버(loadtest_gemini_stub.py)를 가리키는 uvicorn 앱(loadtest_app.py)을 띄우고,
+# 목표 RPS로 요청을 열린 루프(open-loop) 방식으로 보내 처리량/지연 백분위/폴백 비율을 보고한다.
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from app.services.batch_recommender import random_profile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 🗣️ 자연어 질의 (상품 유형만 말한 단순 질의는 사용자 유형별 추천 뷰 경로)
+NATURAL_QUERIES = [
+    "적금 추천해줘",
+    "예금 상품 알려줘",
+    "3년 동안 매달 50만원씩 모아서 결혼자금 만들고 싶어요",
+    "안전하게 목돈 굴릴 수 있는 정기예금 찾아줘",
+    "사회초년생인데 월 30만원으로 시작할 수 있는 적금",
+    "전세자금 대출 금리 낮은 곳 알려줘",
+    "신용대출 한도 많이 나오는 상품",
+    "노후 대비로 5년 이상 넣을 상품 추천",
+]
+SCENARIO_IDS = ["house", "retire", "baby"]
+FALLBACK_OUTCOMES = ("selection_fallback", "keyword_fallback", "rule_based")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """`nl=0.7,sim=0.3` → 정규화된 엔드포인트 비율"""
+    weights = {name: float(weight) for name, weight in (part.split("=") for part in spec.split(","))}
+    total = sum(weights.values())
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def build_request(kind: str, rng: random.Random) -> Tuple[str, Dict[str, Any]]:
+    """요청 종류 → (경로, JSON 본문)"""
+    if kind == "nl":
+        return "/api/recommendations/natural-language", {
+            "query": rng.choice(NATURAL_QUERIES),
+            "user_profile": random_profile(rng),
+            "limit": 5,
+        }
+    stochastic = rng.random() < 0.2
+    return "/api/simulation/calculate", {
+        "scenario_id": rng.choice(SCENARIO_IDS),
+        "monthly_amount": rng.randrange(300000, 1500001, 50000),
+        "target_years": rng.randint(3, 15),
+        "expected_return": round(rng.uniform(2.0, 6.0), 1),
+        "mode": "stochastic" if stochastic else "deterministic",
+        "n_paths": 5000,
+        "seed": rng.randint(0, 10 ** 6),
+    }
+
+
+def classify_response(kind: str, status_code: int, body: Optional[Dict[str, Any]]) -> str:
+    """응답 → 결과 유형 (ai / segment_view / selection_fallback / keyword_fallback / rule_based / unrelated / rejected / error)"""
+    if status_code == 429:
+        return "rejected"
+    if status_code != 200 or not isinstance(body, dict):
+        return "error"
+    if kind == "sim":
+        return "ai" if body.get("ai_analysis", {}).get("source") == "ai" else "rule_based"
+    if body.get("is_financial_related") is False:
+        return "unrelated"
+    if body.get("ai_metadata", {}).get("source") == "segment_view":
+        return "segment_view"
+    if body.get("recommendation_reasoning") == "키워드 기반 기본 추천":
+        return "keyword_fallback"
+    products = body.get("data") or []
+    if products and all(product.get("ai_analysis", {}).get("match_reasons") == ["다양성 기반 선택"] for product in products):
+        return "selection_fallback"
+    return "ai"
+
+
+def summarize(results: List[Tuple[str, str, float]], elapsed: float) -> Dict[str, Any]:
+    """(종류, 결과 유형, 지연초) 목록 → 종류별 처리량/지연 백분위/결과 분포"""
+    summary: Dict[str, Any] = {}
+    for kind in sorted({kind for kind, _, _ in results}):
+        rows = [(outcome, latency) for result_kind, outcome, latency in results if result_kind == kind]
+        latencies_ms = np.array([latency for _, latency in rows]) * 1000
+        outcomes: Dict[str, int] = {}
+        for outcome, _ in rows:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        answered = len(rows) - outcomes.get("error", 0) - outcomes.get("rejected", 0)
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+        summary[kind] = {
+            "requests": len(rows),
+            "throughput": round(answered / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "p99_ms": round(float(p99), 1),
+            "error_ratio": round(outcomes.get("error", 0) / len(rows), 4),
+            "rejected_ratio": round(outcomes.get("rejected", 0) / len(rows), 4),
+            "fallback_ratio": round(sum(outcomes.get(name, 0) for name in FALLBACK_OUTCOMES) / answered, 4) if answered else 0.0,
+            "outcomes": outcomes,
+        }
+    return summary
+
+
+async def run_load(base_url: str, rps: float, duration: float, mix: Dict[str, float], seed: int = 7, timeout: float = 60.0):
+    """목표 RPS로 요청 예약 - 지연은 예약 시각부터 측정 (응답 지연이 다음 요청을 늦추지 않음)"""
+    rng = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    results: List[Tuple[str, str, float]] = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def send(kind: str, path: str, body: Dict[str, Any], user_id: str, scheduled: float):
+            try:
+                response = await client.post(path, json=body, headers={"Authorization": f"Bearer loadtest-{user_id}"})
+                payload = response.json() if response.headers.get("content-type", "").startswith("application/json") else None
+                outcome = classify_response(kind, response.status_code, payload)
+            except (httpx.HTTPError, ValueError):
+                outcome = "error"
+            results.append((kind, outcome, time.perf_counter() - scheduled))
+
+        start = time.perf_counter()
+        tasks = []
+        for i in range(int(rps * duration)):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            kind = rng.choices(kinds, weights)[0]
+            path, body = build_request(kind, rng)
+            tasks.append(asyncio.create_task(send(kind, path, body, f"user{rng.randrange(1000)}", scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return summarize(results, elapsed), elapsed
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} 프로세스가 종료됨 (코드 {process.returncode})")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} 준비 시간 초과")
+
+
+def _stop(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def start_stub(port: int, args) -> subprocess.Popen:
+    command = [
+        sys.executable, os.path.join(HERE, "loadtest_gemini_stub.py"), "--port", str(port),
+        "--latency", args.latency, "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate), "--malformed-rate", str(args.malformed_rate),
+    ]
+    for spec in args.stage_latency:
+        command += ["--stage-latency", spec]
+    if args.responses:
+        command += ["--responses", args.responses]
+    process = subprocess.Popen(command, cwd=HERE)
+    _wait_until_ready(f"http://127.0.0.1:{port}/stats", process)
+    return process
+
+
+def start_app(port: int, workers: int, stub_url: str, data_dir: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "loadtest",
+        "GEMINI_API_ENDPOINT": stub_url,
+        "HISTORY_DB_PATH": os.path.join(data_dir, f"history_{workers}.sqlite3"),
+        "PYTHONUNBUFFERED": "1",
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "loadtest_app:app", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    # 앱의 디버그 print 출력은 버림 (부하 중 터미널 I/O가 지연을 왜곡하지 않도록)
+    process = subprocess.Popen(command, cwd=HERE, env=env, stdout=subprocess.DEVNULL)
+    _wait_until_ready(f"http://127.0.0.1:{port}/health", process)
+    return process
+
+
+def print_report(workers: int, summary: Dict[str, Any], elapsed: float, stub_stats: Dict[str, Dict[str, int]]):
+    print(f"\n⚙️ 워커 {workers}개 ({elapsed:.1f}초)")
+    for kind, row in summary.items():
+        print(
+            f"  {kind:<4} {row['requests']:>5}건  {row['throughput']:>7.2f} req/s  "
+            f"p50 {row['p50_ms']:>8.1f}ms  p95 {row['p95_ms']:>8.1f}ms  p99 {row['p99_ms']:>8.1f}ms  "
+            f"폴백 {row['fallback_ratio']:.1%}  429 {row['rejected_ratio']:.1%}  오류 {row['error_ratio']:.1%}"
+        )
+        print(f"       결과 분포: {row['outcomes']}")
+    injected = {}
+    for prompt_type, counts in stub_stats.items():
+        failures = {key: value for key, value in counts.items() if key != "ok" and value}
+        if failures:
+            injected[prompt_type] = failures
+    calls = sum(sum(counts.values()) for counts in stub_stats.values())
+    print(f"  🤖 Gemini 대역 호출 {calls}건, 주입된 실패: {injected or '없음'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="자연어 추천/시뮬레이션 API 부하 테스트")
+    parser.add_argument("--workers", default="1,2,4", help="비교할 uvicorn 워커 수 목록")
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="워커 수별 부하 시간(초)")
+    parser.add_argument("--mix", default="nl=0.7,sim=0.3", help="엔드포인트 비율 (nl: 자연어 추천, sim: 시뮬레이션)")
+    parser.add_argument("--base-url", help="이미 떠 있는 서버에 부하 (앱/대역 서버를 띄우지 않음)")
+    parser.add_argument("--seed", type=int, default=7)
+    # Gemini 대역 서버 설정 (loadtest_gemini_stub.py로 전달)
+    parser.add_argument("--latency", default="lognormal:0.4,2.0")
+    parser.add_argument("--stage-latency", action="append", default=[])
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--responses")
+    args = parser.parse_args(argv)
+    mix = parse_mix(args.mix)
+
+    print(f"🚀 목표 {args.rps:g} req/s × {args.duration:g}초, 비율 {mix}")
+    if args.base_url:
+        summary, elapsed = asyncio.run(run_load(args.base_url, args.rps, args.duration, mix, args.seed))
+        print_report(0, summary, elapsed, {})
+        return
+
+    stub_port = _free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    stub = start_stub(stub_port, args)
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            for workers in (int(value) for value in args.workers.split(",")):
+                port = _free_port()
+                server = start_app(port, workers, stub_url, data_dir)
+                try:
+                    httpx.post(f"{stub_url}/stats/reset")
+                    summary, elapsed = asyncio.run(run_load(f"http://127.0.0.1:{port}", args.rps, args.duration, mix, args.seed))
+                    print_report(workers, summary, elapsed, httpx.get(f"{stub_url}/stats").json())
+                finally:
+                    _stop(server)
+    finally:
+        _stop(stub)
+
+    print("\n🏁 부하 테스트 완료!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# finpick-back/test_admission.py - 사용자별 수락 제어/Gemini 가중 공정 큐 테스트
+
+import asyncio
+import os
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from fastapi import HTTPException
+
+import app.api.admission as admission_api
+from app.services.admission import (
+    LANE_BATCH,
+    LANE_INTERACTIVE,
+    AdmissionController,
+    AdmissionRejected,
+)
+from app.services.gemini_service import GeminiService
+
+
+def _controller(concurrency: int = 1, rate: float = 100.0, burst: int = 100, max_in_flight: int = 100) -> AdmissionController:
+    limits = {"rate": rate, "burst": burst, "max_in_flight": max_in_flight}
+    return AdmissionController(gemini_concurrency=concurrency, lane_limits={LANE_INTERACTIVE: dict(limits), LANE_BATCH: dict(limits)})
+
+
+def test_token_bucket_and_lane_capacity():
+    """사용자별 버스트 초과/차선 포화 시 거절, 다른 사용자는 영향 없음, 429 + Retry-After"""
+    async def run():
+        controller = _controller(rate=0.5, burst=2, max_in_flight=2)
+        for _ in range(2):
+            async with controller.admit("heavy"):
+                pass
+        try:
+            async with controller.admit("heavy"):
+                pass
+            assert False, "버스트 초과는 거절되어야 함"
+        except AdmissionRejected as e:
+            assert e.reason == "rate_limited" and e.retry_after == 2
+        async with controller.admit("light"):
+            pass
+
+        async with controller.admit("a"), controller.admit("b"):
+            try:
+                async with controller.admit("c"):
+                    pass
+                assert False, "차선 동시 처리 상한 초과는 거절되어야 함"
+            except AdmissionRejected as e:
+                assert e.reason == "queue_full" and e.retry_after >= 1
+        lane = controller.metrics()["lanes"][LANE_INTERACTIVE]
+        assert lane["rejected_rate_limited"] == 1 and lane["rejected_queue_full"] == 1 and lane["in_flight"] == 0
+
+        admission_api.get_admission_controller = lambda: controller
+        try:
+            async with admission_api.admit_or_429("heavy"):
+                pass
+            assert False, "429로 변환되어야 함"
+        except HTTPException as e:
+            assert e.status_code == 429 and e.headers["Retry-After"] == "2"
+
+    original = admission_api.get_admission_controller
+    try:
+        asyncio.run(run())
+    finally:
+        admission_api.get_admission_controller = original
+
+
+def test_fair_queue_and_priority_lanes():
+    """동시 호출 1개 - 몰아 보낸 사용자와 나중 사용자가 번갈아 배정, 대화형 차선이 배치 차선보다 먼저"""
+    async def run():
+        controller = _controller(concurrency=1)
+        order = []
+        release = asyncio.Event()
+
+        async def call(uid: str, lane: str):
+            async with controller.admit(uid, lane):
+                async with controller.gemini_slot():
+                    order.append(uid)
+                    await release.wait()
+
+        tasks = [asyncio.create_task(call("heavy", LANE_INTERACTIVE)) for _ in range(4)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(call("background", LANE_BATCH)))
+        tasks += [asyncio.create_task(call("light", LANE_INTERACTIVE)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        lanes = controller.metrics()["lanes"]
+        assert lanes[LANE_INTERACTIVE]["gemini_queue_depth"] == 5 and lanes[LANE_BATCH]["gemini_queue_depth"] == 1
+        release.set()
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(run())
+    assert order == ["heavy", "heavy", "light", "heavy", "light", "heavy", "background"], order
+
+
+def test_gemini_calls_use_slots():
+    """GeminiService 호출이 현재 요청의 차선으로 슬롯을 받음"""
+    class _Response:
+        text = "예금적금"
+
+    class _Model:
+        async def generate_content_async(self, prompt, generation_config=None):
+            return _Response()
+
+    async def run():
+        import app.services.gemini_service as gemini_module
+        controller = _controller(concurrency=2)
+        original = gemini_module.get_admission_controller
+        gemini_module.get_admission_controller = lambda: controller
+        try:
+            service = GeminiService(use_semantic_cache=False)
+            service.model = _Model()
+            async with controller.admit("u1", LANE_INTERACTIVE):
+                assert await service.classify_financial_domain("적금 추천") == "예금적금"
+        finally:
+            gemini_module.get_admission_controller = original
+        return controller.metrics()
+
+    metrics = asyncio.run(run())
+    assert metrics["lanes"][LANE_INTERACTIVE]["gemini_calls"] == 1 and metrics["gemini_running"] == 0
+
+
+if __name__ == "__main__":
+    test_token_bucket_and_lane_capacity()
+    test_fair_queue_and_priority_lanes()
+    test_gemini_calls_use_slots()
+    print("🏁 수락 제어 테스트 완료!")
@@ -0,0 +1,57 @@
+# finpick-back/test_allocation_engine.py - 월 예산 배분 테스트
+
+from app.services.allocation_engine import allocate_monthly_budget, monthly_budget_from_profile
+from app.services.yield_engine import YieldEngine
+
+
+def _savings(product_id, bank, rate, maximum, minimum=10000):
+    return {
+        "id": product_id, "name": f"{product_id} 적금", "type": "적금",
+        "provider": {"name": bank},
+        "details": {"minimum_amount": minimum, "maximum_amount": maximum},
+        "rates": [{"period_months": 12, "base_rate": rate, "max_rate": rate, "rate_type": "단리"}],
+    }
+
+
+PRODUCTS = [
+    _savings("a_top", "A은행", 7.0, 100000),
+    _savings("a_second", "A은행", 6.5, 500000),
+    _savings("b_mid", "B은행", 5.0, 300000),
+    _savings("c_big", "C은행", 4.0, None),
+    _savings("d_min", "D은행", 4.5, None, minimum=1000000),
+]
+
+
+def test_fills_higher_yield_first_with_caps_and_diversity():
+    """수익률 순으로 한도까지, 은행당 1개"""
+    engine = YieldEngine.build(PRODUCTS)
+    result = allocate_monthly_budget(engine, PRODUCTS, 400000, 12, max_products=3)
+
+    split = {item["product_id"]: item["monthly_amount"] for item in result["allocations"]}
+    assert split == {"a_top": 100000, "b_mid": 300000}
+    assert result["unallocated_amount"] == 0
+    assert 5.0 * 0.846 < result["blended_effective_rate"] < 7.0
+
+
+def test_swap_uses_larger_caps_when_product_count_is_limited():
+    """상품 수 한도 때문에 예산이 남으면 한도가 큰 상품으로 교환"""
+    engine = YieldEngine.build(PRODUCTS)
+    result = allocate_monthly_budget(engine, PRODUCTS, 2000000, 12, max_products=2)
+
+    split = {item["product_id"]: item["monthly_amount"] for item in result["allocations"]}
+    assert result["unallocated_amount"] == 0
+    assert sum(split.values()) == 2000000
+    assert "d_min" in split  # 최소 100만원 상품도 예산이 충분하면 선택 가능
+    assert len(split) == 2
+
+
+def test_monthly_budget_from_profile():
+    assert monthly_budget_from_profile({"goal_setting": {"monthly_budget": "500000"}}) == 500000
+    assert monthly_budget_from_profile({"goal_setting": {}}) is None
+
+
+if __name__ == "__main__":
+    test_fills_higher_yield_first_with_caps_and_diversity()
+    test_swap_uses_larger_caps_when_product_count_is_limited()
+    test_monthly_budget_from_profile()
+    print("🏁 월 예산 배분 테스트 완료!")
@@ -0,0 +1,83 @@
+# finpick-back/test_batch_recommender.py - 대량 배치 추천 테스트
+
+import json
+import os
+import tempfile
+
+from app.services.batch_recommender import checkpoint_path, recommend_profile, run_batch
+from bench_batch_recommender import write_profiles
+
+RECORD_COUNT = 230
+CHUNK_SIZE = 50
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def _read_lines(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.readlines()
+
+
+def test_recommend_profile_uses_segment_view():
+    """원본 프로필 표준화 → 사용자 유형 → 뷰 상품 + 사용자별 정보"""
+    views = {
+        ("예금적금", ("conservative", "young", "young_professional"), None, None): [
+            {"product_id": "s1", "name": "청년 적금", "bank_name": "A은행", "type": "적금", "interest_rate": 3.5,
+             "conditions": {}, "ai_analysis": {"suitability_score": 0.85}},
+        ]
+    }
+    record = {"user_id": "c1", "profile": {"basicInfo": {"age": "20대"}, "investmentProfile": {"totalScore": 10}}}
+
+    result = recommend_profile(record, views, limit=5)
+    assert result["user_id"] == "c1" and result["segment"] == ["conservative", "young", "young_professional"]
+    assert [item["product_id"] for item in result["recommendations"]] == ["s1"]
+    assert result["recommendations"][0]["user_specific"]["risk_compatibility"] == "매우 적합"
+    assert "conditions" not in result["recommendations"][0]
+
+
+def test_batch_output_and_resume():
+    """입력 순서대로 출력, 프로세스 풀/중단 후 resume 결과가 한 번에 처리한 결과와 동일"""
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "profiles.jsonl")
+        write_profiles(input_path, RECORD_COUNT)
+        with open(input_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"user_id": "broken", "profile": {"basicInfo": "잘못된 형식"}}) + "\n")
+
+        full_path = os.path.join(directory, "full.jsonl")
+        summary = run_batch(input_path, full_path, chunk_size=CHUNK_SIZE)
+        full = _read_lines(full_path)
+        assert summary["records"] == RECORD_COUNT + 1 and summary["errors"] == 1
+        assert [json.loads(line)["user_id"] for line in full[:3]] == ["customer_0", "customer_1", "customer_2"]
+        assert "error" in json.loads(full[-1])
+
+        parallel_path = os.path.join(directory, "parallel.jsonl")
+        run_batch(input_path, parallel_path, workers=2, chunk_size=CHUNK_SIZE)
+        assert _read_lines(parallel_path) == full
+
+        resumed_path = os.path.join(directory, "resumed.jsonl")
+
+        def interrupt(status):
+            if status["chunks"] == 2:
+                raise _Interrupted()
+
+        try:
+            run_batch(input_path, resumed_path, chunk_size=CHUNK_SIZE, progress=interrupt)
+        except _Interrupted:
+            pass
+        with open(checkpoint_path(resumed_path), "r", encoding="utf-8") as f:
+            assert json.load(f)["completed_chunks"] == 2
+
+        summary = run_batch(input_path, resumed_path, chunk_size=CHUNK_SIZE, resume=True)
+        assert summary["resumed_from"] == 2 and summary["processed"] == RECORD_COUNT + 1 - 2 * CHUNK_SIZE
+        assert _read_lines(resumed_path) == full
+
+        # 완료된 작업을 다시 resume하면 아무것도 처리하지 않음
+        assert run_batch(input_path, resumed_path, chunk_size=CHUNK_SIZE, resume=True)["processed"] == 0
+
+
+if __name__ == "__main__":
+    test_recommend_profile_uses_segment_view()
+    test_batch_output_and_resume()
+    print("🏁 대량 배치 추천 테스트 완료!")
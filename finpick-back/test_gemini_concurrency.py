@@ -0,0 +1,99 @@
+# finpick-back/test_gemini_concurrency.py - Gemini 단계 동시 실행 테스트
+
+import asyncio
+import os
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from app.services.gemini_service import GeminiService
+
+STAGE_DELAY = 0.2
+
+SAMPLE_PRODUCTS = [
+    {"id": "d1", "name": "안심 정기예금", "type": "예금", "provider": {"name": "우리은행"}, "details": {"interest_rate": 2.5, "minimum_amount": 10000}},
+    {"id": "s1", "name": "청년 적금", "type": "적금", "provider": {"name": "신한은행"}, "details": {"interest_rate": 3.1, "minimum_amount": 10000}},
+    {"id": "s2", "name": "자유 적금", "type": "적금", "provider": {"name": "우리은행"}, "details": {"interest_rate": 2.9, "minimum_amount": 10000}},
+    {"id": "l1", "name": "직장인 신용대출", "type": "신용대출", "provider": {"name": "하나은행"}, "details": {"interest_rate": 4.8, "minimum_amount": 1000000}},
+]
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _FakeModel:
+    """프롬프트 종류별로 고정 응답을 지연 후 반환하는 테스트용 모델"""
+
+    def __init__(self, related: bool = True, domain: str = "예금적금", fail_selection: bool = False):
+        self.related = related
+        self.domain = domain
+        self.fail_selection = fail_selection
+        self.calls = []
+
+    async def generate_content_async(self, prompt: str):
+        await asyncio.sleep(STAGE_DELAY)
+        if "관련이 있는지 판단" in prompt:
+            self.calls.append("relevance")
+            return _FakeResponse('{"is_related": %s, "confidence": 0.9, "reason": "테스트"}' % str(self.related).lower())
+        if "도메인에 해당하는지" in prompt:
+            self.calls.append("domain")
+            return _FakeResponse(self.domain)
+        if "관점에서 분석" in prompt:
+            self.calls.append("analysis")
+            domain = "대출" if "도메인: 대출" in prompt else "예금적금"
+            return _FakeResponse('{"financial_goal": "%s 목표", "time_horizon": "1년", "priority_factors": ["금리"]}' % domain)
+        self.calls.append("selection")
+        if self.fail_selection:
+            return _FakeResponse("JSON 아님")
+        return _FakeResponse('{"selected_products": [{"index": 0, "score": 90, "reason": "테스트", "strengths": ["금리"]}]}')
+
+
+def _run(service: GeminiService, query: str):
+    start = time.perf_counter()
+    result = asyncio.run(service.recommend_financial_model(query, None, SAMPLE_PRODUCTS, limit=2))
+    return result, time.perf_counter() - start
+
+
+def _service(concurrent: bool, **model_kwargs) -> GeminiService:
+    service = GeminiService(concurrent_stages=concurrent, use_semantic_cache=False)
+    service.model = _FakeModel(**model_kwargs)
+    return service
+
+
+def test_concurrent_matches_sequential():
+    """동시 실행 결과가 순차 실행 결과와 동일한지"""
+    for kwargs, query in [
+        ({}, "안전한 적금 추천해줘"),
+        ({"domain": "대출"}, "급하게 돈이 필요해"),
+        ({"fail_selection": True}, "예금 추천"),
+        ({"related": False}, "오늘 날씨 어때"),
+    ]:
+        sequential, _ = _run(_service(False, **kwargs), query)
+        concurrent, _ = _run(_service(True, **kwargs), query)
+        assert sequential == concurrent, kwargs
+
+
+def test_concurrent_latency():
+    """동시 실행 시 지연이 (가장 느린 단계 + 상품 선택) 수준으로 줄어드는지"""
+    _, sequential_time = _run(_service(False), "안전한 적금 추천해줘")
+    _, concurrent_time = _run(_service(True), "안전한 적금 추천해줘")
+    assert sequential_time >= STAGE_DELAY * 4
+    assert concurrent_time < STAGE_DELAY * 3
+
+
+def test_unrelated_query_cancels_speculative_work():
+    """관련 없는 질문이면 추측 단계 작업이 취소되는지"""
+    service = _service(True, related=False)
+    result, elapsed = _run(service, "오늘 날씨 어때")
+    assert result["is_financial_related"] is False
+    assert "selection" not in service.model.calls
+    assert elapsed < STAGE_DELAY * 2
+
+
+if __name__ == "__main__":
+    test_concurrent_matches_sequential()
+    test_concurrent_latency()
+    test_unrelated_query_cancels_speculative_work()
+    print("🏁 동시 실행 테스트 완료!")
@@ -0,0 +1,122 @@
+# finpick-back/test_gemini_replay.py - Gemini 트래픽 기록/재생 및 오프라인 재생 실행기 테스트
+
+import asyncio
+import json
+import os
+import random
+import tempfile
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import app.services.gemini_replay as replay_module
+from app.config import settings
+from app.services.gemini_replay import RecordingModel, ReplayModel, get_traffic_log, read_traffic, traffic_files
+from app.services.gemini_service import GeminiService
+from app.services.product_catalog import get_product_catalog
+from app.services.replay_runner import diff_outputs, load_queries, run_replay, summarize_result
+from loadtest_gemini_stub import classify_prompt, default_response
+
+QUERIES = ["월 50만원씩 3년 적금 추천해줘", "전세자금 대출 금리 낮은 곳", "비상금 넣어둘 예금 알려줘"]
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _StubModel:
+    """부하 테스트 대역 서버와 같은 기본 응답 - 같은 프롬프트에는 같은 응답 (재생 시 첫 응답을 쓰므로)"""
+
+    async def generate_content_async(self, prompt: str, generation_config=None):
+        return _Response(default_response(classify_prompt(prompt), prompt, random.Random(prompt)))
+
+
+def _record(directory: str):
+    """기록 모드로 질의들을 처리 - 질의별 요약 결과 반환"""
+    original = (settings.gemini_replay_mode, settings.gemini_replay_path, replay_module._traffic_log)
+    settings.gemini_replay_mode, settings.gemini_replay_path, replay_module._traffic_log = "record", directory, None
+    try:
+        async def run():
+            service = GeminiService(use_semantic_cache=False)
+            service.model = RecordingModel(_StubModel(), get_traffic_log())
+            products = get_product_catalog().products
+            return [
+                summarize_result(await service.recommend_financial_model(query, None, products, 3))
+                for query in QUERIES
+            ]
+
+        results = asyncio.run(run())
+        get_traffic_log().close()
+        return results
+    finally:
+        settings.gemini_replay_mode, settings.gemini_replay_path, replay_module._traffic_log = original
+
+
+def test_replay_reproduces_recorded_results():
+    """기록한 질의를 재생하면 네트워크 없이 미스 0건으로 같은 결과, 자기 자신과의 비교는 전부 동일"""
+    with tempfile.TemporaryDirectory() as directory:
+        recorded = _record(directory)
+        assert [query["user_query"] for query in load_queries(directory)] == QUERIES
+        assert all(record["prompt_hash"] for record in read_traffic(directory) if record["kind"] == "call")
+
+        output = os.path.join(directory, "before.jsonl")
+        summary = run_replay(directory, output, workers=1)
+        assert summary["queries"] == len(QUERIES) and summary["calls"] > 0 and summary["misses"] == 0
+
+        with open(output, encoding="utf-8") as f:
+            replayed = [json.loads(line)["result"] for line in f]
+        assert replayed == recorded
+
+        same = diff_outputs(output, output)
+        assert same["identical"] == len(QUERIES) and same["changed"] == 0
+
+
+def test_diff_detects_changed_recommendations():
+    """상품이 바뀐 질의는 변경으로, 순서만 바뀐 질의는 reordered_only로 집계"""
+    def output(key, product_ids, domain="예금적금"):
+        result = {"success": True, "domain": domain, "products": [{"product_id": pid} for pid in product_ids]}
+        return json.dumps({"query_key": key, "user_query": key, "replay": {"hits": 4, "misses": 0}, "result": result})
+
+    with tempfile.TemporaryDirectory() as directory:
+        before, after = os.path.join(directory, "before.jsonl"), os.path.join(directory, "after.jsonl")
+        with open(before, "w", encoding="utf-8") as f:
+            f.write("\n".join([output("a", ["p1", "p2"]), output("b", ["p1", "p2"]), output("c", ["p3"]), output("d", ["p4"])]))
+        with open(after, "w", encoding="utf-8") as f:
+            f.write("\n".join([output("a", ["p1", "p2"]), output("b", ["p2", "p1"]), output("c", ["p5"], "대출")]))
+
+        summary = diff_outputs(before, after)
+        assert (summary["compared"], summary["identical"], summary["changed"]) == (3, 1, 2)
+        assert summary["reordered_only"] == 1 and summary["domain_changed"] == 1
+        assert summary["only_before"] == 1 and summary["only_after"] == 0
+        assert summary["mean_product_overlap"] == round((1 + 1 + 0) / 3, 4)
+
+
+def test_truncated_log_keeps_earlier_records():
+    """비정상 종료로 잘린 로그도 앞부분 레코드는 읽고, 없는 프롬프트는 미스로 집계"""
+    with tempfile.TemporaryDirectory() as directory:
+        log = replay_module.TrafficLog(directory)
+        for index in range(200):
+            log.append({"kind": "call", "prompt_hash": replay_module.prompt_hash(f"p{index}"), "response": f"r{index}"})
+        log.close()
+
+        path = traffic_files(directory)[0]
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[: len(data) * 2 // 3])
+
+        replay = ReplayModel.from_records(read_traffic(directory))
+        assert 0 < len(replay.responses) < 200
+        assert asyncio.run(replay.generate_content_async("p0")).text == "r0"
+        try:
+            asyncio.run(replay.generate_content_async("없는 프롬프트"))
+            assert False, "ReplayMiss 예상"
+        except replay_module.ReplayMiss:
+            assert replay.misses == 1
+
+
+if __name__ == "__main__":
+    test_replay_reproduces_recorded_results()
+    test_diff_detects_changed_recommendations()
+    test_truncated_log_keeps_earlier_records()
+    print("🏁 Gemini 트래픽 기록/재생 테스트 완료!")
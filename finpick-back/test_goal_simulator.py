@@ -0,0 +1,39 @@
+# finpick-back/test_goal_simulator.py - 몬테카를로 목표 달성 시뮬레이션 테스트
+
+from app.services.goal_simulator import simulate_goal
+
+
+def test_seeded_runs_are_reproducible_and_ordered():
+    """같은 시드는 같은 결과, 백분위 밴드는 P10 ≤ P50 ≤ P90"""
+    first = simulate_goal(500000, 5, 3.0, target_amount=32000000, n_paths=12000, seed=42)
+    second = simulate_goal(500000, 5, 3.0, target_amount=32000000, n_paths=12000, seed=42)
+
+    assert first == second
+    assert len(first["bands"]) == 5
+    for band in first["bands"]:
+        assert band["p10"] <= band["p50"] <= band["p90"]
+        assert band["p10"] >= band["principal"]  # 금리는 0 아래로 내려가지 않음
+    assert 0.0 <= first["success_probability"] <= 1.0
+
+
+def test_zero_volatility_matches_deterministic_compound():
+    """변동성 0이면 모든 경로가 고정금리 월복리 결과와 같음"""
+    result = simulate_goal(1000000, 10, 4.0, n_paths=1000, seed=1, volatility=0.0)
+    monthly_rate = 0.04 / 12
+    expected = 1000000 * ((1 + monthly_rate) ** 120 - 1) / monthly_rate
+    assert abs(result["final"]["p10"] - expected) < 2
+    assert result["final"]["p10"] == result["final"]["p90"]
+
+
+def test_process_pool_sharding_is_deterministic():
+    """워커 수와 무관하게 같은 시드면 같은 분포"""
+    single = simulate_goal(300000, 3, 3.0, target_amount=11000000, n_paths=25000, seed=3)
+    sharded = simulate_goal(300000, 3, 3.0, target_amount=11000000, n_paths=25000, seed=3, workers=2)
+    assert single == sharded
+
+
+if __name__ == "__main__":
+    test_seeded_runs_are_reproducible_and_ordered()
+    test_zero_volatility_matches_deterministic_compound()
+    test_process_pool_sharding_is_deterministic()
+    print("🏁 몬테카를로 시뮬레이션 테스트 완료!")
@@ -0,0 +1,70 @@
+# finpick-back/test_goal_solver.py - 상품별 목표 달성 계산 테스트
+
+import asyncio
+import math
+
+from fastapi import HTTPException
+
+from app.api.simulation import optimize_plan
+from app.services.goal_solver import solve_required_monthly, solve_required_months
+from app.services.yield_engine import YieldEngine
+
+PRODUCTS = [
+    {
+        "id": "s_high", "name": "고금리 적금", "type": "적금",
+        "details": {"minimum_amount": 10000, "maximum_amount": 300000},
+        "rates": [{"period_months": 12, "base_rate": 5.0, "max_rate": 6.0, "rate_type": "단리"}],
+    },
+    {
+        "id": "s_low", "name": "기본 적금", "type": "적금",
+        "details": {"minimum_amount": 10000, "maximum_amount": None},
+        "rates": [{"period_months": 12, "base_rate": 3.0, "max_rate": 3.0, "rate_type": "단리"}],
+    },
+    {
+        "id": "d1", "name": "정기예금", "type": "예금",
+        "details": {"minimum_amount": 1000000},
+        "rates": [{"period_months": 12, "base_rate": 3.5, "max_rate": 3.5, "rate_type": "단리"}],
+    },
+]
+
+
+def test_required_monthly_respects_limits():
+    """월 한도를 넘는 상품은 제외, 최소가입금액 미만이면 최소금액으로 상향"""
+    engine = YieldEngine.build(PRODUCTS)
+
+    small = {item["product_id"]: item for item in solve_required_monthly(engine, 3000000, 12)}
+    assert small["s_high"]["required_monthly"] == math.ceil(3000000 / (12 + 12 * 13 / 2 * 0.06 / 12 * (1 - 0.154)))
+    assert small["d1"]["required_monthly"] == 1000000  # 예금 최소가입금액으로 상향
+    assert list(small)[0] == "s_high"
+
+    large = [item["product_id"] for item in solve_required_monthly(engine, 12000000, 12)]
+    assert "s_high" not in large  # 월 30만원 한도 초과
+    assert large == ["s_low", "d1"]  # 12개월 풍차돌리기는 첫 예금만 만기
+
+
+def test_required_months_and_rollover():
+    """월 납입액 기준 최단 기간 - 적금은 만기마다 재가입"""
+    engine = YieldEngine.build(PRODUCTS)
+    results = solve_required_months(engine, 7500000, 300000)
+
+    assert [item["product_id"] for item in results][:2] == ["s_high", "s_low"]
+    assert results[0]["required_months"] == 25  # 12개월 2주기 원리금 + 1개월 원금
+    assert all(item["product_id"] != "d1" for item in results)  # 최소가입금액 100만원 미달
+    assert solve_required_months(engine, 10 ** 12, 300000) == []
+
+
+def test_optimize_rejects_non_positive_inputs():
+    """/optimize 음수 월납입액/기간은 500이 아니라 400"""
+    for params in ({"available_monthly": -100000}, {"target_years": -3}, {"target_amount": 0, "target_years": 5}):
+        try:
+            asyncio.run(optimize_plan("house", current_user={}, **params))
+            assert False, f"{params} 는 거절되어야 함"
+        except HTTPException as error:
+            assert error.status_code == 400
+
+
+if __name__ == "__main__":
+    test_required_monthly_respects_limits()
+    test_required_months_and_rollover()
+    test_optimize_rejects_non_positive_inputs()
+    print("🏁 목표 달성 계산 테스트 완료!")
@@ -0,0 +1,227 @@
+# finpick-back/test_history_store.py - 추천 이력 write-behind 저장소 테스트
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+from app.services.history_store import HistoryStore, SQLiteHistoryBackend
+
+
+def _session(user_id: str, index: int):
+    return {
+        "session_id": f"{user_id}-{index:04d}",
+        "user_id": user_id,
+        "query": f"적금 추천 {index}",
+        "created_at": f"2024-07-11T00:{index // 60:02d}:{index % 60:02d}",
+        "response": {"success": True, "data": [{"product_id": f"p{index}"}]},
+    }
+
+
+def _backend(directory: str) -> SQLiteHistoryBackend:
+    return SQLiteHistoryBackend(os.path.join(directory, "history.sqlite3"))
+
+
+def test_batched_writes_and_flush_on_stop():
+    """기록은 배치로 모아 쓰고, 종료 시 남은 기록을 모두 저장"""
+    async def scenario(directory):
+        store = HistoryStore(_backend(directory), batch_size=100, flush_interval=10.0)
+        for index in range(250):
+            await store.record_session(_session("u1", index))
+        await store.record_feedback({"feedback_id": "f1", "user_id": "u1", "recommendation_id": "u1-0001", "rating": 5, "created_at": "2024-07-11T01:00:00"})
+        await store.stop()
+        return store.metrics()
+
+    with tempfile.TemporaryDirectory() as directory:
+        metrics = asyncio.run(scenario(directory))
+        assert metrics["written_sessions"] == 250 and metrics["written_feedback"] == 1
+        assert metrics["batches"] <= 4
+
+        backend = _backend(directory)
+        assert backend.count_history("u1") == 250
+        assert backend.read_history("u1", 1)[0]["session_id"] == "u1-0249"
+        backend.close()
+
+
+def test_paginated_history_from_lru():
+    """첫 조회는 저장소, 이후 페이지와 새 기록은 LRU에서 최신순으로 응답"""
+    async def scenario(directory):
+        store = HistoryStore(_backend(directory), flush_interval=0.01, cache_sessions=20)
+        for index in range(30):
+            await store.record_session(_session("u1", index))
+
+        first = await store.get_history("u1", page=1, page_size=10)
+        await store.record_session(_session("u1", 30))
+        second = await store.get_history("u1", page=1, page_size=10)
+        old_page = await store.get_history("u1", page=3, page_size=10)
+        other = await store.get_history("u2", page=1, page_size=10)
+        await store.stop()
+        return first, second, old_page, other
+
+    with tempfile.TemporaryDirectory() as directory:
+        first, second, old_page, other = asyncio.run(scenario(directory))
+
+    assert first["source"] == "store" and first["total"] == 30
+    assert [item["session_id"] for item in first["items"]][:2] == ["u1-0029", "u1-0028"]
+
+    assert second["source"] == "cache" and second["total"] == 31
+    assert second["items"][0]["session_id"] == "u1-0030"
+    assert second["items"][1:] == first["items"][:9]
+
+    # LRU(20건) 밖 페이지는 저장소에서 조회
+    assert old_page["source"] == "store"
+    assert [item["session_id"] for item in old_page["items"]] == [f"u1-{index:04d}" for index in range(10, 0, -1)]
+    assert old_page["has_next"] is True
+
+    assert other["items"] == [] and other["total"] == 0 and other["has_next"] is False
+
+
+def test_bounded_queue_backpressure():
+    """큐가 가득 차면 기록하는 쪽이 잠시 대기하고, 저장소가 정상이면 기록은 유실되지 않음"""
+    async def scenario(directory):
+        store = HistoryStore(_backend(directory), queue_size=5, batch_size=5, flush_interval=0.01, enqueue_timeout=5.0)
+        await asyncio.gather(*(store.record_session(_session("u1", index)) for index in range(40)))
+        await store.stop()
+        return store.metrics()
+
+    with tempfile.TemporaryDirectory() as directory:
+        metrics = asyncio.run(scenario(directory))
+    assert metrics["backpressure_waits"] > 0 and metrics["dropped"] == 0
+    assert metrics["written_sessions"] == 40
+
+
+class _FlakyBackend(SQLiteHistoryBackend):
+    """처음 failures번은 쓰기 실패"""
+
+    def __init__(self, path: str, failures: int):
+        super().__init__(path)
+        self.failures = failures
+
+    def write_batch(self, sessions, feedback):
+        if self.failures > 0:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        super().write_batch(sessions, feedback)
+
+
+def test_failed_batches_are_retried_not_dropped():
+    """저장 실패 배치는 백오프 후 재시도, 종료 시에도 남은 실패분을 다시 시도"""
+    async def scenario(directory):
+        store = HistoryStore(_FlakyBackend(os.path.join(directory, "history.sqlite3"), failures=2), flush_interval=0.01)
+        for index in range(10):
+            await store.record_session(_session("u1", index))
+        await store.record_feedback({"feedback_id": "f1", "user_id": "u1", "rating": 4, "created_at": "2024-07-11T01:00:00"})
+        await store.stop()
+        return store.metrics()
+
+    with tempfile.TemporaryDirectory() as directory:
+        metrics = asyncio.run(scenario(directory))
+        assert metrics["write_errors"] == 2 and metrics["retry_pending"] == 0
+        assert metrics["written_sessions"] == 10 and metrics["written_feedback"] == 1
+
+        backend = _backend(directory)
+        assert backend.count_history("u1") == 10
+        backend.close()
+
+
+class _DownBackend(SQLiteHistoryBackend):
+    """down인 동안 쓰기가 계속 실패하는 저장소"""
+
+    down = True
+
+    def write_batch(self, sessions, feedback):
+        if self.down:
+            raise sqlite3.OperationalError("disk I/O error")
+        super().write_batch(sessions, feedback)
+
+
+def test_failing_store_never_blocks_recording():
+    """저장소 장애가 계속되어도 기록 호출은 enqueue_timeout 안에 끝나고, 재시도 중에도 큐를 계속 비움 (보관 상한 queue_size)"""
+    async def scenario(directory):
+        store = HistoryStore(
+            _DownBackend(os.path.join(directory, "history.sqlite3")),
+            queue_size=5, batch_size=5, flush_interval=0.01, enqueue_timeout=0.01
+        )
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for index in range(30):
+            await store.record_session(_session("u1", index))
+            await asyncio.sleep(0.005)
+        elapsed = loop.time() - started
+        during_outage = store.metrics()
+        # 복구되면 보관 중이던 기록은 종료 시 모두 저장
+        store.backend.down = False
+        await store.stop()
+        return elapsed, during_outage, store.metrics()
+
+    with tempfile.TemporaryDirectory() as directory:
+        elapsed, during_outage, final = asyncio.run(scenario(directory))
+    assert elapsed < 2.0
+    assert during_outage["write_errors"] >= 1 and during_outage["dropped"] > 0
+    assert 0 < during_outage["retry_pending"] <= 5
+    assert final["written_sessions"] + final["dropped"] == 30 and final["retry_pending"] == 0
+
+
+class _CountingBackend(SQLiteHistoryBackend):
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.reads = 0
+
+    def read_history(self, user_id, limit, offset=0):
+        self.reads += 1
+        return super().read_history(user_id, limit, offset)
+
+    def count_history(self, user_id):
+        self.reads += 1
+        return super().count_history(user_id)
+
+
+def test_cached_reads_skip_store_until_commit_or_ttl():
+    """LRU 적중 조회는 저장소를 읽지 않고, 이 워커의 커밋 후나 TTL이 지나 다른 워커 기록이 보일 때만 다시 읽음"""
+    async def scenario(directory):
+        backend = _CountingBackend(os.path.join(directory, "history.sqlite3"))
+        worker_a = HistoryStore(backend, flush_interval=0.01, cache_ttl=0.2)
+        worker_b = HistoryStore(_backend(directory), flush_interval=0.01)
+        for index in range(5):
+            await worker_a.record_session(_session("u1", index))
+        first = await worker_a.get_history("u1", page=1, page_size=10)
+        reads = backend.reads
+        cached = [await worker_a.get_history("u1", page=1, page_size=10) for _ in range(5)]
+        cached_reads = backend.reads - reads
+
+        # 이 워커 기록: 커밋 전에는 LRU에 바로 보이고, 커밋 후 한 번 다시 읽음
+        await worker_a.record_session(_session("u1", 5))
+        own = await worker_a.get_history("u1", page=1, page_size=10)
+        await worker_a.flush()
+        after_commit = await worker_a.get_history("u1", page=1, page_size=10)
+
+        # 다른 워커 기록은 TTL이 지나면 반영
+        await worker_b.record_session(_session("u1", 6))
+        await worker_b.flush()
+        before_ttl = await worker_a.get_history("u1", page=1, page_size=10)
+        await asyncio.sleep(0.25)
+        after_ttl = await worker_a.get_history("u1", page=1, page_size=10)
+        await worker_a.stop()
+        await worker_b.stop()
+        return first, cached, cached_reads, own, after_commit, before_ttl, after_ttl, worker_a.metrics()
+
+    with tempfile.TemporaryDirectory() as directory:
+        first, cached, cached_reads, own, after_commit, before_ttl, after_ttl, metrics = asyncio.run(scenario(directory))
+
+    assert first["total"] == 5 and all(page["source"] == "cache" for page in cached) and cached_reads == 0
+    assert own["source"] == "cache" and own["items"][0]["session_id"] == "u1-0005"
+    assert after_commit["source"] == "store" and after_commit["total"] == 6
+    assert before_ttl["source"] == "cache" and before_ttl["total"] == 6
+    assert after_ttl["source"] == "store" and after_ttl["total"] == 7
+    assert after_ttl["items"][0]["session_id"] == "u1-0006"
+    assert metrics["cache_refreshes"] == 2
+
+
+if __name__ == "__main__":
+    test_batched_writes_and_flush_on_stop()
+    test_paginated_history_from_lru()
+    test_bounded_queue_backpressure()
+    test_failed_batches_are_retried_not_dropped()
+    test_failing_store_never_blocks_recording()
+    test_cached_reads_skip_store_until_commit_or_ttl()
+    print("🏁 추천 이력 저장소 테스트 완료!")
@@ -0,0 +1,156 @@
+# finpick-back/test_llm_json.py - LLM 응답 JSON 추출/복구/스키마 검증 테스트
+
+import asyncio
+import os
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import app.services.gemini_service as gemini_module
+from app.services.gemini_service import GeminiService
+from app.services.llm_json import LLMJSONError, llm_json_metrics, loads_tolerant, parse_stage_response, validate_stage
+
+PRODUCTS = [
+    {"id": f"p{i}", "name": f"적금{i}", "type": "적금", "provider": {"name": f"{i}은행"}, "details": {"interest_rate": 3.0, "minimum_amount": 10000}}
+    for i in range(4)
+]
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _StructuredModel:
+    """generation_config를 받는 모델 - 잘린 선택 결과를 반환"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.configs = []
+
+    async def generate_content_async(self, prompt: str, generation_config=None):
+        self.configs.append(generation_config)
+        return _FakeResponse(self.text)
+
+
+def test_tolerant_parsing():
+    """코드 펜스, 설명 문장, 후행 쉼표, 잘린 배열/객체 복구"""
+    assert loads_tolerant('{"a": 1}') == ({"a": 1}, False)
+    assert loads_tolerant('```json\n{"a": [1, 2,],}\n```') == ({"a": [1, 2]}, True)
+    assert loads_tolerant('결과입니다 {"a": "}"} 참고하세요 {b}') == ({"a": "}"}, True)
+    assert loads_tolerant('{"items": [{"i": 0}, {"i": 1}, {"i": 2, "na') == ({"items": [{"i": 0}, {"i": 1}, {"i": 2}]}, True)
+    assert loads_tolerant('{"ok": true, "reason": "이유"') == ({"ok": True, "reason": "이유"}, True)
+    # 설명 문장 속 대괄호/중괄호는 건너뛰고 객체부터
+    assert loads_tolerant('다음은 [분석 결과]입니다: {"is_related": true}') == ({"is_related": True}, True)
+    assert loads_tolerant('Note: see [1].\n{"is_related": false, "confidence": 0.4}') == ({"is_related": False, "confidence": 0.4}, True)
+    assert loads_tolerant('형식 {예시} 참고, 결과: {"is_related": true}') == ({"is_related": True}, True)
+    assert parse_stage_response("relevance", '참고 [1]\n```json\n{"is_related": true,}\n```')["is_related"] is True
+    try:
+        loads_tolerant("JSON이 아닌 응답")
+        assert False, "JSON이 없으면 실패해야 함"
+    except LLMJSONError:
+        pass
+
+
+def test_partial_acceptance():
+    """스키마에 맞지 않는 목록 항목/선택 필드만 버림, 필수 필드 누락은 실패"""
+    selection, dropped = validate_stage("product_selection", {"selected_products": [
+        {"index": 0, "score": 90}, {"index": "첫번째", "score": 80}, {"index": 2}, {"index": 3, "score": "70"},
+    ]})
+    assert [item["index"] for item in selection["selected_products"]] == [0, 3] and dropped == 2
+    assert selection["selected_products"][1]["score"] == 70.0
+
+    analysis, dropped = validate_stage("user_analysis", {"financial_goal": "목돈", "priority_factors": "금리"})
+    assert analysis == {"financial_goal": "목돈"} and dropped == 1
+
+    try:
+        validate_stage("relevance", {"confidence": 0.9})
+        assert False, "필수 필드 누락은 실패해야 함"
+    except LLMJSONError:
+        pass
+
+
+def test_metrics_count_outcomes():
+    llm_json_metrics.reset()
+    parse_stage_response("relevance", '{"is_related": true}')
+    parse_stage_response("relevance", '```json\n{"is_related": false,}\n```')
+    try:
+        parse_stage_response("relevance", "모르겠어요")
+    except LLMJSONError:
+        pass
+    counts = llm_json_metrics.snapshot()["relevance"]
+    assert (counts["direct"], counts["repaired"], counts["failed"], counts["total"]) == (1, 1, 1, 3)
+    assert counts["repair_rate"] == round(1 / 3, 4)
+
+
+def test_truncated_selection_keeps_valid_items():
+    """잘린 선택 응답도 완성된 항목은 사용 (폴백 없음, 잘린 숫자는 버림), 구조화 출력 설정 전달"""
+    gemini_module._structured_output_disabled_until.clear()
+    service = GeminiService(concurrent_stages=False, use_semantic_cache=False)
+    service.model = _StructuredModel('{"selected_products": [{"index": 2, "score": 91, "reason": "금리"}, {"index": 0, "score": 8')
+
+    dataset = {"domain": "예금적금", "products": PRODUCTS}
+    recommendations = asyncio.run(service._recommend_products_v2({}, dataset, limit=2))
+
+    assert [item["product_id"] for item in recommendations] == ["p2"]
+    assert recommendations[0]["ai_analysis"]["suitability_score"] == 0.91
+    assert service.model.configs[0]["response_mime_type"] == "application/json"
+
+
+class _BlockedResponse:
+    """안전 필터로 차단된 응답 - .text 접근 시 ValueError (SDK 동작)"""
+
+    @property
+    def text(self):
+        raise ValueError("응답이 차단되었습니다")
+
+
+class _ConfigRejectingModel:
+    """generation_config를 거부하는 모델 (구형 SDK)"""
+
+    def __init__(self):
+        self.configs = []
+
+    async def generate_content_async(self, prompt: str, generation_config=None):
+        self.configs.append(generation_config)
+        if generation_config is not None:
+            raise TypeError("unexpected keyword argument 'response_schema'")
+        return _FakeResponse('{"is_related": true}')
+
+
+def test_structured_output_downgrade_is_per_stage():
+    """차단 응답은 구조화 출력을 끄지 않고, 설정 거부는 해당 단계만 일정 시간 전환"""
+    gemini_module._structured_output_disabled_until.clear()
+    service = GeminiService(concurrent_stages=False, use_semantic_cache=False)
+
+    class _BlockingModel(_StructuredModel):
+        async def generate_content_async(self, prompt: str, generation_config=None):
+            self.configs.append(generation_config)
+            return _BlockedResponse()
+
+    service.model = _BlockingModel("")
+    try:
+        asyncio.run(service._generate_json_text("질문", "relevance"))
+        assert False, "차단 응답 오류는 호출자에게 전달되어야 함"
+    except ValueError:
+        pass
+    assert len(service.model.configs) == 1 and not gemini_module._structured_output_disabled_until
+
+    service.model = _ConfigRejectingModel()
+    assert asyncio.run(service._generate_json_text("질문", "relevance")) == '{"is_related": true}'
+    asyncio.run(service._generate_json_text("질문", "relevance"))
+    assert [config is not None for config in service.model.configs] == [True, False, False]
+    assert set(gemini_module._structured_output_disabled_until) == {"relevance"}
+
+    # 다른 단계는 계속 구조화 출력 시도
+    asyncio.run(service._generate_json_text("분석", "user_analysis"))
+    assert service.model.configs[-2]["response_mime_type"] == "application/json"
+    gemini_module._structured_output_disabled_until.clear()
+
+
+if __name__ == "__main__":
+    test_tolerant_parsing()
+    test_partial_acceptance()
+    test_metrics_count_outcomes()
+    test_truncated_selection_keeps_valid_items()
+    test_structured_output_downgrade_is_per_stage()
+    print("🏁 LLM JSON 추출/복구 테스트 완료!")
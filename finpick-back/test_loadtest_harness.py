@@ -0,0 +1,84 @@
+# finpick-back/test_loadtest_harness.py - Gemini 대역 서버/REST 모델/부하 결과 분류 테스트
+
+import asyncio
+import os
+import random
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import httpx
+
+from app.services.gemini_rest import GeminiRESTError, GeminiRESTModel
+from app.services.gemini_service import GeminiService
+from loadtest_gemini_stub import GeminiStub, StubConfig, classify_prompt, parse_latency
+from loadtest_recommendations import classify_response, summarize
+
+PRODUCTS = [
+    {"id": f"p{i}", "name": f"적금{i}", "type": "적금", "provider": {"name": f"{i}은행"}, "details": {"interest_rate": 3.0, "minimum_amount": 10000}}
+    for i in range(8)
+]
+
+
+def _rest_model(stub: GeminiStub) -> GeminiRESTModel:
+    """대역 서버 ASGI 앱을 직접 호출하는 REST 모델 (실행 중인 루프에서 생성)"""
+    model = GeminiRESTModel("test-key", "http://stub", "gemini-2.0-flash")
+    model._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+    model._client_loop = asyncio.get_running_loop()
+    return model
+
+
+def test_latency_and_prompt_types():
+    """지연 분포 문자열 파싱, 프롬프트 유형 판별"""
+    rng = random.Random(0)
+    assert parse_latency("fixed:0.2")(rng) == 0.2
+    assert 0.1 <= parse_latency("uniform:0.1-0.5")(rng) <= 0.5
+    samples = sorted(parse_latency("lognormal:0.4,2.0")(rng) for _ in range(4000))
+    assert 0.35 < samples[2000] < 0.45 and 1.6 < samples[3960] < 2.5
+
+    assert classify_prompt('사용자의 질문이 금융 상품(대출, 예금, 적금)과 관련이 있는지 판단해주세요.') == "relevance"
+    assert classify_prompt('{"selected_products": []}') == "product_selection"
+    assert classify_prompt("시뮬레이션 조언") == "generic"
+
+
+def test_service_pipeline_through_stub():
+    """REST 모델로 대역 서버를 호출해 AI 추천 경로 전체 통과, 주입된 503은 폴백으로 처리"""
+    async def run():
+        stub = GeminiStub(StubConfig(latency="fixed:0", seed=1))
+        service = GeminiService(concurrent_stages=False, use_semantic_cache=False)
+        service.model = _rest_model(stub)
+        result = await service.recommend_financial_model("매달 30만원씩 모을 적금 추천", available_products=PRODUCTS, limit=3)
+        assert result["success"] and result["domain"] == "예금적금"
+        assert len(result["recommended_products"]) == 3
+        assert all(product["ai_analysis"]["match_reasons"] == ["금리 경쟁력"] for product in result["recommended_products"])
+        assert set(stub.stats()) == {"relevance", "domain", "user_analysis", "product_selection"}
+
+        failing = GeminiStub(StubConfig(latency="fixed:0", error_rate=1.0))
+        try:
+            await _rest_model(failing).generate_content_async("안녕")
+            assert False, "503이면 실패해야 함"
+        except GeminiRESTError as e:
+            assert e.status_code == 503
+
+    asyncio.run(run())
+
+
+def test_classify_and_summarize():
+    """응답 결과 유형 분류, 종류별 백분위/폴백 비율"""
+    assert classify_response("nl", 500, None) == "error"
+    assert classify_response("nl", 200, {"recommendation_reasoning": "키워드 기반 기본 추천", "data": []}) == "keyword_fallback"
+    assert classify_response("nl", 200, {"data": [{"ai_analysis": {"match_reasons": ["다양성 기반 선택"]}}]}) == "selection_fallback"
+    assert classify_response("nl", 200, {"ai_metadata": {"source": "segment_view"}, "data": []}) == "segment_view"
+    assert classify_response("sim", 200, {"ai_analysis": {"source": "rule_based"}}) == "rule_based"
+
+    results = [("nl", "ai", 0.1)] * 6 + [("nl", "selection_fallback", 0.2)] * 2 + [("nl", "error", 1.0)] * 2
+    summary = summarize(results, elapsed=2.0)["nl"]
+    assert summary["requests"] == 10 and summary["throughput"] == 4.0
+    assert summary["fallback_ratio"] == 0.25 and summary["error_ratio"] == 0.2
+    assert summary["p50_ms"] == 100.0 and summary["p99_ms"] > 900
+
+
+if __name__ == "__main__":
+    test_latency_and_prompt_types()
+    test_service_pipeline_through_stub()
+    test_classify_and_summarize()
+    print("🏁 부하 테스트 도구 테스트 완료!")
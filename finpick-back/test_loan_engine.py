@@ -0,0 +1,72 @@
+# finpick-back/test_loan_engine.py - 대출 상환 계산 테스트
+
+import numpy as np
+
+from app.services.loan_engine import (
+    BULLET, EQUAL_INSTALLMENT, EQUAL_PRINCIPAL, LoanEngine, estimate_monthly_payment
+)
+
+LOANS = [
+    {
+        "id": "m1", "name": "아파트론", "type": "주택담보대출",
+        "details": {"minimum_amount": 10000000, "loan_period_max": 360},
+        "rates": [
+            {"repay_type": "분할상환방식", "min_rate": 3.6, "max_rate": 4.8, "avg_rate": 4.0},
+            {"repay_type": "만기일시상환방식", "min_rate": 4.0, "max_rate": 5.0, "avg_rate": 0.0},
+        ],
+    },
+    {
+        "id": "m2", "name": "단기 주담대", "type": "주택담보대출",
+        "details": {"minimum_amount": 10000000, "loan_period_max": 120},
+        "rates": [{"repay_type": "분할상환방식", "min_rate": 3.0, "max_rate": 3.5, "avg_rate": 3.2}],
+    },
+    {"id": "c1", "name": "신용대출", "type": "신용대출", "details": {"interest_rate": 0.0}, "rates": []},
+]
+
+
+def test_schedule_matches_closed_form():
+    """월별 스케줄 합계가 닫힌 식 총이자와 일치하고 원금이 모두 상환됨"""
+    engine = LoanEngine.build(LOANS)
+    summary = engine.compute(100000000, 360)
+    schedules = engine.schedules(100000000, 360)
+
+    assert np.allclose(schedules["interest"].sum(axis=-1), summary["total_interest"])
+    assert np.allclose(schedules["principal"].sum(axis=-1), 100000000)
+    assert np.allclose(schedules["balance"][..., -1], 0.0, atol=1e-3)
+    assert set(summary["doc"].tolist()) == {0}  # 최대 대출기간 120개월 상품 / 금리 없는 신용대출 제외
+
+    payment = schedules["payment"][0, 1]  # 원리금균등, 평균금리
+    assert np.allclose(payment, payment[0])
+
+
+def test_rank_by_total_cost_and_dsr():
+    """총비용 순위는 상품별 최저 비용 상환방식 1개, DSR 필터 적용"""
+    engine = LoanEngine.build(LOANS)
+    ranked = engine.rank_by_total_cost(100000000, 120, annual_income=50000000)
+    assert [item["product_id"] for item in ranked] == ["m2", "m1"]
+    assert ranked[0]["repayment_method"] == EQUAL_PRINCIPAL
+    assert ranked[0]["total_cost"] == 100000000 + round(100000000 * 0.032 / 12 * 121 / 2)
+
+    bullet = engine.rank_by_total_cost(100000000, 120, method=BULLET, annual_income=50000000)
+    # 평균금리 누락 시 최저·최고 중간값 4.5%, DSR은 이자 + 원금/기간 기준
+    assert bullet[0]["rate"] == 4.5
+    assert bullet[0]["dsr"] == round((100000000 * 0.045 + 100000000 / 10) / 50000000 * 100, 2)
+    assert engine.rank_by_total_cost(100000000, 120, annual_income=50000000, max_dsr=10) == []
+
+
+def test_single_product_helpers():
+    engine = LoanEngine.build(LOANS)
+    schedule = engine.schedule("m1", 12000000, 12, method=EQUAL_INSTALLMENT)
+    assert len(schedule["months"]) == 12
+    assert schedule["months"][-1]["balance"] == 0
+    assert engine.schedule("c1", 12000000, 12) is None
+
+    assert estimate_monthly_payment(LOANS[0]) > 0
+    assert estimate_monthly_payment(LOANS[2]) == 0
+
+
+if __name__ == "__main__":
+    test_schedule_matches_closed_form()
+    test_rank_by_total_cost_and_dsr()
+    test_single_product_helpers()
+    print("🏁 대출 상환 계산 테스트 완료!")
@@ -0,0 +1,106 @@
+# finpick-back/test_product_catalog.py - 공유 카탈로그 테스트
+
+import json
+import math
+import os
+import tempfile
+
+from app.config import settings
+from app.services.product_catalog import (
+    ProductCatalog, ProductView, SharedCatalog, attach_shared_catalog, compile_shared_catalog, load_catalog_products
+)
+
+SAMPLE_PRODUCTS = [
+    {
+        "id": "d1", "name": "안심 정기예금", "type": "예금",
+        "provider": {"code": "001", "name": "우리은행"},
+        "details": {"interest_rate": 2.5, "max_interest_rate": 2.8, "minimum_amount": 10000, "maximum_amount": None},
+        "rates": [{"period_months": 12, "base_rate": 2.5, "max_rate": 2.8, "rate_type": "단리"}],
+    },
+    {
+        "id": "l1", "name": "직장인 신용대출", "type": "신용대출",
+        "provider": {"code": "002", "name": "하나은행"},
+        "details": {"interest_rate": 4.8, "minimum_amount": 1000000},
+    },
+]
+
+
+def test_shared_catalog_roundtrip():
+    """컴파일한 공유 버퍼가 원본과 동일한 상품 뷰를 제공하는지"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = compile_shared_catalog(SAMPLE_PRODUCTS, "a" * 40, os.path.join(tmp_dir, "catalog.bin"))
+        catalog = SharedCatalog(path)
+
+        assert len(catalog) == 2
+        assert catalog.version == "a" * 40
+
+        view = catalog[0]
+        assert isinstance(view, ProductView)
+        assert view.get("type") == "예금"
+        assert view.get("missing", "기본값") == "기본값"
+        assert view["provider"]["name"] == "우리은행"
+        assert dict(view) == SAMPLE_PRODUCTS[0]
+        assert [p.get("id") for p in catalog] == ["d1", "l1"]
+
+        rates = catalog.column("max_interest_rate")
+        assert rates[0] == 2.8 and math.isnan(rates[1])
+
+
+def test_summary_fields_do_not_materialize_full_product():
+    """이름/타입/은행 조회는 전체 JSON을 파싱하지 않음"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        catalog = SharedCatalog(compile_shared_catalog(SAMPLE_PRODUCTS, "b" * 40, os.path.join(tmp_dir, "c.bin")))
+        view = catalog[1]
+        assert view.get("name") == "직장인 신용대출"
+        assert view._data is None
+        assert view["details"]["interest_rate"] == 4.8
+        assert view._data is not None
+        # 카탈로그는 뷰를 보관하지 않음 (다시 조회하면 역직렬화 전 상태의 새 뷰)
+        assert catalog[1] is not view and catalog[1]._data is None
+
+
+def test_shared_indexes_built_without_full_products():
+    """공유 모드 색인은 버퍼의 색인 JSON만 읽어 구축 (전체 상품 JSON 역직렬화 0건), 결과는 dict 모드와 동일"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        shared = SharedCatalog(compile_shared_catalog(SAMPLE_PRODUCTS, "c" * 40, os.path.join(tmp_dir, "c.bin")))
+        parts = []
+        read_json = shared._read_json
+        shared._read_json = lambda index, part: parts.append(part) or read_json(index, part)
+
+        catalog = ProductCatalog(shared, shared.version, None, shared=True)
+        assert "full" not in parts and parts.count("index") == 4 * len(SAMPLE_PRODUCTS)
+
+        plain = ProductCatalog(SAMPLE_PRODUCTS, "c" * 40, None)
+        assert catalog.search_index.score_documents("우리은행 예금") == plain.search_index.score_documents("우리은행 예금")
+        assert catalog.yield_engine.effective_rates("예금", 1000000, 12) == plain.yield_engine.effective_rates("예금", 1000000, 12)
+        assert len(catalog.loan_engine) == len(plain.loan_engine)
+
+
+def test_attach_recompiles_on_version_change():
+    """원본 카탈로그가 바뀌면 공유 버퍼를 다시 컴파일"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, "financial_products.json")
+        shared = os.path.join(tmp_dir, "shared.bin")
+        settings.catalog_shared_path = shared
+        try:
+            with open(source, "w", encoding="utf-8") as f:
+                json.dump({"deposits": SAMPLE_PRODUCTS[:1], "total_count": 1}, f, ensure_ascii=False)
+            products, version = load_catalog_products(source)
+            first = attach_shared_catalog(source, version)
+            assert len(first) == 1
+
+            with open(source, "w", encoding="utf-8") as f:
+                json.dump({"deposits": SAMPLE_PRODUCTS, "total_count": 2}, f, ensure_ascii=False)
+            products, version = load_catalog_products(source)
+            second = attach_shared_catalog(source, version)
+            assert len(second) == 2 and second.version == version
+        finally:
+            settings.catalog_shared_path = ""
+
+
+if __name__ == "__main__":
+    test_shared_catalog_roundtrip()
+    test_summary_fields_do_not_materialize_full_product()
+    test_shared_indexes_built_without_full_products()
+    test_attach_recompiles_on_version_change()
+    print("🏁 공유 카탈로그 테스트 완료!")
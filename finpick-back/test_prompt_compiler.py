@@ -0,0 +1,142 @@
+# finpick-back/test_prompt_compiler.py - 프롬프트 고정 부분 컴파일/컨텍스트 캐시 테스트
+
+import asyncio
+import json
+import os
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import app.services.gemini_service as gemini_module
+from app.services.gemini_service import GeminiService
+from app.services.prompt_compiler import PromptCompiler, StubContextCache
+
+PRODUCTS = [
+    {"id": f"p{i}", "name": f"적금{i}", "type": "적금", "provider": {"name": f"{i}은행"}, "details": {"interest_rate": 3.0 + i / 10, "minimum_amount": 10000}}
+    for i in range(6)
+]
+USER_ANALYSIS = {"financial_goal": "목돈 마련", "priority_factors": ["금리"], "domain_specific": {"key_requirements": ["월 적립"]}}
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _SelectionModel:
+    """받은 전체 프롬프트를 기록하고 앞의 상품 3개를 선택"""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_content_async(self, prompt: str, generation_config=None):
+        self.prompts.append(prompt)
+        return _Response(json.dumps({"selected_products": [{"index": i, "score": 90 - i} for i in range(3)]}))
+
+
+class _ExpiredCacheModel:
+    async def generate_content_async(self, prompt: str, generation_config=None):
+        raise RuntimeError("cachedContents/stub-0 not found")
+
+
+class _RateLimitedModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content_async(self, prompt: str, generation_config=None):
+        self.calls += 1
+        raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+
+
+def _run_selection(compiler: PromptCompiler, model, catalog_version, repeat: int = 1):
+    async def run():
+        original = gemini_module.get_prompt_compiler
+        gemini_module.get_prompt_compiler = lambda: compiler
+        try:
+            service = GeminiService(use_semantic_cache=False)
+            service.model = model
+            dataset = {"domain": "예금적금", "products": PRODUCTS, "catalog_version": catalog_version}
+            return [await service._recommend_products_v2(USER_ANALYSIS, dataset, 3) for _ in range(repeat)]
+        finally:
+            gemini_module.get_prompt_compiler = original
+
+    return asyncio.run(run())
+
+
+def test_prefix_reused_per_catalog_version():
+    """같은 버전/키는 한 번만 렌더링, 버전이 바뀌면 다시 렌더링, 버전 없으면 매번 렌더링"""
+    compiler = PromptCompiler()
+    renders = []
+
+    def render():
+        renders.append(1)
+        return "고정 부분"
+
+    first = compiler.prefix(("product_selection", "예금적금", None), "v1", render)
+    assert compiler.prefix(("product_selection", "예금적금", None), "v1", render) is first
+    compiler.prefix(("product_selection", "대출", None), "v1", render)
+    compiler.prefix(("product_selection", "예금적금", None), "v2", render)
+    compiler.prefix(("product_selection", "예금적금", None), None, render)
+    compiler.prefix(("product_selection", "예금적금", None), None, render)
+    assert len(renders) == 5
+    metrics = compiler.metrics()
+    assert metrics["version"] == "v2" and metrics["prefixes"] == 1
+    assert (metrics["hits"], metrics["misses"], metrics["uncached"]) == (1, 3, 2)
+
+
+def test_context_cache_sends_only_user_suffix():
+    """캐시 등록 후에는 사용자별 부분만 전송, 모델이 보는 전체 프롬프트와 선택 결과는 캐시 없을 때와 동일"""
+    plain_model = _SelectionModel()
+    plain = _run_selection(PromptCompiler(), plain_model, "v1")[0]
+
+    backend = StubContextCache()
+    cached_model = _SelectionModel()
+    results = _run_selection(PromptCompiler(backend), cached_model, "v1", repeat=3)
+
+    assert len(backend.contents) == 1
+    assert cached_model.prompts == plain_model.prompts * 3
+    assert all(result == plain for result in results)
+    assert backend.sent_chars and max(backend.sent_chars) < len(plain_model.prompts[0]) / 3
+    assert "반드시 3개를 선택" in plain_model.prompts[0] and "적금5" in next(iter(backend.contents.values()))
+
+
+def test_expired_cache_falls_back_to_full_prompt():
+    """캐시 모델 호출 실패 → 전체 프롬프트로 재시도하고 다음 요청에서 다시 등록, 버전 변경 시 이전 캐시 삭제"""
+    backend = StubContextCache()
+    compiler = PromptCompiler(backend)
+    backend.model_for = lambda handle, base_model: _ExpiredCacheModel()
+
+    model = _SelectionModel()
+    results = _run_selection(compiler, model, "v1", repeat=2)
+    assert all(len(result) == 3 for result in results)
+    assert len(model.prompts) == 2 and compiler.metrics()["cache_created"] == 2
+    assert backend.deleted == 1
+
+    del backend.model_for
+    _run_selection(compiler, _SelectionModel(), "v1")
+    assert backend.deleted == 2 and compiler.metrics()["context_cache"]["active"] == 1
+
+    _run_selection(compiler, _SelectionModel(), "v2")
+    assert backend.deleted == 3 and len(backend.contents) == 1 and compiler.metrics()["version"] == "v2"
+
+
+def test_transient_error_keeps_cache_and_does_not_resend():
+    """캐시 모델의 429 등 일시 오류는 캐시를 폐기하지 않고 전체 프롬프트 재전송도 하지 않음 (기존 폴백으로)"""
+    backend = StubContextCache()
+    compiler = PromptCompiler(backend)
+    limited = _RateLimitedModel()
+    backend.model_for = lambda handle, base_model: limited
+
+    model = _SelectionModel()
+    results = _run_selection(compiler, model, "v1", repeat=2)
+    assert all(len(result) == 3 for result in results)
+    assert limited.calls == 2 and model.prompts == []
+    assert compiler.metrics()["cache_created"] == 1 and backend.deleted == 0
+    assert compiler.metrics()["context_cache"]["active"] == 1
+
+
+if __name__ == "__main__":
+    test_prefix_reused_per_catalog_version()
+    test_context_cache_sends_only_user_suffix()
+    test_expired_cache_falls_back_to_full_prompt()
+    test_transient_error_keeps_cache_and_does_not_resend()
+    print("🏁 프롬프트 컴파일러 테스트 완료!")
@@ -0,0 +1,61 @@
+# finpick-back/test_rate_index.py - 기간별 금리 색인 테스트
+
+from app.services.rate_index import RateIndex, parse_period_months, preferred_period_months, product_rate_for_period
+
+
+def _savings(pid: str, min_amount: int, rates):
+    return {
+        "id": pid, "type": "적금", "details": {"minimum_amount": min_amount},
+        "rates": [
+            {"period_months": period, "base_rate": base, "max_rate": best, "rate_type": "단리"}
+            for period, base, best in rates
+        ],
+    }
+
+
+PRODUCTS = [
+    _savings("s1", 10000, [(12, 2.0, 3.0), (24, 2.2, 3.2)]),
+    _savings("s2", 100000, [(12, 2.5, 4.0), (12, 2.4, 3.5)]),
+    _savings("s3", 10000, [(12, 3.0, 3.1), (36, 3.0, 3.3)]),
+    {"id": "l1", "type": "신용대출", "details": {}, "rates": []},
+]
+
+
+def test_top_products_by_period_and_min_amount():
+    """12개월 적금 최고금리 순, 최소가입금액 조건"""
+    index = RateIndex.build(PRODUCTS)
+    period, entries = index.top_products("적금", 12, limit=3)
+    assert period == 12
+    assert [entry.doc for entry in entries] == [1, 2, 0]
+    assert entries[0].max_rate == 4.0
+
+    _, entries = index.top_products("적금", 12, limit=3, max_min_amount=50000)
+    assert [entry.doc for entry in entries] == [2, 0]
+
+    _, entries = index.top_products("적금", 12, metric="base_rate", limit=1)
+    assert entries[0].doc == 2
+
+
+def test_period_resolution():
+    """없는 기간은 요청 이하 중 가장 긴 기간으로 대체"""
+    index = RateIndex.build(PRODUCTS)
+    assert index.top_products("적금", 30)[0] == 24
+    assert index.top_products("적금", 6)[0] == 12
+    assert index.top_products("신용대출", 12) == (None, [])
+
+
+def test_preferred_period_rate():
+    """사용자 선호 기간 기준 상품 금리"""
+    assert parse_period_months("2-3년") == 24
+    assert parse_period_months("6개월") == 6
+    profile = {"investment_profile": {"investment_period": {"selected": "3년 이상"}}}
+    assert preferred_period_months(profile) == 36
+    assert product_rate_for_period(PRODUCTS[2], 36) == 3.3
+    assert product_rate_for_period(PRODUCTS[0], None) is None
+
+
+if __name__ == "__main__":
+    test_top_products_by_period_and_min_amount()
+    test_period_resolution()
+    test_preferred_period_rate()
+    print("🏁 금리 색인 테스트 완료!")
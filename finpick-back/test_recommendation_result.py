@@ -0,0 +1,118 @@
+# finpick-back/test_recommendation_result.py - AI/사용자 유형 뷰/폴백 공통 추천 결과 모델 테스트
+
+import asyncio
+import json
+import os
+import tempfile
+
+from app.api.recommendations import _generate_fallback_recommendations
+from app.api.responses import encode_json
+from app.models.recommendation import RecommendationRequest, RecommendationResult, RecommendedProduct
+from app.services.history_store import SQLiteHistoryBackend
+from app.services.profile_analytics import enhance_product_with_user_context
+from app.services.recommendation_service import RecommendationService, build_recommended_product
+
+PRODUCT = {
+    "id": "s1",
+    "name": "청년 적금",
+    "type": "적금",
+    "provider": {"name": "A은행"},
+    "details": {"interest_rate": 3.5, "max_interest_rate": 5.0, "minimum_amount": 10000, "maximum_amount": None,
+                "available_periods": [6, 12]},
+    "conditions": {"join_way": ["스마트폰"], "join_member": "만 19~34세", "special_conditions": "급여이체"},
+    "benefits": ["우대금리 1.5%"],
+}
+PROFILE = {"basic_info": {"age": "30대", "occupation": "회사원"}, "investment_profile": {"total_score": 30}}
+
+
+class _FakeGemini:
+    async def recommend_financial_model(self, user_query, user_profile, available_products, limit):
+        return {
+            "success": True,
+            "domain": "예금적금",
+            "recommended_products": [
+                {"product_id": "s1", "ai_analysis": {"suitability_score": 0.9, "match_reasons": ["고금리"], "expected_benefit": "목돈 마련"}},
+                {"product_id": "없는상품"},
+            ],
+        }
+
+
+def _service(gemini=None):
+    service = RecommendationService()
+    service.financial_products = [PRODUCT]
+    service.gemini_service = gemini
+    service.use_ai = gemini is not None
+    return service
+
+
+def _validated(payload):
+    """응답 dict가 스키마 필드 그대로이고 검증을 통과하는지 (검증 결과 dict 반환)"""
+    assert payload.keys() == RecommendationResult.model_fields.keys()
+    for product in payload["data"]:
+        assert product.keys() == RecommendedProduct.model_fields.keys()
+    return RecommendationResult.model_validate(payload).model_dump(mode="json")
+
+
+def test_payload_matches_schema():
+    """스키마 dict는 검증 결과와 같은 JSON, 없는 필드는 거부"""
+    product = build_recommended_product(PRODUCT, {"suitability_score": 0.8}, PROFILE)
+    assert product["interest_rate"] == 3.5 and product["bank_name"] == "A은행"
+
+    payload = RecommendationResult.payload(recommendation_type="fallback", data=[product])
+    assert json.loads(encode_json(payload)) == _validated(payload)
+    assert payload["user_insights"] is not RecommendationResult.payload(recommendation_type="fallback")["user_insights"]
+    try:
+        RecommendationResult.payload(recommendation_type="fallback", recommendations=[])
+        assert False, "스키마에 없는 필드는 실패해야 함"
+    except ValueError:
+        pass
+
+
+def test_enhanced_product_reuses_precomputed_user_specific():
+    """이미 계산된 user_specific은 재계산하지 않고, 없으면 프로필로 계산"""
+    product_data = {"product_id": "s1", "name": "청년 적금", "bank_name": "A은행", "type": "적금", "interest_rate": 3.5}
+    computed = enhance_product_with_user_context(product_data, PROFILE)
+    assert set(computed["user_specific"]) == {"recommended_monthly_amount", "risk_compatibility", "age_appropriateness"}
+
+    precomputed = {"risk_compatibility": "높음"}
+    assert enhance_product_with_user_context({**product_data, "user_specific": precomputed}, PROFILE)["user_specific"] is precomputed
+
+
+def test_ai_and_fallback_share_schema():
+    """서비스 AI/폴백, API 폴백 모두 RecommendationResult 스키마, 같은 상품 필드"""
+    request = RecommendationRequest(user_id="u1", natural_query="적금 추천", limit=3)
+
+    ai_result = asyncio.run(_service(_FakeGemini()).generate_recommendations(request))
+    fallback_result = asyncio.run(_service().generate_recommendations(request))
+    api_fallback = asyncio.run(_generate_fallback_recommendations("적금 추천", [PRODUCT], 3, PROFILE))
+
+    ai_item = _validated(ai_result)["data"]
+    fallback_item = _validated(fallback_result)["data"]
+    api_item = _validated(api_fallback)["data"]
+    assert ai_result["recommendation_type"] == "financial_model_based" and fallback_result["recommendation_type"] == "fallback"
+    assert len(ai_item) == 1 and len(fallback_item) == 1 and len(api_item) == 1
+    assert ai_item[0]["ai_analysis"]["suitability_score"] == 0.9 and ai_item[0]["ai_analysis"]["match_reasons"] == ["고금리"]
+    assert fallback_item[0]["ai_analysis"]["fallback_mode"] is True
+    assert api_item[0]["user_specific"]["risk_compatibility"]
+
+
+def test_history_store_keeps_response_payload():
+    """이력 저장소에 저장한 응답이 그대로 다시 읽힘"""
+    result = asyncio.run(_generate_fallback_recommendations("적금 추천", [PRODUCT], 3, PROFILE))
+    result["session_id"] = "h1"
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteHistoryBackend(os.path.join(directory, "history.sqlite3"))
+        try:
+            backend.write_batch([{"session_id": "h1", "user_id": "u1", "created_at": "2025-01-01T00:00:00", "response": result}], [])
+            stored = backend.read_history("u1", 10)
+        finally:
+            backend.close()
+    assert stored[0]["response"] == _validated(result)
+
+
+if __name__ == "__main__":
+    test_payload_matches_schema()
+    test_enhanced_product_reuses_precomputed_user_specific()
+    test_ai_and_fallback_share_schema()
+    test_history_store_keeps_response_payload()
+    print("🏁 추천 결과 모델 테스트 완료!")
@@ -0,0 +1,131 @@
+# finpick-back/test_request_profiler.py - 요청 단위 온디맨드 프로파일링 테스트
+
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app as main_app
+from app.services.request_profiler import ProfileStore, RequestProfilingMiddleware
+
+ADMIN_TOKEN = "profile-secret"
+
+
+def _busy(ms: float):
+    deadline = time.perf_counter() + ms / 1000
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def _slow_upstream():
+    await asyncio.sleep(0.08)
+
+
+async def _child_stage():
+    await asyncio.sleep(0.05)
+
+
+def _profiled_app(store: ProfileStore):
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        child = asyncio.create_task(_child_stage())
+        _busy(60)
+        await _slow_upstream()
+        await child
+        return {"ok": True}
+
+    return TestClient(RequestProfilingMiddleware(app, store))
+
+
+class _Settings:
+    """테스트 동안 프로파일링 설정 교체"""
+
+    def __init__(self, **values):
+        self.values = values
+
+    def __enter__(self):
+        self.original = {name: getattr(settings, name) for name in self.values}
+        for name, value in self.values.items():
+            setattr(settings, name, value)
+
+    def __exit__(self, *exc):
+        for name, value in self.original.items():
+            setattr(settings, name, value)
+
+
+def test_admin_header_profiles_cpu_and_await_time():
+    """관리자 헤더 요청만 측정 - CPU 구간(실제 스택), 대기 구간(await 체인), 요청이 만든 하위 작업까지 기록"""
+    with tempfile.TemporaryDirectory() as directory, _Settings(profiling_admin_token=ADMIN_TOKEN, profiling_sample_rate=0.0, profiling_interval_ms=2.0):
+        store = ProfileStore(directory)
+        client = _profiled_app(store)
+
+        plain = client.get("/slow")
+        assert plain.status_code == 200 and "x-profile-id" not in plain.headers
+        wrong = client.get("/slow", headers={"X-Profile-Token": "nope"})
+        assert "x-profile-id" not in wrong.headers
+        assert store.list() == []
+
+        response = client.get("/slow", headers={"X-Profile-Token": ADMIN_TOKEN})
+        profile_id = response.headers["x-profile-id"]
+        collapsed = store.collapsed(profile_id)
+        lines = [line.rsplit(" ", 1) for line in collapsed.splitlines()]
+        assert all(int(count) > 0 for _, count in lines)
+
+        def samples(frame_name: str) -> int:
+            return sum(int(count) for stack, count in lines if frame_name in stack)
+
+        assert samples("_busy") > 5
+        assert samples("_slow_upstream") > 5 and any("_slow_upstream" in stack and "[await" in stack for stack, _ in lines)
+        assert samples("_child_stage") > 5
+
+        meta = store.list()[0]
+        assert meta["profile_id"] == profile_id and meta["trigger"] == "admin" and meta["status_code"] == 200
+        assert meta["path"] == "/slow" and meta["duration_ms"] >= 140
+
+
+def test_sample_rate_and_concurrency_cap():
+    """표본 비율 1이면 모든 요청 측정, 동시 측정 상한 0이면 측정하지 않고 건너뜀"""
+    with tempfile.TemporaryDirectory() as directory, _Settings(profiling_admin_token="", profiling_sample_rate=1.0, profiling_max_concurrent=2):
+        store = ProfileStore(directory, max_artifacts=2)
+        client = _profiled_app(store)
+        ids = [client.get("/slow").headers["x-profile-id"] for _ in range(3)]
+        # 오래된 결과물은 max_artifacts개만 남기고 삭제
+        assert {meta["profile_id"] for meta in store.list()} <= set(ids) and len(store.list()) == 2
+
+        with _Settings(profiling_max_concurrent=0):
+            assert "x-profile-id" not in client.get("/slow").headers
+
+
+def test_retrieval_endpoints_require_admin_token():
+    """조회 API는 관리자 토큰이 설정·일치할 때만 (아니면 404), 잘못된 id는 404"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = ProfileStore(directory)
+        with _Settings(profiling_admin_token=ADMIN_TOKEN, profiling_sample_rate=0.0, profiling_interval_ms=2.0):
+            profile_id = _profiled_app(store).get("/slow", headers={"X-Profile-Token": ADMIN_TOKEN}).headers["x-profile-id"]
+
+        client = TestClient(main_app)
+        headers = {"X-Profile-Token": ADMIN_TOKEN}
+        with _Settings(profiling_admin_token="", profiling_path=directory):
+            assert client.get("/api/debug/profiles", headers=headers).status_code == 404
+        with _Settings(profiling_admin_token=ADMIN_TOKEN, profiling_path=directory):
+            assert client.get("/api/debug/profiles").status_code == 404
+            listed = client.get("/api/debug/profiles", headers=headers).json()["profiles"]
+            assert [meta["profile_id"] for meta in listed] == [profile_id]
+            collapsed = client.get(f"/api/debug/profiles/{profile_id}", headers=headers)
+            assert collapsed.status_code == 200 and "_busy" in collapsed.text
+            assert client.get("/api/debug/profiles/..%2F..%2Fetc", headers=headers).status_code == 404
+
+
+if __name__ == "__main__":
+    test_admin_header_profiles_cpu_and_await_time()
+    test_sample_rate_and_concurrency_cap()
+    test_retrieval_endpoints_require_admin_token()
+    print("🏁 요청 프로파일링 테스트 완료!")
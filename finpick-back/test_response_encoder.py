@@ -0,0 +1,58 @@
+# finpick-back/test_response_encoder.py - orjson 추천 응답 직렬화 테스트
+
+import json
+from datetime import datetime
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from app.api.responses import FastJSONResponse, encode_json
+from app.models.recommendation import FeedbackData
+
+
+def _payload():
+    return {
+        "success": True,
+        "data": [{
+            "product_id": "s1",
+            "name": "청년 적금",
+            "interest_rate": np.float64(3.5),
+            "conditions": {"join_way": ["스마트폰"]},
+            "features": [],
+            "ai_analysis": {"suitability_score": 0.85, "match_reasons": ["금리"]},
+            "user_specific": {"recommended_monthly_amount": np.int64(300000)},
+        }],
+        "ai_metadata": {"domain": "예금/적금", 12: "기간 키"},
+    }
+
+
+def test_encode_matches_jsonable_encoder():
+    """기존 jsonable_encoder 경로와 같은 JSON (한글은 이스케이프 없이 UTF-8)"""
+    payload = _payload()
+    payload["data"][0]["interest_rate"] = 3.5
+    payload["data"][0]["user_specific"]["recommended_monthly_amount"] = 300000
+    body = encode_json(payload)
+    assert "청년 적금".encode("utf-8") in body
+    assert json.loads(body) == json.loads(json.dumps(jsonable_encoder(payload)))
+
+
+def test_numpy_and_fallback_values():
+    """numpy 값은 orjson이 직접, pydantic 모델/set은 jsonable_encoder로 변환"""
+    payload = _payload()
+    payload["feedback"] = FeedbackData(
+        recommendation_id="r1", user_id="u1", rating=5, timestamp=datetime(2025, 7, 1, 9, 30),
+        interaction_type="rating", product_ids=["s1"]
+    )
+    payload["tags"] = {"예금"}
+    decoded = json.loads(FastJSONResponse(payload).body)
+    assert decoded["data"][0]["interest_rate"] == 3.5
+    assert decoded["data"][0]["user_specific"]["recommended_monthly_amount"] == 300000
+    assert decoded["ai_metadata"]["12"] == "기간 키"
+    assert decoded["tags"] == ["예금"]
+    assert decoded["feedback"]["rating"] == 5 and decoded["feedback"]["timestamp"] == "2025-07-01T09:30:00"
+
+
+if __name__ == "__main__":
+    test_encode_matches_jsonable_encoder()
+    test_numpy_and_fallback_values()
+    print("🏁 응답 직렬화 테스트 완료!")
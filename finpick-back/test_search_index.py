@@ -0,0 +1,55 @@
+# finpick-back/test_search_index.py - 상품 검색 역색인 테스트
+
+from app.services.search_index import ProductSearchIndex, tokenize_ngrams
+
+PRODUCTS = [
+    {"id": "s1", "name": "청년도약 적금", "type": "적금", "provider": {"name": "우리은행"},
+     "conditions": {"special_conditions": "급여이체 시 우대", "notes": ""}},
+    {"id": "d1", "name": "WON플러스예금", "type": "예금", "provider": {"name": "우리은행"},
+     "conditions": {"special_conditions": "해당사항 없음", "notes": "가입기간 1~36개월"}},
+    {"id": "l1", "name": "직장인 신용대출", "type": "신용대출", "provider": {"name": "하나은행"},
+     "conditions": {"special_conditions": "", "notes": "재직기간 6개월 이상"}},
+]
+
+
+def test_tokenize_handles_korean_particles():
+    """조사가 붙은 단어도 bigram으로 원형과 겹침"""
+    assert "적금" in tokenize_ngrams("적금을")
+    assert "대출" in tokenize_ngrams("대출이 필요해요!")
+    assert tokenize_ngrams("A") == ["a"]
+
+
+def test_search_ranks_matching_products():
+    """조사 포함 질의로도 해당 상품이 1위"""
+    index = ProductSearchIndex.build(PRODUCTS)
+    assert index.search("적금을 들고 싶어요", limit=1)[0][0] == 0
+    assert index.search("신용대출이 필요해", limit=1)[0][0] == 2
+    assert index.search("하나은행", limit=3)[0][0] == 2
+
+
+def test_search_product_type_filter_and_scores():
+    """상품 타입 필터와 행 번호별 점수"""
+    index = ProductSearchIndex.build(PRODUCTS)
+    hits = index.search("우리은행", limit=5, product_type="예금")
+    assert [doc for doc, _ in hits] == [1]
+    scores = index.score_documents("우리은행")
+    assert min(scores[0], scores[1]) > scores.get(2, 0.0)
+    assert index.search("없는단어", limit=5) == []
+
+
+def test_duplicate_product_ids_keep_separate_scores():
+    """ID가 같은 상품도 행별로 점수가 유지되어 검색 결과에서 빠지지 않음"""
+    products = PRODUCTS + [dict(PRODUCTS[2], name="사업자 신용대출", provider={"name": "국민은행"})]
+    index = ProductSearchIndex.build(products)
+    hits = index.search("신용대출", limit=5)
+    assert sorted(doc for doc, _ in hits) == [2, 3]
+    scores = index.score_documents("국민은행 신용대출")
+    assert scores[3] > scores[2] > 0
+
+
+if __name__ == "__main__":
+    test_tokenize_handles_korean_particles()
+    test_search_ranks_matching_products()
+    test_search_product_type_filter_and_scores()
+    test_duplicate_product_ids_keep_separate_scores()
+    print("🏁 검색 색인 테스트 완료!")
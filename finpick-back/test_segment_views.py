@@ -0,0 +1,129 @@
+# finpick-back/test_segment_views.py - 사용자 유형별 추천 뷰 테스트
+
+import time
+from types import SimpleNamespace
+
+from app.services.loan_engine import estimate_monthly_payment
+from app.services.profile_analytics import enhance_product_with_user_context
+from app.services.segment_views import (
+    SEGMENTS,
+    SegmentViewStore,
+    build_segment_views,
+    budget_bucket,
+    generic_query_domain,
+    profile_monthly_budget,
+    user_segment,
+    view_key,
+)
+
+
+def _saving(pid, bank, product_type, base, best, minimum=10000, maximum=None):
+    return {
+        "id": pid,
+        "name": pid,
+        "type": product_type,
+        "provider": {"name": bank},
+        "details": {"interest_rate": base, "max_interest_rate": best, "minimum_amount": minimum, "maximum_amount": maximum},
+        "rates": [{"period_months": 12, "base_rate": base, "max_rate": best, "rate_type": "단리"}],
+    }
+
+
+PRODUCTS = [
+    _saving("promo", "A은행", "적금", 2.0, 6.0, maximum=200000),   # 우대조건 충족 시 고금리, 월 20만원 한도
+    _saving("steady", "B은행", "적금", 3.3, 3.5),                   # 기본금리 높은 적금
+    _saving("deposit", "C은행", "예금", 3.2, 3.4, minimum=10000000),
+    {
+        "id": "loan", "name": "loan", "type": "신용대출", "provider": {"name": "D은행"},
+        "details": {"interest_rate": 4.5, "minimum_amount": 10000000, "loan_period_max": 60},
+        "rates": [{"repay_type": "원리금분할상환", "min_rate": 4.0, "max_rate": 5.0, "avg_rate": 4.5}],
+    },
+]
+
+
+def _profile(age="20대", score=10, period="1년", budget="10-30만원", marital=""):
+    return {
+        "basic_info": {"age": age, "marital_status": marital},
+        "investment_profile": {"total_score": score, "investment_period": period},
+        "financial_status": {"monthlyInvestment": budget},
+    }
+
+
+def test_generic_query_detection():
+    """상품 유형만 말한 요청만 뷰 대상"""
+    assert generic_query_domain("적금 추천해줘") == "예금적금"
+    assert generic_query_domain("좋은 예금 상품 추천해 주세요") == "예금적금"
+    assert generic_query_domain("대출 상품 알려줘") == "대출"
+    assert generic_query_domain("월 30만원 적금 추천") is None
+    assert generic_query_domain("집 사려고 대출 알아보는 중") is None
+
+
+def test_segment_and_budget_keys():
+    """프로필 → 뷰 키"""
+    assert user_segment(_profile()) == ("conservative", "young", "young_professional")
+    assert user_segment(_profile(age="30대", score=35, marital="미혼")) == ("moderate", "middle", "single_professional")
+    assert profile_monthly_budget(_profile(budget="10만원 미만")) == 10000
+    assert budget_bucket(profile_monthly_budget(_profile(budget="50-100만원"))) == 500000
+    assert view_key("예금적금", _profile()) == ("예금적금", ("conservative", "young", "young_professional"), 12, 100000)
+    assert view_key("대출", _profile()) == ("대출", ("conservative", "young", "young_professional"), None, None)
+
+
+def test_views_rank_by_segment():
+    """보수형은 기본금리, 공격형은 최고금리 기준 / 예산 적격성 반영 / 모든 조합 계산"""
+    views = build_segment_views(PRODUCTS, top_k=3)
+    ids = lambda key: [item["product_id"] for item in views[key]]
+
+    conservative = ("conservative", "young", "young_professional")
+    aggressive = ("aggressive", "young", "young_professional")
+    assert ids(("예금적금", conservative, 12, 100000))[0] == "steady"
+    assert ids(("예금적금", aggressive, 12, 100000))[0] == "promo"
+    # 월 100만원이면 20만원 한도 적금은 감점, 1년치 예산(1200만원)으로 최소 1000만원 예금 가입 가능
+    assert ids(("예금적금", aggressive, 12, 1000000)) == ["promo", "steady", "deposit"]
+    assert "deposit" not in ids(("예금적금", aggressive, 12, 100000))
+    assert ids(("대출", conservative, None, None)) == ["loan"]
+
+    for segment in SEGMENTS:
+        assert ("예금적금", segment, None, None) in views
+        assert ("대출", segment, None, None) in views
+
+
+def test_store_rebuilds_on_catalog_version_change():
+    """버전이 바뀌면 백그라운드 재계산, 완료 전에는 뷰를 쓰지 않음"""
+    store = SegmentViewStore(top_k=3)
+    catalog = SimpleNamespace(products=PRODUCTS, version="v1")
+    store.refresh(catalog)
+
+    first = store.lookup(catalog, "예금적금", _profile(), limit=2)
+    assert [item["product_id"] for item in first] == ["steady", "promo"]
+    assert "user_specific" not in first[0]
+
+    updated = SimpleNamespace(products=PRODUCTS[1:], version="v2")
+    assert store.lookup(updated, "예금적금", _profile(), limit=2) is None
+    for _ in range(100):
+        if store.version == "v2":
+            break
+        time.sleep(0.02)
+    assert [item["product_id"] for item in store.lookup(updated, "예금적금", _profile(), limit=2)] == ["steady"]
+    assert store.metrics()["builds"] == 2
+
+
+def test_view_items_keep_user_specific_inputs():
+    """뷰 상품의 user_specific이 원본 상품과 같고, 뷰 크기보다 큰 limit은 일반 경로로"""
+    store = SegmentViewStore(top_k=3)
+    catalog = SimpleNamespace(products=PRODUCTS, version="v1")
+    store.refresh(catalog)
+
+    loan_item = store.lookup(catalog, "대출", _profile(), limit=3)[0]
+    payment = enhance_product_with_user_context(loan_item, _profile())["user_specific"]["recommended_monthly_amount"]
+    assert payment == estimate_monthly_payment(PRODUCTS[3]) > 0
+
+    assert store.lookup(catalog, "예금적금", _profile(), limit=4) is None
+    assert store.metrics()["misses"] == 1
+
+
+if __name__ == "__main__":
+    test_generic_query_detection()
+    test_segment_and_budget_keys()
+    test_views_rank_by_segment()
+    test_store_rebuilds_on_catalog_version_change()
+    test_view_items_keep_user_specific_inputs()
+    print("🏁 사용자 유형별 추천 뷰 테스트 완료!")
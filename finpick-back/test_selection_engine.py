@@ -0,0 +1,76 @@
+# finpick-back/test_selection_engine.py - 다양성 선택 엔진 테스트
+
+from app.services.selection_engine import (
+    SelectionConstraints, select_diverse_top_k, product_quality_score, provider_name
+)
+
+
+def _product(pid: str, bank: str, rate: float, ptype: str = "적금"):
+    return {"id": pid, "type": ptype, "provider": {"name": bank}, "details": {"interest_rate": rate}}
+
+
+PRODUCTS = [
+    _product("a1", "A은행", 2.0),
+    _product("a2", "A은행", 3.5),
+    _product("a3", "A은행", 3.0),
+    _product("b1", "B은행", 2.8),
+    _product("b2", "B은행", 2.9, "예금"),
+    _product("c1", "C은행", 2.5, "예금"),
+]
+
+
+def _ids(selected):
+    return [choice.item["id"] for choice in selected]
+
+
+def test_round_robin_by_quality():
+    """1라운드는 은행별 최고 상품을 점수순으로, 이후 두 번째 상품 순"""
+    selected = select_diverse_top_k(PRODUCTS, 5, product_quality_score, provider_name)
+    assert _ids(selected) == ["a2", "b2", "c1", "a3", "b1"]
+    assert [choice.rank for choice in selected] == [0, 1, 2, 3, 4]
+
+
+def test_no_duplicates_when_limit_exceeds_catalog():
+    """상품 수보다 많이 요청해도 중복 선택 없음"""
+    selected = select_diverse_top_k(PRODUCTS, 20, product_quality_score, provider_name)
+    assert sorted(_ids(selected)) == sorted(p["id"] for p in PRODUCTS)
+
+
+def test_max_per_group_and_required_types():
+    """은행별 최대 개수와 타입별 최소 개수 제약"""
+    constraints = SelectionConstraints(max_per_group=1, required_types={"적금": 2})
+    selected = select_diverse_top_k(
+        PRODUCTS, 3, product_quality_score, provider_name,
+        type_fn=lambda p: p["type"], constraints=constraints
+    )
+    ids = _ids(selected)
+    assert len({provider_name(choice.item) for choice in selected}) == 3
+    assert sum(1 for choice in selected if choice.item["type"] == "적금") >= 2
+    assert ids == ["a2", "c1", "b1"]
+
+
+def test_deterministic_ties():
+    """동점이면 원본 순서 유지"""
+    tied = [_product(f"p{i}", f"은행{i % 3}", 3.0) for i in range(9)]
+    first = _ids(select_diverse_top_k(tied, 4, product_quality_score, provider_name))
+    second = _ids(select_diverse_top_k(tied, 4, product_quality_score, provider_name))
+    assert first == second == ["p0", "p1", "p2", "p3"]
+
+
+def test_loans_prefer_lower_rates():
+    """대출은 낮은 금리, 금리 정보 없는 상품은 후순위"""
+    loans = [
+        _product("l1", "A은행", 5.5, "신용대출"),
+        _product("l2", "B은행", 0.0, "신용대출"),
+        _product("l3", "C은행", 4.1, "신용대출"),
+    ]
+    assert _ids(select_diverse_top_k(loans, 3, product_quality_score, provider_name)) == ["l3", "l1", "l2"]
+
+
+if __name__ == "__main__":
+    test_round_robin_by_quality()
+    test_no_duplicates_when_limit_exceeds_catalog()
+    test_max_per_group_and_required_types()
+    test_deterministic_ties()
+    test_loans_prefer_lower_rates()
+    print("🏁 선택 엔진 테스트 완료!")
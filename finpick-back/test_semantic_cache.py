@@ -0,0 +1,114 @@
+# finpick-back/test_semantic_cache.py - 자연어 질의 의미 캐시 테스트
+
+import asyncio
+import os
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from app.services.gemini_service import GeminiService
+from app.services.semantic_cache import GROW_ENTRIES, SemanticQueryCache, normalize_query
+from test_gemini_concurrency import SAMPLE_PRODUCTS, _FakeModel
+
+VALUE = {"domain": "예금적금", "user_analysis": {"financial_goal": "목돈 마련"}}
+
+
+def _profile(age: str = "20대", score: int = 35):
+    return {"basic_info": {"age": age}, "investment_profile": {"total_score": score}}
+
+
+def test_near_duplicate_hits():
+    """어미/띄어쓰기만 다른 질의는 같은 항목에 적중"""
+    cache = SemanticQueryCache()
+    cache.store("안전한 적금 추천해줘", _profile(), VALUE)
+
+    assert normalize_query("안전한 적금 추천해 주세요") == normalize_query("안전한  적금 추천해줘!")
+    hit = cache.lookup("안전한 적금 추천해 주세요", _profile())
+    assert hit is not None and hit["value"] == VALUE
+    assert hit["cached_query"] == "안전한 적금 추천해줘"
+
+
+def test_different_meaning_misses():
+    """숫자 표현/도메인/프로필 구간이 다르면 재사용하지 않음"""
+    cache = SemanticQueryCache()
+    cache.store("월 30만원 적금 추천해줘", _profile(), VALUE)
+    cache.store("안전한 적금 추천해줘", _profile(), VALUE)
+
+    assert cache.lookup("월 50만원 적금 추천해줘", _profile()) is None
+    assert cache.lookup("안전한 대출 추천해줘", _profile()) is None
+    assert cache.lookup("안전한 적금 추천해줘", _profile(age="50대")) is None
+    assert cache.lookup("안전한 적금 추천해줘", _profile(score=75)) is None
+    assert cache.lookup("청년 주택 청약 알려줘", _profile()) is None
+
+
+def test_lru_eviction_and_metrics():
+    """용량 초과 시 가장 오래 쓰지 않은 항목 교체 + 지표 집계"""
+    cache = SemanticQueryCache(max_entries=2, audit_rate=0.0)
+    cache.store("정기예금 금리 비교", None, VALUE)
+    cache.store("청년 적금 추천", None, VALUE)
+    assert cache.lookup("정기예금 금리 비교") is not None
+    cache.store("자유적금 우대조건", None, VALUE)
+
+    assert cache.lookup("청년 적금 추천") is None
+    assert cache.lookup("정기예금 금리 비교") is not None
+    cache.record_audit(False)
+
+    metrics = cache.metrics()
+    assert metrics["entries"] == 2 and metrics["evictions"] == 1
+    assert metrics["hits"] == 2 and metrics["misses"] == 1
+    assert metrics["false_hit_rate"] == 1.0
+    assert metrics["index_bytes"] > 0
+
+
+def test_index_grows_in_chunks_and_replaces_same_query():
+    """색인은 저장한 만큼만 확장, 같은 질의+버킷은 기존 항목 교체"""
+    cache = SemanticQueryCache(max_entries=GROW_ENTRIES * 3)
+    initial_bytes = cache.metrics()["index_bytes"]
+    for i in range(GROW_ENTRIES + 1):
+        cache.store(f"적금 추천 {i}번", None, VALUE)
+    assert cache.metrics()["index_bytes"] < initial_bytes * 3
+
+    updated = {"domain": "예금적금", "user_analysis": {"financial_goal": "비상금"}}
+    cache.store("안전한 적금 추천해줘", _profile(), VALUE)
+    cache.store("안전한 적금 추천해 주세요", _profile(), updated)
+    assert cache.metrics()["entries"] == GROW_ENTRIES + 2
+    assert cache.lookup("안전한 적금 추천해줘", _profile())["value"] == updated
+
+    cache.store("안전한 적금 추천해줘", _profile(age="50대"), VALUE)
+    assert cache.metrics()["entries"] == GROW_ENTRIES + 3
+
+
+def test_gemini_service_reuses_cached_analysis():
+    """적중 시 관련성/도메인/요구사항 분석 호출 없이 상품 선택만 실행"""
+    service = GeminiService(concurrent_stages=True, use_semantic_cache=False)
+    service.semantic_cache = SemanticQueryCache(audit_rate=0.0)
+    service.model = _FakeModel()
+
+    first = asyncio.run(service.recommend_financial_model("안전한 적금 추천해줘", None, SAMPLE_PRODUCTS, limit=2))
+    service.model.calls.clear()
+    second = asyncio.run(service.recommend_financial_model("안전한 적금 추천해 주세요", None, SAMPLE_PRODUCTS, limit=2))
+
+    assert service.model.calls == ["selection"]
+    assert second["domain"] == first["domain"]
+    assert second["user_analysis"] == first["user_analysis"]
+    assert second["recommended_products"] == first["recommended_products"]
+    assert second["ai_insights"]["semantic_cache"]["cached_query"] == "안전한 적금 추천해줘"
+
+
+def test_unrelated_query_not_cached():
+    """금융 무관 질의는 캐시에 저장하지 않음"""
+    service = GeminiService(concurrent_stages=True, use_semantic_cache=False)
+    service.semantic_cache = SemanticQueryCache()
+    service.model = _FakeModel(related=False)
+
+    asyncio.run(service.recommend_financial_model("오늘 날씨 어때", None, SAMPLE_PRODUCTS, limit=2))
+    assert service.semantic_cache.metrics()["entries"] == 0
+
+
+if __name__ == "__main__":
+    test_near_duplicate_hits()
+    test_different_meaning_misses()
+    test_lru_eviction_and_metrics()
+    test_index_grows_in_chunks_and_replaces_same_query()
+    test_gemini_service_reuses_cached_analysis()
+    test_unrelated_query_not_cached()
+    print("🏁 의미 캐시 테스트 완료!")
@@ -0,0 +1,41 @@
+# finpick-back/test_startup_imports.py - 앱 import 시 무거운 SDK 지연 로드 확인
+
+import json
+import subprocess
+import sys
+
+from app.startup_profile import heavy_modules_loaded, parse_importtime
+
+SAMPLE_IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     app.config
+import time:      3000 |       4500 |   google.generativeai
+import time:       200 |       4820 | app.main
+"""
+
+
+def test_bare_import_skips_heavy_sdks():
+    """`import app.main`만으로 Gemini/Firebase/Google Cloud SDK가 로드되지 않아야 함"""
+    result = subprocess.run(
+        [sys.executable, "-c", "import json, sys, app.main; print(json.dumps(sorted(sys.modules)))"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    modules = json.loads(result.stdout.strip().splitlines()[-1])
+    assert "app.main" in modules
+    assert heavy_modules_loaded(modules) == []
+
+
+def test_parse_importtime():
+    timings = parse_importtime(SAMPLE_IMPORTTIME)
+    assert [(timing.module, timing.depth) for timing in timings] == [
+        ("app.config", 2), ("google.generativeai", 1), ("app.main", 0)
+    ]
+    assert timings[-1].cumulative_us == 4820
+    assert heavy_modules_loaded(timing.module for timing in timings) == ["google.generativeai"]
+
+
+if __name__ == "__main__":
+    test_bare_import_skips_heavy_sdks()
+    test_parse_importtime()
+    print("🏁 앱 import 지연 로드 테스트 완료!")
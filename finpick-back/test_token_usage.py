@@ -0,0 +1,132 @@
+# finpick-back/test_token_usage.py - Gemini 토큰 사용량/비용 집계 테스트
+
+import asyncio
+import json
+import os
+import random
+import tempfile
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import app.services.token_usage as token_usage_module
+from app.services.admission import AdmissionController
+from app.services.gemini_rest import GeminiRESTResponse
+from app.services.gemini_service import GeminiService
+from app.services.token_usage import (
+    TokenUsageLedger, begin_request_usage, end_request_usage, extract_usage,
+    prometheus_text, read_usage_rows, token_cost, usage_report
+)
+from loadtest_gemini_stub import classify_prompt, default_response
+
+PRODUCTS = [
+    {"id": f"p{i}", "name": f"적금{i}", "type": "적금", "provider": {"name": f"{i}은행"}, "details": {"interest_rate": 3.0 + i / 10}}
+    for i in range(8)
+]
+
+
+class _Usage:
+    def __init__(self, prompt_token_count, candidates_token_count, cached_content_token_count=0):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.cached_content_token_count = cached_content_token_count
+
+
+class _Response:
+    def __init__(self, text: str, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class _MeteredModel:
+    """대역 서버 기본 응답 + SDK 형식 사용량 (입력 = 프롬프트 길이/2, 출력 = 응답 길이/2)"""
+
+    async def generate_content_async(self, prompt: str, generation_config=None):
+        text = default_response(classify_prompt(prompt), prompt, random.Random(prompt))
+        return _Response(text, _Usage(len(prompt) // 2, len(text) // 2))
+
+
+def _with_ledger(directory: str) -> TokenUsageLedger:
+    ledger = TokenUsageLedger(directory)
+    token_usage_module._ledger = ledger
+    return ledger
+
+
+def test_extract_usage_from_sdk_and_rest_responses():
+    """SDK 객체/REST usageMetadata 모두 읽고, 캐시 토큰은 캐시 단가로 계산, 사용량 없으면 None"""
+    assert extract_usage(_Response("", _Usage(1000, 200, 800))) == (1000, 800, 200)
+    rest = GeminiRESTResponse({"usageMetadata": {"promptTokenCount": 30, "candidatesTokenCount": 5}})
+    assert extract_usage(rest) == (30, 0, 5)
+    assert extract_usage(_Response("")) is None
+    assert token_cost(1000, 800, 200) < token_cost(1000, 0, 200)
+
+
+def test_usage_attributed_to_stage_user_and_endpoint():
+    """수락된 사용자/요청 엔드포인트로 단계별 집계, 요청 사용량과 전체 합계 일치, flush 후 보고서 상위 소비자"""
+    with tempfile.TemporaryDirectory() as directory:
+        ledger = _with_ledger(directory)
+        controller = AdmissionController(enabled=True)
+
+        async def run(uid: str, repeat: int):
+            usage, token = begin_request_usage(endpoint="/api/recommendations/natural-language")
+            try:
+                async with controller.admit(uid):
+                    service = GeminiService(use_semantic_cache=False)
+                    service.model = _MeteredModel()
+                    for _ in range(repeat):
+                        await service.recommend_financial_model("월 30만원 적금 추천해줘", None, PRODUCTS, 3)
+            finally:
+                end_request_usage(token)
+            return usage.as_dict()
+
+        async def scenario():
+            heavy = await run("heavy", 3)
+            light = await run("light", 1)
+            await ledger.flush()
+            return heavy, light
+
+        try:
+            heavy, light = asyncio.run(scenario())
+        finally:
+            token_usage_module._ledger = None
+
+        assert heavy["calls"] == 3 * light["calls"] and heavy["unmetered_calls"] == 0
+        assert set(light["stages"]) >= {"relevance", "domain", "user_analysis", "product_selection"}
+
+        metrics = ledger.metrics()
+        total_input = sum(counts["input_tokens"] for counts in metrics["stages"].values())
+        assert total_input == heavy["input_tokens"] + light["input_tokens"]
+        # 상품 목록이 들어가는 선택 단계가 입력 토큰 최대
+        assert max(metrics["stages"], key=lambda stage: metrics["stages"][stage]["input_tokens"]) == "product_selection"
+
+        rows = list(read_usage_rows(directory))
+        assert {row["endpoint"] for row in rows} == {"/api/recommendations/natural-language"}
+        by_user = usage_report(iter(rows), ["user"], top=1)
+        assert by_user[0]["user"] == "heavy" and by_user[0]["calls"] == heavy["calls"]
+
+        # flush된 증분은 비워지고 누적 합계(/metrics)는 유지
+        asyncio.run(ledger.flush())
+        assert len(list(read_usage_rows(directory))) == len(rows)
+        assert ledger.metrics()["total_cost_usd"] == metrics["total_cost_usd"] > 0
+
+
+def test_prometheus_text_and_unmetered_calls():
+    """요청 범위 밖 호출은 시스템 사용자/엔드포인트 없음으로, 사용량 없는 응답은 미계량으로 노출"""
+    ledger = TokenUsageLedger()
+    ledger.record("domain", _Response("대출"))
+    ledger.record("narrative", _Response("설명", _Usage(120, 40)))
+
+    text = prometheus_text(ledger)
+    assert 'finpick_gemini_unmetered_calls_total{stage="domain",endpoint="-"} 1' in text
+    assert 'finpick_gemini_tokens_total{stage="narrative",endpoint="-",kind="input"} 120' in text
+    assert "# TYPE finpick_gemini_cost_usd_total counter" in text
+
+    rows = ledger._take_pending()
+    assert {row["user"] for row in rows} == {"_system"}
+    assert json.loads(json.dumps(rows))[0]["calls"] == 1
+
+
+if __name__ == "__main__":
+    test_extract_usage_from_sdk_and_rest_responses()
+    test_usage_attributed_to_stage_user_and_endpoint()
+    test_prometheus_text_and_unmetered_calls()
+    print("🏁 토큰 사용량 집계 테스트 완료!")
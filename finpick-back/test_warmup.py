@@ -0,0 +1,110 @@
+# finpick-back/test_warmup.py - 워커 시작 워밍업 및 /livez, /readyz, /health 테스트
+
+import asyncio
+import os
+import tempfile
+from contextlib import contextmanager
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from fastapi.testclient import TestClient
+
+import app.services.history_store as history_store_module
+import app.services.warmup as warmup_module
+from app.config import settings
+from app.main import app
+from app.services.product_catalog import get_product_catalog
+from app.services.prompt_compiler import get_prompt_compiler
+from app.services.warmup import Warmup
+
+
+@contextmanager
+def _temporary_history_store():
+    """워밍업/상태 조회가 만드는 기본 이력 저장소를 임시 디렉터리에 (작업 디렉터리에 SQLite 파일을 남기지 않음)"""
+    original_path = settings.history_db_path
+    with tempfile.TemporaryDirectory() as directory:
+        settings.history_db_path = os.path.join(directory, "history.sqlite3")
+        history_store_module._store = None
+        try:
+            yield
+        finally:
+            asyncio.run(history_store_module.shutdown_history_store())
+            settings.history_db_path = original_path
+
+
+def _failing_step(message: str):
+    async def run():
+        raise RuntimeError(message)
+    return run
+
+
+def test_warmup_prepares_catalog_views_and_prompts():
+    """워밍업 후 카탈로그/추천 뷰/프롬프트 고정 부분이 준비되어 첫 요청이 재사용"""
+    with _temporary_history_store():
+        state = asyncio.run(Warmup().run())
+    assert state.status in ("ready", "degraded") and state.ready
+    steps = state.steps
+    assert steps["catalog"]["status"] == "ok" and steps["catalog"]["products"] == len(get_product_catalog().products)
+    assert steps["segment_views"]["views"] > 0
+    assert steps["prompt_cache"]["prompt_prefixes"] == 10
+    assert steps["synthetic_queries"]["queries"] == 20
+    assert all("duration_ms" in step for step in steps.values())
+
+    compiler = get_prompt_compiler()
+    hits = compiler.metrics()["hits"]
+    compiler.prefix(("product_selection", "대출", 12), get_product_catalog().version, lambda: "다시 렌더링하면 안 됨")
+    assert compiler.metrics()["hits"] == hits + 1
+
+
+def test_required_step_failure_blocks_readiness():
+    """필수 단계(카탈로그) 실패 → failed(준비 안 됨), 선택 단계 실패 → degraded(트래픽 수신)"""
+    original = (warmup_module._warm_catalog, warmup_module._warm_auth)
+    try:
+        with _temporary_history_store():
+            warmup_module._warm_auth = _failing_step("firebase 키 없음")
+            degraded = asyncio.run(Warmup().run())
+            assert degraded.status == "degraded" and degraded.ready
+            assert degraded.steps["auth"]["error"] == "firebase 키 없음"
+
+            warmup_module._warm_catalog = _failing_step("카탈로그 파일 없음")
+            failed = asyncio.run(Warmup().run())
+            assert failed.status == "failed" and not failed.ready
+            # 카탈로그가 없으면 카탈로그 의존 단계는 실행하지 않음
+            assert "segment_views" not in failed.steps and "synthetic_queries" not in failed.steps
+    finally:
+        warmup_module._warm_catalog, warmup_module._warm_auth = original
+
+
+def test_readyz_reflects_warmup_and_livez_always_alive():
+    """워밍업 전 /readyz 503 + /health starting, 워밍업 후 200 + 실제 구성 요소 상태"""
+    original = warmup_module._warmup
+    warmup_module._warmup = Warmup()
+    try:
+        with _temporary_history_store():
+            client = TestClient(app)
+            assert client.get("/livez").json() == {"status": "alive"}
+
+            before = client.get("/readyz")
+            assert before.status_code == 503 and before.json()["warmup"]["status"] == "pending"
+            assert client.get("/health").json()["status"] == "starting"
+
+            asyncio.run(warmup_module._warmup.run())
+            after = client.get("/readyz")
+            body = after.json()
+            assert after.status_code == 200 and body["status"] == "ready"
+            assert body["components"]["catalog"]["status"] == "ok"
+            assert body["components"]["segment_views"]["status"] == "ok"
+            assert body["warmup"]["steps"]["catalog"]["duration_ms"] >= 0
+
+            health = client.get("/health").json()
+            assert health["status"] in ("healthy", "degraded")
+            assert health["services"]["financial_data"] == "ok" and health["services"]["database"] != "connected"
+    finally:
+        warmup_module._warmup = original
+
+
+if __name__ == "__main__":
+    test_warmup_prepares_catalog_views_and_prompts()
+    test_required_step_failure_blocks_readiness()
+    test_readyz_reflects_warmup_and_livez_always_alive()
+    print("🏁 워밍업/준비 상태 테스트 완료!")
@@ -0,0 +1,81 @@
+# finpick-back/test_yield_engine.py - 세후 만기 계산 테스트
+
+import math
+
+from app.services.yield_engine import YieldEngine
+
+PRODUCTS = [
+    {
+        "id": "d_simple", "name": "단리 정기예금", "type": "예금",
+        "details": {"minimum_amount": 1000000, "maximum_amount": None},
+        "rates": [{"period_months": 12, "base_rate": 3.0, "max_rate": 3.0, "rate_type": "단리"}],
+    },
+    {
+        "id": "d_compound", "name": "복리 정기예금", "type": "예금",
+        "details": {"minimum_amount": 1000000},
+        "rates": [
+            {"period_months": 12, "base_rate": 3.0, "max_rate": 3.0, "rate_type": "단리"},
+            {"period_months": 12, "base_rate": 3.0, "max_rate": 3.0, "rate_type": "복리"},
+        ],
+    },
+    {
+        "id": "d_big", "name": "고액 정기예금", "type": "예금",
+        "details": {"minimum_amount": 50000000},
+        "rates": [{"period_months": 12, "base_rate": 4.0, "max_rate": 4.0, "rate_type": "단리"}],
+    },
+    {
+        "id": "s_simple", "name": "자유 적금", "type": "적금",
+        "details": {"minimum_amount": 10000, "maximum_amount": 500000},
+        "rates": [{"period_months": 12, "base_rate": 4.0, "max_rate": 5.0, "rate_type": "단리"}],
+    },
+    {"id": "l1", "name": "신용대출", "type": "신용대출", "details": {"interest_rate": 5.0}},
+]
+
+
+def test_lump_sum_simple_and_compound():
+    """예금 단리/복리 세후 이자 및 상품당 최적 행 선택"""
+    engine = YieldEngine.build(PRODUCTS)
+    rows = {item["product_id"]: item for item in engine.compare("정기예금", 10000000, 12)}
+
+    assert set(rows) == {"d_simple", "d_compound"}  # 최소가입금액 미달 상품 제외
+    simple = rows["d_simple"]
+    assert simple["gross_interest"] == 300000
+    assert simple["tax"] == 46200
+    assert simple["net_interest"] == 253800
+    assert simple["net_proceeds"] == 10253800
+
+    compound = rows["d_compound"]
+    assert compound["rate_type"] == "복리"
+    assert compound["gross_interest"] == int(10000000 * ((1 + 0.03 / 12) ** 12 - 1))
+    assert engine.compare("예금", 10000000, 12)[0]["product_id"] == "d_compound"
+
+
+def test_installment_interest_and_limits():
+    """적금 월 납입 단리 이자와 월 한도 초과 제외"""
+    engine = YieldEngine.build(PRODUCTS)
+    [item] = engine.compare("적금", 300000, 12)
+    expected_gross = 300000 * 0.05 / 12 * 12 * 13 / 2
+    assert item["principal"] == 3600000
+    assert item["gross_interest"] == int(expected_gross)
+    assert item["net_interest"] == int(expected_gross - math.floor(expected_gross * 0.154))
+    assert item["effective_annual_rate"] < 5.0
+
+    assert engine.compare("적금", 600000, 12) == []
+    assert engine.compare("적금", 300000, 24) == []
+
+
+def test_effective_rates_keyed_by_catalog_row():
+    """ID가 같은 상품(금감원 데이터 중복 ID)도 행마다 따로 수익률 계산"""
+    duplicate = dict(PRODUCTS[0], rates=[{"period_months": 12, "base_rate": 2.0, "max_rate": 2.0, "rate_type": "단리"}])
+    engine = YieldEngine.build(PRODUCTS + [duplicate])
+    rates = engine.effective_rates("예금", 10000000, 12)
+
+    assert set(rates) == {0, 1, len(PRODUCTS)}
+    assert rates[0] > rates[len(PRODUCTS)]
+
+
+if __name__ == "__main__":
+    test_lump_sum_simple_and_compound()
+    test_installment_interest_and_limits()
+    test_effective_rates_keyed_by_catalog_row()
+    print("🏁 세후 만기 계산 테스트 완료!")